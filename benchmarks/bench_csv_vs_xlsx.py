@@ -0,0 +1,63 @@
+"""
+YAML ↔ Excel Converter - Benchmark CSV/TSV vs XLSX
+Confronta i tempi di conversione nei due sensi per i formati tabellari
+
+Uso:
+    python -m benchmarks.bench_csv_vs_xlsx --connections 20000
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+from benchmarks.common import file_size_mb, generate_rlist, print_table, timed
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSV/TSV vs XLSX')
+    parser.add_argument('--connections', type=int, default=20000)
+    parser.add_argument('--secrets', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        yaml_path = os.path.join(work_dir, 'input.yml')
+        row_count = generate_rlist(yaml_path, args.connections, args.secrets)
+        print(f"{row_count} rows, YAML {file_size_mb(yaml_path):.1f} MB\n")
+
+        results = []
+        for fmt in ('xlsx', 'csv', 'tsv'):
+            table_path = os.path.join(work_dir, f'output.{fmt}')
+            back_path = os.path.join(work_dir, f'back_{fmt}.yml')
+            with contextlib.redirect_stdout(io.StringIO()):
+                to_table, result = timed(custom_yaml_to_excel, yaml_path, table_path)
+                assert result[0], result[2]
+                to_yaml, result = timed(custom_excel_to_yaml, table_path, back_path, streaming=True)
+                assert result[0], result[2]
+            results.append([fmt, to_table, to_yaml, file_size_mb(table_path)])
+
+        print_table(['format', 'yaml->table s', 'table->yaml s', 'size MB'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+YAML ↔ Excel Converter - Benchmark diff
+Misura il confronto di due rlist da 1M di righe: la parte hash map
+(diff_rows) e il confronto completo da file NDJSON/CSV con i reader
+
+Uso:
+    python -m benchmarks.bench_diff --rows 1000000 --changes 1000
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from benchmarks.common import file_size_mb, print_table, timed
+from yamlconverter.converters.custom_csv import write_csv_rows
+from yamlconverter.converters.custom_ndjson import write_ndjson_rows
+from yamlconverter.converters.diff import diff_files, diff_rows
+
+
+def make_rows(rows: int, changes: int, secrets_per_connection: int = 4) -> list:
+    """Genera le righe; con changes > 0 modifica un valore ogni rows // changes righe"""
+    step = rows // changes if changes else 0
+    result = []
+    for i in range(rows):
+        connection, index = divmod(i, secrets_per_connection)
+        value = f'value-{connection}-{index}-abcdefghijklmnopqrstuvwxyz'
+        if step and i % step == 0:
+            value += '-changed'
+        result.append({'Name': f'CONNECTION_{connection:07d}[{index}]', 'Secret': f'$$SECRET_{index}$$',
+                       'Value': value})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff benchmark')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--changes', type=int, default=1000)
+    args = parser.parse_args()
+
+    old_rows = make_rows(args.rows, 0)
+    new_rows = make_rows(args.rows, args.changes)
+    work_dir = tempfile.mkdtemp()
+    try:
+        results = []
+        seconds, result = timed(diff_rows, old_rows, new_rows)
+        results.append(['in memory', args.rows, result['summary']['secrets_changed'], seconds, '-'])
+
+        for extension, writer in (('.ndjson', write_ndjson_rows), ('.csv', write_csv_rows)):
+            paths = []
+            for label, rows in (('old', old_rows), ('new', new_rows)):
+                path = os.path.join(work_dir, label + extension)
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    writer(rows, f)
+                paths.append(path)
+            seconds, (_success, _warnings, error, result) = timed(diff_files, *paths)
+            assert error is None, error
+            results.append([extension[1:], args.rows, result['summary']['secrets_changed'], seconds,
+                            f"{file_size_mb(paths[0]):.1f}"])
+
+        print_table(['input', 'rows', 'changed', 'seconds', 'size MB'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+YAML ↔ Excel Converter - Benchmark engines
+Confronto degli engine registrati per lo stesso formato (parsing YAML con
+libyaml o PyYAML puro, lettura/scrittura NDJSON con orjson o json)
+
+Uso:
+    python -m benchmarks.bench_engines --connections 10000,50000
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from benchmarks.common import file_size_mb, generate_rlist, print_table, timed
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.registry import list_engines, set_preferred_engine
+
+# (tipo, formato, conversione misurata)
+CASES = [('yaml_loader', 'yaml', 'yaml -> csv'), ('writer', 'ndjson', 'yaml -> ndjson'),
+         ('reader', 'ndjson', 'ndjson -> yaml')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Engine registry benchmark')
+    parser.add_argument('--connections', default='10000,50000')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        results = []
+        for connections in [int(value) for value in args.connections.split(',')]:
+            yaml_file = os.path.join(work_dir, f'rlist_{connections}.yml')
+            generate_rlist(yaml_file, connections)
+            ndjson_file = os.path.join(work_dir, f'rlist_{connections}.ndjson')
+            success, _warnings, error = custom_yaml_to_excel(yaml_file, ndjson_file)
+            assert success, error
+            for kind, fmt, label in CASES:
+                for engine in list_engines(kind, fmt):
+                    if not engine.is_available():
+                        continue
+                    set_preferred_engine(kind, fmt, engine.name)
+                    try:
+                        if kind == 'reader':
+                            output = os.path.join(work_dir, 'out.yml')
+                            seconds, (success, _warnings, error) = timed(custom_excel_to_yaml, ndjson_file, output)
+                        else:
+                            output = os.path.join(work_dir, 'out.csv' if kind == 'yaml_loader' else 'out.ndjson')
+                            seconds, (success, _warnings, error) = timed(custom_yaml_to_excel, yaml_file, output)
+                        assert success, error
+                    finally:
+                        set_preferred_engine(kind, fmt)
+                    results.append([connections, label, engine.name, file_size_mb(yaml_file), seconds])
+
+        print_table(['connections', 'conversion', 'engine', 'yaml MB', 'seconds'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+YAML ↔ Excel Converter - Benchmark bulk GPG
+Misura il throughput di cifratura, decifratura e cambio passphrase in blocco
+di molti rlist al crescere del numero di processi gpg contemporanei
+
+Uso:
+    python -m benchmarks.bench_gpg_bulk --files 48 --connections 2000 --workers 1,2,4,8
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from benchmarks.common import generate_rlist, print_table, timed
+from yamlconverter.converters.bulk_gpg import bulk_decrypt_files, bulk_encrypt_files, rekey_files
+
+PASSWORD = 'benchmark-passphrase'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk GPG benchmark')
+    parser.add_argument('--files', type=int, default=48)
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--workers', default='1,2,4,8')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        plain_dir = os.path.join(work_dir, 'plain')
+        os.makedirs(plain_dir)
+        for number in range(args.files):
+            generate_rlist(os.path.join(plain_dir, f'app_{number:03d}.yml'), args.connections)
+        total_mb = sum(os.path.getsize(os.path.join(plain_dir, name)) for name in os.listdir(plain_dir)) / (1024 * 1024)
+
+        results = []
+        for workers in [int(value) for value in args.workers.split(',')]:
+            encrypted_dir = os.path.join(work_dir, f'encrypted_{workers}')
+            decrypted_dir = os.path.join(work_dir, f'decrypted_{workers}')
+            seconds, (_success, _warnings, error, report) = timed(
+                bulk_encrypt_files, [plain_dir], PASSWORD, encrypted_dir, workers)
+            assert error is None and report['failed'] == 0, error
+            encrypt_seconds = seconds
+            seconds, (_success, _warnings, error, report) = timed(
+                bulk_decrypt_files, [encrypted_dir], PASSWORD, decrypted_dir, workers)
+            assert error is None and report['failed'] == 0, error
+            decrypt_seconds = seconds
+            seconds, (_success, _warnings, error, report) = timed(
+                rekey_files, [encrypted_dir], PASSWORD, PASSWORD + '-new', None, workers)
+            assert error is None and report['failed'] == 0, error
+            results.append([workers, args.files, encrypt_seconds, total_mb / encrypt_seconds,
+                            decrypt_seconds, total_mb / decrypt_seconds, seconds, total_mb / seconds])
+
+        print(f"{args.files} files, {total_mb:.1f} MB, {os.cpu_count()} CPU")
+        print_table(['workers', 'files', 'encrypt s', 'encrypt MB/s', 'decrypt s', 'decrypt MB/s',
+                     'rekey s', 'rekey MB/s'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+YAML ↔ Excel Converter - Benchmark GPG profiles
+Matrice dei tempi di cifratura/decifratura e delle dimensioni dell'output
+per ogni profilo di cifratura su rlist generati di varie dimensioni
+
+Uso:
+    python -m benchmarks.bench_gpg_profiles --connections 10000,100000
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from benchmarks.common import file_size_mb, generate_rlist, print_table, timed
+from yamlconverter.utils.gpg_utils import GPG_PROFILES, decrypt_file, encrypt_file
+
+PASSWORD = 'benchmark-passphrase'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GPG profiles benchmark')
+    parser.add_argument('--connections', default='10000,100000')
+    parser.add_argument('--profiles', default=','.join(GPG_PROFILES))
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        results = []
+        for connections in [int(value) for value in args.connections.split(',')]:
+            yaml_file = os.path.join(work_dir, f'rlist_{connections}.yml')
+            generate_rlist(yaml_file, connections)
+            with open(yaml_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            input_mb = file_size_mb(yaml_file)
+            for profile in args.profiles.split(','):
+                gpg_file = os.path.join(work_dir, f'rlist_{connections}_{profile}.yml.gpg')
+                encrypt_seconds, (success, error) = timed(encrypt_file, content, gpg_file, PASSWORD,
+                                                          profile=profile)
+                assert success, error
+                decrypt_seconds, (success, _content, error) = timed(decrypt_file, gpg_file, PASSWORD)
+                assert success, error
+                output_mb = file_size_mb(gpg_file)
+                results.append([connections, profile, input_mb, encrypt_seconds, decrypt_seconds,
+                                output_mb, output_mb / input_mb])
+
+        print_table(['connections', 'profile', 'yaml MB', 'encrypt s', 'decrypt s', 'gpg MB', 'ratio'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+YAML ↔ Excel Converter - Benchmark inventory
+Tempo delle statistiche (comando stats) rispetto alla conversione completa,
+per YAML, xlsx e csv, e di una cartella con più processi
+
+Uso:
+    python -m benchmarks.bench_inventory --connections 5000,20000 --files 8
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from benchmarks.common import file_size_mb, generate_rlist, print_table, timed
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.inventory import file_stats, inventory_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inventory scan benchmark')
+    parser.add_argument('--connections', default='5000,20000')
+    parser.add_argument('--files', type=int, default=8)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        results = []
+        for connections in [int(value) for value in args.connections.split(',')]:
+            paths = {extension: os.path.join(work_dir, f'rlist_{connections}.{extension}')
+                     for extension in ('yml', 'xlsx', 'csv')}
+            generate_rlist(paths['yml'], connections)
+            with redirect_stdout(io.StringIO()):
+                for extension in ('xlsx', 'csv'):
+                    success, _warnings, error = custom_yaml_to_excel(paths['yml'], paths[extension])
+                    assert success, error
+            for extension, path in paths.items():
+                converter = custom_yaml_to_excel if extension == 'yml' else custom_excel_to_yaml
+                output = os.path.join(work_dir, 'out.csv' if extension == 'yml' else 'out.yml')
+                with redirect_stdout(io.StringIO()):
+                    convert_seconds, (success, _warnings, error) = timed(converter, path, output)
+                assert success, error
+                stats_seconds, result = timed(file_stats, path)
+                assert result['error'] is None, result['error']
+                results.append([connections, extension, f'{file_size_mb(path):.1f}', result['rows'],
+                                convert_seconds, stats_seconds, f'{stats_seconds / convert_seconds:.1%}'])
+        print_table(['connections', 'format', 'MB', 'rows', 'convert s', 'stats s', 'ratio'], results)
+
+        # Cartella di file: un processo contro tutte le CPU
+        folder = os.path.join(work_dir, 'folder')
+        os.makedirs(folder)
+        for index in range(args.files):
+            generate_rlist(os.path.join(folder, f'rlist_{index}.yml'), 5000)
+        folder_results = []
+        for workers in sorted({1, os.cpu_count() or 1}):
+            seconds, (success, _warnings, error, report) = timed(inventory_files, [folder], workers=workers)
+            assert success, error
+            folder_results.append([args.files, workers, report['rows'], seconds])
+        print()
+        print_table(['files', 'workers', 'rows', 'seconds'], folder_results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+YAML ↔ Excel Converter - Benchmark NDJSON
+Verifica che esportazione e importazione NDJSON scalino linearmente con il
+numero di righe e che l'esportazione usi memoria costante
+
+Uso:
+    python -m benchmarks.bench_ndjson_scaling --sizes 250000 500000 1000000 2000000
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from benchmarks.common import file_size_mb, peak_memory, print_table, timed
+from yamlconverter.converters.custom_excel_to_yaml import iter_table_rows, rebuild_yaml_structure
+from yamlconverter.converters.custom_ndjson import read_ndjson_table, write_ndjson_rows
+from yamlconverter.converters.custom_yaml_to_excel import iter_name_secret_value
+
+
+def build_structure(rows: int, secrets_per_connection: int = 4) -> dict:
+    """Costruisce in memoria una struttura YAML già caricata con il numero di righe richiesto"""
+    connections = {}
+    for i in range(rows // secrets_per_connection):
+        connections[f'CONNECTION_{i:07d}'] = [
+            {'secret': f'$$SECRET_{j}$$', 'value': f'value-{i}-{j}-abcdefghijklmnopqrstuvwxyz'}
+            for j in range(secrets_per_connection)
+        ]
+    return {'Connections': connections}
+
+
+def export_rows(data: dict, path: str) -> int:
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        return write_ndjson_rows(iter_name_secret_value(data), f)
+
+
+def import_rows(path: str) -> int:
+    with open(path, 'r', encoding='utf-8') as f:
+        return len(rebuild_yaml_structure(iter_table_rows(read_ndjson_table(f)))['Connections'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='NDJSON scaling benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250000, 500000, 1000000, 2000000])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        results = []
+        for size in args.sizes:
+            data = build_structure(size)
+            path = os.path.join(work_dir, f'rows_{size}.ndjson')
+
+            # Tempo e picco di memoria da due esecuzioni distinte (tracemalloc falserebbe il tempo)
+            export_s, written = timed(export_rows, data, path)
+            peak, _written = peak_memory(export_rows, data, path)
+
+            import_s, _connections = timed(import_rows, path)
+            results.append([written, export_s, written / export_s, peak / 1024, import_s,
+                            written / import_s, file_size_mb(path)])
+            del data
+            os.unlink(path)
+
+        print_table(['rows', 'export s', 'export rows/s', 'export peak KB', 'import s',
+                     'import rows/s', 'size MB'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+YAML ↔ Excel Converter - Benchmark planner
+Tempo e memoria di picco di ogni strategia di conversione, confrontati con
+la stima del planner (da cui derivano i coefficienti di planner.py)
+
+Uso:
+    python -m benchmarks.bench_planner --connections 5000,20000
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from benchmarks.common import generate_rlist, print_table, timed
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.planner import STRATEGY_OPTIONS, estimate_input
+
+# (input, output, modalità)
+CASES = [('yml', 'csv', 'yaml_to_excel'), ('xlsx', 'yml', 'excel_to_yaml'), ('csv', 'yml', 'excel_to_yaml')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Conversion planner benchmark')
+    parser.add_argument('--connections', default='5000,20000')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        results = []
+        for connections in [int(value) for value in args.connections.split(',')]:
+            paths = {extension: os.path.join(work_dir, f'rlist_{connections}.{extension}')
+                     for extension in ('yml', 'xlsx', 'csv')}
+            generate_rlist(paths['yml'], connections)
+            with redirect_stdout(io.StringIO()):
+                for extension in ('xlsx', 'csv'):
+                    success, _warnings, error = custom_yaml_to_excel(paths['yml'], paths[extension])
+                    assert success, error
+            for source, target, mode in CASES:
+                rows, memory = estimate_input(paths[source], mode)
+                converter = custom_yaml_to_excel if mode == 'yaml_to_excel' else custom_excel_to_yaml
+                output = os.path.join(work_dir, f'out.{target}')
+                for strategy, options in STRATEGY_OPTIONS[mode].items():
+                    tracemalloc.start()
+                    with redirect_stdout(io.StringIO()):
+                        seconds, (success, _warnings, error) = timed(converter, paths[source], output, **options)
+                    _current, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    assert success, error
+                    results.append([connections, f'{source} -> {target}', strategy, rows,
+                                    memory / (1024 * 1024), peak / (1024 * 1024), seconds])
+
+        print_table(['connections', 'conversion', 'strategy', 'estimated rows', 'estimated MB',
+                     'peak MB', 'seconds'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+YAML ↔ Excel Converter - Benchmark search index
+Misura l'indicizzazione di un albero di rlist CSV, la reindicizzazione
+incrementale (file invariati) e il tempo delle ricerche sull'indice
+
+Uso:
+    python -m benchmarks.bench_search_index --files 20 --rows 50000
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+from benchmarks.common import print_table, timed
+from yamlconverter.converters.custom_csv import write_csv_rows
+from yamlconverter.converters.search_index import search_index, update_index
+
+
+def write_tree(root: str, files: int, rows: int, secrets_per_connection: int = 4):
+    """Scrive files rlist CSV con connessioni diverse per file"""
+    for number in range(files):
+        directory = os.path.join(root, f'team_{number % 4}')
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f'app_{number:03d}.csv'), 'w', encoding='utf-8', newline='') as f:
+            write_csv_rows(({'Name': f'CONN_{number:03d}_{i // secrets_per_connection:06d}'
+                                     f'[{i % secrets_per_connection}]',
+                             'Secret': f'$$SECRET_{i % secrets_per_connection}$$',
+                             'Value': f'value-{i}'} for i in range(rows)), f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search index benchmark')
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        root = os.path.join(work_dir, 'tree')
+        index_file = os.path.join(work_dir, 'index.sqlite')
+        write_tree(root, args.files, args.rows)
+
+        results = []
+        seconds, (_success, _warnings, error, report) = timed(update_index, [root], index_file)
+        assert error is None, error
+        results.append(['index', report['entries'], seconds * 1000])
+        seconds, (_success, _warnings, error, report) = timed(update_index, [root], index_file)
+        results.append(['re-index (unchanged)', report['unchanged'], seconds * 1000])
+
+        queries = [
+            ('connection substring', dict(connection='007_000123')),
+            ('connection exact', dict(connection='CONN_007_000123', exact=True)),
+            ('placeholder + connection', dict(secret='SECRET_2', connection='CONN_012_0004')),
+            ('placeholder (limit 100)', dict(secret='$$SECRET_1$$', limit=100)),
+            ('short text (scan)', dict(text='_9', limit=100)),
+        ]
+        for label, criteria in queries:
+            seconds, matches = timed(search_index, index_file, **criteria)
+            results.append([f'search: {label}', len(matches), seconds * 1000])
+
+        print_table(['operation', 'rows', 'ms'], results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+YAML ↔ Excel Converter - Benchmark utilities
+Funzioni comuni ai benchmark: generazione di rlist sintetici e misura dei tempi
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import time
+import tracemalloc
+from typing import Callable, List, Sequence, Tuple
+
+
+def generate_rlist(path: str, connections: int, secrets_per_connection: int = 3) -> int:
+    """
+    Genera un file secrets.rlist sintetico.
+
+    Args:
+        path: Path del file YAML da creare
+        connections: Numero di connessioni
+        secrets_per_connection: Numero di coppie secret/value per connessione
+
+    Returns:
+        Numero di righe Name/Secret/Value corrispondenti
+    """
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('Connections:\n')
+        for i in range(connections):
+            f.write(f'  CONNECTION_{i:07d}:\n')
+            for j in range(secrets_per_connection):
+                f.write(f'    - secret: "$$SECRET_{j}$$"\n')
+                f.write(f'      value: "value-{i}-{j}-abcdefghijklmnopqrstuvwxyz"\n')
+    return connections * secrets_per_connection
+
+
+def timed(func: Callable, *args, **kwargs) -> Tuple[float, object]:
+    """
+    Esegue una funzione misurandone il tempo.
+
+    Returns:
+        Tupla (secondi, risultato)
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - start, result)
+
+
+def peak_memory(func: Callable, *args, **kwargs) -> Tuple[int, object]:
+    """
+    Esegue una funzione sotto tracemalloc misurando il picco di memoria
+    allocata (in un'esecuzione separata da quella cronometrata: tracemalloc
+    rallenta molto il codice che alloca).
+
+    Returns:
+        Tupla (byte di picco, risultato)
+    """
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak, result)
+
+
+def file_size_mb(path: str) -> float:
+    """Dimensione del file in MB"""
+    return os.path.getsize(path) / (1024 * 1024)
+
+
+def print_table(headers: Sequence[str], rows: List[Sequence[object]]):
+    """Stampa una tabella allineata a colonne"""
+    cells = [[str(h) for h in headers]] + [[f"{c:.3f}" if isinstance(c, float) else str(c) for c in row]
+                                           for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print('  '.join(cell.rjust(width) for cell, width in zip(row, widths)))
+        if index == 0:
+            print('  '.join('-' * width for width in widths))
@@ -44,9 +44,15 @@ a = Analysis(
         'yamlconverter.converters',
         'yamlconverter.converters.custom_yaml_to_excel',
         'yamlconverter.converters.custom_excel_to_yaml',
+        'yamlconverter.converters.custom_csv',
+        'yamlconverter.converters.custom_ndjson',
+        'yamlconverter.converters.pipeline',
         'yamlconverter.utils',
+        'yamlconverter.utils.formats',
         'yamlconverter.utils.gpg_utils',
         'yamlconverter.utils.i18n',
+        'yamlconverter.utils.streams',
+        'yamlconverter.utils.watcher',
     ],
     hookspath=[str(root_dir / 'scripts' / 'hooks')],  # Hook personalizzati per correggere warning tkinterdnd2
     hooksconfig={},
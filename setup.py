@@ -39,9 +39,14 @@ setup(
         "tkinterdnd2>=0.3.0",
         "python-gnupg>=0.5.0",
     ],
+    extras_require={
+        "zstd": ["zstandard>=0.21"],
+        "orjson": ["orjson>=3.6"],
+    },
     entry_points={
         "console_scripts": [
             "yamlconverter=yamlconverter.gui.main:main",
+            "yamlconverter-cli=yamlconverter.cli.main:main",
         ],
         "gui_scripts": [
             "yamlconverter-gui=yamlconverter.gui.main:main",
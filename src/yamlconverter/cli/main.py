@@ -0,0 +1,713 @@
+"""
+YAML ↔ Excel Converter - CLI
+Interfaccia a riga di comando per conversioni singole e monitoraggio cartelle
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import getpass
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from typing import List, Optional
+from yamlconverter.converters.bulk_gpg import bulk_gpg_files
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_sheets_to_yaml
+from yamlconverter.converters.diff import (
+    DIFF_FORMATS, diff_files, format_diff_json, format_diff_summary, format_diff_text, has_differences,
+)
+from yamlconverter.converters.filters import build_connection_filter
+from yamlconverter.converters.inventory import INVENTORY_FORMATS, format_inventory, inventory_files
+from yamlconverter.converters.merge import MERGE_POLICIES, merge_files
+from yamlconverter.converters.pipeline import convert_file
+from yamlconverter.converters.planner import STRATEGIES, STRATEGY_OPTIONS
+from yamlconverter.converters.registry import PLUGIN_ERRORS, get_engine, list_engines, load_plugins
+from yamlconverter.converters.search_index import (
+    DEFAULT_INDEX_FILE, SEARCH_FORMATS, SEARCH_LIMIT, format_search_results, search_index, update_index,
+)
+from yamlconverter.converters.verify import RowDigest, format_verify_report, verify_round_trip, verify_written_table
+from yamlconverter.utils.formats import (
+    TABLE_FORMATS, describe_supported_formats, detect_conversion_mode, is_compressed_path,
+    table_format,
+)
+from yamlconverter.utils.gpg_utils import GPG_PROFILES, is_encrypted_file, parse_profile
+from yamlconverter.utils.i18n import get_i18n, set_language
+from yamlconverter.utils.metrics import MetricsRecorder, parse_labels
+from yamlconverter.utils.profiling import PROFILE_FORMATS, Profiler
+from yamlconverter.utils.sniff import DETECT_FORMATS, format_chains, sniff_conversion_mode, sniff_file
+from yamlconverter.utils.streams import STDIO
+from yamlconverter.utils.watcher import (
+    ConversionWatcher, input_filter_for_mode, watch_output_path,
+)
+
+MODES = ['yaml_to_excel', 'excel_to_yaml']
+
+
+def _echo(message: str, error: bool = False):
+    """Stampa un messaggio ignorando errori di encoding della console"""
+    try:
+        print(message, file=sys.stderr if error else sys.stdout)
+    except UnicodeEncodeError:
+        pass
+
+
+def _resolve_password(args, i18n, needed: bool) -> Optional[str]:
+    """
+    Recupera la password GPG dalla variabile d'ambiente indicata o la chiede all'utente.
+
+    Args:
+        args: Argomenti della riga di comando
+        i18n: Oggetto i18n
+        needed: True se la password è necessaria
+
+    Returns:
+        Password oppure None se non necessaria
+    """
+    if not needed:
+        return None
+    if args.password_env:
+        password = os.environ.get(args.password_env)
+        if password:
+            return password
+    return getpass.getpass(i18n.t('password_prompt'))
+
+
+def _resolve_new_password(args, i18n) -> Optional[str]:
+    """Recupera la nuova password GPG dalla variabile d'ambiente o la chiede due volte (None se non coincide)"""
+    if args.new_password_env:
+        password = os.environ.get(args.new_password_env)
+        if password:
+            return password
+    password = getpass.getpass(i18n.t('new_password_prompt'))
+    if getpass.getpass(i18n.t('new_password_confirm')) != password:
+        return None
+    return password
+
+
+def _log_result(result: tuple, i18n) -> bool:
+    """Stampa warning ed errori di una conversione e restituisce l'esito"""
+    success, warnings, error = result
+    for warning in warnings or []:
+        _echo(warning, error=True)
+    if not success and error:
+        _echo(f"✗ {error}", error=True)
+    return success
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser, i18n):
+    """Aggiunge le opzioni di filtro delle connessioni a un sottocomando"""
+    parser.add_argument('--include', action='append', metavar='PATTERN', help=i18n.t('cli_help_include'))
+    parser.add_argument('--exclude', action='append', metavar='PATTERN', help=i18n.t('cli_help_exclude'))
+    parser.add_argument('--include-secret', action='append', metavar='PATTERN',
+                        help=i18n.t('cli_help_include_secret'))
+    parser.add_argument('--exclude-secret', action='append', metavar='PATTERN',
+                        help=i18n.t('cli_help_exclude_secret'))
+
+
+def _connection_filter(args, i18n):
+    """Crea il filtro delle connessioni dagli argomenti (None se non richiesto)"""
+    return build_connection_filter(args.include, args.exclude, args.include_secret,
+                                   args.exclude_secret, i18n)
+
+
+def _add_gpg_profile_argument(parser: argparse.ArgumentParser, i18n):
+    """Aggiunge l'opzione del profilo di cifratura GPG a un sottocomando"""
+    parser.add_argument('--gpg-profile', metavar='PROFILE',
+                        help=i18n.t('cli_help_gpg_profile').format(profiles=', '.join(GPG_PROFILES)))
+
+
+def _gpg_profile(args, i18n):
+    """Profilo di cifratura dagli argomenti (None se non indicato, ValueError se non valido)"""
+    if not args.gpg_profile:
+        return None
+    try:
+        return parse_profile(args.gpg_profile)
+    except ValueError as e:
+        raise ValueError(f"{i18n.t('invalid_gpg_profile')}: {e}") from e
+
+
+def _is_encrypted_input(path: str) -> bool:
+    """Verifica se un input è cifrato con GPG (estensione .gpg o contenuto)"""
+    return path.lower().endswith('.gpg') or (path != STDIO and is_encrypted_file(path))
+
+
+def _megabytes(value: Optional[float]) -> Optional[int]:
+    """Converte un valore in MB dalla riga di comando in byte"""
+    return None if value is None else int(value * 1024 * 1024)
+
+
+def cmd_convert(args, i18n) -> int:
+    """Sottocomando 'convert': converte un singolo file"""
+    mode = args.mode or detect_conversion_mode(args.input, args.output)
+    sniffed_format = None
+    if mode is None and STDIO not in (args.input, args.output) and os.path.isfile(args.input):
+        # Estensioni non riconosciute: modalità e formato dedotti dal contenuto
+        mode, sniffed_format = sniff_conversion_mode(args.input, args.output)
+    if mode is None:
+        if STDIO in (args.input, args.output):
+            _echo(f"⚠ {i18n.t('stdio_requires_mode')}", error=True)
+        else:
+            _echo(f"⚠ {i18n.t('warning_extension_not_recognized')}. "
+                  f"{i18n.t('supported_formats')}: {describe_supported_formats()}", error=True)
+        return 2
+    if args.input != STDIO and not os.path.exists(args.input):
+        _echo(f"✗ {i18n.t('file_not_found')}: {args.input}", error=True)
+        return 1
+
+    needs_password = _is_encrypted_input(args.input) or (
+        mode == 'excel_to_yaml' and (args.encrypt or args.output.lower().endswith('.gpg')))
+    if needs_password and args.input == STDIO and not args.password_env:
+        # stdin è occupato dai dati: la password non può essere chiesta interattivamente
+        _echo(f"✗ {i18n.t('stdio_requires_password_env')}", error=True)
+        return 2
+    password = _resolve_password(args, i18n, needs_password)
+
+    options = {}
+    if args.parallel:
+        if mode == 'excel_to_yaml' and (args.table_format or sniffed_format or table_format(args.input)) != 'xlsx':
+            _echo(f"⚠ {i18n.t('parallel_yaml_only')}", error=True)
+        elif args.input == STDIO or is_compressed_path(args.input):
+            _echo(f"⚠ {i18n.t('parallel_file_only')}", error=True)
+        else:
+            options.update(parallel=True, workers=args.jobs)
+    if args.streaming:
+        options.update(streaming=True)
+
+    if args.memory_budget is not None:
+        if mode != 'excel_to_yaml':
+            _echo(f"⚠ {i18n.t('memory_budget_excel_only')}", error=True)
+        else:
+            options.update(memory_budget=_megabytes(args.memory_budget))
+
+    if args.table_format or sniffed_format:
+        options.update(table_format=args.table_format or sniffed_format)
+    try:
+        connection_filter = _connection_filter(args, i18n)
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+    if connection_filter is not None:
+        options.update(connection_filter=connection_filter)
+    try:
+        options.update(gpg_profile=_gpg_profile(args, i18n))
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+
+    row_digest = None
+    if args.verify and mode == 'yaml_to_excel':
+        if args.output == STDIO:
+            # La tabella scritta viene riletta: stdout non si può verificare
+            _echo(f"✗ {i18n.t('verify_requires_output_file')}", error=True)
+            return 2
+        # Digest delle righe calcolato mentre il writer le scrive (vedi verify_written_table)
+        row_digest = RowDigest()
+        options.update(row_digest=row_digest)
+
+    if args.strategy != 'auto' and args.strategy not in STRATEGY_OPTIONS[mode]:
+        _echo(f"✗ {i18n.t('strategy_not_applicable')}: {args.strategy}", error=True)
+        return 2
+
+    profiler = Profiler().start() if args.profile else None
+    try:
+        result = convert_file(args.input, args.output, mode=mode, password=password,
+                              encrypt=args.encrypt, i18n=i18n, strategy=args.strategy,
+                              memory_cap=_megabytes(args.memory_cap), **options)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+    if profiler is not None:
+        try:
+            profiler.write(args.profile, args.profile_format)
+        except OSError as e:
+            _echo(f"✗ {i18n.t('error_profile')} {args.profile}: {e}", error=True)
+            return 1
+        _echo(f"{i18n.t('profile_written')}: {args.profile}", error=True)
+    if not _log_result(result, i18n):
+        return 1
+    if row_digest is not None:
+        fmt = options.get('table_format') or table_format(args.output)
+        outcome = verify_written_table(row_digest, args.output, fmt, args.input, password, i18n, connection_filter)
+        return 1 if _report_verify(outcome, args.output, i18n) else 0
+    return 0
+
+
+def _report_verify(outcome: tuple, label: str, i18n) -> int:
+    """Stampa l'esito di una verifica (0 = ok, 1 = divergenze, 2 = errore)"""
+    success, warnings, error, result = outcome
+    if not _log_result((success, warnings, error), i18n):
+        return 2
+    _echo(format_verify_report(result, label, i18n), error=not result['ok'])
+    return 0 if result['ok'] else 1
+
+
+def _verify_files(paths: List[str], password: Optional[str], i18n, fmt: str, show_values: bool) -> int:
+    """Verifica il round trip di più file (0 = tutti ok, 1 = divergenze, 2 = errori)"""
+    exit_code = 0
+    for path in paths:
+        outcome = verify_round_trip(path, password, i18n, fmt, show_values)
+        exit_code = max(exit_code, _report_verify(outcome, path, i18n))
+    return exit_code
+
+
+def cmd_verify(args, i18n) -> int:
+    """Sottocomando 'verify': controlla che YAML → tabella → YAML non perda nulla"""
+    for path in args.inputs:
+        if not os.path.exists(path):
+            _echo(f"✗ {i18n.t('file_not_found')}: {path}", error=True)
+            return 2
+    needs_password = any(_is_encrypted_input(path) for path in args.inputs)
+    password = _resolve_password(args, i18n, needs_password)
+    return _verify_files(args.inputs, password, i18n, args.table_format or 'xlsx', args.show_values)
+
+
+def cmd_split(args, i18n) -> int:
+    """Sottocomando 'split': converte ogni foglio di un workbook nel proprio file YAML"""
+    if not os.path.exists(args.input):
+        _echo(f"✗ {i18n.t('file_not_found')}: {args.input}", error=True)
+        return 1
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.input))
+    sheets = [name.strip() for name in args.sheets.split(',') if name.strip()] if args.sheets else None
+    try:
+        connection_filter = _connection_filter(args, i18n)
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+    result = custom_excel_sheets_to_yaml(args.input, output_dir, sheets, i18n, streaming=args.streaming,
+                                         parallel=args.parallel, workers=args.jobs,
+                                         connection_filter=connection_filter)
+    return 0 if _log_result(result, i18n) else 1
+
+
+def cmd_diff(args, i18n) -> int:
+    """Sottocomando 'diff': confronta due rlist (0 = identiche, 1 = differenze, 2 = errore)"""
+    for path in (args.old, args.new):
+        if not os.path.exists(path):
+            _echo(f"✗ {i18n.t('file_not_found')}: {path}", error=True)
+            return 2
+    needs_password = any(_is_encrypted_input(path) for path in (args.old, args.new))
+    password = _resolve_password(args, i18n, needs_password)
+    try:
+        connection_filter = _connection_filter(args, i18n)
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+
+    success, warnings, error, result = diff_files(
+        args.old, args.new, password, i18n, show_values=args.show_values,
+        parallel=args.parallel, workers=args.jobs, connection_filter=connection_filter)
+    if not _log_result((success, warnings, error), i18n):
+        return 2
+
+    if args.format == 'json':
+        report = format_diff_json(result, args.old, args.new)
+    else:
+        report = format_diff_text(result, args.old, args.new, i18n)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(report)
+    elif report:
+        sys.stdout.write(report)
+    _echo(format_diff_summary(result, i18n), error=True)
+    return 1 if has_differences(result) else 0
+
+
+def cmd_merge(args, i18n) -> int:
+    """Sottocomando 'merge': unisce più rlist in un unico file ordinato per connessione"""
+    for path in args.inputs:
+        if not os.path.exists(path):
+            _echo(f"✗ {i18n.t('file_not_found')}: {path}", error=True)
+            return 1
+    needs_password = args.output.lower().endswith('.gpg') or any(_is_encrypted_input(path) for path in args.inputs)
+    password = _resolve_password(args, i18n, needs_password)
+    try:
+        connection_filter = _connection_filter(args, i18n)
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+    try:
+        gpg_profile = _gpg_profile(args, i18n)
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+    result = merge_files(args.inputs, args.output, args.policy, password, i18n,
+                         table_format=args.table_format, connection_filter=connection_filter,
+                         memory_budget=_megabytes(args.memory_budget), gpg_profile=gpg_profile)
+    return 0 if _log_result(result, i18n) else 1
+
+
+def cmd_index(args, i18n) -> int:
+    """Sottocomando 'index': aggiorna l'indice di connessioni e placeholder delle rlist"""
+    for path in args.roots:
+        if not os.path.exists(path):
+            _echo(f"✗ {i18n.t('file_not_found')}: {path}", error=True)
+            return 2
+    password = None
+    if args.password_env:
+        password = os.environ.get(args.password_env) or None
+    success, warnings, error, report = update_index(args.roots, args.index, password, i18n)
+    if not _log_result((success, warnings, error), i18n):
+        return 2
+    for failure in report['failed']:
+        _echo(f"⚠ {i18n.t('index_skipped')}: {failure}", error=True)
+    _echo(f"{i18n.t('index_updated')}: {report['indexed']} {i18n.t('index_files_indexed')}, "
+          f"{report['unchanged']} {i18n.t('index_files_unchanged')}, "
+          f"{report['removed']} {i18n.t('index_files_removed')} ({report['entries']} {i18n.t('rows_created')})")
+    return 1 if report['failed'] else 0
+
+
+def cmd_search(args, i18n) -> int:
+    """Sottocomando 'search': cerca nell'indice (0 = trovato, 1 = nessun risultato, 2 = errore)"""
+    if not (args.text or args.connection or args.secret):
+        _echo(f"✗ {i18n.t('search_requires_criteria')}", error=True)
+        return 2
+    try:
+        results = search_index(args.index, args.text, args.connection, args.secret, args.exact, args.limit)
+    except FileNotFoundError:
+        _echo(f"✗ {i18n.t('index_not_found')}: {args.index}", error=True)
+        return 2
+    except sqlite3.Error as e:
+        _echo(f"✗ {i18n.t('error_index')} {args.index}: {e}", error=True)
+        return 2
+    sys.stdout.write(format_search_results(results, args.format))
+    return 0 if results else 1
+
+
+def cmd_stats(args, i18n) -> int:
+    """Sottocomando 'stats': connessioni, righe e duplicati delle rlist senza conversione (1 = file illeggibili)"""
+    for path in args.paths:
+        if not os.path.exists(path):
+            _echo(f"✗ {i18n.t('file_not_found')}: {path}", error=True)
+            return 2
+    password = None
+    if args.password_env:
+        password = os.environ.get(args.password_env) or None
+    success, warnings, error, report = inventory_files(args.paths, password, args.workers, i18n)
+    if not _log_result((success, warnings, error), i18n):
+        return 2
+    sys.stdout.write(format_inventory(report, args.format, i18n))
+    return 1 if report['failed'] else 0
+
+
+def _bulk_gpg(args, i18n, operation: str) -> int:
+    """Cifra, decifra o ricifra più file in parallelo (0 = tutti ok, 1 = alcuni falliti, 2 = errore)"""
+    for path in args.paths:
+        if not os.path.exists(path):
+            _echo(f"✗ {i18n.t('file_not_found')}: {path}", error=True)
+            return 2
+    try:
+        gpg_profile = _gpg_profile(args, i18n) if operation != 'decrypt' else None
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+    # Una sola richiesta della passphrase per tutto il batch
+    password = _resolve_password(args, i18n, True)
+    new_password = None
+    if operation == 'rekey':
+        new_password = _resolve_new_password(args, i18n)
+        if new_password is None:
+            _echo(f"✗ {i18n.t('new_password_mismatch')}", error=True)
+            return 2
+
+    def on_result(result: dict):
+        if result['success']:
+            _echo(f"✓ {result['input']} -> {result['output']}")
+        else:
+            _echo(f"✗ {result['input']}: {result['error']}", error=True)
+
+    success, warnings, error, report = bulk_gpg_files(operation, args.paths, password, args.output_dir,
+                                                      args.workers, i18n, on_result, new_password, gpg_profile)
+    if not _log_result((success, warnings, error), i18n):
+        return 2
+    megabytes = report['bytes_in'] / (1024 * 1024)
+    _echo(f"{i18n.t('bulk_done')}: {report['succeeded']} ok, {report['failed']} {i18n.t('bulk_failed')} "
+          f"({megabytes:.1f} MB, {report['seconds']:.2f} s)", error=True)
+    return 1 if report['failed'] else 0
+
+
+def cmd_detect(args, i18n) -> int:
+    """Sottocomando 'detect': mostra la catena dei formati riconosciuti dal contenuto (1 = non riconosciuti)"""
+    chains = []
+    for path in args.paths:
+        if not os.path.isfile(path):
+            _echo(f"✗ {i18n.t('file_not_found')}: {path}", error=True)
+            return 2
+        chains.append((path, sniff_file(path)))
+    sys.stdout.write(format_chains(chains, args.format))
+    return 0 if all(chain for _path, chain in chains) else 1
+
+
+def cmd_engines(args, i18n) -> int:
+    """Sottocomando 'engines': elenca gli engine registrati (* = scelto per il formato)"""
+    for engine in list_engines():
+        available = engine.is_available()
+        chosen = available and get_engine(engine.kind, engine.fmt) is engine
+        status = i18n.t('engine_available' if available else 'engine_not_available')
+        _echo(f"{'*' if chosen else ' '} {engine.kind:<12} {engine.fmt:<7} {engine.name:<10} "
+              f"{engine.priority:>4}  {status}")
+    for name, error in PLUGIN_ERRORS:
+        _echo(f"✗ {i18n.t('plugin_load_error')} {name}: {error}", error=True)
+    return 1 if PLUGIN_ERRORS else 0
+
+
+def cmd_encrypt(args, i18n) -> int:
+    """Sottocomando 'encrypt': cifra più file o cartelle con la stessa passphrase"""
+    return _bulk_gpg(args, i18n, 'encrypt')
+
+
+def cmd_decrypt(args, i18n) -> int:
+    """Sottocomando 'decrypt': decifra più file .gpg o cartelle con la stessa passphrase"""
+    return _bulk_gpg(args, i18n, 'decrypt')
+
+
+def cmd_rekey(args, i18n) -> int:
+    """Sottocomando 'rekey': cambia la passphrase di più file .gpg senza scriverli in chiaro"""
+    return _bulk_gpg(args, i18n, 'rekey')
+
+
+def cmd_watch(args, i18n) -> int:
+    """Sottocomando 'watch': monitora file/cartelle e riconverte a ogni modifica"""
+    mode = args.mode or 'auto'
+    file_filter = input_filter_for_mode(mode)
+
+    try:
+        gpg_profile = _gpg_profile(args, i18n)
+    except ValueError as e:
+        _echo(f"✗ {e}", error=True)
+        return 2
+
+    needs_password = args.encrypt
+    for target in args.targets:
+        if os.path.isdir(target):
+            needs_password = needs_password or any(
+                name.lower().endswith('.gpg') for name in os.listdir(target))
+        elif target.lower().endswith('.gpg'):
+            needs_password = True
+    password = _resolve_password(args, i18n, needs_password)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    def output_for(path: str) -> Optional[str]:
+        return watch_output_path(path, args.output_dir, args.encrypt)
+
+    def job(path: str) -> tuple:
+        output_path = output_for(path)
+        if output_path is None:
+            return (False, [], f"{i18n.t('warning_extension_not_recognized')}: {path}")
+        return convert_file(path, output_path, password=password, encrypt=args.encrypt, i18n=i18n,
+                            gpg_profile=gpg_profile)
+
+    def on_result(path: str, result: tuple):
+        if _log_result(result, i18n):
+            _echo(f"✓ {i18n.t('watch_file_changed')}: {path} -> {output_for(path)}")
+
+    watcher = ConversionWatcher(
+        args.targets, job, output_for=output_for, file_filter=file_filter,
+        debounce=args.debounce, max_workers=args.workers,
+        use_inotify=False if args.poll else None, poll_interval=args.poll_interval,
+        on_result=on_result,
+    )
+    watcher.start()
+    _echo(f"{i18n.t('watch_started')}: {', '.join(watcher.targets)}")
+    _echo(f"{i18n.t('watch_backend')}: {watcher.backend_name} - {i18n.t('watch_stop_hint')}")
+    watcher.run_forever()
+    _echo(i18n.t('watch_stopped'))
+    return 0
+
+
+def build_parser(i18n) -> argparse.ArgumentParser:
+    """Costruisce il parser degli argomenti della riga di comando"""
+    # I formati aggiunti dai plugin devono comparire tra le scelte di --table-format
+    load_plugins()
+    parser = argparse.ArgumentParser(prog='yamlconverter-cli', description=i18n.t('cli_description'))
+    parser.add_argument('--lang', choices=['it', 'en'], help=i18n.t('cli_help_lang'))
+    parser.add_argument('--metrics', metavar='FILE', help=i18n.t('cli_help_metrics'))
+    parser.add_argument('--metrics-label', metavar='KEY=VALUE', action='append', default=[],
+                        help=i18n.t('cli_help_metrics_label'))
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    convert_parser = subparsers.add_parser('convert', help=i18n.t('cli_help_convert'))
+    convert_parser.add_argument('input', help=i18n.t('cli_help_input'))
+    convert_parser.add_argument('output', help=i18n.t('cli_help_output'))
+    convert_parser.add_argument('--mode', choices=MODES, help=i18n.t('cli_help_mode'))
+    convert_parser.add_argument('--encrypt', action='store_true', help=i18n.t('cli_help_encrypt'))
+    convert_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_password_env'))
+    convert_parser.add_argument('--parallel', action='store_true', help=i18n.t('cli_help_parallel'))
+    convert_parser.add_argument('--jobs', type=int, help=i18n.t('cli_help_jobs'))
+    convert_parser.add_argument('--streaming', action='store_true', help=i18n.t('cli_help_streaming'))
+    convert_parser.add_argument('--table-format', choices=TABLE_FORMATS, help=i18n.t('cli_help_table_format'))
+    convert_parser.add_argument('--memory-budget', type=float, metavar='MB', help=i18n.t('cli_help_memory_budget'))
+    convert_parser.add_argument('--strategy', choices=STRATEGIES, default='auto', help=i18n.t('cli_help_strategy'))
+    convert_parser.add_argument('--memory-cap', type=float, metavar='MB', help=i18n.t('cli_help_memory_cap'))
+    convert_parser.add_argument('--profile', metavar='FILE', help=i18n.t('cli_help_profile'))
+    convert_parser.add_argument('--profile-format', choices=PROFILE_FORMATS, help=i18n.t('cli_help_profile_format'))
+    convert_parser.add_argument('--verify', action='store_true', help=i18n.t('cli_help_verify'))
+    _add_gpg_profile_argument(convert_parser, i18n)
+    _add_filter_arguments(convert_parser, i18n)
+    convert_parser.set_defaults(func=cmd_convert)
+
+    split_parser = subparsers.add_parser('split', help=i18n.t('cli_help_split'))
+    split_parser.add_argument('input', help=i18n.t('cli_help_split_input'))
+    split_parser.add_argument('--output-dir', help=i18n.t('cli_help_output_dir'))
+    split_parser.add_argument('--sheets', help=i18n.t('cli_help_sheets'))
+    split_parser.add_argument('--streaming', action='store_true', help=i18n.t('cli_help_streaming'))
+    split_parser.add_argument('--parallel', action='store_true', help=i18n.t('cli_help_split_parallel'))
+    split_parser.add_argument('--jobs', type=int, help=i18n.t('cli_help_jobs'))
+    _add_filter_arguments(split_parser, i18n)
+    split_parser.set_defaults(func=cmd_split)
+
+    diff_parser = subparsers.add_parser('diff', help=i18n.t('cli_help_diff'))
+    diff_parser.add_argument('old', help=i18n.t('cli_help_diff_old'))
+    diff_parser.add_argument('new', help=i18n.t('cli_help_diff_new'))
+    diff_parser.add_argument('--format', choices=DIFF_FORMATS, default='text', help=i18n.t('cli_help_diff_format'))
+    diff_parser.add_argument('--output', help=i18n.t('cli_help_diff_output'))
+    diff_parser.add_argument('--show-values', action='store_true', help=i18n.t('cli_help_show_values'))
+    diff_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_password_env'))
+    diff_parser.add_argument('--parallel', action='store_true', help=i18n.t('cli_help_parallel'))
+    diff_parser.add_argument('--jobs', type=int, help=i18n.t('cli_help_jobs'))
+    _add_filter_arguments(diff_parser, i18n)
+    diff_parser.set_defaults(func=cmd_diff)
+
+    merge_parser = subparsers.add_parser('merge', help=i18n.t('cli_help_merge'))
+    merge_parser.add_argument('inputs', nargs='+', help=i18n.t('cli_help_merge_inputs'))
+    merge_parser.add_argument('-o', '--output', required=True, help=i18n.t('cli_help_merge_output'))
+    merge_parser.add_argument('--policy', choices=MERGE_POLICIES, default='first',
+                              help=i18n.t('cli_help_merge_policy'))
+    merge_parser.add_argument('--table-format', choices=TABLE_FORMATS, help=i18n.t('cli_help_table_format'))
+    merge_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_password_env'))
+    merge_parser.add_argument('--memory-budget', type=float, metavar='MB', help=i18n.t('cli_help_memory_budget'))
+    _add_gpg_profile_argument(merge_parser, i18n)
+    _add_filter_arguments(merge_parser, i18n)
+    merge_parser.set_defaults(func=cmd_merge)
+
+    index_parser = subparsers.add_parser('index', help=i18n.t('cli_help_index'))
+    index_parser.add_argument('roots', nargs='+', help=i18n.t('cli_help_index_roots'))
+    index_parser.add_argument('--index', default=DEFAULT_INDEX_FILE, help=i18n.t('cli_help_index_file'))
+    index_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_index_password_env'))
+    index_parser.set_defaults(func=cmd_index)
+
+    search_parser = subparsers.add_parser('search', help=i18n.t('cli_help_search'))
+    search_parser.add_argument('text', nargs='?', help=i18n.t('cli_help_search_text'))
+    search_parser.add_argument('--connection', help=i18n.t('cli_help_search_connection'))
+    search_parser.add_argument('--secret', help=i18n.t('cli_help_search_secret'))
+    search_parser.add_argument('--exact', action='store_true', help=i18n.t('cli_help_search_exact'))
+    search_parser.add_argument('--index', default=DEFAULT_INDEX_FILE, help=i18n.t('cli_help_index_file'))
+    search_parser.add_argument('--limit', type=int, default=SEARCH_LIMIT, help=i18n.t('cli_help_search_limit'))
+    search_parser.add_argument('--format', choices=SEARCH_FORMATS, default='text', help=i18n.t('cli_help_search_format'))
+    search_parser.set_defaults(func=cmd_search)
+
+    stats_parser = subparsers.add_parser('stats', help=i18n.t('cli_help_stats'))
+    stats_parser.add_argument('paths', nargs='+', help=i18n.t('cli_help_stats_paths'))
+    stats_parser.add_argument('--workers', type=int, help=i18n.t('cli_help_stats_workers'))
+    stats_parser.add_argument('--format', choices=INVENTORY_FORMATS, default='text', help=i18n.t('cli_help_stats_format'))
+    stats_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_stats_password_env'))
+    stats_parser.set_defaults(func=cmd_stats)
+
+    verify_parser = subparsers.add_parser('verify', help=i18n.t('cli_help_verify_command'))
+    verify_parser.add_argument('inputs', nargs='+', help=i18n.t('cli_help_verify_inputs'))
+    verify_parser.add_argument('--table-format', choices=TABLE_FORMATS, help=i18n.t('cli_help_table_format'))
+    verify_parser.add_argument('--show-values', action='store_true', help=i18n.t('cli_help_show_values'))
+    verify_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_password_env'))
+    verify_parser.set_defaults(func=cmd_verify)
+
+    detect_parser = subparsers.add_parser('detect', help=i18n.t('cli_help_detect'))
+    detect_parser.add_argument('paths', nargs='+', help=i18n.t('cli_help_detect_paths'))
+    detect_parser.add_argument('--format', choices=DETECT_FORMATS, default='text', help=i18n.t('cli_help_detect_format'))
+    detect_parser.set_defaults(func=cmd_detect)
+
+    engines_parser = subparsers.add_parser('engines', help=i18n.t('cli_help_engines'))
+    engines_parser.set_defaults(func=cmd_engines)
+
+    for name, func in (('encrypt', cmd_encrypt), ('decrypt', cmd_decrypt), ('rekey', cmd_rekey)):
+        bulk_parser = subparsers.add_parser(name, help=i18n.t(f'cli_help_{name}_command'))
+        bulk_parser.add_argument('paths', nargs='+', help=i18n.t(f'cli_help_{name}_paths'))
+        bulk_parser.add_argument('--output-dir', help=i18n.t('cli_help_bulk_output_dir'))
+        bulk_parser.add_argument('--workers', type=int, help=i18n.t('cli_help_bulk_workers'))
+        bulk_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_password_env'))
+        if name == 'rekey':
+            bulk_parser.add_argument('--new-password-env', metavar='VAR', help=i18n.t('cli_help_new_password_env'))
+        if name != 'decrypt':
+            _add_gpg_profile_argument(bulk_parser, i18n)
+        bulk_parser.set_defaults(func=func)
+
+    watch_parser = subparsers.add_parser('watch', help=i18n.t('cli_help_watch'))
+    watch_parser.add_argument('targets', nargs='+', help=i18n.t('cli_help_targets'))
+    watch_parser.add_argument('--mode', choices=MODES, help=i18n.t('cli_help_mode'))
+    watch_parser.add_argument('--output-dir', help=i18n.t('cli_help_output_dir'))
+    watch_parser.add_argument('--encrypt', action='store_true', help=i18n.t('cli_help_encrypt'))
+    watch_parser.add_argument('--password-env', metavar='VAR', help=i18n.t('cli_help_password_env'))
+    _add_gpg_profile_argument(watch_parser, i18n)
+    watch_parser.add_argument('--debounce', type=float, default=0.5, help=i18n.t('cli_help_debounce'))
+    watch_parser.add_argument('--workers', type=int, default=2, help=i18n.t('cli_help_workers'))
+    watch_parser.add_argument('--poll', action='store_true', help=i18n.t('cli_help_poll'))
+    watch_parser.add_argument('--poll-interval', type=float, default=1.0, help=i18n.t('cli_help_poll_interval'))
+    watch_parser.set_defaults(func=cmd_watch)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Funzione principale della CLI"""
+    # Necessario per i process pool negli eseguibili PyInstaller
+    multiprocessing.freeze_support()
+    i18n = get_i18n()
+    parser = build_parser(i18n)
+    args = parser.parse_args(argv)
+    if args.lang:
+        set_language(args.lang)
+        i18n = get_i18n()
+    if not args.metrics:
+        return args.func(args, i18n)
+    return _run_with_metrics(args, i18n)
+
+
+def _run_with_metrics(args, i18n) -> int:
+    """
+    Esegue il comando raccogliendo le metriche e le scrive in args.metrics
+    (formato textfile di Prometheus) anche se il comando fallisce o viene interrotto.
+    """
+    try:
+        labels = parse_labels(args.metrics_label)
+    except ValueError as e:
+        _echo(f"✗ {i18n.t('invalid_metrics_label')}: {e}", error=True)
+        return 2
+    recorder = MetricsRecorder(labels).start()
+    start = time.perf_counter()
+    exit_code = 1  # Registrato se il comando solleva un'eccezione
+    try:
+        exit_code = args.func(args, i18n)
+    except KeyboardInterrupt:
+        exit_code = 130  # Come la shell per un comando interrotto (es: watch)
+        raise
+    finally:
+        recorder.stop()
+        recorder.set('run_duration_seconds', time.perf_counter() - start, command=args.command)
+        recorder.set('run_exit_code', exit_code, command=args.command)
+        recorder.set('run_timestamp_seconds', round(time.time()), command=args.command)
+        try:
+            recorder.write(args.metrics)
+            written = True
+        except OSError as e:
+            _echo(f"✗ {i18n.t('error_metrics')} {args.metrics}: {e}", error=True)
+            written = False
+    return exit_code if written else exit_code or 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+YAML ↔ Excel Converter - Async pipeline
+Facciata asyncio per conversioni e GPG: gpg gira come sottoprocesso asyncio,
+il parsing in un executor, con concorrenza limitata e supporto alla cancellazione
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import functools
+import os
+import traceback
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.pipeline import (
+    convert_plain, decrypted_input, encrypted_output_path, resolve_conversion,
+)
+from yamlconverter.utils.gpg_utils import (
+    GPGProfile, decrypt_bytes_async, decrypt_file_async, encrypt_bytes_async, encrypt_file_async,
+)
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.metrics import record_conversion
+
+
+class AsyncConverter:
+    """
+    Facciata asincrona delle conversioni, da usare in un event loop asyncio.
+
+    Ogni operazione occupa uno slot di un semaforo (max_concurrency
+    operazioni contemporanee). gpg gira come sottoprocesso asyncio (anche
+    per input e output .gpg di convert_file), il parsing e la scrittura in
+    un executor, così l'event loop non viene mai bloccato. I risultati sono
+    le stesse tuple (success, warnings, error) dell'API sincrona.
+
+    Cancellando un'operazione il processo gpg in corso viene terminato; una
+    conversione già avviata nell'executor non può essere interrotta:
+    termina in background e il suo risultato viene scartato.
+
+    Esempio:
+        async with AsyncConverter(max_concurrency=4) as converter:
+            results = await asyncio.gather(*(converter.convert_file(path, out) for path, out in jobs))
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, executor: Optional[Executor] = None, i18n=None):
+        """
+        Args:
+            max_concurrency: Operazioni contemporanee (default: numero di CPU)
+            executor: Executor per il parsing (default: ThreadPoolExecutor con
+                      max_concurrency thread, chiuso da close()); con un
+                      ProcessPoolExecutor gli argomenti devono essere serializzabili
+            i18n: Oggetto i18n per la localizzazione (opzionale)
+        """
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.i18n = i18n or get_i18n()
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                        thread_name_prefix='yamlconverter')
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Chiude l'executor creato dalla facciata (senza attendere i lavori in background)"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    async def _offload(self, func: Callable, *args, **kwargs) -> Any:
+        """Esegue una funzione bloccante nell'executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def yaml_to_excel(self, yaml_file, excel_file, **converter_options) -> tuple:
+        """Versione asincrona di custom_yaml_to_excel"""
+        async with self._semaphore:
+            return await self._offload(custom_yaml_to_excel, yaml_file, excel_file, self.i18n,
+                                       **converter_options)
+
+    async def excel_to_yaml(self, excel_file, yaml_file, **converter_options) -> tuple:
+        """Versione asincrona di custom_excel_to_yaml"""
+        async with self._semaphore:
+            return await self._offload(custom_excel_to_yaml, excel_file, yaml_file, self.i18n,
+                                       **converter_options)
+
+    async def decrypt_file(self, input_file: str, password: str) -> tuple:
+        """Versione asincrona di decrypt_file: (success, decrypted_content, error_message)"""
+        async with self._semaphore:
+            return await decrypt_file_async(input_file, password, self.i18n)
+
+    async def encrypt_file(self, content: str, output_file: str, password: str,
+                           profile: GPGProfile = None) -> tuple:
+        """Versione asincrona di encrypt_file: (success, error_message)"""
+        async with self._semaphore:
+            return await encrypt_file_async(content, output_file, password, self.i18n, profile)
+
+    async def convert_file(self, input_file: str, output_file: str, mode: Optional[str] = None,
+                           password: Optional[str] = None, encrypt: bool = False,
+                           gpg_profile: GPGProfile = None, strategy: str = 'auto',
+                           memory_cap: Optional[int] = None, **converter_options) -> tuple:
+        """
+        Versione asincrona di convert_file (stessa validazione, planner e metriche).
+
+        Un input .gpg viene decrittato in memoria con decrypt_bytes_async e un
+        output cifrato generato in memoria e cifrato con encrypt_bytes_async:
+        nell'executor gira solo la conversione in chiaro.
+
+        Args:
+            input_file: Path del file di input
+            output_file: Path del file di output
+            mode: 'yaml_to_excel' o 'excel_to_yaml' (se None viene rilevata dalle
+                  estensioni o, se non bastano, dal contenuto dell'input)
+            password: Password GPG per input/output criptati
+            encrypt: Cripta l'output YAML con GPG
+            gpg_profile: Profilo di cifratura dell'output (vedi GPG_PROFILES)
+            strategy: 'auto' (scelta del planner) o una strategia forzata (vedi STRATEGIES in planner.py)
+            memory_cap: Limite di memoria in byte per il planner (default: DEFAULT_MEMORY_CAP)
+            **converter_options: Opzioni passate al converter
+
+        Returns:
+            Tupla (success, warnings, error_message)
+        """
+        i18n = self.i18n
+        async with self._semaphore:
+            mode, input_is_encrypted, output_is_encrypted, error = await self._offload(
+                resolve_conversion, input_file, output_file, mode, password, encrypt, i18n, strategy, converter_options)
+            if error is not None:
+                return (False, [], error)
+            try:
+                result = await self._convert_file(input_file, output_file, mode, input_is_encrypted,
+                                                  output_is_encrypted, password, gpg_profile, strategy, memory_cap,
+                                                  converter_options)
+            except Exception as e:
+                error_details = traceback.format_exc()
+                result = (False, [], f"{i18n.t('error_occurred')}: {e}\n\n{i18n.t('error_details')}:\n{error_details}")
+            written_output = encrypted_output_path(output_file) if output_is_encrypted else output_file
+            record_conversion(mode, input_file, written_output, result[0])
+            return result
+
+    async def _convert_file(self, input_file: str, output_file: str, mode: str, input_is_encrypted: bool,
+                            output_is_encrypted: bool, password: Optional[str], gpg_profile: GPGProfile,
+                            strategy: str, memory_cap: Optional[int], converter_options: dict) -> tuple:
+        """Conversione di convert_file, dopo la validazione di modalità e password"""
+        i18n = self.i18n
+        actual_input = input_file
+        if input_is_encrypted:
+            success, data, error = await decrypt_bytes_async(input_file, password, i18n)
+            if not success:
+                return (False, [], error)
+            actual_input = decrypted_input(data, input_file, mode, converter_options)
+
+        result, content = await self._offload(convert_plain, actual_input, output_file, mode, output_is_encrypted,
+                                              i18n, strategy, memory_cap, converter_options)
+        if content is None:
+            return result
+
+        warnings = result[1]
+        success, error = await encrypt_bytes_async(content.encode('utf-8'), encrypted_output_path(output_file),
+                                                   password, i18n, gpg_profile)
+        if not success:
+            return (False, warnings, error)
+        return (True, warnings, None)
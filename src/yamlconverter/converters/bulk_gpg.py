@@ -0,0 +1,228 @@
+"""
+YAML ↔ Excel Converter - Bulk GPG
+Cifratura, decifratura e cambio passphrase di molti file in parallelo, con
+un pool limitato di processi gpg alimentati a blocchi e un esito per ogni file
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import os
+import time
+import traceback
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from yamlconverter.converters.search_index import iter_rlist_files
+from yamlconverter.utils.formats import strip_gpg_extension
+from yamlconverter.utils.gpg_utils import GPGProfile, decrypt_to_file_async, encrypt_bytes_async, rekey_file_async
+from yamlconverter.utils.i18n import get_i18n
+
+BULK_OPERATIONS = ['encrypt', 'decrypt', 'rekey']
+
+Target = Tuple[str, Optional[str]]
+
+
+def _output_path(path: str, operation: str, relative: str, output_dir: Optional[str]) -> Optional[str]:
+    """Path di output di un file (None se il file non è un .gpg da decifrare o ricifrare)"""
+    if operation == 'encrypt':
+        output = relative + '.gpg'
+    elif not relative.lower().endswith('.gpg'):
+        return None
+    elif operation == 'rekey':
+        output = relative
+    else:
+        output = strip_gpg_extension(relative)
+    if output_dir is None:
+        return os.path.join(os.path.dirname(path), os.path.basename(output))
+    return os.path.join(os.path.abspath(output_dir), output)
+
+
+def bulk_targets(paths: Iterable[str], operation: str, output_dir: Optional[str] = None) -> List[Target]:
+    """
+    Elenca i file da elaborare con il rispettivo path di output.
+
+    I file indicati esplicitamente vengono sempre inclusi; dalle cartelle
+    (percorse come per l'indice, saltando quelle nascoste) vengono presi i
+    .gpg per 'decrypt' e 'rekey' e le rlist in chiaro per 'encrypt'.
+    L'output va accanto all'input ('rekey' sostituisce il file stesso),
+    oppure in output_dir mantenendo i percorsi relativi alla cartella di partenza.
+
+    Args:
+        paths: File o cartelle
+        operation: 'encrypt', 'decrypt' o 'rekey'
+        output_dir: Cartella di output (opzionale)
+
+    Returns:
+        Lista di (input, output); output è None per i file da decifrare senza estensione .gpg
+    """
+    if operation not in BULK_OPERATIONS:
+        raise ValueError(operation)
+    targets = []
+    for root in paths:
+        root = os.path.abspath(root)
+        if os.path.isfile(root):
+            targets.append((root, _output_path(root, operation, os.path.basename(root), output_dir)))
+            continue
+        for path in iter_rlist_files([root]):
+            if path.lower().endswith('.gpg') == (operation == 'encrypt'):
+                continue
+            relative = os.path.relpath(path, root)
+            targets.append((path, _output_path(path, operation, relative, output_dir)))
+    return targets
+
+
+async def _process_file(operation: str, input_file: str, output_file: Optional[str],
+                        password: str, new_password: Optional[str], profile: GPGProfile,
+                        i18n) -> Dict[str, Any]:
+    """Cifra, decifra o ricifra un file e ne restituisce l'esito"""
+    result = {'input': input_file, 'output': output_file, 'success': False, 'error': None,
+              'bytes_in': 0, 'bytes_out': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+    try:
+        if output_file is None:
+            result['error'] = f"{i18n.t('bulk_not_gpg')}: {input_file}"
+            return result
+        result['bytes_in'] = os.path.getsize(input_file)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        if operation == 'encrypt':
+            with open(input_file, 'rb') as source:
+                success, error = await encrypt_bytes_async(source, output_file, password, i18n, profile)
+        elif operation == 'rekey':
+            success, error = await rekey_file_async(input_file, password, new_password, output_file, i18n,
+                                                    profile)
+        else:
+            success, error = await decrypt_to_file_async(input_file, output_file, password, i18n)
+        result['success'] = success
+        result['error'] = error
+        if success:
+            result['bytes_out'] = os.path.getsize(output_file)
+    except OSError as e:
+        result['error'] = f"{i18n.t('generic_error')}: {str(e)}"
+    finally:
+        result['seconds'] = time.perf_counter() - start
+    return result
+
+
+async def bulk_gpg_async(operation: str, targets: List[Target], password: str,
+                         workers: Optional[int] = None, i18n=None,
+                         on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                         new_password: Optional[str] = None,
+                         profile: GPGProfile = None) -> List[Dict[str, Any]]:
+    """
+    Elabora i file con al massimo workers processi gpg contemporanei.
+
+    Ogni file viene passato a gpg a blocchi e scritto in un file temporaneo
+    che sostituisce l'output solo a operazione riuscita; l'errore di un file
+    non interrompe gli altri. Cancellando il task i processi gpg in corso
+    vengono terminati.
+
+    Args:
+        operation: 'encrypt', 'decrypt' o 'rekey'
+        targets: Lista di (input, output), vedi bulk_targets
+        password: Passphrase usata per tutti i file (la vecchia per 'rekey')
+        workers: Processi gpg contemporanei (default: numero di CPU; per
+                 'rekey' ogni file occupa due processi)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        on_result: Funzione chiamata con l'esito di ogni file appena disponibile
+        new_password: Nuova passphrase per 'rekey'
+        profile: Profilo di cifratura per 'encrypt' e 'rekey' (vedi GPG_PROFILES)
+
+    Returns:
+        Esiti dei file nell'ordine di targets
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    semaphore = asyncio.Semaphore(workers or os.cpu_count() or 1)
+
+    async def run(input_file: str, output_file: Optional[str]) -> Dict[str, Any]:
+        async with semaphore:
+            result = await _process_file(operation, input_file, output_file, password, new_password,
+                                         profile, i18n)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    return await asyncio.gather(*(run(input_file, output_file) for input_file, output_file in targets))
+
+
+def bulk_gpg_files(operation: str, paths: Iterable[str], password: str, output_dir: Optional[str] = None,
+                   workers: Optional[int] = None, i18n=None,
+                   on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   new_password: Optional[str] = None, profile: GPGProfile = None) -> tuple:
+    """
+    Cifra, decifra o ricifra tutti i file indicati (vedi bulk_targets e bulk_gpg_async).
+
+    Da non chiamare dentro un event loop in esecuzione: in quel caso usare
+    direttamente bulk_gpg_async.
+
+    Args:
+        operation: 'encrypt', 'decrypt' o 'rekey'
+        paths: File o cartelle
+        password: Passphrase usata per tutti i file (la vecchia per 'rekey')
+        output_dir: Cartella di output (default: accanto agli input)
+        workers: Processi gpg contemporanei (default: numero di CPU)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        on_result: Funzione chiamata con l'esito di ogni file appena disponibile
+        new_password: Nuova passphrase per 'rekey'
+        profile: Profilo di cifratura per 'encrypt' e 'rekey' (vedi GPG_PROFILES)
+
+    Returns:
+        Tupla (success, warnings, error, report): success è False solo in caso
+        di errore; report contiene 'results' (un esito per file), 'succeeded',
+        'failed', 'bytes_in', 'bytes_out' e 'seconds'
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    if not password or (operation == 'rekey' and not new_password):
+        return (False, [], i18n.t('password_required'), None)
+    try:
+        targets = bulk_targets(paths, operation, output_dir)
+        if not targets:
+            return (False, [], i18n.t('bulk_no_files'), None)
+        start = time.perf_counter()
+        results = asyncio.run(bulk_gpg_async(operation, targets, password, workers, i18n, on_result,
+                                             new_password, profile))
+        succeeded = sum(1 for result in results if result['success'])
+        report = {'results': results, 'succeeded': succeeded, 'failed': len(results) - succeeded,
+                  'bytes_in': sum(result['bytes_in'] for result in results),
+                  'bytes_out': sum(result['bytes_out'] for result in results),
+                  'seconds': time.perf_counter() - start}
+        return (True, [], None, report)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        return (False, [], f"{i18n.t('error_occurred')}: {e}\n\n{i18n.t('error_details')}:\n{error_details}", None)
+
+
+def bulk_encrypt_files(paths: Iterable[str], password: str, output_dir: Optional[str] = None,
+                       workers: Optional[int] = None, i18n=None, on_result=None,
+                       profile: GPGProfile = None) -> tuple:
+    """Cifra tutti i file indicati con la stessa passphrase (vedi bulk_gpg_files)"""
+    return bulk_gpg_files('encrypt', paths, password, output_dir, workers, i18n, on_result, profile=profile)
+
+
+def bulk_decrypt_files(paths: Iterable[str], password: str, output_dir: Optional[str] = None,
+                       workers: Optional[int] = None, i18n=None, on_result=None) -> tuple:
+    """Decifra tutti i file .gpg indicati con la stessa passphrase (vedi bulk_gpg_files)"""
+    return bulk_gpg_files('decrypt', paths, password, output_dir, workers, i18n, on_result)
+
+
+def rekey_files(paths: Iterable[str], old_password: str, new_password: str, output_dir: Optional[str] = None,
+                workers: Optional[int] = None, i18n=None, on_result=None, profile: GPGProfile = None) -> tuple:
+    """
+    Cambia la passphrase di tutti i file .gpg indicati senza scriverne il
+    contenuto in chiaro su disco; ogni file viene sostituito atomicamente
+    (vedi rekey_file_async e bulk_gpg_files).
+    """
+    return bulk_gpg_files('rekey', paths, old_password, output_dir, workers, i18n, on_result, new_password,
+                          profile)
@@ -0,0 +1,77 @@
+"""
+YAML ↔ Excel Converter - CSV/TSV
+Modulo per lettura e scrittura in streaming del formato Name/Secret/Value
+come CSV o TSV (alternativa leggera a .xlsx per gli scambi tra sistemi)
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import csv
+from typing import IO, Dict, Iterable, Iterator, List
+
+# Separatore di campo per ciascun formato
+DELIMITERS = {'csv': ',', 'tsv': '\t'}
+
+# Intestazione scritta in output (stesso contratto del foglio Excel)
+HEADER = ['Name', 'Secret', 'Value']
+
+
+def _strip_bom(reader: Iterator[List[str]]) -> Iterator[List[str]]:
+    """Rimuove il BOM UTF-8 (aggiunto da Excel in "CSV UTF-8") dalla prima cella"""
+    first_row = next(reader, None)
+    if first_row is None:
+        return
+    if first_row and first_row[0].startswith('\ufeff'):
+        first_row[0] = first_row[0][1:]
+    yield first_row
+    yield from reader
+
+
+def read_csv_table(f: IO, table_format: str = 'csv') -> Iterator[List[str]]:
+    """
+    Legge un CSV/TSV riga per riga (intestazione inclusa).
+
+    Le righe vanno passate a iter_table_rows, che verifica l'intestazione
+    Name/Secret/Value e normalizza le celle come per il foglio Excel.
+
+    Args:
+        f: File di testo aperto in lettura
+        table_format: 'csv' oppure 'tsv'
+
+    Returns:
+        Iteratore sulle righe come liste di stringhe
+    """
+    return _strip_bom(csv.reader(f, delimiter=DELIMITERS[table_format]))
+
+
+def write_csv_rows(rows: Iterable[Dict[str, str]], f: IO, table_format: str = 'csv') -> int:
+    """
+    Scrive i record Name/Secret/Value in CSV/TSV, una riga alla volta.
+
+    Args:
+        rows: Iteratore di record Name/Secret/Value
+        f: File di testo aperto in scrittura
+        table_format: 'csv' oppure 'tsv'
+
+    Returns:
+        Numero di righe dati scritte
+    """
+    writer = csv.writer(f, delimiter=DELIMITERS[table_format], lineterminator='\n')
+    writer.writerow(HEADER)
+    count = 0
+    for row in rows:
+        writer.writerow([row.get('Name', ''), row.get('Secret', ''), row.get('Value', '')])
+        count += 1
+    return count
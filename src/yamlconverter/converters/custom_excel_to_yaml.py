@@ -18,12 +18,40 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import itertools
 import openpyxl
+import os
 import re
+import shutil
+import tempfile
+import time
 import traceback
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from collections import defaultdict
-from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.converters.registry import load_engine
+from yamlconverter.utils.formats import table_format as table_format_of
+from yamlconverter.utils.i18n import I18n, get_i18n
+from yamlconverter.utils.metrics import Tally, inc
+from yamlconverter.utils.profiling import span, traced_batches
+from yamlconverter.utils.spill import SPILL_MEMORY_BUDGET, SpillStore, estimate_row_size
+from yamlconverter.utils.streams import (
+    SPOOL_MAX_SIZE, atomic_output_path, console_for, describe, is_path, is_rewritable, is_seekable,
+    open_binary_input, open_text_input, open_text_output,
+)
+
+# Nome del foglio principale; i fogli successivi sono Connections_2, Connections_3, ...
+SHEET_NAME = 'Connections'
+_SHARD_RE = re.compile(r'^Connections_(\d+)$')
+
+
+class UngroupedRowsError(ValueError):
+    """Sollevata in modalità streaming quando una connessione ricompare dopo essere stata chiusa"""
+    
+    def __init__(self, connection_name: str):
+        super().__init__(connection_name)
+        self.connection_name = connection_name
 
 
 def quote_yaml_value(value: str) -> str:
@@ -98,12 +126,229 @@ def parse_name_to_structure(name: str) -> tuple:
     return tuple(parts)
 
 
-def rebuild_yaml_structure(rows: List[Dict[str, str]]) -> Dict[str, Any]:
+def normalize_cell(value: Any) -> str:
+    """
+    Normalizza il valore di una cella: rimuove newline interni,
+    spazi iniziali/finali e spazi multipli consecutivi.
+    
+    Args:
+        value: Valore della cella (None per celle vuote)
+        
+    Returns:
+        Stringa normalizzata (vuota per celle vuote)
+    """
+    if not value:
+        return ''
+    return ' '.join(str(value).split())
+
+
+def _iter_data_rows(rows: Iterator[tuple], name_idx: int, secret_idx: int,
+                    value_idx: int) -> Iterator[Dict[str, str]]:
+    """Genera i record Name/Secret/Value normalizzati dalle righe dati"""
+    for row in rows:
+        name = row[name_idx] if name_idx < len(row) else None
+        if not name:  # Salta righe vuote
+            continue
+        yield {
+            'Name': normalize_cell(name),
+            'Secret': normalize_cell(row[secret_idx] if secret_idx < len(row) else None),
+            'Value': normalize_cell(row[value_idx] if value_idx < len(row) else None),
+        }
+
+
+def iter_table_rows(rows: Iterator[Any], i18n=None) -> Iterator[Dict[str, str]]:
+    """
+    Converte le righe di una tabella (intestazione inclusa) in record Name/Secret/Value.
+    
+    La riga di intestazione viene letta e verificata subito, le righe dati
+    vengono lette una alla volta. Usata sia per i fogli Excel sia per CSV/TSV.
+    
+    Args:
+        rows: Iteratore sulle righe (tuple o liste di celle)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        
+    Returns:
+        Iteratore di dizionari con chiavi 'Name', 'Secret' e 'Value'
+        
+    Raises:
+        ValueError: Se mancano le colonne Name/Secret/Value
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        return iter(())
+    
+    # Prima riga: headers
+    headers = [cell if cell else '' for cell in first_row]
+    # Verifica che abbia le colonne corrette
+    if 'Name' not in headers or 'Secret' not in headers or 'Value' not in headers:
+        raise ValueError(i18n.t("missing_columns"))
+    return _iter_data_rows(rows, headers.index('Name'), headers.index('Secret'), headers.index('Value'))
+
+
+def iter_sheet_rows(ws, i18n=None) -> Iterator[Dict[str, str]]:
+    """
+    Legge un worksheet e restituisce un iteratore sui record Name/Secret/Value.
+    
+    La riga di intestazione viene letta e verificata subito, le righe dati
+    vengono lette una alla volta (compatibile con i workbook read_only).
+    
+    Args:
+        ws: Worksheet openpyxl
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        
+    Returns:
+        Iteratore di dizionari con chiavi 'Name', 'Secret' e 'Value'
+        
+    Raises:
+        ValueError: Se mancano le colonne Name/Secret/Value
+    """
+    return iter_table_rows(ws.iter_rows(values_only=True), i18n)
+
+
+def shard_sheet_name(index: int) -> str:
+    """
+    Restituisce il nome del foglio di indice index (1 -> 'Connections', 2 -> 'Connections_2').
+    
+    Args:
+        index: Indice del foglio a partire da 1
+        
+    Returns:
+        Nome del foglio
+    """
+    return SHEET_NAME if index == 1 else f"{SHEET_NAME}_{index}"
+
+
+def shard_sheet_names(wb) -> List[str]:
+    """
+    Restituisce in ordine i fogli che contengono le connessioni.
+    
+    Se il workbook ha un foglio 'Connections' vengono restituiti quello e i
+    fogli 'Connections_N' ordinati per N; altrimenti solo il foglio attivo
+    (comportamento dei file creati a mano).
+    
+    Args:
+        wb: Workbook openpyxl
+        
+    Returns:
+        Lista dei nomi dei fogli
+    """
+    return shard_sheet_order(wb.sheetnames, wb.active.title)
+
+
+def shard_sheet_order(sheet_names: List[str], active: str) -> List[str]:
+    """
+    Come shard_sheet_names, dai soli nomi dei fogli (per chi legge l'xlsx senza openpyxl).
+    
+    Args:
+        sheet_names: Nomi dei fogli nell'ordine del workbook
+        active: Nome del foglio attivo
+        
+    Returns:
+        Lista dei nomi dei fogli
+    """
+    if SHEET_NAME not in sheet_names:
+        return [active]
+    shards = sorted((int(match.group(1)), name) for name in sheet_names
+                    for match in [_SHARD_RE.match(name)] if match)
+    return [SHEET_NAME] + [name for _index, name in shards]
+
+
+def iter_workbook_rows(wb, sheet_names: List[str], i18n=None) -> Iterator[Dict[str, str]]:
+    """
+    Concatena i record Name/Secret/Value dei fogli indicati, nell'ordine dato.
+    
+    L'intestazione del primo foglio viene verificata subito, quelle dei fogli
+    successivi quando vengono raggiunti.
+    
+    Args:
+        wb: Workbook openpyxl
+        sheet_names: Fogli da leggere (vedi shard_sheet_names)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        
+    Returns:
+        Iteratore di dizionari con chiavi 'Name', 'Secret' e 'Value'
+    """
+    first = iter_sheet_rows(wb[sheet_names[0]], i18n)
+    rest = (iter_sheet_rows(wb[name], i18n) for name in sheet_names[1:])
+    return itertools.chain(first, itertools.chain.from_iterable(rest))
+
+
+def _read_sheet_records(excel_file: str, sheet_name: str) -> List[Tuple[str, str, str]]:
+    """Legge tutte le righe di un foglio (eseguito nei worker del parsing parallelo)"""
+    wb = openpyxl.load_workbook(excel_file, read_only=True)
+    try:
+        return [(row['Name'], row['Secret'], row['Value']) for row in iter_sheet_rows(wb[sheet_name])]
+    finally:
+        wb.close()
+
+
+def read_sheets_parallel(excel_file: str, sheet_names: List[str],
+                         workers: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """
+    Legge i fogli su più processi (uno per foglio) e restituisce le righe nell'ordine dei fogli.
+    
+    Args:
+        excel_file: Path del file Excel
+        sheet_names: Fogli da leggere
+        workers: Numero di processi (default: numero di CPU)
+        
+    Returns:
+        Iteratore di dizionari con chiavi 'Name', 'Secret' e 'Value'
+    """
+    workers = min(workers or os.cpu_count() or 1, len(sheet_names))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_read_sheet_records, [excel_file] * len(sheet_names), sheet_names))
+    return ({'Name': name, 'Secret': secret, 'Value': value}
+            for records in results for name, secret, value in records)
+
+
+def _apply_row(connections: Dict[str, Any], connection_first_seen: Dict[str, int],
+               row: Dict[str, str]):
+    """Inserisce un record Name/Secret/Value nella struttura delle connessioni"""
+    name = row.get('Name', '')
+    secret = row.get('Secret', '')
+    value = row.get('Value', '')
+    
+    if not name:
+        return
+    
+    # Analizza la struttura del nome
+    parts = parse_name_to_structure(name)
+    
+    if len(parts) >= 2:
+        # Formato: CONNECTION_NAME[index]
+        connection_name = parts[0]
+        index = parts[1]
+        
+        # Traccia la prima occorrenza
+        if connection_name not in connection_first_seen:
+            connection_first_seen[connection_name] = index
+        
+        # Assicura che ci siano abbastanza elementi nella lista
+        while len(connections[connection_name]) <= index:
+            connections[connection_name].append({})
+        
+        # Imposta secret e value come dizionario
+        connections[connection_name][index]['secret'] = secret
+        connections[connection_name][index]['value'] = value
+    
+    elif len(parts) == 1:
+        # Formato semplice: KEY (senza array)
+        if parts[0] not in connection_first_seen:
+            connection_first_seen[parts[0]] = 0
+        connections[parts[0]] = value
+
+
+def rebuild_yaml_structure(rows: Iterable[Dict[str, str]]) -> Dict[str, Any]:
     """
     Ricostruisce la struttura YAML gerarchica da una lista di record Name/Secret/Value.
     
     Args:
-        rows: Lista di dizionari con chiavi 'Name', 'Secret' e 'Value'
+        rows: Lista (o iteratore) di dizionari con chiavi 'Name', 'Secret' e 'Value'
         
     Returns:
         Dizionario con struttura YAML gerarchica
@@ -113,38 +358,7 @@ def rebuild_yaml_structure(rows: List[Dict[str, str]]) -> Dict[str, Any]:
     connection_first_seen = {}
     
     for row in rows:
-        name = row.get('Name', '')
-        secret = row.get('Secret', '')
-        value = row.get('Value', '')
-        
-        if not name:
-            continue
-        
-        # Analizza la struttura del nome
-        parts = parse_name_to_structure(name)
-        
-        if len(parts) >= 2:
-            # Formato: CONNECTION_NAME[index]
-            connection_name = parts[0]
-            index = parts[1]
-            
-            # Traccia la prima occorrenza
-            if connection_name not in connection_first_seen:
-                connection_first_seen[connection_name] = index
-            
-            # Assicura che ci siano abbastanza elementi nella lista
-            while len(connections[connection_name]) <= index:
-                connections[connection_name].append({})
-            
-            # Imposta secret e value come dizionario
-            connections[connection_name][index]['secret'] = secret
-            connections[connection_name][index]['value'] = value
-        
-        elif len(parts) == 1:
-            # Formato semplice: KEY (senza array)
-            if parts[0] not in connection_first_seen:
-                connection_first_seen[parts[0]] = 0
-            connections[parts[0]] = value
+        _apply_row(connections, connection_first_seen, row)
     
     # Costruisce la struttura finale
     result = {
@@ -154,6 +368,156 @@ def rebuild_yaml_structure(rows: List[Dict[str, str]]) -> Dict[str, Any]:
     return result
 
 
+def _structure_rows(connections: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+    """Riconverte in righe Name/Secret/Value una struttura parziale delle connessioni"""
+    for connection_name, items in connections.items():
+        if isinstance(items, list):
+            for index, item in enumerate(items):
+                # Gli elementi vuoti sono solo riempimento: l'indice resta nelle righe successive
+                if item:
+                    yield {'Name': f'{connection_name}[{index}]', 'Secret': item.get('secret', ''),
+                           'Value': item.get('value', '')}
+        else:
+            yield {'Name': connection_name, 'Secret': '', 'Value': items}
+
+
+def rebuild_or_spill(rows: Iterable[Dict[str, str]], memory_budget: Optional[int] = None) -> tuple:
+    """
+    Come rebuild_yaml_structure, ma entro un budget di memoria.
+
+    Finché la stima della memoria occupata resta nel budget la struttura
+    viene costruita in memoria; oltre, la struttura parziale e tutte le righe
+    successive passano in uno SpillStore (SQLite temporaneo), da rileggere
+    in ordine di prima occorrenza con write_yaml_streaming.
+
+    Args:
+        rows: Iteratore di record Name/Secret/Value
+        memory_budget: Byte stimati oltre i quali usare il disco (default: SPILL_MEMORY_BUDGET)
+
+    Returns:
+        Tupla (struttura YAML, None) oppure (None, SpillStore da chiudere dopo l'uso)
+    """
+    budget = SPILL_MEMORY_BUDGET if memory_budget is None else memory_budget
+    connections = defaultdict(list)
+    connection_first_seen = {}
+    size = 0
+    rows = iter(rows)
+    
+    for row in rows:
+        _apply_row(connections, connection_first_seen, row)
+        size += estimate_row_size(row)
+        if size > budget:
+            store = SpillStore(connection_name_of)
+            try:
+                store.add_rows(_structure_rows(connections))
+                connections.clear()
+                store.add_rows(rows)
+            except BaseException:
+                store.close()
+                raise
+            return (None, store)
+    
+    return ({'Connections': dict(connections)}, None)
+
+
+def connection_name_of(name: str) -> str:
+    """
+    Restituisce il nome della connessione di un Name (es: "SAP_SOAP[1]" -> "SAP_SOAP").
+    
+    Args:
+        name: Stringa Name dal formato Excel
+        
+    Returns:
+        Nome della connessione
+    """
+    # Equivalente a parse_name_to_structure(name)[0], senza espressioni regolari
+    # (chiamata per ogni riga da streaming, filtri e diff)
+    segment = name.split('.', 1)[0]
+    core = segment[:-1] if segment.endswith('\n') else segment
+    if core.endswith(']'):
+        key, bracket, index = core[:-1].rpartition('[')
+        if bracket and key and index.isdecimal() and '\n' not in key:
+            return key
+    return segment
+
+
+def iter_connection_groups(rows: Iterable[Dict[str, str]]) -> Iterator[Tuple[str, List[Dict[str, str]]]]:
+    """
+    Raggruppa record consecutivi appartenenti alla stessa connessione.
+    
+    Tiene in memoria una sola connessione alla volta: il gruppo viene emesso
+    non appena arriva la prima riga della connessione successiva.
+    
+    Args:
+        rows: Iteratore di record Name/Secret/Value
+        
+    Yields:
+        Tuple (nome_connessione, righe della connessione)
+        
+    Raises:
+        UngroupedRowsError: Se una connessione già emessa ricompare più avanti
+    """
+    emitted = set()
+    current_name = None
+    current_rows: List[Dict[str, str]] = []
+    
+    for row in rows:
+        name = row.get('Name', '')
+        if not name:
+            continue
+        connection_name = connection_name_of(name)
+        if connection_name != current_name:
+            if current_name is not None:
+                yield (current_name, current_rows)
+                emitted.add(current_name)
+            if connection_name in emitted:
+                raise UngroupedRowsError(connection_name)
+            current_name = connection_name
+            current_rows = []
+        current_rows.append(row)
+    
+    if current_name is not None:
+        yield (current_name, current_rows)
+
+
+def format_connection_block(conn_name: str, items: Any) -> List[str]:
+    """
+    Formatta il blocco YAML di una singola connessione.
+    
+    Args:
+        conn_name: Nome della connessione
+        items: Lista di dizionari secret/value oppure valore semplice
+        
+    Returns:
+        Lista di righe YAML (senza newline)
+    """
+    lines = [f'  {conn_name}:']
+    
+    if isinstance(items, list):
+        for item in items:
+            if isinstance(item, dict):
+                # Primo campo (secret) con 4 spazi + trattino
+                first_key = True
+                for key, value in item.items():
+                    # Assicura che key e value siano puliti
+                    clean_key = str(key).strip()
+                    clean_value = str(value).strip()
+                    # Quota il valore in modo sicuro
+                    quoted_value = quote_yaml_value(clean_value)
+                    if first_key:
+                        lines.append(f'    - {clean_key}: {quoted_value}')
+                        first_key = False
+                    else:
+                        # Campi successivi (value) con 6 spazi
+                        lines.append(f'      {clean_key}: {quoted_value}')
+    else:
+        # Valore semplice
+        quoted_items = quote_yaml_value(str(items))
+        lines.append(f'    - {quoted_items}')
+    
+    return lines
+
+
 def format_yaml_custom(data: Dict[str, Any]) -> str:
     """
     Formatta manualmente il YAML con indentazione custom per secrets.rlist.
@@ -170,41 +534,181 @@ def format_yaml_custom(data: Dict[str, Any]) -> str:
     lines.append('Connections:')
     
     for conn_name, items in connections.items():
-        lines.append(f'  {conn_name}:')
-        
-        if isinstance(items, list):
-            for item in items:
-                if isinstance(item, dict):
-                    # Primo campo (secret) con 4 spazi + trattino
-                    first_key = True
-                    for key, value in item.items():
-                        # Assicura che key e value siano puliti
-                        clean_key = str(key).strip()
-                        clean_value = str(value).strip()
-                        # Quota il valore in modo sicuro
-                        quoted_value = quote_yaml_value(clean_value)
-                        if first_key:
-                            lines.append(f'    - {clean_key}: {quoted_value}')
-                            first_key = False
-                        else:
-                            # Campi successivi (value) con 6 spazi
-                            lines.append(f'      {clean_key}: {quoted_value}')
-        else:
-            # Valore semplice
-            quoted_items = quote_yaml_value(str(items))
-            lines.append(f'    - {quoted_items}')
+        lines.extend(format_connection_block(conn_name, items))
     
     return '\n'.join(lines) + '\n'
 
 
-def custom_excel_to_yaml(excel_file: str, yaml_file: str, i18n=None) -> tuple:
+def write_yaml_streaming(rows: Iterable[Dict[str, str]], f) -> int:
     """
-    Converte un file Excel in formato custom per secrets.rlist in YAML.
+    Scrive il YAML emettendo ogni connessione appena ne è stata letta l'ultima riga.
+    
+    Richiede che le righe siano raggruppate per connessione (come le scrive
+    custom_yaml_to_excel); altrimenti solleva UngroupedRowsError e l'output
+    scritto fino a quel momento va scartato.
     
     Args:
-        excel_file: Path del file Excel di input
-        yaml_file: Path del file YAML di output
+        rows: Iteratore di record Name/Secret/Value
+        f: File di testo di output
+        
+    Returns:
+        Numero di connessioni scritte
+        
+    Raises:
+        UngroupedRowsError: Se le righe non sono raggruppate per connessione
+    """
+    f.write('Connections:\n')
+    count = 0
+    for connection_name, group in iter_connection_groups(rows):
+        structure = rebuild_yaml_structure(group)['Connections']
+        for conn_name, items in structure.items():
+            f.write('\n'.join(format_connection_block(conn_name, items)) + '\n')
+        count += 1
+    return count
+
+
+def _write_yaml(rows: Iterator[Dict[str, str]], reopen_rows: Callable[[], Iterator[Dict[str, str]]],
+                f, streaming: bool, warnings: List[str], i18n, memory_budget: Optional[int] = None) -> int:
+    """
+    Scrive il YAML delle righe sullo stream di testo f.
+    
+    In modalità streaming, se le righe non sono raggruppate per connessione,
+    f viene svuotato e il YAML viene ricostruito per intero rileggendo le
+    righe con reopen_rows (f deve essere riposizionabile). La ricostruzione
+    completa passa su disco se supera memory_budget (vedi rebuild_or_spill).
+    
+    Returns:
+        Numero di connessioni scritte
+    """
+    if streaming:
+        try:
+            with span('write', streaming=True):
+                return write_yaml_streaming(rows, f)
+        except UngroupedRowsError as e:
+            warnings.append(f"{i18n.t('warning_ungrouped_rows')}: {e.connection_name}")
+            f.seek(0)
+            f.truncate()
+            rows = reopen_rows()
+    
+    # Ricostruisce la struttura YAML
+    with span('rebuild'):
+        yaml_data, store = rebuild_or_spill(rows, memory_budget)
+    if store is not None:
+        with store, span('write', spilled=True):
+            return write_yaml_streaming(store.iter_rows(), f)
+    with span('write'):
+        f.write(format_yaml_custom(yaml_data))
+    return len(yaml_data.get('Connections', {}))
+
+
+def _filtered_rows(rows: Iterator[Dict[str, str]], reopen_rows: Optional[Callable],
+                   connection_filter, streaming: bool) -> Tuple[Iterator[Dict[str, str]], Optional[Callable]]:
+    """
+    Applica il filtro alle righe; l'uscita anticipata vale solo in streaming,
+    dove una connessione richiesta che ricompare solleva UngroupedRowsError
+    e attiva il ripiego (la rilettura legge sempre tutte le righe).
+    """
+    filtered = connection_filter.filter_rows(rows, early_exit=streaming)
+    if reopen_rows is None:
+        return (filtered, None)
+    return (filtered, lambda: connection_filter.filter_rows(reopen_rows()))
+
+
+def _tallied_reopen(tally: Tally, reopen_rows: Callable) -> Callable:
+    """reopen_rows con le righe rilette contate da tally"""
+    return lambda: tally.wrap(reopen_rows())
+
+
+def open_xlsx_rows(stack: ExitStack, excel_file: Union[str, IO], fmt: str, streaming: bool,
+                   parallel: bool, workers: Optional[int],
+                   i18n) -> Tuple[Iterator[Dict[str, str]], Optional[Callable]]:
+    """Engine 'reader' xlsx con openpyxl (vedi open_table_rows)"""
+    source = stack.enter_context(open_binary_input(excel_file, seekable=True))
+    wb = openpyxl.load_workbook(source, read_only=streaming or parallel)
+    stack.callback(wb.close)
+    sheet_names = shard_sheet_names(wb)
+    
+    if parallel and len(sheet_names) > 1 and is_path(excel_file):
+        # Verifica l'intestazione del primo foglio prima di avviare i worker
+        iter_sheet_rows(wb[sheet_names[0]], i18n)
+        records = list(read_sheets_parallel(excel_file, sheet_names, workers))
+        return (iter(records), lambda: iter(records))
+    
+    return (iter_workbook_rows(wb, sheet_names, i18n),
+            lambda: iter_workbook_rows(wb, sheet_names, i18n))
+
+
+def open_text_table_rows(stack: ExitStack, excel_file: Union[str, IO],
+                         read_table: Callable[[IO], Iterator[List]],
+                         i18n) -> Tuple[Iterator[Dict[str, str]], Optional[Callable]]:
+    """
+    Apre una tabella testuale e ne restituisce le righe (base degli engine csv/tsv/ndjson).
+    
+    Args:
+        stack: ExitStack che chiude l'input
+        excel_file: Path, stream o '-' dell'input (anche compresso)
+        read_table: Funzione che legge il file di testo come righe, intestazione inclusa
+        i18n: Oggetto i18n per la localizzazione
+    """
+    source = stack.enter_context(open_text_input(excel_file))
+    try:
+        start = source.tell() if is_seekable(source) else None
+    except OSError:
+        start = None
+    
+    def read_rows():
+        return iter_table_rows(read_table(source), i18n)
+    
+    def reopen_rows():
+        source.seek(start)
+        return read_rows()
+    
+    return (read_rows(), reopen_rows if start is not None else None)
+
+
+def open_table_rows(stack: ExitStack, excel_file: Union[str, IO], fmt: str, streaming: bool,
+                    parallel: bool, workers: Optional[int],
+                    i18n) -> Tuple[Iterator[Dict[str, str]], Optional[Callable]]:
+    """
+    Apre la tabella di input (xlsx, csv, tsv, ndjson o un formato dei plugin)
+    con l'engine 'reader' più veloce disponibile (vedi registry.py) e
+    restituisce le righe.
+    
+    Returns:
+        Tupla (righe, funzione che riapre le righe dall'inizio oppure None
+        se l'input non può essere riletto)
+    """
+    return load_engine('reader', fmt)(stack, excel_file, fmt, streaming, parallel, workers, i18n)
+
+
+def custom_excel_to_yaml(excel_file: Union[str, IO], yaml_file: Union[str, IO], i18n=None,
+                         streaming: bool = False, table_format: Optional[str] = None,
+                         parallel: bool = False, workers: Optional[int] = None,
+                         connection_filter=None, memory_budget: Optional[int] = None) -> tuple:
+    """
+    Converte un file Excel (o CSV/TSV/NDJSON) in formato custom per secrets.rlist in YAML.
+    
+    Input e output possono essere path, stream oppure '-' (stdin/stdout);
+    un output .yml.gz/.yml.xz/.yml.zst viene compresso durante la scrittura.
+    Un input xlsx non riposizionabile (es: pipe) viene prima copiato in un
+    file temporaneo "spooled", perché il formato zip richiede l'accesso casuale.
+    I fogli 'Connections', 'Connections_2', ... vengono letti in ordine e uniti
+    in un unico documento.
+    
+    Args:
+        excel_file: Path, stream o '-' del file Excel/CSV/TSV/NDJSON di input
+        yaml_file: Path, stream di testo/binario o '-' del YAML di output
         i18n: Oggetto i18n per la localizzazione (opzionale)
+        streaming: Legge il foglio in modalità read_only ed emette ogni connessione
+                   appena completata, tenendone in memoria una sola; se le righe non
+                   sono raggruppate per connessione ripiega sulla ricostruzione completa
+        table_format: 'xlsx', 'csv', 'tsv' o 'ndjson' (default: dedotto dall'estensione, xlsx per gli stream)
+        parallel: Legge i fogli di un file xlsx su più processi, uno per foglio
+        workers: Numero di processi per la lettura parallela (default: numero di CPU)
+        connection_filter: ConnectionFilter (vedi filters.py); in modalità streaming la
+                           lettura termina appena emesse tutte le connessioni richieste per nome
+        memory_budget: Byte stimati oltre i quali la ricostruzione del YAML usa un
+                       database SQLite temporaneo (default: SPILL_MEMORY_BUDGET)
         
     Returns:
         Tupla (success, warnings) dove success è bool e warnings è lista di stringhe
@@ -213,68 +717,279 @@ def custom_excel_to_yaml(excel_file: str, yaml_file: str, i18n=None) -> tuple:
     if i18n is None:
         i18n = get_i18n()
     
+    console = console_for(yaml_file)
     warnings = []
     try:
-        # Legge il file Excel
-        wb = openpyxl.load_workbook(excel_file)
-        ws = wb.active
-        
-        # Legge i dati
-        rows = []
-        headers = []
-        for i, row in enumerate(ws.iter_rows(values_only=True)):
-            if i == 0:
-                # Prima riga: headers
-                headers = [cell if cell else '' for cell in row]
-                # Verifica che abbia le colonne corrette
-                if 'Name' not in headers or 'Secret' not in headers or 'Value' not in headers:
-                    raise ValueError(i18n.t("missing_columns"))
-                name_idx = headers.index('Name')
-                secret_idx = headers.index('Secret')
-                value_idx = headers.index('Value')
-            else:
-                # Dati
-                if row[name_idx]:  # Salta righe vuote
-                    # Pulisce i valori rimuovendo newline interni e spazi trailing/leading
-                    name_value = str(row[name_idx]).strip().replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ') if row[name_idx] else ''
-                    secret_value = str(row[secret_idx]).strip().replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ') if row[secret_idx] else ''
-                    value_value = str(row[value_idx]).strip().replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ') if row[value_idx] else ''
-                    # Rimuove spazi multipli consecutivi
-                    name_value = ' '.join(name_value.split())
-                    secret_value = ' '.join(secret_value.split())
-                    value_value = ' '.join(value_value.split())
-                    rows.append({
-                        'Name': name_value,
-                        'Secret': secret_value,
-                        'Value': value_value
-                    })
-        
-        # Ricostruisce la struttura YAML
-        yaml_data = rebuild_yaml_structure(rows)
-        
-        # Scrive il file YAML con formattazione custom e line ending Unix (LF)
-        with open(yaml_file, 'w', encoding='utf-8', newline='\n') as f:
-            yaml_content = format_yaml_custom(yaml_data)
-            f.write(yaml_content)
+        fmt = table_format or table_format_of(excel_file)
+        with ExitStack() as stack:
+            # Legge gli headers (verifica le colonne prima di creare l'output)
+            with span('open', format=fmt):
+                rows, reopen_rows = open_table_rows(stack, excel_file, fmt, streaming,
+                                                    parallel, workers, i18n)
+            # Il ripiego della modalità streaming richiede di poter rileggere l'input
+            streaming = streaming and reopen_rows is not None
+            if connection_filter is not None:
+                rows, reopen_rows = _filtered_rows(rows, reopen_rows, connection_filter, streaming)
+            # Righe convertite per le metriche (conta solo l'ultima lettura in caso di ripiego)
+            tally = Tally()
+            rows = tally.wrap(rows)
+            if reopen_rows is not None:
+                reopen_rows = _tallied_reopen(tally, reopen_rows)
+            rows = traced_batches(rows, 'connection_batch', lambda row: connection_name_of(row['Name']))
+            
+            # Un file di output viene sostituito solo a conversione riuscita
+            target = stack.enter_context(atomic_output_path(yaml_file)) if is_path(yaml_file) else yaml_file
+            # Scrive il file YAML con formattazione custom e line ending Unix (LF)
+            with open_text_output(target) as f:
+                if not streaming or is_rewritable(target):
+                    connection_count = _write_yaml(rows, reopen_rows, f, streaming, warnings, i18n,
+                                                   memory_budget)
+                else:
+                    # Output non riposizionabile o compresso: il ripiego sulla
+                    # ricostruzione completa richiede di poter riscrivere l'output
+                    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+',
+                                                       encoding='utf-8', newline='\n') as spool:
+                        connection_count = _write_yaml(rows, reopen_rows, spool, streaming, warnings, i18n,
+                                                       memory_budget)
+                        spool.seek(0)
+                        shutil.copyfileobj(spool, f)
         
         try:
-            print(f"{i18n.t('converted')} {excel_file} -> {yaml_file}")
-            connections = yaml_data.get('Connections', {})
-            print(f"  {len(connections)} {i18n.t('connections_rebuilt')}")
+            print(f"{i18n.t('converted')} {describe(excel_file)} -> {describe(yaml_file)}", file=console)
+            print(f"  {connection_count} {i18n.t('connections_rebuilt')}", file=console)
         except UnicodeEncodeError:
             pass
+        inc('rows_total', tally.count, mode='excel_to_yaml')
         return (True, warnings, None)
     
     except Exception as e:
         error_details = traceback.format_exc()
         error_msg = f"{i18n.t('error_conversion_excel_yaml')}: {e}\n\n{i18n.t('error_details')}:\n{error_details}"
         try:
-            print(f"{i18n.t('error')}: {error_msg}")
+            print(f"{i18n.t('error')}: {error_msg}", file=console)
         except UnicodeEncodeError:
             pass
         return (False, warnings, error_msg)
 
 
+def sheet_output_path(excel_file: str, sheet_name: str, output_dir: str) -> str:
+    """
+    Restituisce il path del YAML generato per un foglio.
+    
+    Esempio: ("app.xlsx", "prod", "out") -> "out/app.prod.yml"
+    
+    Args:
+        excel_file: Path del workbook
+        sheet_name: Nome del foglio
+        output_dir: Cartella di output
+        
+    Returns:
+        Path del file YAML
+    """
+    stem = os.path.splitext(os.path.basename(excel_file))[0]
+    safe_name = re.sub(r'[\\/:*?"<>|\s]+', '_', sheet_name.strip())
+    return os.path.join(output_dir, f"{stem}.{safe_name}.yml")
+
+
+def sheet_output_paths(excel_file: str, sheet_names: List[str], output_dir: str) -> List[str]:
+    """
+    Restituisce i path dei YAML di più fogli (vedi sheet_output_path).
+    
+    I fogli il cui nome diventa uguale a quello di un foglio precedente dopo
+    la sostituzione dei caratteri non validi (es: "a/b" e "a:b", anche solo
+    per maiuscole/minuscole) ricevono un suffisso numerico: "out/app.a_b_2.yml".
+    
+    Args:
+        excel_file: Path del workbook
+        sheet_names: Nomi dei fogli
+        output_dir: Cartella di output
+        
+    Returns:
+        Path dei file YAML, distinti e nello stesso ordine dei fogli
+    """
+    paths = []
+    taken = set()
+    for sheet_name in sheet_names:
+        path = sheet_output_path(excel_file, sheet_name, output_dir)
+        base, extension = os.path.splitext(path)
+        index = 1
+        while path.lower() in taken:
+            index += 1
+            path = f"{base}_{index}{extension}"
+        taken.add(path.lower())
+        paths.append(path)
+    return paths
+
+
+def _timed_rows(rows: Iterator[Dict[str, str]], timings: Dict[str, float]) -> Iterator[Dict[str, str]]:
+    """Somma in timings['read'] il tempo speso a leggere le righe dal foglio"""
+    rows = iter(rows)
+    while True:
+        start = time.perf_counter()
+        row = next(rows, None)
+        timings['read'] += time.perf_counter() - start
+        if row is None:
+            return
+        yield row
+
+
+def _convert_sheet(ws, yaml_file: str, streaming: bool, i18n, connection_filter=None) -> Dict[str, Any]:
+    """
+    Converte un foglio nel proprio file YAML misurando i tempi delle fasi.
+    
+    Returns:
+        Dizionario con 'connections', 'warnings' e 'timings' (secondi per
+        'read', 'write' e 'total')
+    """
+    timings = {'read': 0.0}
+    warnings = []
+    start = time.perf_counter()
+    rows = _timed_rows(iter_sheet_rows(ws, i18n), timings)
+    reopen_rows = lambda: _timed_rows(iter_sheet_rows(ws, i18n), timings)
+    if connection_filter is not None:
+        rows, reopen_rows = _filtered_rows(rows, reopen_rows, connection_filter, streaming)
+    with open_text_output(yaml_file) as f:
+        connection_count = _write_yaml(rows, reopen_rows, f, streaming, warnings, i18n)
+    timings['total'] = time.perf_counter() - start
+    timings['write'] = max(0.0, timings['total'] - timings['read'])
+    return {'connections': connection_count, 'warnings': warnings, 'timings': timings}
+
+
+def _sheet_report(sheet_name: str, yaml_file: str, ws, streaming: bool, i18n,
+                  connection_filter=None) -> Dict[str, Any]:
+    """Converte un foglio restituendo il report (errori inclusi, senza sollevare eccezioni)"""
+    report = {'sheet': sheet_name, 'output': yaml_file, 'success': False, 'error': None,
+              'connections': 0, 'warnings': [], 'timings': {}}
+    try:
+        report.update(_convert_sheet(ws, yaml_file, streaming, i18n, connection_filter), success=True)
+    except Exception as e:
+        report['error'] = f"{i18n.t('error_conversion_excel_yaml')}: {e}"
+    return report
+
+
+def _convert_sheet_worker(excel_file: str, sheet_name: str, yaml_file: str,
+                          streaming: bool, language: str, connection_filter=None) -> Dict[str, Any]:
+    """Converte un foglio in un processo separato (workbook aperto in read_only)"""
+    i18n = I18n(language)
+    wb = openpyxl.load_workbook(excel_file, read_only=True)
+    try:
+        return _sheet_report(sheet_name, yaml_file, wb[sheet_name], streaming, i18n, connection_filter)
+    finally:
+        wb.close()
+
+
+def convert_workbook_sheets(excel_file: str, output_dir: str, sheets: Optional[List[str]] = None,
+                            i18n=None, streaming: bool = False, parallel: bool = False,
+                            workers: Optional[int] = None, connection_filter=None) -> List[Dict[str, Any]]:
+    """
+    Converte ogni foglio di un workbook (o solo quelli indicati) nel proprio file YAML.
+    
+    In modalità seriale il workbook viene aperto una sola volta e i fogli
+    convertiti uno dopo l'altro. Con parallel=True ogni foglio viene
+    convertito in un processo separato: openpyxl non consente letture
+    concorrenti dallo stesso workbook, quindi ogni processo lo riapre in
+    read_only, operazione che non legge i fogli degli altri processi.
+    
+    Args:
+        excel_file: Path del file Excel
+        output_dir: Cartella dei file YAML (vedi sheet_output_paths)
+        sheets: Nomi dei fogli da convertire (default: tutti, nell'ordine del workbook)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        streaming: Emette ogni connessione appena completata (vedi custom_excel_to_yaml)
+        parallel: Converte i fogli su più processi
+        workers: Numero di processi (default: numero di CPU)
+        connection_filter: ConnectionFilter applicato a ogni foglio (opzionale)
+        
+    Returns:
+        Lista di report, uno per foglio, con chiavi 'sheet', 'output', 'success',
+        'error', 'connections', 'warnings' e 'timings' (secondi per fase)
+        
+    Raises:
+        ValueError: Se un foglio richiesto non esiste
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    
+    start = time.perf_counter()
+    wb = openpyxl.load_workbook(excel_file, read_only=streaming or parallel)
+    try:
+        open_time = time.perf_counter() - start
+        sheet_names = list(sheets) if sheets else wb.sheetnames
+        missing = [name for name in sheet_names if name not in wb.sheetnames]
+        if missing:
+            raise ValueError(f"{i18n.t('sheet_not_found')}: {', '.join(missing)}")
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = sheet_output_paths(excel_file, sheet_names, output_dir)
+        
+        if parallel and len(sheet_names) > 1:
+            workers = min(workers or os.cpu_count() or 1, len(sheet_names))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                reports = list(executor.map(
+                    _convert_sheet_worker, [excel_file] * len(sheet_names), sheet_names, outputs,
+                    [streaming] * len(sheet_names), [i18n.language] * len(sheet_names),
+                    [connection_filter] * len(sheet_names)))
+        else:
+            reports = [_sheet_report(name, output, wb[name], streaming, i18n, connection_filter)
+                       for name, output in zip(sheet_names, outputs)]
+    finally:
+        wb.close()
+    
+    for report in reports:
+        report['timings']['open'] = open_time
+    return reports
+
+
+def custom_excel_sheets_to_yaml(excel_file: str, output_dir: str, sheets: Optional[List[str]] = None,
+                                i18n=None, streaming: bool = False, parallel: bool = False,
+                                workers: Optional[int] = None, connection_filter=None) -> tuple:
+    """
+    Converte i fogli di un workbook in un file YAML per foglio (es: dev, staging, prod).
+    
+    Stampa per ogni foglio le connessioni ricostruite e i tempi di lettura e
+    scrittura; i warning vengono prefissati con il nome del foglio.
+    
+    Args:
+        Vedi convert_workbook_sheets
+        
+    Returns:
+        Tupla (success, warnings, error): success è False se almeno un foglio fallisce
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    
+    try:
+        reports = convert_workbook_sheets(excel_file, output_dir, sheets, i18n,
+                                          streaming=streaming, parallel=parallel, workers=workers,
+                                          connection_filter=connection_filter)
+    except Exception as e:
+        error_msg = f"{i18n.t('error_conversion_excel_yaml')}: {e}"
+        try:
+            print(f"{i18n.t('error')}: {error_msg}")
+        except UnicodeEncodeError:
+            pass
+        return (False, [], error_msg)
+    
+    warnings = []
+    errors = []
+    for report in reports:
+        warnings.extend(f"[{report['sheet']}] {warning}" for warning in report['warnings'])
+        if not report['success']:
+            errors.append(f"[{report['sheet']}] {report['error']}")
+            continue
+        timings = report['timings']
+        try:
+            print(f"{i18n.t('converted')} {excel_file} [{report['sheet']}] -> {report['output']}")
+            print(f"  {report['connections']} {i18n.t('connections_rebuilt')} - "
+                  f"{i18n.t('timing_read')} {timings['read']:.3f}s, "
+                  f"{i18n.t('timing_write')} {timings['write']:.3f}s")
+        except UnicodeEncodeError:
+            pass
+    
+    if errors:
+        return (False, warnings, '\n'.join(errors))
+    return (True, warnings, None)
+
+
 if __name__ == "__main__":
     # Test del modulo
     import sys
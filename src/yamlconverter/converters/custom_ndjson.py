@@ -0,0 +1,104 @@
+"""
+YAML ↔ Excel Converter - NDJSON
+Modulo per lettura e scrittura in streaming dei record Name/Secret/Value
+come NDJSON (JSON Lines), un oggetto JSON per riga
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional
+from yamlconverter.utils.i18n import get_i18n
+
+# Encoder/decoder riutilizzati per tutte le righe (evita di ricrearli a ogni record)
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+_DECODER = json.JSONDecoder()
+
+# Numero di righe accumulate prima di ogni scrittura sul file
+WRITE_BATCH_SIZE = 1000
+
+# Colonne dei record (stesso contratto del foglio Excel)
+HEADER = ['Name', 'Secret', 'Value']
+
+
+def read_ndjson_table(f: IO, i18n=None, decode: Optional[Callable[[str], Any]] = None) -> Iterator[List]:
+    """
+    Legge un file NDJSON riga per riga restituendo le righe come tabella.
+
+    La prima riga restituita è l'intestazione Name/Secret/Value, seguita dai
+    valori di ogni oggetto: le righe vanno passate a iter_table_rows, che le
+    normalizza come le celle del foglio Excel. Le righe vuote vengono ignorate.
+
+    Args:
+        f: File di testo aperto in lettura
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        decode: Funzione che decodifica una riga JSON (default: json; es: orjson.loads)
+
+    Returns:
+        Iteratore sulle righe come liste [Name, Secret, Value]
+
+    Raises:
+        ValueError: Se una riga non è un oggetto JSON valido
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    yield HEADER
+    decode = decode or _DECODER.decode
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = decode(line)
+        except ValueError as e:
+            raise ValueError(f"{i18n.t('ndjson_invalid_line')} {line_number}: {e}") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"{i18n.t('ndjson_invalid_line')} {line_number}")
+        yield [record.get('Name'), record.get('Secret'), record.get('Value')]
+
+
+def write_ndjson_rows(rows: Iterable[Dict[str, str]], f: IO, batch_size: int = WRITE_BATCH_SIZE,
+                      encode: Optional[Callable[[Dict[str, str]], str]] = None) -> int:
+    """
+    Scrive i record Name/Secret/Value come NDJSON, a blocchi di batch_size righe.
+
+    La memoria usata non dipende dal numero di record: viene tenuto
+    in memoria un solo blocco alla volta.
+
+    Args:
+        rows: Iteratore di record Name/Secret/Value
+        f: File di testo aperto in scrittura
+        batch_size: Numero di righe per ogni scrittura
+        encode: Funzione che codifica un record come riga JSON compatta
+                (default: json; deve produrre lo stesso output)
+
+    Returns:
+        Numero di righe scritte
+    """
+    encode = encode or _ENCODER.encode
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(encode({'Name': row.get('Name', ''), 'Secret': row.get('Secret', ''),
+                             'Value': row.get('Value', '')}))
+        if len(batch) >= batch_size:
+            f.write('\n'.join(batch) + '\n')
+            count += len(batch)
+            batch = []
+    if batch:
+        f.write('\n'.join(batch) + '\n')
+        count += len(batch)
+    return count
@@ -20,14 +20,52 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import yaml
 from openpyxl import Workbook
+import itertools
+import mmap
+import os
+import re
 import traceback
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from yamlconverter.converters.custom_excel_to_yaml import connection_name_of, shard_sheet_name
+from yamlconverter.converters.registry import load_engine, yaml_loader
+from yamlconverter.utils.formats import table_format as table_format_of
 from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.metrics import inc
+from yamlconverter.utils.profiling import span, traced_batches
+from yamlconverter.utils.streams import (
+    console_for, describe, input_compression, is_path, open_binary_output, open_text_input,
+)
 
+# Pattern per la scansione testuale del formato secrets.rlist
+# (compilati una volta sola, lavorano su bytes per poter usare mmap); dopo
+# l'intestazione le righe si cercano dal '\n' che le precede, un prefisso
+# letterale molto più veloce da cercare di '^' (provato a ogni posizione)
+_CONNECTIONS_RE = re.compile(rb'^Connections:[ \t\r\f\v]*$', re.MULTILINE)
+_LEVEL0_RE = re.compile(rb'\n[A-Za-z][^\n]*:')
+_LEVEL1_RE = re.compile(rb'\n  ([A-Za-z0-9_-]+):[ \t\r\f\v]*$', re.MULTILINE)
+# Elementi delle liste di connessione: una riga Name/Secret/Value ciascuno
+_ITEM_RE = re.compile(rb'\n[ \t]+-[ \t\r\n]')
+_HEADER_LINE_RE = re.compile(rb'^[ \t]*(#.*|---[ \t]*|%.*)?\r?$')
 
-def flatten_to_name_secret_value(data: Dict[str, Any], parent_key: str = '') -> List[Dict[str, str]]:
+# Stessi pattern in versione testuale, per la scansione riga per riga degli stream
+_CONNECTIONS_LINE_RE = re.compile(r'^Connections:[ \t\r\f\v]*$')
+_LEVEL0_LINE_RE = re.compile(r'^[A-Za-z][^\n]*:')
+_LEVEL1_LINE_RE = re.compile(r'^  ([A-Za-z0-9_-]+):[ \t\r\f\v]*$')
+
+# Byte esaminati per volta dal conteggio degli elementi delle liste
+ITEM_SCAN_WINDOW = 8 * 1024 * 1024
+
+# Dimensione minima di un chunk per il parsing parallelo
+PARALLEL_MIN_CHUNK_BYTES = 1024 * 1024
+
+# Numero massimo di righe di un foglio Excel (intestazione inclusa)
+SHEET_MAX_ROWS = 1048576
+
+
+def iter_name_secret_value(data: Dict[str, Any], parent_key: str = '') -> Iterator[Dict[str, str]]:
     """
-    Appiattisce la struttura YAML gerarchica in una lista di record Name/Secret/Value.
+    Appiattisce la struttura YAML gerarchica generando un record Name/Secret/Value alla volta.
     
     Formato atteso YAML:
     Connections:
@@ -45,11 +83,9 @@ def flatten_to_name_secret_value(data: Dict[str, Any], parent_key: str = '') ->
         data: Dizionario YAML da convertire
         parent_key: Chiave parent per la ricorsione
         
-    Returns:
-        Lista di dizionari con chiavi 'Name', 'Secret' e 'Value'
+    Yields:
+        Dizionari con chiavi 'Name', 'Secret' e 'Value'
     """
-    rows = []
-    
     # Se c'è una chiave "Connections" al primo livello, la saltiamo
     if parent_key == '' and 'Connections' in data:
         data = data['Connections']
@@ -67,117 +103,668 @@ def flatten_to_name_secret_value(data: Dict[str, Any], parent_key: str = '') ->
                     name = f"{full_key}[{index}]"
                     secret = str(item.get('secret', ''))
                     val = str(item.get('value', ''))
-                    rows.append({'Name': name, 'Secret': secret, 'Value': val})
+                    yield {'Name': name, 'Secret': secret, 'Value': val}
                 else:
                     # Elemento semplice nella lista
                     name = f"{full_key}[{index}]"
-                    rows.append({'Name': name, 'Secret': '', 'Value': str(item)})
+                    yield {'Name': name, 'Secret': '', 'Value': str(item)}
         
         elif isinstance(value, dict):
             # Dizionario annidato - ricorsione
-            rows.extend(flatten_to_name_secret_value(value, full_key))
+            yield from iter_name_secret_value(value, full_key)
         
         else:
             # Valore semplice
-            rows.append({'Name': full_key, 'Secret': '', 'Value': str(value)})
+            yield {'Name': full_key, 'Secret': '', 'Value': str(value)}
+
+
+def flatten_to_name_secret_value(data: Dict[str, Any], parent_key: str = '') -> List[Dict[str, str]]:
+    """
+    Appiattisce la struttura YAML gerarchica in una lista di record Name/Secret/Value
+    (vedi iter_name_secret_value per il formato).
     
-    return rows
+    Args:
+        data: Dizionario YAML da convertire
+        parent_key: Chiave parent per la ricorsione
+        
+    Returns:
+        Lista di dizionari con chiavi 'Name', 'Secret' e 'Value'
+    """
+    return list(iter_name_secret_value(data, parent_key))
 
 
-def custom_yaml_to_excel(yaml_file: str, excel_file: str, i18n=None) -> tuple:
+def scan_connection_blocks(buffer) -> Tuple[Optional[int], List[Tuple[str, int, int]], int]:
     """
-    Converte un file YAML in formato custom per secrets.rlist in Excel.
+    Individua i blocchi di connessione (chiavi di livello 1 sotto Connections).
+    
+    Lavora su bytes o mmap senza decodificare né fare il parsing del file.
     
     Args:
-        yaml_file: Path del file YAML di input
-        excel_file: Path del file Excel di output
-        i18n: Oggetto i18n per la localizzazione (opzionale)
+        buffer: Contenuto del file (bytes o mmap)
         
     Returns:
-        Tupla (success, warnings) dove success è bool e warnings è lista di stringhe
+        Tupla (connections_start, blocks, section_end) dove:
+        - connections_start è l'offset della riga "Connections:" (None se assente)
+        - blocks è la lista di (nome, inizio, fine) di ogni blocco di connessione
+        - section_end è l'offset della prima chiave di livello 0 dopo Connections
     """
-    # Inizializza i18n se non passato
-    if i18n is None:
-        i18n = get_i18n()
+    size = len(buffer)
+    header = _CONNECTIONS_RE.search(buffer)
+    if header is None:
+        return (None, [], size)
     
-    warnings = []
-    try:
-        # Prima controlla duplicati leggendo il file come testo
-        # (yaml.safe_load sovrascrive automaticamente le chiavi duplicate)
-        duplicates = set()
-        with open(yaml_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            lines = content.split('\n')
-            
-            # Cerca pattern di chiavi al livello 1 (sotto Connections)
-            # Pattern: 2 spazi + nome + ':'
-            import re
-            level1_keys = []
-            in_connections = False
-            
+    # La sezione termina alla prima chiave di livello 0 successiva
+    next_level0 = _LEVEL0_RE.search(buffer, header.end())
+    section_end = next_level0.start() + 1 if next_level0 else size
+    
+    starts = [(match.group(1).decode('ascii'), match.start() + 1)
+              for match in _LEVEL1_RE.finditer(buffer, header.end(), section_end)]
+    blocks = []
+    for i, (name, start) in enumerate(starts):
+        end = starts[i + 1][1] if i + 1 < len(starts) else section_end
+        blocks.append((name, start, end))
+    return (header.start(), blocks, section_end)
+
+
+def count_list_items(buffer, start: int, end: int) -> int:
+    """
+    Conta gli elementi delle liste ("    - secret: ...") tra start ed end,
+    cioè le righe Name/Secret/Value che il file produrrà, senza parsing.
+    
+    Args:
+        buffer: Contenuto del file (bytes o mmap)
+        start: Offset iniziale (es: inizio del primo blocco di connessione)
+        end: Offset finale (escluso)
+        
+    Returns:
+        Numero di elementi
+    """
+    count = 0
+    position = max(start - 1, 0)
+    while position < end:
+        # Finestre che terminano su un '\n', così la lista dei match resta piccola:
+        # un elemento che inizia sul '\n' finale viene contato nella finestra successiva
+        window_end = buffer.find(b'\n', min(position + ITEM_SCAN_WINDOW, end))
+        if window_end < 0 or window_end >= end:
+            window_end = end
+        count += len(_ITEM_RE.findall(buffer, position, min(window_end + 1, end)))
+        position = window_end
+    return count
+
+
+def _open_mapped(yaml_file: str):
+    """Apre il file in sola lettura come mmap (bytes vuoti per file vuoti)"""
+    with open(yaml_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def find_duplicate_connections(blocks: List[Tuple[str, int, int]]) -> set:
+    """
+    Restituisce i nomi di connessione definiti più volte.
+    
+    Args:
+        blocks: Blocchi restituiti da scan_connection_blocks
+        
+    Returns:
+        Insieme dei nomi duplicati
+    """
+    seen = set()
+    duplicates = set()
+    for name, _start, _end in blocks:
+        if name in seen:
+            duplicates.add(name)
+        seen.add(name)
+    return duplicates
+
+
+class ScanningReader:
+    """
+    Avvolge uno stream di testo e individua i nomi di connessione mentre
+    yaml.safe_load lo legge, così l'input viene letto una sola volta
+    (necessario per stdin e altri stream non riposizionabili).
+    
+    Applica gli stessi criteri di scan_connection_blocks, riga per riga.
+    Con block_filter le righe dei blocchi di connessione esclusi non vengono
+    passate al parser; con stop_after la lettura termina (EOF per il parser)
+    al primo blocco successivo all'ultima connessione richiesta.
+    """
+    
+    def __init__(self, stream: IO, block_filter: Optional[Callable[[str], bool]] = None,
+                 stop_after: Optional[Iterable[str]] = None):
+        self.stream = stream
+        self.name = describe(stream)
+        self.connection_names: List[str] = []
+        self.block_filter = block_filter
+        self._remaining = set(stop_after) if stop_after is not None else None
+        self._keep = True
+        self._done = False
+        self._state = 'before'  # before -> inside -> after
+        self._pending = ''
+    
+    def _read_lines(self, size: int) -> Tuple[str, List[str]]:
+        """Legge un chunk e restituisce (chunk, righe complete)"""
+        chunk = self.stream.read(size)
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode('utf-8')
+        if chunk:
+            lines = (self._pending + chunk).split('\n')
+            self._pending = lines.pop()
+        else:
+            lines = [self._pending] if self._pending else []
+            self._pending = ''
+        return (chunk, lines)
+    
+    def read(self, size: int = -1) -> str:
+        """Legge dallo stream sottostante analizzando le righe complete"""
+        if self.block_filter is None and self._remaining is None:
+            chunk, lines = self._read_lines(size)
             for line in lines:
-                # Rileva quando siamo dentro Connections
-                if re.match(r'^Connections:\s*$', line):
-                    in_connections = True
-                    continue
-                
-                if in_connections:
-                    # Chiave di livello 0 (fine Connections)
-                    if re.match(r'^[A-Za-z]', line) and ':' in line:
-                        break
-                    
-                    # Chiave di livello 1 (2 spazi)
-                    match = re.match(r'^  ([A-Za-z0-9_-]+):\s*$', line)
-                    if match:
-                        key_name = match.group(1)
-                        if key_name in level1_keys:
-                            duplicates.add(key_name)
-                        level1_keys.append(key_name)
-        
-        if duplicates:
-            warnings.append(f"{i18n.t('warning_duplicates_found')}:")
-            for dup in sorted(duplicates):
-                warnings.append(f"  - {dup} {i18n.t('converted_only_first')}")
+                self._scan_line(line)
+            return chunk
+        
+        # Con il filtro vengono restituite solo le righe complete da tenere
+        while not self._done:
+            chunk, lines = self._read_lines(size)
+            kept = ''.join(line + '\n' for line in lines if self._scan_line(line) and not self._done)
+            if kept or not chunk:
+                return kept
+        return ''
+    
+    def _scan_line(self, line: str) -> bool:
+        """Aggiorna lo stato della scansione con una singola riga (True se la riga va tenuta)"""
+        if self._state == 'before':
+            if _CONNECTIONS_LINE_RE.match(line):
+                self._state = 'inside'
+        elif self._state == 'inside':
+            if _LEVEL0_LINE_RE.match(line):
+                self._state = 'after'
+                self._keep = True
+                return True
+            match = _LEVEL1_LINE_RE.match(line)
+            if match:
+                name = match.group(1)
+                if self._remaining is not None and not self._remaining:
+                    self._done = True
+                    return False
+                self._keep = self.block_filter is None or self.block_filter(name)
+                if self._keep:
+                    self.connection_names.append(name)
+                    if self._remaining is not None:
+                        self._remaining.discard(name)
+            return self._keep
+        return True
+    
+    @property
+    def blocks(self) -> List[Tuple[str, int, int]]:
+        """Blocchi nel formato di scan_connection_blocks (offset non disponibili)"""
+        return [(name, -1, -1) for name in self.connection_names]
+
+
+def _parse_connection_chunk(yaml_file: str, start: int, end: int) -> Dict[str, Any]:
+    """
+    Esegue il parsing di un intervallo di blocchi di connessione (eseguito nei worker).
+    
+    Args:
+        yaml_file: Path del file YAML
+        start: Offset iniziale (inizio di un blocco di connessione)
+        end: Offset finale (escluso)
+        
+    Returns:
+        Dizionario {nome_connessione: contenuto} del chunk
+    """
+    with open(yaml_file, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    data = yaml.load('Connections:\n' + text, Loader=yaml_loader())
+    connections = data.get('Connections') if isinstance(data, dict) else None
+    return connections or {}
+
+
+def _split_chunks(blocks: List[Tuple[str, int, int]], chunk_count: int) -> List[Tuple[int, int]]:
+    """Raggruppa blocchi consecutivi in chunk di dimensione simile (un chunk non scavalca i blocchi esclusi)"""
+    total = sum(end - start for _name, start, end in blocks)
+    target = max(1, total // chunk_count)
+    chunks = []
+    chunk_start = None
+    previous_end = None
+    for _name, start, end in blocks:
+        if chunk_start is None:
+            chunk_start = start
+        elif start != previous_end:
+            chunks.append((chunk_start, previous_end))
+            chunk_start = start
+        previous_end = end
+        if end - chunk_start >= target:
+            chunks.append((chunk_start, end))
+            chunk_start = None
+    if chunk_start is not None:
+        chunks.append((chunk_start, previous_end))
+    return chunks
+
+
+def _divisible_blocks(yaml_file: str, scan=None,
+                      block_filter: Optional[Callable[[str], bool]] = None) -> Optional[List[Tuple[str, int, int]]]:
+    """
+    Blocchi di connessione (filtrati) di un file analizzabile per parti.
+    
+    Returns:
+        Lista dei blocchi (vuota se il filtro li esclude tutti) oppure None se
+        il file contiene altro oltre a commenti e alla sezione Connections
+    """
+    buffer = _open_mapped(yaml_file)
+    try:
+        connections_start, blocks, section_end = scan or scan_connection_blocks(buffer)
+        if connections_start is None or not blocks:
+            return None
+        # Solo commenti/righe vuote prima di Connections e nulla dopo la sezione
+        if section_end < len(buffer):
+            return None
+        for line in buffer[:connections_start].splitlines():
+            if not _HEADER_LINE_RE.match(line):
+                return None
+    finally:
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+    
+    if block_filter is not None:
+        blocks = [block for block in blocks if block_filter(block[0])]
+    return blocks
+
+
+def _shift_marks(error: yaml.YAMLError, yaml_file: str, lines: int):
+    """Riporta le posizioni di un errore di parsing di un chunk a quelle del file"""
+    for attribute in ('context_mark', 'problem_mark'):
+        mark = getattr(error, attribute, None)
+        if mark is not None:
+            # I Mark di libyaml non sono modificabili: vengono sostituiti
+            setattr(error, attribute, yaml.Mark(yaml_file, mark.index, mark.line + lines, mark.column, None, None))
+
+
+def iter_connection_chunks(yaml_file: str, blocks: List[Tuple[str, int, int]],
+                           chunk_bytes: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Analizza i blocchi di connessione un chunk alla volta, in ordine.
+    
+    In memoria resta un solo chunk: è la modalità streaming della conversione
+    YAML → tabella per i file che non entrano nel limite di memoria. Gli
+    errori di sintassi riportano i numeri di riga del file.
+    
+    Args:
+        yaml_file: Path del file YAML
+        blocks: Blocchi (nome, inizio, fine) restituiti da _divisible_blocks
+        chunk_bytes: Dimensione minima di un chunk (default: PARALLEL_MIN_CHUNK_BYTES)
+        
+    Yields:
+        Documenti parziali {'Connections': {...}}
+    """
+    if not blocks:
+        yield {'Connections': {}}
+        return
+    total = sum(end - start for _name, start, end in blocks)
+    chunks = _split_chunks(blocks, max(1, total // (chunk_bytes or PARALLEL_MIN_CHUNK_BYTES)))
+    line = 0
+    position = 0
+    with open(yaml_file, 'rb') as f:
+        for start, end in chunks:
+            # Conta le righe fino al chunk (intestazione e blocchi esclusi)
+            while position < start:
+                piece = f.read(min(start - position, PARALLEL_MIN_CHUNK_BYTES))
+                line += piece.count(b'\n')
+                position += len(piece)
+            text = f.read(end - start)
             try:
-                print("\n".join(warnings))
-            except UnicodeEncodeError:
-                pass  # Ignora errori di encoding nei print
+                with span('parse_batch', 'batch', offset=start, bytes=end - start):
+                    data = yaml.load('Connections:\n' + text.decode('utf-8'), Loader=yaml_loader())
+            except yaml.YAMLError as e:
+                # La prima riga del chunk è l'intestazione aggiunta
+                _shift_marks(e, yaml_file, line - 1)
+                raise
+            line += text.count(b'\n')
+            position = end
+            connections = data.get('Connections') if isinstance(data, dict) else None
+            yield {'Connections': connections or {}}
+
+
+def parallel_safe_load(yaml_file: str, workers: Optional[int] = None,
+                       chunk_bytes: Optional[int] = None, scan=None,
+                       block_filter: Optional[Callable[[str], bool]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Esegue il parsing del YAML in parallelo, spezzando il file ai confini dei blocchi
+    di connessione (righe "  NOME:" sotto Connections) e unendo i risultati nell'ordine originale.
+    
+    Le chiavi duplicate tra chunk diversi vengono unite come fa yaml.safe_load:
+    la posizione resta quella della prima occorrenza, il valore è quello dell'ultima.
+    
+    Args:
+        yaml_file: Path del file YAML
+        workers: Numero di processi (default: numero di CPU)
+        chunk_bytes: Dimensione minima di un chunk (default: PARALLEL_MIN_CHUNK_BYTES)
+        scan: Risultato di scan_connection_blocks già calcolato (opzionale)
+        block_filter: Funzione sul nome della connessione: i blocchi esclusi
+                      non vengono nemmeno analizzati (opzionale)
         
-        # Legge il file YAML
-        with open(yaml_file, 'r', encoding='utf-8') as f:
-            yaml_data = yaml.safe_load(f)
+    Returns:
+        Dizionario YAML oppure None se il file non è divisibile in sicurezza
+        (in tal caso va usato il parsing sequenziale)
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_bytes = chunk_bytes or PARALLEL_MIN_CHUNK_BYTES
+    
+    blocks = _divisible_blocks(yaml_file, scan, block_filter)
+    if blocks is None:
+        return None
+    if not blocks:
+        return {'Connections': {}}
+    
+    total = sum(end - start for _name, start, end in blocks)
+    chunk_count = max(1, min(workers * 4, total // chunk_bytes))
+    chunks = _split_chunks(blocks, chunk_count)
+    
+    try:
+        if len(chunks) == 1 or workers == 1:
+            results = [_parse_connection_chunk(yaml_file, start, end) for start, end in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                results = list(executor.map(_parse_connection_chunk,
+                                            [yaml_file] * len(chunks),
+                                            [start for start, _ in chunks],
+                                            [end for _, end in chunks]))
+    except yaml.YAMLError:
+        # Il parsing sequenziale riporta l'errore con i numeri di riga corretti
+        return None
+    
+    merged = {}
+    for result in results:
+        merged.update(result)
+    return {'Connections': merged}
+
+
+def _duplicate_warnings(duplicates: set, i18n, console: IO) -> List[str]:
+    """Costruisce (e stampa) i warning per le connessioni duplicate"""
+    if not duplicates:
+        return []
+    warnings = [f"{i18n.t('warning_duplicates_found')}:"]
+    for dup in sorted(duplicates):
+        warnings.append(f"  - {dup} {i18n.t('converted_only_first')}")
+    try:
+        print("\n".join(warnings), file=console)
+    except UnicodeEncodeError:
+        pass  # Ignora errori di encoding nei print
+    return warnings
+
+
+def save_workbook(wb: Workbook, excel_file: Union[str, IO]):
+    """
+    Salva il workbook su path, stream binario o '-' (stdout).
+    
+    Il formato xlsx (zip) richiede un output riposizionabile: per pipe e
+    stream non riposizionabili i dati passano da un file temporaneo "spooled".
+    
+    Args:
+        wb: Workbook openpyxl
+        excel_file: Path, stream binario o '-'
+    """
+    if is_path(excel_file):
+        wb.save(excel_file)
+        return
+    with open_binary_output(excel_file, seekable=True) as f:
+        wb.save(f)
+
+
+class ConnectionTooLargeError(ValueError):
+    """Sollevata quando una singola connessione non entra in un foglio Excel"""
+    
+    def __init__(self, connection_name: str, row_count: int):
+        super().__init__(connection_name)
+        self.connection_name = connection_name
+        self.row_count = row_count
+
+
+def _discard_workbook(wb: Workbook):
+    """
+    Chiude i fogli di un workbook write-only che non verrà salvato,
+    eliminando i file temporanei in cui openpyxl serializza le righe.
+    """
+    for sheet in wb.worksheets:
+        sheet.close()
+        sheet._writer.cleanup()
+
+
+def write_workbook_rows(rows: Iterator[Dict[str, str]], excel_file: Union[str, IO],
+                        max_rows: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Scrive i record Name/Secret/Value in un workbook in modalità write-only.
+    
+    Le righe vanno nel foglio 'Connections'; oltre il limite di righe di Excel
+    si prosegue nei fogli 'Connections_2', 'Connections_3', ... senza mai
+    dividere una connessione tra due fogli.
+    
+    Args:
+        rows: Iteratore di record Name/Secret/Value (raggruppati per connessione)
+        excel_file: Path, stream binario o '-'
+        max_rows: Righe massime per foglio, intestazione inclusa (default: SHEET_MAX_ROWS)
+        
+    Returns:
+        Tupla (righe dati scritte, fogli creati)
+        
+    Raises:
+        ConnectionTooLargeError: Se una connessione da sola supera il limite del foglio
+    """
+    max_data_rows = (max_rows or SHEET_MAX_ROWS) - 1
+    
+    # Workbook in streaming: le righe vengono serializzate subito, non tenute come celle
+    wb = Workbook(write_only=True)
+    ws = None
+    sheet_count = 0
+    sheet_rows = 0
+    count = 0
+    
+    try:
+        for connection_name, group in itertools.groupby(rows,
+                                                        key=lambda row: connection_name_of(row.get('Name', ''))):
+            group = [[row.get('Name', ''), row.get('Secret', ''), row.get('Value', '')] for row in group]
+            if len(group) > max_data_rows:
+                raise ConnectionTooLargeError(connection_name, len(group))
+            
+            # Nuovo foglio se la connessione non entra per intero in quello corrente
+            if ws is None or sheet_rows + len(group) > max_data_rows:
+                sheet_count += 1
+                ws = wb.create_sheet(shard_sheet_name(sheet_count))
+                # Scrive gli header
+                ws.append(['Name', 'Secret', 'Value'])
+                sheet_rows = 0
+            
+            # Scrive i dati
+            for cells in group:
+                ws.append(cells)
+            sheet_rows += len(group)
+            count += len(group)
+    except BaseException:
+        _discard_workbook(wb)
+        raise
+    
+    # Salva il file Excel
+    save_workbook(wb, excel_file)
+    return (count, sheet_count)
+
+
+def load_yaml_document(yaml_file: Union[str, IO], i18n, warnings: List[str], console: IO,
+                       parallel: bool = False, workers: Optional[int] = None,
+                       connection_filter=None) -> Dict[str, Any]:
+    """
+    Carica un documento YAML rilevando le connessioni duplicate.
+    
+    Un file non compresso viene scansionato via mmap (e analizzato in parallelo
+    se richiesto); uno stream o un file compresso viene letto una sola volta.
+    Il parsing usa il Loader più veloce disponibile (libyaml se compilato,
+    vedi yaml_loader in registry.py).
+    
+    Args:
+        yaml_file: Path, stream di testo/binario o '-' del YAML
+        i18n: Oggetto i18n per la localizzazione
+        warnings: Lista a cui aggiungere i warning sui duplicati
+        console: Stream su cui stampare i warning
+        parallel: Esegue il parsing dei blocchi di connessione su più processi
+        workers: Numero di processi per il parsing parallelo
+        connection_filter: ConnectionFilter (vedi filters.py, opzionale)
         
-        if yaml_data is None:
-            raise ValueError(i18n.t("empty_yaml"))
+    Returns:
+        Dizionario YAML (filtrato, se indicato un filtro)
         
-        # Converte in formato Name/Secret/Value
-        rows = flatten_to_name_secret_value(yaml_data)
+    Raises:
+        ValueError: Se il documento è vuoto
+        yaml.YAMLError: Se il YAML non è valido
+    """
+    block_filter = connection_filter.match_connection if connection_filter is not None else None
+    if is_path(yaml_file) and input_compression(yaml_file) is None:
+        # Prima controlla duplicati scansionando il file come testo
+        # (yaml.safe_load sovrascrive automaticamente le chiavi duplicate)
+        with span('scan'):
+            buffer = _open_mapped(yaml_file)
+            try:
+                scan = scan_connection_blocks(buffer)
+            finally:
+                if isinstance(buffer, mmap.mmap):
+                    buffer.close()
+        blocks = scan[1] if block_filter is None else [block for block in scan[1] if block_filter(block[0])]
+        warnings.extend(_duplicate_warnings(find_duplicate_connections(blocks), i18n, console))
         
-        if not rows:
-            raise ValueError(i18n.t("no_data_to_convert"))
+        # Legge il file YAML (in parallelo per blocchi di connessione, se richiesto);
+        # con un filtro vengono analizzati solo i blocchi delle connessioni selezionate
+        with span('parse', parallel=parallel):
+            yaml_data = None
+            if parallel or block_filter is not None:
+                yaml_data = parallel_safe_load(yaml_file, workers if parallel else 1,
+                                               scan=scan, block_filter=block_filter)
+            if yaml_data is None:
+                with open(yaml_file, 'r', encoding='utf-8') as f:
+                    yaml_data = yaml.load(f, Loader=yaml_loader())
+    else:
+        # Stream o file compresso: duplicati individuati nella stessa lettura del parsing
+        with open_text_input(yaml_file) as f, span('parse'):
+            stop_after = connection_filter.explicit_names if connection_filter is not None else None
+            reader = ScanningReader(f, block_filter, stop_after)
+            try:
+                yaml_data = yaml.load(reader, Loader=yaml_loader())
+            finally:
+                warnings.extend(_duplicate_warnings(
+                    find_duplicate_connections(reader.blocks), i18n, console))
+    
+    if yaml_data is None:
+        raise ValueError(i18n.t("empty_yaml"))
+    if connection_filter is not None:
+        yaml_data = connection_filter.filter_document(yaml_data)
+    return yaml_data
+
+
+def iter_yaml_documents(yaml_file: Union[str, IO], i18n, warnings: List[str], console: IO,
+                        parallel: bool = False, workers: Optional[int] = None,
+                        connection_filter=None, streaming: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Documenti YAML da convertire, in ordine.
+    
+    In streaming un file non compresso, divisibile in blocchi e senza
+    connessioni duplicate viene analizzato un chunk alla volta (vedi
+    iter_connection_chunks); negli altri casi viene restituito l'unico
+    documento caricato da load_yaml_document (stessi argomenti).
+    
+    Returns:
+        Iteratore di dizionari YAML (filtrati, se indicato un filtro)
+    """
+    if streaming and is_path(yaml_file) and input_compression(yaml_file) is None:
+        buffer = _open_mapped(yaml_file)
+        try:
+            scan = scan_connection_blocks(buffer)
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+        block_filter = connection_filter.match_connection if connection_filter is not None else None
+        blocks = _divisible_blocks(yaml_file, scan, block_filter)
+        # Con connessioni duplicate vale la semantica di yaml.safe_load sul documento intero
+        if blocks is not None and not find_duplicate_connections(blocks):
+            documents = iter_connection_chunks(yaml_file, blocks)
+            if connection_filter is not None:
+                documents = (connection_filter.filter_document(document) for document in documents)
+            return documents
+    return iter([load_yaml_document(yaml_file, i18n, warnings, console, parallel, workers, connection_filter)])
+
+
+def custom_yaml_to_excel(yaml_file: Union[str, IO], excel_file: Union[str, IO], i18n=None,
+                         parallel: bool = False, workers: Optional[int] = None,
+                         table_format: Optional[str] = None, connection_filter=None,
+                         streaming: bool = False, row_digest=None) -> tuple:
+    """
+    Converte un file YAML in formato custom per secrets.rlist in Excel (o CSV/TSV/NDJSON).
+    
+    Input e output possono essere path, stream oppure '-' (stdin/stdout).
+    Uno stream di input (o un file compresso gzip/xz/zstd) viene letto una
+    sola volta, in modo incrementale.
+    
+    Args:
+        yaml_file: Path, stream di testo/binario o '-' del YAML di input
+        excel_file: Path, stream o '-' del file di output (stream binario per xlsx)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        parallel: Esegue il parsing dei blocchi di connessione su più processi
+                  (solo per input su file non compresso)
+        workers: Numero di processi per il parsing parallelo (default: numero di CPU)
+        table_format: 'xlsx', 'csv', 'tsv' o 'ndjson' (default: dedotto dall'estensione, xlsx per gli stream)
+        connection_filter: ConnectionFilter (vedi filters.py): i blocchi di connessione
+                           esclusi vengono saltati prima del parsing, quando possibile
+        streaming: Analizza il file un chunk di connessioni alla volta invece di
+                   caricarlo per intero (vedi iter_yaml_documents)
+        row_digest: RowDigest (vedi verify.py) aggiornato con le righe man mano
+                    che vengono scritte (opzionale)
         
-        # Crea workbook e worksheet
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Connections'
+    Returns:
+        Tupla (success, warnings) dove success è bool e warnings è lista di stringhe
+    """
+    # Inizializza i18n se non passato
+    if i18n is None:
+        i18n = get_i18n()
+    
+    console = console_for(excel_file)
+    warnings = []
+    try:
+        documents = iter_yaml_documents(yaml_file, i18n, warnings, console, parallel, workers,
+                                        connection_filter, streaming)
         
-        # Scrive gli header
-        ws.append(['Name', 'Secret', 'Value'])
+        # Converte in formato Name/Secret/Value (un record alla volta)
+        rows = itertools.chain.from_iterable(iter_name_secret_value(document) for document in documents)
+        first_row = next(rows, None)
         
-        # Scrive i dati
-        for row in rows:
-            ws.append([row.get('Name', ''), row.get('Secret', ''), row.get('Value', '')])
+        if first_row is None:
+            raise ValueError(i18n.t("no_connections_matched" if connection_filter is not None
+                                    else "no_data_to_convert"))
+        rows = itertools.chain([first_row], rows)
+        if row_digest is not None:
+            rows = row_digest.tee(rows)
         
-        # Salva il file Excel
-        wb.save(excel_file)
+        # Scrive con l'engine 'writer' più veloce disponibile per il formato (vedi registry.py);
+        # appiattimento (e parsing in streaming) avvengono man mano che il writer consuma le righe
+        fmt = table_format or table_format_of(excel_file)
+        rows = traced_batches(rows, 'connection_batch', lambda row: connection_name_of(row['Name']))
+        with span('write', format=fmt):
+            row_count, sheet_count = load_engine('writer', fmt)(rows, excel_file, fmt)
+        inc('rows_total', row_count, mode='yaml_to_excel')
         
         try:
-            print(f"{i18n.t('converted')} {yaml_file} -> {excel_file}")
-            print(f"  {len(rows)} {i18n.t('rows_created')}")
+            print(f"{i18n.t('converted')} {describe(yaml_file)} -> {describe(excel_file)}", file=console)
+            print(f"  {row_count} {i18n.t('rows_created')}", file=console)
+            if sheet_count > 1:
+                print(f"  {sheet_count} {i18n.t('sheets_created')}", file=console)
         except UnicodeEncodeError:
             pass  # Ignora errori di encoding
         return (True, warnings, None)
     
+    except ConnectionTooLargeError as e:
+        error_msg = f"{i18n.t('error_connection_too_large')}: {e.connection_name} ({e.row_count})"
+        try:
+            print(f"{i18n.t('error')}: {error_msg}", file=console)
+        except UnicodeEncodeError:
+            pass
+        return (False, warnings, error_msg)
     except yaml.YAMLError as e:
         error_msg = f"{i18n.t('yaml_syntax_error')}: {e}\n\n"
         error_msg += f"{i18n.t('suggestions')}:\n"
@@ -185,7 +772,7 @@ def custom_yaml_to_excel(yaml_file: str, excel_file: str, i18n=None) -> tuple:
         error_msg += f"- {i18n.t('suggestion_indentation')}\n"
         error_msg += f"- {i18n.t('suggestion_no_tabs')}"
         try:
-            print(f"{i18n.t('error')}: {error_msg}")
+            print(f"{i18n.t('error')}: {error_msg}", file=console)
         except UnicodeEncodeError:
             pass
         return (False, warnings, error_msg)
@@ -193,7 +780,7 @@ def custom_yaml_to_excel(yaml_file: str, excel_file: str, i18n=None) -> tuple:
         error_details = traceback.format_exc()
         error_msg = f"{i18n.t('error_conversion_yaml_excel')}: {e}\n\n{i18n.t('error_details')}:\n{error_details}"
         try:
-            print(f"{i18n.t('error')}: {error_msg}")
+            print(f"{i18n.t('error')}: {error_msg}", file=console)
         except UnicodeEncodeError:
             pass
         return (False, warnings, error_msg)
@@ -0,0 +1,227 @@
+"""
+YAML ↔ Excel Converter - Diff
+Modulo per il confronto strutturale di due rlist (YAML, Excel/CSV/NDJSON
+o .gpg di entrambi) tramite hash map indicizzate per Name
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import traceback
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from yamlconverter.converters.custom_excel_to_yaml import connection_name_of
+from yamlconverter.converters.readers import open_rows
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.streams import describe
+
+# Testo mostrato al posto dei valori quando non vengono rivelati
+MASK = '***'
+
+# Formati di output del report
+DIFF_FORMATS = ['text', 'json']
+
+
+def _index_rows(rows: Iterable[Dict[str, str]]) -> Tuple[Dict[str, tuple], Dict[str, int]]:
+    """Costruisce la hash map Name -> (Secret, Value) e il numero di Name per connessione"""
+    index = {}
+    counts = {}
+    for row in rows:
+        name = row['Name']
+        if name not in index:
+            connection_name = connection_name_of(name)
+            counts[connection_name] = counts.get(connection_name, 0) + 1
+        index[name] = (row['Secret'], row['Value'])
+    return (index, counts)
+
+
+def _entry(status: str, name: str, old: Optional[tuple], new: Optional[tuple], show_values: bool) -> Dict[str, Any]:
+    """Crea una voce del diff, mascherando i valori se richiesto"""
+    def shown(item):
+        if item is None:
+            return None
+        return item[1] if show_values else MASK
+    return {
+        'status': status,
+        'name': name,
+        'secret_old': old[0] if old else None,
+        'secret_new': new[0] if new else None,
+        'value_old': shown(old),
+        'value_new': shown(new),
+        'value_changed': bool(old and new and old[1] != new[1]),
+    }
+
+
+def diff_rows(old_rows: Iterable[Dict[str, str]], new_rows: Iterable[Dict[str, str]],
+              show_values: bool = False) -> Dict[str, Any]:
+    """
+    Confronta due insiemi di righe Name/Secret/Value in O(n).
+
+    Le righe del primo input vengono indicizzate per Name in una hash map;
+    quelle del secondo vengono lette in streaming e confrontate rimuovendo
+    le voci trovate, così le voci rimaste nella mappa sono quelle rimosse.
+    I valori vengono mascherati solo nelle voci del risultato.
+
+    Args:
+        old_rows: Righe della versione precedente
+        new_rows: Righe della nuova versione
+        show_values: Riporta i valori in chiaro invece di MASK
+
+    Returns:
+        Dizionario con 'summary' (conteggi) e 'connections': lista di
+        {'name', 'status' ('added', 'removed', 'changed'), 'entries'}
+    """
+    old_index, old_counts = _index_rows(old_rows)
+    entries: Dict[str, List[Dict[str, Any]]] = {}
+    unchanged = 0
+
+    pop = old_index.pop
+    for row in new_rows:
+        name = row['Name']
+        current = (row['Secret'], row['Value'])
+        previous = pop(name, None)
+        if previous == current:
+            unchanged += 1
+            continue
+        connection_name = connection_name_of(name)
+        if previous is None:
+            entries.setdefault(connection_name, []).append(_entry('added', name, None, current, show_values))
+        else:
+            entries.setdefault(connection_name, []).append(
+                _entry('changed', name, previous, current, show_values))
+
+    for name, previous in old_index.items():
+        entries.setdefault(connection_name_of(name), []).append(
+            _entry('removed', name, previous, None, show_values))
+
+    connections = []
+    summary = {'connections_added': 0, 'connections_removed': 0, 'connections_changed': 0,
+               'secrets_added': 0, 'secrets_removed': 0, 'secrets_changed': 0, 'secrets_unchanged': unchanged}
+    for connection_name, connection_entries in entries.items():
+        if connection_name not in old_counts:
+            status = 'added'
+        elif (len(connection_entries) == old_counts[connection_name]
+              and all(entry['status'] == 'removed' for entry in connection_entries)):
+            # Tutti i Name della connessione sono stati rimossi
+            status = 'removed'
+        else:
+            status = 'changed'
+        summary[f'connections_{status}'] += 1
+        for entry in connection_entries:
+            summary[f"secrets_{entry['status']}"] += 1
+        connections.append({'name': connection_name, 'status': status, 'entries': connection_entries})
+    return {'summary': summary, 'connections': connections}
+
+
+def has_differences(result: Dict[str, Any]) -> bool:
+    """Verifica se il risultato di diff_rows contiene differenze"""
+    return bool(result['connections'])
+
+
+def _format_row(name: str, secret: Optional[str], value: Optional[str], note: str = '') -> str:
+    """Formatta una riga del diff testuale"""
+    return f"{name}  {secret or ''} = {value}{note}"
+
+
+def format_diff_text(result: Dict[str, Any], old_label: str, new_label: str, i18n=None) -> str:
+    """
+    Formatta il risultato come diff unificato (leggibile dagli strumenti di review).
+
+    Ogni connessione è un hunk '@@ NOME (stato) @@'; le righe rimosse
+    iniziano con '-', quelle aggiunte con '+', un secret modificato produce
+    una riga '-' e una '+'.
+
+    Args:
+        result: Risultato di diff_rows
+        old_label: Nome della versione precedente
+        new_label: Nome della nuova versione
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+
+    Returns:
+        Testo del diff (stringa vuota se non ci sono differenze)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    if not has_differences(result):
+        return ''
+    lines = [f"--- {old_label}", f"+++ {new_label}"]
+    changed_note = f"  ({i18n.t('diff_value_changed')})"
+    for connection in result['connections']:
+        lines.append(f"@@ {connection['name']} ({i18n.t('diff_' + connection['status'])}) @@")
+        for entry in connection['entries']:
+            note = changed_note if entry['value_changed'] else ''
+            if entry['status'] in ('removed', 'changed'):
+                lines.append('-' + _format_row(entry['name'], entry['secret_old'], entry['value_old']))
+            if entry['status'] in ('added', 'changed'):
+                lines.append('+' + _format_row(entry['name'], entry['secret_new'], entry['value_new'], note))
+    return '\n'.join(lines) + '\n'
+
+
+def format_diff_summary(result: Dict[str, Any], i18n=None) -> str:
+    """Riepilogo su una riga dei conteggi (connessioni e secret aggiunti/rimossi/modificati)"""
+    if i18n is None:
+        i18n = get_i18n()
+    summary = result['summary']
+    return (f"{i18n.t('diff_summary')}: "
+            f"{i18n.t('diff_connections')} +{summary['connections_added']} "
+            f"-{summary['connections_removed']} ~{summary['connections_changed']}, "
+            f"{i18n.t('diff_secrets')} +{summary['secrets_added']} "
+            f"-{summary['secrets_removed']} ~{summary['secrets_changed']}")
+
+
+def format_diff_json(result: Dict[str, Any], old_label: str, new_label: str) -> str:
+    """Formatta il risultato come JSON ({'old', 'new', 'summary', 'connections'})"""
+    return json.dumps({'old': old_label, 'new': new_label, **result}, ensure_ascii=False, indent=2) + '\n'
+
+
+def _read_rows(source: Union[str, IO], **options) -> Iterator[Dict[str, str]]:
+    """Apre l'input solo quando viene letta la prima riga (un documento alla volta in memoria)"""
+    with open_rows(source, **options) as rows:
+        yield from rows
+
+
+def diff_files(old_file: Union[str, IO], new_file: Union[str, IO], password: Optional[str] = None,
+               i18n=None, show_values: bool = False, parallel: bool = False,
+               workers: Optional[int] = None, connection_filter=None) -> tuple:
+    """
+    Confronta due input qualsiasi (YAML, tabelle o .gpg di entrambi).
+
+    Args:
+        old_file: Path o stream della versione precedente
+        new_file: Path o stream della nuova versione
+        password: Password GPG per gli input .gpg
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        show_values: Riporta i valori in chiaro
+        parallel: Parsing YAML parallelo (input su file non compressi)
+        workers: Numero di processi
+        connection_filter: ConnectionFilter applicato a entrambi gli input (opzionale)
+
+    Returns:
+        Tupla (success, warnings, error, result) dove result è il risultato
+        di diff_rows (None in caso di errore)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    warnings = []
+    options = dict(password=password, i18n=i18n, warnings=warnings, parallel=parallel,
+                   workers=workers, connection_filter=connection_filter)
+    try:
+        result = diff_rows(_read_rows(old_file, **options), _read_rows(new_file, **options), show_values)
+        return (True, warnings, None, result)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        error_msg = (f"{i18n.t('error_diff')} {describe(old_file)} / {describe(new_file)}: {e}"
+                     f"\n\n{i18n.t('error_details')}:\n{error_details}")
+        return (False, warnings, error_msg, None)
@@ -0,0 +1,75 @@
+"""
+YAML ↔ Excel Converter - Engines
+Engine di lettura e scrittura inclusi, registrati in registry.py e importati
+solo al primo utilizzo
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from contextlib import ExitStack
+from typing import IO, Callable, Dict, Iterator, Optional, Tuple, Union
+from yamlconverter.converters.custom_csv import read_csv_table, write_csv_rows
+from yamlconverter.converters.custom_excel_to_yaml import open_text_table_rows
+from yamlconverter.converters.custom_ndjson import read_ndjson_table, write_ndjson_rows
+from yamlconverter.converters.custom_yaml_to_excel import write_workbook_rows
+from yamlconverter.utils.streams import open_text_output
+
+Rows = Tuple[Iterator[Dict[str, str]], Optional[Callable]]
+
+
+def open_csv_rows(stack: ExitStack, source: Union[str, IO], fmt: str, streaming: bool, parallel: bool,
+                  workers: Optional[int], i18n) -> Rows:
+    """Engine 'reader' csv/tsv con il modulo csv"""
+    return open_text_table_rows(stack, source, lambda f: read_csv_table(f, fmt), i18n)
+
+
+def open_ndjson_rows(stack: ExitStack, source: Union[str, IO], fmt: str, streaming: bool, parallel: bool,
+                     workers: Optional[int], i18n) -> Rows:
+    """Engine 'reader' ndjson con il modulo json"""
+    return open_text_table_rows(stack, source, lambda f: read_ndjson_table(f, i18n), i18n)
+
+
+def open_ndjson_rows_orjson(stack: ExitStack, source: Union[str, IO], fmt: str, streaming: bool,
+                            parallel: bool, workers: Optional[int], i18n) -> Rows:
+    """Engine 'reader' ndjson con orjson (opzionale)"""
+    import orjson
+    return open_text_table_rows(stack, source, lambda f: read_ndjson_table(f, i18n, orjson.loads), i18n)
+
+
+def write_xlsx_rows(rows: Iterator[Dict[str, str]], output_file: Union[str, IO], fmt: str) -> Tuple[int, int]:
+    """Engine 'writer' xlsx con openpyxl in modalità write-only"""
+    return write_workbook_rows(rows, output_file)
+
+
+def write_csv_table(rows: Iterator[Dict[str, str]], output_file: Union[str, IO], fmt: str) -> Tuple[int, int]:
+    """Engine 'writer' csv/tsv con il modulo csv"""
+    with open_text_output(output_file) as f:
+        return (write_csv_rows(rows, f, fmt), 1)
+
+
+def write_ndjson_table(rows: Iterator[Dict[str, str]], output_file: Union[str, IO],
+                       fmt: str) -> Tuple[int, int]:
+    """Engine 'writer' ndjson con il modulo json"""
+    with open_text_output(output_file) as f:
+        return (write_ndjson_rows(rows, f), 1)
+
+
+def write_ndjson_table_orjson(rows: Iterator[Dict[str, str]], output_file: Union[str, IO],
+                              fmt: str) -> Tuple[int, int]:
+    """Engine 'writer' ndjson con orjson (opzionale): stesso output compatto del modulo json"""
+    import orjson
+    dumps = orjson.dumps
+    with open_text_output(output_file) as f:
+        return (write_ndjson_rows(rows, f, encode=lambda record: dumps(record).decode('utf-8')), 1)
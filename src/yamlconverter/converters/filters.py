@@ -0,0 +1,268 @@
+"""
+YAML ↔ Excel Converter - Filters
+Modulo per il filtro delle connessioni (include/exclude su nome della
+connessione e placeholder del secret) applicato durante la lettura
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import fnmatch
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional
+from yamlconverter.converters.custom_excel_to_yaml import UngroupedRowsError, connection_name_of
+from yamlconverter.utils.i18n import get_i18n
+
+# Prefisso dei pattern da interpretare come espressioni regolari (es: "re:^SAP_(SOAP|RFC)$")
+REGEX_PREFIX = 're:'
+
+# Caratteri speciali dei pattern glob
+_GLOB_CHARS = set('*?[')
+
+# Indice finale di un Name (es: "SAP_SOAP[3]")
+_INDEX_RE = re.compile(r'\[(\d+)\]$')
+
+
+def is_literal_pattern(pattern: str) -> bool:
+    """Verifica se il pattern indica un nome esatto (né regex né caratteri glob)"""
+    return not pattern.startswith(REGEX_PREFIX) and not _GLOB_CHARS & set(pattern)
+
+
+def compile_pattern(pattern: str, i18n=None) -> Callable[[str], bool]:
+    """
+    Compila un pattern in una funzione di match.
+
+    I pattern con prefisso 're:' sono espressioni regolari cercate nel testo
+    (usare ^ e $ per un match completo); gli altri sono glob sul testo intero
+    (es: 'SAP_*', '$$*PASSWORD$$'), con distinzione tra maiuscole e minuscole.
+
+    Args:
+        pattern: Pattern glob o regex
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+
+    Returns:
+        Funzione che restituisce True se il testo corrisponde
+
+    Raises:
+        ValueError: Se l'espressione regolare non è valida
+    """
+    if pattern.startswith(REGEX_PREFIX):
+        try:
+            regex = re.compile(pattern[len(REGEX_PREFIX):])
+        except re.error as e:
+            if i18n is None:
+                i18n = get_i18n()
+            raise ValueError(f"{i18n.t('invalid_filter_pattern')}: {pattern}: {e}") from e
+        return lambda text: regex.search(text) is not None
+    if is_literal_pattern(pattern):
+        return lambda text: text == pattern
+    regex = re.compile(fnmatch.translate(pattern))
+    return lambda text: regex.match(text) is not None
+
+
+def _any_of(patterns: Optional[Iterable[str]], i18n) -> Optional[Callable[[str], bool]]:
+    """Combina più pattern in OR (None se non ci sono pattern)"""
+    matchers = [compile_pattern(pattern, i18n) for pattern in patterns or []]
+    if not matchers:
+        return None
+    return lambda text: any(match(text) for match in matchers)
+
+
+class ConnectionFilter:
+    """
+    Filtro include/exclude sulle connessioni e sui placeholder dei secret.
+
+    Una connessione viene tenuta se corrisponde ad almeno un pattern include
+    (o se non ce ne sono) e a nessun pattern exclude; lo stesso vale per i
+    singoli secret. Se tutti i pattern include sui nomi sono nomi esatti, la
+    lettura di un input raggruppato per connessione può terminare appena
+    sono state emesse tutte le connessioni richieste (vedi explicit_names).
+    """
+
+    def __init__(self, include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 include_secrets: Optional[List[str]] = None, exclude_secrets: Optional[List[str]] = None,
+                 i18n=None):
+        """
+        Args:
+            include: Pattern dei nomi di connessione da tenere
+            exclude: Pattern dei nomi di connessione da scartare
+            include_secrets: Pattern dei placeholder (es: '$$PASSWORD$$') da tenere
+            exclude_secrets: Pattern dei placeholder da scartare
+            i18n: Oggetto i18n per la localizzazione (opzionale)
+        """
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.include_secrets = list(include_secrets or [])
+        self.exclude_secrets = list(exclude_secrets or [])
+        self._include = _any_of(self.include, i18n)
+        self._exclude = _any_of(self.exclude, i18n)
+        self._include_secrets = _any_of(self.include_secrets, i18n)
+        self._exclude_secrets = _any_of(self.exclude_secrets, i18n)
+        self._connection_cache: Dict[str, bool] = {}
+
+    def __getstate__(self) -> Dict[str, List[str]]:
+        """Serializza solo i pattern (le funzioni di match vengono ricompilate nei worker)"""
+        return {'include': self.include, 'exclude': self.exclude,
+                'include_secrets': self.include_secrets, 'exclude_secrets': self.exclude_secrets}
+
+    def __setstate__(self, state: Dict[str, List[str]]):
+        self.__init__(**state)
+
+    @property
+    def filters_connections(self) -> bool:
+        """True se il filtro seleziona le connessioni per nome"""
+        return bool(self.include or self.exclude)
+
+    @property
+    def filters_secrets(self) -> bool:
+        """True se il filtro seleziona i singoli secret"""
+        return bool(self.include_secrets or self.exclude_secrets)
+
+    @property
+    def active(self) -> bool:
+        """True se è presente almeno un pattern"""
+        return self.filters_connections or self.filters_secrets
+
+    @property
+    def explicit_names(self) -> Optional[FrozenSet[str]]:
+        """Nomi esatti richiesti, se tutti i pattern include sono nomi esatti (altrimenti None)"""
+        if not self.include or not all(is_literal_pattern(pattern) for pattern in self.include):
+            return None
+        return frozenset(name for name in self.include if self.match_connection(name))
+
+    def match_connection(self, name: str) -> bool:
+        """Verifica se la connessione va tenuta (risultato memorizzato per nome)"""
+        result = self._connection_cache.get(name)
+        if result is None:
+            result = ((self._include is None or self._include(name))
+                      and (self._exclude is None or not self._exclude(name)))
+            self._connection_cache[name] = result
+        return result
+
+    def match_secret(self, secret: str) -> bool:
+        """Verifica se il secret (placeholder) va tenuto"""
+        return ((self._include_secrets is None or self._include_secrets(secret))
+                and (self._exclude_secrets is None or not self._exclude_secrets(secret)))
+
+    def filter_document(self, data: Any) -> Any:
+        """
+        Filtra un documento YAML già caricato, prima dell'appiattimento in righe.
+
+        Le connessioni scartate non generano righe; con il filtro sui secret
+        le liste vengono ricompattate, così gli indici restano consecutivi.
+
+        Args:
+            data: Dizionario YAML (con o senza chiave Connections)
+
+        Returns:
+            Dizionario {'Connections': {...}} filtrato
+        """
+        if not isinstance(data, dict):
+            return data
+        section = (data['Connections'] if 'Connections' in data else data) or {}
+        filtered = {}
+        for name, value in section.items():
+            if not self.match_connection(str(name)):
+                continue
+            if self.filters_secrets:
+                if isinstance(value, list):
+                    value = [item for item in value
+                             if self.match_secret(str(item.get('secret', '')) if isinstance(item, dict) else '')]
+                    if not value:
+                        continue
+                elif not isinstance(value, dict) and not self.match_secret(''):
+                    continue
+            filtered[name] = value
+        return {'Connections': filtered}
+
+    @staticmethod
+    def _check_grouped(rows: Iterable[Dict[str, str]], emitted: set, connection_name: str) -> None:
+        """
+        Scorre le righe restanti senza produrle: il raggruppamento è provato
+        solo a fine tabella, quindi una connessione già emessa che ricompare
+        solleva UngroupedRowsError (il chiamante ripiega sulla rilettura completa).
+        """
+        current_name = connection_name
+        if current_name in emitted:
+            raise UngroupedRowsError(current_name)
+        for row in rows:
+            name = row.get('Name', '')
+            connection_name = connection_name_of(name) if name else ''
+            if connection_name != current_name:
+                current_name = connection_name
+                if connection_name in emitted:
+                    raise UngroupedRowsError(connection_name)
+
+    def filter_rows(self, rows: Iterable[Dict[str, str]], early_exit: bool = False) -> Iterator[Dict[str, str]]:
+        """
+        Filtra i record Name/Secret/Value durante la lettura di una tabella.
+
+        Con il filtro sui secret gli indici dei Name vengono rinumerati per
+        connessione. Con early_exit=True e nomi esatti (explicit_names) dopo
+        l'ultima connessione richiesta non viene più prodotto alcun record: le
+        righe restanti sono solo scorse fino alla fine per verificare che
+        nessuna connessione tenuta ricompaia (righe non raggruppate).
+
+        Args:
+            rows: Iteratore di record Name/Secret/Value
+            early_exit: Salta i record successivi all'ultima connessione richiesta
+
+        Yields:
+            Record tenuti
+
+        Raises:
+            UngroupedRowsError: Se con early_exit una connessione tenuta ricompare
+        """
+        remaining = set(self.explicit_names or ()) if early_exit and self.explicit_names is not None else None
+        renumber = self.filters_secrets
+        counters: Dict[str, int] = {}
+        current_name = None
+        keep_connection = True
+
+        emitted = set()
+
+        rows = iter(rows)
+        for row in rows:
+            name = row.get('Name', '')
+            connection_name = connection_name_of(name) if name else ''
+            if connection_name != current_name:
+                if remaining is not None and not remaining:
+                    self._check_grouped(rows, emitted, connection_name)
+                    return
+                current_name = connection_name
+                keep_connection = self.match_connection(connection_name)
+                if keep_connection and remaining is not None:
+                    remaining.discard(connection_name)
+                    emitted.add(connection_name)
+            if not keep_connection:
+                continue
+            if renumber:
+                if not self.match_secret(row.get('Secret', '')):
+                    continue
+                match = _INDEX_RE.search(name)
+                if match:
+                    prefix = name[:match.start()]
+                    index = counters.get(prefix, 0)
+                    counters[prefix] = index + 1
+                    row = dict(row, Name=f"{prefix}[{index}]")
+            yield row
+
+
+def build_connection_filter(include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                            include_secrets: Optional[List[str]] = None,
+                            exclude_secrets: Optional[List[str]] = None,
+                            i18n=None) -> Optional[ConnectionFilter]:
+    """Crea un ConnectionFilter, oppure None se non è stato indicato alcun pattern"""
+    connection_filter = ConnectionFilter(include, exclude, include_secrets, exclude_secrets, i18n)
+    return connection_filter if connection_filter.active else None
@@ -0,0 +1,447 @@
+"""
+YAML ↔ Excel Converter - Inventory
+Statistiche veloci delle rlist (connessioni, righe, nomi duplicati) senza
+conversione: scansione testuale via mmap per i YAML, sola colonna Name
+dell'XML dei fogli per gli xlsx; più file vengono analizzati in parallelo
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import io
+import json
+import mmap
+import os
+import posixpath
+import re
+import time
+import traceback
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import fromstring, iterparse
+import yaml
+from yamlconverter.converters.custom_excel_to_yaml import (
+    connection_name_of, normalize_cell, open_table_rows, shard_sheet_order,
+)
+from yamlconverter.converters.custom_yaml_to_excel import (
+    _CONNECTIONS_LINE_RE, _LEVEL0_LINE_RE, _LEVEL1_LINE_RE, _open_mapped, count_list_items,
+    iter_name_secret_value, scan_connection_blocks,
+)
+from yamlconverter.converters.registry import yaml_loader
+from yamlconverter.converters.search_index import iter_rlist_files
+from yamlconverter.utils.formats import is_table_path, strip_gpg_extension, table_format
+from yamlconverter.utils.gpg_utils import decrypt_bytes, is_encrypted_file
+from yamlconverter.utils.i18n import I18n, get_i18n
+from yamlconverter.utils.streams import input_compression, open_text_input, sniff_compression
+
+# Formati di output del comando stats
+INVENTORY_FORMATS = ['text', 'json']
+
+# Blocco di connessione nella forma canonica di secrets.rlist: elementi di
+# lista di una riga, tutti alla stessa indentazione, seguiti solo dalle altre
+# chiavi dello stesso elemento, da righe vuote o da commenti. Ogni elemento
+# produce esattamente una riga; le altre forme (valori scalari o in stile
+# flow, block scalar, liste annidate...) vengono contate col parsing
+_LINE_REST = rb'[^\n]*(?:\n|\Z)'
+_BLANK_LINE = rb'[ \t\r]*(?:#[^\n]*)?(?:\n|\Z)'
+_CANONICAL_BLOCK_RE = re.compile(
+    rb'  [A-Za-z0-9_-]+:[ \t\r\f\v]*(?:\n|\Z)(?:' + _BLANK_LINE + rb')*'
+    rb'(?P<indent> +)- ' + _LINE_REST +
+    rb'(?:(?P=indent)- ' + _LINE_REST + rb'|(?P=indent)  [^ \t\r\n#-]' + _LINE_REST + rb'|' + _BLANK_LINE + rb')*')
+_BLANK_LINES_RE = re.compile(rb'(?:' + _BLANK_LINE + rb')*')
+
+# Connessioni di una parte del YAML con le rispettive righe (None: serve il documento intero)
+PartStats = List[Tuple[Optional[str], Optional[int]]]
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_RELATIONSHIPS_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PACKAGE_RELATIONSHIPS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def yaml_stats(source: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Conta connessioni, righe e connessioni duplicate di un YAML.
+
+    Un file non compresso (o il contenuto già in memoria) viene scansionato
+    con le espressioni regolari di scan_connection_blocks; un contenuto
+    compresso (file o bytes, es: decrittati da un .yml.gz.gpg) viene letto
+    una volta riga per riga, un blocco di connessione alla volta. Le righe
+    dei blocchi nella forma canonica si contano senza parsing
+    (count_list_items), gli altri blocchi vengono analizzati da soli e il
+    documento intero solo se un blocco non basta (es: alias a un'ancora di
+    un altro blocco) o manca la sezione Connections. Di una connessione
+    duplicata si contano solo le righe dell'ultima copia, come nella
+    conversione; i duplicati restano quelli trovati dalla scansione anche
+    quando le righe vengono dal parsing del documento intero.
+
+    Args:
+        source: Path del file oppure contenuto in bytes
+
+    Returns:
+        Dizionario con 'connections', 'rows' e 'duplicates' (nomi ordinati)
+    """
+    if isinstance(source, bytes) and sniff_compression(source) is not None:
+        source = io.BytesIO(source)
+    if not isinstance(source, bytes) and (not isinstance(source, str) or input_compression(source) is not None):
+        with open_text_input(source) as f:
+            parts = _stream_stats(f)
+    else:
+        buffer = source if isinstance(source, bytes) else _open_mapped(source)
+        try:
+            parts = _buffer_stats(buffer)
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+    if parts is None:
+        names, rows = _document_stats(source)
+    else:
+        names = [name for name, _rows in parts if name is not None]
+        # Per i duplicati la conversione tiene l'ultima copia
+        kept = dict(parts)
+        if None in kept.values():
+            # Un blocco non analizzabile da solo: il parsing del documento intero
+            # lo risolve o riporta l'errore con i numeri di riga corretti
+            document_names, rows = _document_stats(source)
+            scanned = set(names)
+            names.extend(name for name in document_names if name not in scanned)
+        else:
+            rows = sum(kept.values())
+    counts = Counter(names)
+    return {'connections': len(counts), 'rows': rows,
+            'duplicates': sorted(name for name, count in counts.items() if count > 1)}
+
+
+def _part_stats(name: Optional[str], buffer, start: int, end: int) -> PartStats:
+    """
+    Connessioni e relative righe di una parte della sezione Connections: il
+    blocco della connessione name oppure (name None) le righe tra
+    "Connections:" e il primo blocco. Una parte non analizzabile da sola
+    restituisce [(name, None)].
+    """
+    if name is None:
+        if _BLANK_LINES_RE.fullmatch(buffer, start, end):
+            return []
+    elif _CANONICAL_BLOCK_RE.fullmatch(buffer, start, end):
+        return [(name, count_list_items(buffer, start, end))]
+    try:
+        data = yaml.load(b'Connections:\n' + buffer[start:end], Loader=yaml_loader())
+    except yaml.YAMLError:
+        return [(name, None)]
+    connections = data.get('Connections') if isinstance(data, dict) else None
+    if not isinstance(connections, dict):
+        return []
+    return [(key, sum(1 for _row in iter_name_secret_value({'Connections': {key: value}})))
+            for key, value in connections.items()]
+
+
+def _buffer_stats(buffer) -> Optional[PartStats]:
+    """Connessioni (ripetute per i duplicati) con le righe di un YAML in memoria (None senza Connections)"""
+    header_start, blocks, section_end = scan_connection_blocks(buffer)
+    if header_start is None:
+        return None
+    first_start = blocks[0][1] if blocks else section_end
+    header_end = buffer.find(b'\n', header_start, first_start)
+    parts = _part_stats(None, buffer, header_end, first_start) if header_end >= 0 else []
+    for name, start, end in blocks:
+        parts.extend(_part_stats(name, buffer, start, end))
+    return parts
+
+
+def _stream_stats(f: IO) -> Optional[PartStats]:
+    """Come _buffer_stats per uno stream di testo, tenendo in memoria un blocco alla volta"""
+    parts = []
+    inside = None  # None prima della sezione Connections, True dentro, False dopo
+    name, lines = None, []
+    for line in f:
+        if inside is None:
+            inside = True if _CONNECTIONS_LINE_RE.match(line) else None
+            continue
+        if not inside:
+            continue
+        level0 = _LEVEL0_LINE_RE.match(line)
+        header = None if level0 else _LEVEL1_LINE_RE.match(line)
+        if level0 or header:
+            part = ''.join(lines).encode('utf-8')
+            parts.extend(_part_stats(name, part, 0, len(part)))
+            name, lines = (header.group(1), [line]) if header else (None, [])
+            inside = header is not None
+        else:
+            lines.append(line)
+    if inside is None:
+        return None
+    if lines:
+        part = ''.join(lines).encode('utf-8')
+        parts.extend(_part_stats(name, part, 0, len(part)))
+    return parts
+
+
+def _document_stats(source: Union[str, bytes, IO]) -> Tuple[List[str], int]:
+    """Nomi di connessione e righe col parsing del documento intero"""
+    if isinstance(source, bytes):
+        data = yaml.load(source, Loader=yaml_loader())
+    else:
+        if isinstance(source, io.BytesIO):
+            source.seek(0)
+        with open_text_input(source) as f:
+            data = yaml.load(f, Loader=yaml_loader())
+    if not isinstance(data, dict):
+        return ([], 0)
+    connections = data.get('Connections', data)
+    names = list(connections) if isinstance(connections, dict) else []
+    return (names, sum(1 for _row in iter_name_secret_value(data)))
+
+
+def _sheet_parts(archive: zipfile.ZipFile) -> List[str]:
+    """Parti XML dei fogli con le connessioni, nell'ordine di shard_sheet_order"""
+    workbook = fromstring(archive.read('xl/workbook.xml'))
+    relationships = fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in relationships.iter(_PACKAGE_RELATIONSHIPS_NS + 'Relationship')}
+    parts = {}
+    for sheet in workbook.iter(_MAIN_NS + 'sheet'):
+        target = targets[sheet.get(_RELATIONSHIPS_NS + 'id')]
+        parts[sheet.get('name')] = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+    names = list(parts)
+    view = workbook.find(f'{_MAIN_NS}bookViews/{_MAIN_NS}workbookView')
+    active = int(view.get('activeTab', 0)) if view is not None else 0
+    return [parts[name] for name in shard_sheet_order(names, names[min(active, len(names) - 1)])]
+
+
+def _column_index(reference: str) -> int:
+    """Indice (da 0) della colonna di un riferimento di cella (es: 'C12' -> 2)"""
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+
+def _cell_text(cell, shared_strings: Callable[[], List[str]]) -> Optional[str]:
+    """Testo di una cella <c> (stringa condivisa, inline o valore)"""
+    kind = cell.get('t')
+    if kind == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(_MAIN_NS + 't'))
+    value = cell.find(_MAIN_NS + 'v')
+    if value is None or value.text is None:
+        return None
+    if kind == 's':
+        return shared_strings()[int(value.text)]
+    return value.text
+
+
+def iter_xlsx_names(source: Union[str, IO], i18n=None) -> Iterator[str]:
+    """
+    Legge in streaming la sola colonna Name dei fogli delle connessioni di un xlsx.
+
+    L'XML dei fogli viene decompresso e analizzato una riga alla volta
+    (senza openpyxl); le stringhe condivise vengono caricate solo se usate.
+
+    Args:
+        source: Path o stream binario riposizionabile dell'xlsx
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+
+    Yields:
+        Name normalizzati delle righe dati non vuote
+
+    Raises:
+        ValueError: Se mancano le colonne Name/Secret/Value
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    with zipfile.ZipFile(source) as archive:
+        cache = []
+
+        def shared_strings() -> List[str]:
+            if not cache:
+                cache.append([''.join(text.text or '' for text in item.iter(_MAIN_NS + 't'))
+                              for item in fromstring(archive.read('xl/sharedStrings.xml'))])
+            return cache[0]
+
+        for part in _sheet_parts(archive):
+            name_column = None
+            with archive.open(part) as f:
+                sheet_data = None
+                for event, element in iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        if element.tag == _MAIN_NS + 'sheetData':
+                            sheet_data = element
+                        continue
+                    if element.tag != _MAIN_NS + 'row':
+                        continue
+                    cells = {}
+                    for position, cell in enumerate(element.iter(_MAIN_NS + 'c')):
+                        reference = cell.get('r')
+                        column = _column_index(reference) if reference else position
+                        if name_column is None or column == name_column:
+                            cells[column] = _cell_text(cell, shared_strings)
+                    sheet_data.clear()
+                    if name_column is None:
+                        headers = [cells.get(column) for column in range(max(cells, default=-1) + 1)]
+                        if not {'Name', 'Secret', 'Value'} <= set(headers):
+                            raise ValueError(i18n.t('missing_columns'))
+                        name_column = headers.index('Name')
+                        continue
+                    name = normalize_cell(cells.get(name_column))
+                    if name:
+                        yield name
+            if name_column is None:
+                raise ValueError(i18n.t('missing_columns'))
+
+
+def table_stats(source: Union[str, IO], fmt: str, i18n=None) -> Dict[str, Any]:
+    """
+    Conta connessioni, righe e Name duplicati di una tabella senza ricostruire il YAML.
+
+    Gli xlsx vengono letti con iter_xlsx_names, gli altri formati con
+    l'engine 'reader' del formato; in memoria restano solo i Name.
+
+    Args:
+        source: Path o stream binario della tabella
+        fmt: Formato della tabella ('xlsx', 'csv', 'tsv', 'ndjson' o dei plugin)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+
+    Returns:
+        Dizionario con 'connections', 'rows' e 'duplicates' (Name ordinati)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    with ExitStack() as stack:
+        if fmt == 'xlsx':
+            names = iter_xlsx_names(source, i18n)
+        else:
+            rows, _reopen = open_table_rows(stack, source, fmt, True, False, None, i18n)
+            names = (row['Name'] for row in rows)
+        counts = Counter(names)
+    return {'connections': len({connection_name_of(name) for name in counts}), 'rows': sum(counts.values()),
+            'duplicates': sorted(name for name, count in counts.items() if count > 1)}
+
+
+def file_stats(path: str, password: Optional[str] = None, i18n=None) -> Dict[str, Any]:
+    """
+    Statistiche di un file (YAML, tabella o .gpg di entrambi, decrittato in memoria).
+
+    Returns:
+        Dizionario con 'path', 'format', 'connections', 'rows', 'duplicates',
+        'bytes', 'seconds' ed 'error' (None se la lettura è riuscita)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    start = time.perf_counter()
+    inner_path = strip_gpg_extension(path)
+    fmt = table_format(inner_path) if is_table_path(inner_path) else 'yaml'
+    result = {'path': path, 'format': fmt, 'connections': 0, 'rows': 0, 'duplicates': [], 'bytes': 0,
+              'seconds': 0.0, 'error': None}
+    try:
+        result['bytes'] = os.path.getsize(path)
+        source = path
+        if path.lower().endswith('.gpg') or is_encrypted_file(path):
+            if not password:
+                raise ValueError(i18n.t('password_required'))
+            success, data, error = decrypt_bytes(path, password, i18n)
+            if not success:
+                raise ValueError(error)
+            source = io.BytesIO(data) if fmt != 'yaml' else data
+        result.update(yaml_stats(source) if fmt == 'yaml' else table_stats(source, fmt, i18n))
+    except Exception as e:
+        result['error'] = str(e) or traceback.format_exc(limit=1)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _file_stats_worker(path: str, password: Optional[str], language: str) -> Dict[str, Any]:
+    """Esegue file_stats in un processo worker"""
+    return file_stats(path, password, I18n(language))
+
+
+def inventory_files(paths: Iterable[str], password: Optional[str] = None, workers: Optional[int] = None,
+                    i18n=None, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> tuple:
+    """
+    Statistiche di tutte le rlist indicate (file o cartelle, vedi iter_rlist_files),
+    in parallelo su più processi.
+
+    Args:
+        paths: File o cartelle
+        password: Passphrase dei file .gpg (quelli senza password risultano falliti)
+        workers: Processi contemporanei (default: numero di CPU)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        on_result: Funzione chiamata con l'esito di ogni file, nell'ordine dei file
+
+    Returns:
+        Tupla (success, warnings, error, report): success è False solo in caso
+        di errore; report contiene 'results' (un esito per file, vedi
+        file_stats), 'files', 'failed', 'connections', 'rows', 'duplicates',
+        'bytes' e 'seconds'
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    try:
+        files = list(iter_rlist_files(paths))
+        if not files:
+            return (False, [], i18n.t('bulk_no_files'), None)
+        start = time.perf_counter()
+        workers = min(workers or os.cpu_count() or 1, len(files))
+        results = []
+        if workers == 1:
+            for path in files:
+                results.append(file_stats(path, password, i18n))
+                if on_result is not None:
+                    on_result(results[-1])
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunksize = max(1, len(files) // (workers * 4))
+                for result in executor.map(_file_stats_worker, files, [password] * len(files),
+                                           [i18n.language] * len(files), chunksize=chunksize):
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+        succeeded = [result for result in results if result['error'] is None]
+        report = {'results': results, 'files': len(results), 'failed': len(results) - len(succeeded),
+                  'connections': sum(result['connections'] for result in succeeded),
+                  'rows': sum(result['rows'] for result in succeeded),
+                  'duplicates': sum(len(result['duplicates']) for result in succeeded),
+                  'bytes': sum(result['bytes'] for result in results),
+                  'seconds': time.perf_counter() - start}
+        return (True, [], None, report)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        return (False, [], f"{i18n.t('error_occurred')}: {e}\n\n{i18n.t('error_details')}:\n{error_details}", None)
+
+
+def format_file_stats(result: Dict[str, Any], i18n=None) -> str:
+    """Formatta l'esito di un file (una riga)"""
+    if i18n is None:
+        i18n = get_i18n()
+    if result['error'] is not None:
+        return f"✗ {result['path']}: {result['error']}"
+    line = (f"{result['path']}: {result['connections']} {i18n.t('stats_connections')}, "
+            f"{result['rows']} {i18n.t('stats_rows')}")
+    if result['duplicates']:
+        line += f", {i18n.t('stats_duplicates')}: {', '.join(result['duplicates'])}"
+    return line
+
+
+def format_inventory(report: Dict[str, Any], output_format: str = 'text', i18n=None) -> str:
+    """Formatta il report come righe per file più il totale, oppure come JSON"""
+    if output_format == 'json':
+        return json.dumps(report, ensure_ascii=False, indent=2) + '\n'
+    if i18n is None:
+        i18n = get_i18n()
+    lines = [format_file_stats(result, i18n) for result in report['results']]
+    lines.append(f"{i18n.t('stats_total')}: {report['files']} {i18n.t('stats_files')}, "
+                 f"{report['connections']} {i18n.t('stats_connections')}, {report['rows']} {i18n.t('stats_rows')}, "
+                 f"{report['duplicates']} {i18n.t('stats_duplicates')} ({report['seconds']:.2f} s)")
+    return '\n'.join(lines) + '\n'
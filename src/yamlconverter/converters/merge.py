@@ -0,0 +1,277 @@
+"""
+YAML ↔ Excel Converter - Merge
+Modulo per l'unione di più rlist (YAML, Excel/CSV/NDJSON o .gpg di entrambi)
+in un unico YAML o tabella, con k-way merge ordinato per nome di connessione
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import heapq
+import io
+import itertools
+import traceback
+from operator import itemgetter
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from yamlconverter.converters.custom_excel_to_yaml import (
+    connection_name_of, iter_connection_groups, write_yaml_streaming,
+)
+from yamlconverter.converters.custom_yaml_to_excel import ConnectionTooLargeError
+from yamlconverter.converters.readers import is_table_input, open_rows
+from yamlconverter.converters.registry import load_engine
+from yamlconverter.utils.formats import is_yaml_path, table_format as table_format_of
+from yamlconverter.utils.gpg_utils import GPGProfile, encrypt_file
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.spill import SpillStore, collect_rows
+from yamlconverter.utils.streams import atomic_output_path, console_for, describe, is_path, open_text_output
+
+# Politiche per le connessioni presenti in più input con contenuto diverso
+MERGE_POLICIES = ['first', 'last', 'error']
+
+Group = Tuple[str, List[Dict[str, str]]]
+
+
+class MergeConflictError(ValueError):
+    """Sollevata con la politica 'error' quando una connessione differisce tra più input"""
+
+    def __init__(self, connection_name: str, positions: List[int]):
+        super().__init__(connection_name)
+        self.connection_name = connection_name
+        self.positions = positions
+
+
+def _is_sorted_by_connection(rows: Iterable[Dict[str, str]]) -> bool:
+    """Verifica se le righe sono raggruppate e in ordine crescente di connessione"""
+    previous = None
+    for row in rows:
+        connection_name = connection_name_of(row.get('Name', ''))
+        if connection_name != previous:
+            if previous is not None and connection_name < previous:
+                return False
+            previous = connection_name
+    return True
+
+
+def sorted_connection_groups(source: Union[str, IO], memory_budget: Optional[int] = None,
+                             **options) -> Iterator[Group]:
+    """
+    Legge un input e restituisce le sue connessioni in ordine di nome.
+
+    Una tabella già ordinata per connessione (es: l'output di un merge)
+    viene letta in streaming, tenendo in memoria una connessione alla volta;
+    questo richiede una prima lettura che controlla solo l'ordine dei nomi.
+    Gli altri input (i YAML, già caricati per intero da load_yaml_document,
+    e le tabelle non ordinate) vengono raggruppati e ordinati in memoria,
+    oppure in uno SpillStore se superano memory_budget.
+
+    Args:
+        source: Path o stream dell'input
+        memory_budget: Byte stimati oltre i quali ordinare su disco (default: SPILL_MEMORY_BUDGET)
+        **options: Opzioni di open_rows (password, i18n, warnings, connection_filter, ...)
+
+    Yields:
+        Tuple (nome_connessione, righe della connessione)
+    """
+    if is_path(source) and is_table_input(source, options.get('table_format')):
+        with open_rows(source, **dict(options, warnings=[])) as rows:
+            presorted = _is_sorted_by_connection(rows)
+        if presorted:
+            with open_rows(source, **options) as rows:
+                yield from iter_connection_groups(rows)
+            return
+
+    with open_rows(source, **options) as rows:
+        collected = collect_rows(rows, connection_name_of, memory_budget)
+    if isinstance(collected, SpillStore):
+        with collected:
+            yield from iter_connection_groups(collected.iter_rows(order='name'))
+        return
+
+    groups: Dict[str, List[Dict[str, str]]] = {}
+    for connection_name, group in itertools.groupby(
+            collected, key=lambda row: connection_name_of(row.get('Name', ''))):
+        groups.setdefault(connection_name, []).extend(group)
+    del collected
+    for connection_name in sorted(groups):
+        yield (connection_name, groups.pop(connection_name))
+
+
+def _tagged(groups: Iterable[Group], position: int) -> Iterator[Tuple[str, int, List[Dict[str, str]]]]:
+    """Aggiunge ai gruppi la posizione dell'input (criterio secondario del merge)"""
+    for connection_name, rows in groups:
+        yield (connection_name, position, rows)
+
+
+def _content(rows: List[Dict[str, str]]) -> List[Tuple[str, str, str]]:
+    """Contenuto confrontabile di una connessione"""
+    return [(row.get('Name', ''), row.get('Secret', ''), row.get('Value', '')) for row in rows]
+
+
+def merge_groups(sources: List[Iterable[Group]], policy: str = 'first',
+                 conflicts: Optional[List[Tuple[str, List[int]]]] = None) -> Iterator[Dict[str, str]]:
+    """
+    K-way merge di più sequenze di connessioni ordinate per nome.
+
+    Il merge tiene in memoria una sola connessione per sequenza; quanto
+    occupa ogni input dipende da come viene letto (vedi
+    sorted_connection_groups: i YAML e le tabelle non ordinate vengono
+    caricati per intero o riversati su disco). Una connessione presente in più input con lo stesso contenuto viene scritta
+    una volta; se il contenuto differisce decide la politica: 'first' tiene
+    la versione del primo input, 'last' quella dell'ultimo, 'error' solleva
+    MergeConflictError.
+
+    Args:
+        sources: Sequenze (nome_connessione, righe), ognuna ordinata per nome
+        policy: 'first', 'last' o 'error'
+        conflicts: Lista a cui aggiungere (nome, posizioni degli input) dei conflitti risolti
+
+    Yields:
+        Righe Name/Secret/Value ordinate per connessione
+
+    Raises:
+        MergeConflictError: Con la politica 'error', al primo conflitto
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError(policy)
+    streams = [_tagged(groups, position) for position, groups in enumerate(sources)]
+    for connection_name, candidates in itertools.groupby(heapq.merge(*streams), key=itemgetter(0)):
+        candidates = list(candidates)
+        chosen = candidates[0]
+        if len(candidates) > 1:
+            first_content = _content(chosen[2])
+            if any(_content(candidate[2]) != first_content for candidate in candidates[1:]):
+                positions = [candidate[1] for candidate in candidates]
+                if policy == 'error':
+                    raise MergeConflictError(connection_name, positions)
+                if conflicts is not None:
+                    conflicts.append((connection_name, positions))
+                if policy == 'last':
+                    chosen = candidates[-1]
+        yield from chosen[2]
+
+
+def _conflict_warnings(conflicts: List[Tuple[str, List[int]]], inputs: List[Union[str, IO]],
+                       policy: str, i18n, console: IO) -> List[str]:
+    """Costruisce (e stampa) i warning per le connessioni in conflitto, come per i duplicati"""
+    if not conflicts:
+        return []
+    warnings = [f"{i18n.t('warning_duplicates_found')}:"]
+    for connection_name, positions in conflicts:
+        kept = positions[-1] if policy == 'last' else positions[0]
+        warnings.append(f"  - {connection_name} {i18n.t('merge_kept_from')} {describe(inputs[kept])}")
+    try:
+        print("\n".join(warnings), file=console)
+    except UnicodeEncodeError:
+        pass  # Ignora errori di encoding nei print
+    return warnings
+
+
+def _write_merged(rows: Iterator[Dict[str, str]], output_file: Union[str, IO], fmt: Optional[str],
+                  password: Optional[str], i18n, gpg_profile: GPGProfile = None) -> int:
+    """Scrive le righe unite con i writer in streaming (YAML, anche .gpg, o l'engine della tabella)"""
+    if fmt is None:
+        if is_path(output_file) and output_file.lower().endswith('.gpg'):
+            # Il YAML viene generato in memoria e poi cifrato, come in convert_file
+            buffer = io.StringIO()
+            count = write_yaml_streaming(rows, buffer)
+            success, error = encrypt_file(buffer.getvalue(), output_file, password, i18n, gpg_profile)
+            if not success:
+                raise ValueError(error)
+            return count
+        with open_text_output(output_file) as f:
+            return write_yaml_streaming(rows, f)
+    return load_engine('writer', fmt)(rows, output_file, fmt)[0]
+
+
+def merge_files(inputs: List[Union[str, IO]], output_file: Union[str, IO], policy: str = 'first',
+                password: Optional[str] = None, i18n=None, table_format: Optional[str] = None,
+                connection_filter=None, memory_budget: Optional[int] = None,
+                gpg_profile: GPGProfile = None) -> tuple:
+    """
+    Unisce più rlist in un unico file ordinato per nome di connessione.
+
+    Gli input vengono letti con i reader dei converter (i YAML con i warning
+    sui duplicati di load_yaml_document) e l'output viene scritto con i
+    writer in streaming: YAML (anche .yml.gpg), xlsx, csv, tsv o ndjson.
+    Solo le tabelle già ordinate per connessione vengono lette una
+    connessione alla volta; i YAML e le tabelle non ordinate vengono
+    caricati per intero (o in uno SpillStore oltre memory_budget).
+    Un output su file viene scritto in un temporaneo nella stessa cartella
+    e sostituito solo a merge completato: un conflitto o un errore lasciano
+    intatto il file esistente.
+
+    Args:
+        inputs: Path o stream degli input, in ordine di precedenza
+        output_file: Path, stream o '-' dell'output
+        policy: 'first', 'last' o 'error' per le connessioni in conflitto
+        password: Password GPG per input e output .gpg
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        table_format: Formato tabellare dell'output (default: dedotto dall'estensione;
+                      un output YAML resta YAML)
+        connection_filter: ConnectionFilter applicato a tutti gli input (opzionale)
+        memory_budget: Byte stimati per input oltre i quali l'ordinamento usa un
+                       database SQLite temporaneo (default: SPILL_MEMORY_BUDGET)
+        gpg_profile: Profilo di cifratura di un output .gpg (vedi GPG_PROFILES)
+
+    Returns:
+        Tupla (success, warnings, error)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    console = console_for(output_file)
+    warnings = []
+    conflicts = []
+    try:
+        if is_path(output_file) and output_file.lower().endswith('.gpg') and not password:
+            raise ValueError(i18n.t('password_required'))
+        fmt = table_format
+        if fmt is None and not (is_path(output_file) and is_yaml_path(output_file)):
+            fmt = table_format_of(output_file)
+        options = dict(password=password, i18n=i18n, warnings=warnings,
+                       connection_filter=connection_filter, console=console)
+        sources = [sorted_connection_groups(source, memory_budget, **options) for source in inputs]
+        rows = merge_groups(sources, policy, conflicts)
+        first_row = next(rows, None)
+        if first_row is None:
+            raise ValueError(i18n.t("no_connections_matched" if connection_filter is not None
+                                    else "no_data_to_convert"))
+        rows = itertools.chain([first_row], rows)
+        if is_path(output_file):
+            with atomic_output_path(output_file) as temp_path:
+                count = _write_merged(rows, temp_path, fmt, password, i18n, gpg_profile)
+        else:
+            count = _write_merged(rows, output_file, fmt, password, i18n, gpg_profile)
+        warnings.extend(_conflict_warnings(conflicts, inputs, policy, i18n, console))
+
+        try:
+            print(f"{i18n.t('merged')} {len(inputs)} -> {describe(output_file)}", file=console)
+            print(f"  {count} {i18n.t('connections_rebuilt' if fmt is None else 'rows_created')}", file=console)
+        except UnicodeEncodeError:
+            pass
+        return (True, warnings, None)
+
+    except MergeConflictError as e:
+        sources = ', '.join(describe(inputs[position]) for position in e.positions)
+        return (False, warnings, f"{i18n.t('error_merge_conflict')}: {e.connection_name} ({sources})")
+    except ConnectionTooLargeError as e:
+        return (False, warnings, f"{i18n.t('error_connection_too_large')}: {e.connection_name} ({e.row_count})")
+    except Exception as e:
+        error_details = traceback.format_exc()
+        error_msg = f"{i18n.t('error_merge')}: {e}\n\n{i18n.t('error_details')}:\n{error_details}"
+        try:
+            print(f"{i18n.t('error')}: {error_msg}", file=console)
+        except UnicodeEncodeError:
+            pass
+        return (False, warnings, error_msg)
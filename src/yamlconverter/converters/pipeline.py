@@ -0,0 +1,214 @@
+"""
+YAML ↔ Excel Converter - Pipeline
+Modulo che concatena decrittazione GPG, conversione e crittografia GPG
+per un singolo file, senza lasciare file in chiaro su disco
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import io
+import traceback
+from typing import IO, Optional, Union
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.planner import STRATEGY_OPTIONS, STRATEGY_OVERRIDES, format_plan, plan_conversion
+from yamlconverter.utils.gpg_utils import GPGProfile, decrypt_bytes, encrypt_file, is_encrypted_file
+from yamlconverter.utils.formats import detect_conversion_mode, strip_gpg_extension, table_format
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.metrics import record_conversion
+from yamlconverter.utils.profiling import span
+from yamlconverter.utils.sniff import sniff_conversion_mode
+from yamlconverter.utils.streams import console_for, describe, is_path
+
+
+def _is_gpg_path(target: Union[str, IO]) -> bool:
+    """Verifica se il target è un path con estensione .gpg"""
+    return is_path(target) and target.lower().endswith('.gpg')
+
+
+def encrypted_output_path(output_file: str) -> str:
+    """Path del file cifrato per un output YAML ('.gpg' aggiunto se manca)"""
+    return output_file if output_file.lower().endswith('.gpg') else output_file + '.gpg'
+
+
+def _planned_options(input_file: Union[str, IO], output_file: Union[str, IO], mode: str, strategy: str,
+                     memory_cap: Optional[int], i18n, converter_options: dict) -> dict:
+    """
+    Opzioni del converter con la strategia scelta dal planner (vedi planner.py).
+
+    Le opzioni indicate esplicitamente (streaming, parallel, memory_budget)
+    prevalgono e, con strategy 'auto', escludono la scelta automatica.
+    La strategia scelta e la sua motivazione vengono stampate sulla console.
+    """
+    if strategy == 'auto' and any(option in converter_options for option in STRATEGY_OVERRIDES):
+        return converter_options
+    with span('plan'):
+        plan = plan_conversion(input_file, mode, strategy, memory_cap, converter_options.get('table_format'),
+                               converter_options.get('workers'))
+    try:
+        print(format_plan(plan, i18n), file=console_for(output_file))
+    except UnicodeEncodeError:
+        pass
+    return {**plan['options'], **converter_options}
+
+
+def convert_file(input_file: Union[str, IO], output_file: Union[str, IO], mode: Optional[str] = None,
+                 password: Optional[str] = None, encrypt: bool = False, i18n=None,
+                 gpg_profile: GPGProfile = None, strategy: str = 'auto', memory_cap: Optional[int] = None,
+                 **converter_options) -> tuple:
+    """
+    Converte un singolo file gestendo in automatico input/output GPG.
+
+    - Input .gpg (YAML o tabella): viene decrittato in memoria e passato al
+      converter come stream binario; un livello di compressione interno
+      (es: secrets.yml.gz.gpg) viene riconosciuto e decompresso dal reader.
+    - Excel → YAML: se encrypt è True (o l'output termina con .gpg) il YAML
+      viene generato in memoria e poi cifrato nel file di output.
+
+    Input e output possono essere anche stream o '-' (stdin/stdout); in tal
+    caso la modalità va indicata esplicitamente se non è deducibile dall'altro path.
+    Se le estensioni non bastano, modalità e formato dell'input vengono
+    dedotti dal contenuto (vedi sniff.py); un input cifrato con GPG viene
+    riconosciuto anche senza estensione .gpg.
+    La strategia di conversione (in memoria, streaming, su disco o parallela)
+    viene scelta dal planner in base alla stima di righe e memoria.
+
+    Args:
+        input_file: Path, stream o '-' del file di input
+        output_file: Path, stream o '-' del file di output
+        mode: 'yaml_to_excel' o 'excel_to_yaml' (se None viene rilevata dalle estensioni)
+        password: Password GPG per input/output criptati
+        encrypt: Cripta l'output YAML con GPG
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        gpg_profile: Profilo di cifratura dell'output (vedi GPG_PROFILES)
+        strategy: 'auto' (scelta del planner) o una strategia forzata (vedi STRATEGIES in planner.py)
+        memory_cap: Limite di memoria in byte per il planner (default: DEFAULT_MEMORY_CAP)
+        **converter_options: Opzioni passate al converter (es: parallel=True)
+
+    Returns:
+        Tupla (success, warnings, error_message)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    mode, input_is_encrypted, output_is_encrypted, error = resolve_conversion(
+        input_file, output_file, mode, password, encrypt, i18n, strategy, converter_options)
+    if error is not None:
+        return (False, [], error)
+
+    try:
+        with span('convert', mode=mode, input=describe(input_file), output=describe(output_file)):
+            result = _convert(input_file, output_file, mode, input_is_encrypted, output_is_encrypted, password,
+                              i18n, gpg_profile, strategy, memory_cap, converter_options)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        result = (False, [], f"{i18n.t('error_occurred')}: {e}\n\n{i18n.t('error_details')}:\n{error_details}")
+    written_output = encrypted_output_path(output_file) if output_is_encrypted else output_file
+    record_conversion(mode, input_file, written_output, result[0])
+    return result
+
+
+def resolve_conversion(input_file: Union[str, IO], output_file: Union[str, IO], mode: Optional[str],
+                       password: Optional[str], encrypt: bool, i18n, strategy: str, converter_options: dict) -> tuple:
+    """
+    Validazione di convert_file: modalità (dedotta da estensioni o contenuto,
+    col formato sniffato aggiunto a converter_options), strategia, input/output
+    GPG e password.
+
+    Returns:
+        Tupla (mode, input_is_encrypted, output_is_encrypted, error_message)
+    """
+    if mode is None and isinstance(input_file, str) and isinstance(output_file, str):
+        mode = detect_conversion_mode(input_file, output_file)
+        if mode is None and is_path(input_file):
+            mode, sniffed_format = sniff_conversion_mode(input_file, output_file)
+            if sniffed_format is not None and converter_options.get('table_format') is None:
+                converter_options['table_format'] = sniffed_format
+    if mode not in ('yaml_to_excel', 'excel_to_yaml'):
+        return (mode, False, False, f"{i18n.t('warning_extension_not_recognized')}: {input_file} -> {output_file}")
+
+    if strategy != 'auto' and strategy not in STRATEGY_OPTIONS[mode]:
+        return (mode, False, False, f"{i18n.t('strategy_not_applicable')}: {strategy}")
+
+    input_is_encrypted = _is_gpg_path(input_file) or (is_path(input_file) and is_encrypted_file(input_file))
+    output_is_encrypted = mode == 'excel_to_yaml' and (encrypt or _is_gpg_path(output_file))
+    if output_is_encrypted and not is_path(output_file):
+        return (mode, input_is_encrypted, output_is_encrypted, i18n.t('encrypt_requires_file'))
+
+    if (input_is_encrypted or output_is_encrypted) and not password:
+        return (mode, input_is_encrypted, output_is_encrypted, i18n.t('password_required'))
+    return (mode, input_is_encrypted, output_is_encrypted, None)
+
+
+def decrypted_input(data: bytes, input_file: str, mode: str, converter_options: dict) -> IO:
+    """
+    Stream binario del contenuto decrittato di un input .gpg, con le opzioni
+    del converter adattate (formato dedotto dal nome, niente parsing parallelo).
+    """
+    if mode == 'excel_to_yaml' and not converter_options.get('table_format'):
+        converter_options['table_format'] = table_format(strip_gpg_extension(input_file))
+    # Il parsing parallelo lavora solo su file
+    converter_options.pop('parallel', None)
+    converter_options.pop('workers', None)
+    # Il contenuto in chiaro resta in memoria: compressione interna e line ending
+    # vengono gestiti dai reader come per qualsiasi stream binario
+    return io.BytesIO(data)
+
+
+def convert_plain(actual_input: Union[str, IO], output_file: Union[str, IO], mode: str, output_is_encrypted: bool,
+                  i18n, strategy: str, memory_cap: Optional[int], converter_options: dict) -> tuple:
+    """
+    Conversione di un input in chiaro (senza GPG). Con output_is_encrypted
+    il YAML viene generato in memoria e restituito da cifrare.
+
+    Returns:
+        Tupla (result, content): result è la tupla (success, warnings, error_message),
+        content il YAML da cifrare (None se non va cifrato o la conversione è fallita)
+    """
+    converter_options = _planned_options(actual_input, output_file, mode, strategy, memory_cap, i18n,
+                                         converter_options)
+    if mode == 'yaml_to_excel':
+        return (custom_yaml_to_excel(actual_input, output_file, i18n, **converter_options), None)
+
+    # excel_to_yaml
+    if not output_is_encrypted:
+        return (custom_excel_to_yaml(actual_input, output_file, i18n, **converter_options), None)
+
+    buffer = io.StringIO()
+    result = custom_excel_to_yaml(actual_input, buffer, i18n, **converter_options)
+    return (result, buffer.getvalue() if result[0] else None)
+
+
+def _convert(input_file: Union[str, IO], output_file: Union[str, IO], mode: str, input_is_encrypted: bool,
+             output_is_encrypted: bool, password: Optional[str], i18n, gpg_profile: GPGProfile, strategy: str,
+             memory_cap: Optional[int], converter_options: dict) -> tuple:
+    """Conversione di convert_file, dopo la validazione di modalità, strategia e password"""
+    actual_input = input_file
+    if input_is_encrypted:
+        success_decrypt, data, error = decrypt_bytes(input_file, password, i18n)
+        if not success_decrypt:
+            return (False, [], error)
+        actual_input = decrypted_input(data, input_file, mode, converter_options)
+
+    result, content = convert_plain(actual_input, output_file, mode, output_is_encrypted, i18n, strategy,
+                                    memory_cap, converter_options)
+    if content is None:
+        return result
+
+    warnings = result[1]
+    success_encrypt, error = encrypt_file(content, encrypted_output_path(output_file), password, i18n, gpg_profile)
+    if not success_encrypt:
+        return (False, warnings, error)
+    return (True, warnings, None)
@@ -0,0 +1,230 @@
+"""
+YAML ↔ Excel Converter - Planner
+Scelta automatica della strategia di conversione (in memoria, streaming,
+su disco o parallela) dalla stima di righe e memoria, entro un limite
+di memoria configurabile
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import re
+import zipfile
+from typing import IO, Any, Dict, Optional, Tuple, Union
+from yamlconverter.utils.formats import table_format as table_format_of
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.spill import SPILL_MEMORY_BUDGET
+from yamlconverter.utils.streams import input_compression, is_path
+
+# Strategie: 'auto' lascia la scelta al planner
+STRATEGIES = ['auto', 'memory', 'streaming', 'spill', 'parallel']
+
+# Strategie applicabili per modalità e opzioni passate al converter
+STRATEGY_OPTIONS = {
+    'yaml_to_excel': {
+        'memory': {},
+        'streaming': {'streaming': True},
+        'parallel': {'parallel': True},
+    },
+    'excel_to_yaml': {
+        'memory': {},
+        'streaming': {'streaming': True},
+        'spill': {'memory_budget': 0},
+        'parallel': {'parallel': True},
+    },
+}
+
+# Opzioni del converter che, se indicate esplicitamente, escludono la scelta automatica
+STRATEGY_OVERRIDES = ['streaming', 'parallel', 'memory_budget']
+
+# Limite di memoria di default (lo stesso budget della ricostruzione su disco)
+DEFAULT_MEMORY_CAP = SPILL_MEMORY_BUDGET
+
+# Memoria di picco stimata, misurata con benchmarks/bench_planner.py:
+# - YAML caricato per intero: multiplo della dimensione del file
+# - xlsx caricato per intero (openpyxl non read_only): byte per riga
+# - tabella testuale ricostruita in memoria: byte per riga
+YAML_MEMORY_FACTOR = 30
+XLSX_ROW_MEMORY = 2000
+TEXT_ROW_MEMORY = 800
+
+# Byte medi di XML per riga di un foglio senza <dimension> (es: scritto in write-only)
+XLSX_XML_ROW_BYTES = 230
+
+# Rapporto di compressione ipotizzato per gli input .gz/.xz/.zst
+COMPRESSION_RATIO = 5
+
+# Sotto questa dimensione il parsing parallelo del YAML non ripaga l'avvio dei processi
+PARALLEL_MIN_FILE_BYTES = 16 * 1024 * 1024
+
+# Byte letti dall'inizio di un file di testo per stimare la lunghezza media delle righe
+SAMPLE_BYTES = 64 * 1024
+
+_DIMENSION_RE = re.compile(rb'<dimension ref="[A-Z]+\d+(?::[A-Z]+(\d+))?"')
+_SECRET_LINE_RE = re.compile(rb'^[ \t]*- ', re.MULTILINE)
+
+
+def _sample(path: str) -> bytes:
+    """Primi SAMPLE_BYTES del file, troncati all'ultima riga completa"""
+    with open(path, 'rb') as f:
+        head = f.read(SAMPLE_BYTES)
+    if len(head) == SAMPLE_BYTES and b'\n' in head:
+        head = head[:head.rindex(b'\n') + 1]
+    return head
+
+
+def _xlsx_rows(path: str) -> Optional[int]:
+    """
+    Righe dei fogli di un xlsx lette dalla directory dello zip, senza decomprimere i fogli.
+
+    Usa l'attributo <dimension> all'inizio di ogni foglio; se manca, la
+    dimensione decompressa dell'XML diviso XLSX_XML_ROW_BYTES.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            rows = 0
+            for info in archive.infolist():
+                if not (info.filename.startswith('xl/worksheets/') and info.filename.endswith('.xml')):
+                    continue
+                with archive.open(info) as f:
+                    match = _DIMENSION_RE.search(f.read(1024))
+                if match and match.group(1):
+                    rows += max(0, int(match.group(1)) - 1)
+                else:
+                    rows += info.file_size // XLSX_XML_ROW_BYTES
+            return rows
+    except (OSError, zipfile.BadZipFile):
+        return None
+
+
+def estimate_input(input_file: Union[str, IO], mode: str,
+                   table_format: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Stima economica di righe e memoria di picco della conversione in memoria.
+
+    Legge solo la dimensione del file, la directory dello zip per gli xlsx e
+    i primi SAMPLE_BYTES per YAML e tabelle testuali.
+
+    Args:
+        input_file: Path o stream dell'input
+        mode: 'yaml_to_excel' o 'excel_to_yaml'
+        table_format: Formato della tabella di input (default: dedotto dall'estensione)
+
+    Returns:
+        Tupla (righe stimate, byte di memoria stimati); (None, None) per gli stream
+    """
+    if not is_path(input_file) or not os.path.isfile(input_file):
+        return (None, None)
+    size = os.path.getsize(input_file)
+    fmt = table_format or table_format_of(input_file)
+    if mode == 'excel_to_yaml' and fmt == 'xlsx':
+        rows = _xlsx_rows(input_file)
+        return (rows, None if rows is None else rows * XLSX_ROW_MEMORY)
+
+    if input_compression(input_file) is not None:
+        # Il campione compresso non dice nulla sulle righe
+        size *= COMPRESSION_RATIO
+        head = b''
+    else:
+        head = _sample(input_file)
+    if mode == 'yaml_to_excel':
+        # Una riga Name/Secret/Value per ogni elemento "- secret: ..." delle liste
+        items = len(_SECRET_LINE_RE.findall(head))
+        rows = size * items // len(head) if items else size // 100
+        return (rows, size * YAML_MEMORY_FACTOR)
+    lines = head.count(b'\n')
+    rows = max(0, size * lines // len(head) - 1) if lines else size // 100
+    return (rows, rows * TEXT_ROW_MEMORY)
+
+
+def plan_conversion(input_file: Union[str, IO], mode: str, strategy: str = 'auto',
+                    memory_cap: Optional[int] = None, table_format: Optional[str] = None,
+                    workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Sceglie la strategia di conversione sotto il limite di memoria.
+
+    - YAML → tabella: in memoria se la stima entra nel limite (parallela per
+      file grandi con più CPU), altrimenti streaming a chunk di connessioni.
+    - Tabella → YAML: in memoria se la stima entra nel limite, altrimenti
+      streaming (xlsx in read_only); in entrambi i casi la ricostruzione
+      passa su disco oltre il limite, anche per gli stream di dimensione
+      non nota. La strategia 'spill' (tutto su disco) va forzata.
+
+    Args:
+        input_file: Path o stream dell'input
+        mode: 'yaml_to_excel' o 'excel_to_yaml'
+        strategy: 'auto' oppure una strategia forzata (vedi STRATEGIES)
+        memory_cap: Limite di memoria in byte (default: DEFAULT_MEMORY_CAP)
+        table_format: Formato della tabella di input (solo excel_to_yaml)
+        workers: Processi disponibili per la strategia parallela (default: numero di CPU)
+
+    Returns:
+        Dizionario con 'mode', 'strategy', 'options' (da passare al converter),
+        'rows' e 'memory' stimati (None se non stimabili), 'memory_cap' e
+        'reason' (chiave i18n della motivazione)
+
+    Raises:
+        ValueError: Se la strategia non esiste o non si applica alla modalità
+    """
+    if strategy not in STRATEGIES or (strategy != 'auto' and strategy not in STRATEGY_OPTIONS[mode]):
+        raise ValueError(strategy)
+    memory_cap = DEFAULT_MEMORY_CAP if memory_cap is None else memory_cap
+    rows, memory = estimate_input(input_file, mode, table_format)
+    splittable = is_path(input_file) and os.path.isfile(input_file) and input_compression(input_file) is None
+
+    if strategy != 'auto':
+        reason = 'plan_reason_forced'
+    elif mode == 'yaml_to_excel':
+        if not splittable:
+            strategy, reason = 'memory', 'plan_reason_single_read'
+        elif memory > memory_cap:
+            strategy, reason = 'streaming', 'plan_reason_over_cap'
+        elif os.path.getsize(input_file) >= PARALLEL_MIN_FILE_BYTES and (workers or os.cpu_count() or 1) > 1:
+            strategy, reason = 'parallel', 'plan_reason_large_file'
+        else:
+            strategy, reason = 'memory', 'plan_reason_within_cap'
+    elif memory is None:
+        strategy, reason = 'memory', 'plan_reason_unknown_size'
+    elif memory <= memory_cap:
+        strategy, reason = 'memory', 'plan_reason_within_cap'
+    else:
+        strategy, reason = 'streaming', 'plan_reason_over_cap'
+
+    options = dict(STRATEGY_OPTIONS[mode][strategy])
+    if mode == 'excel_to_yaml':
+        options.setdefault('memory_budget', memory_cap)
+    if strategy == 'parallel' and workers:
+        options['workers'] = workers
+    return {'mode': mode, 'strategy': strategy, 'options': options, 'rows': rows, 'memory': memory,
+            'memory_cap': memory_cap, 'reason': reason}
+
+
+def _megabytes(value: int) -> str:
+    """Byte in MB con un decimale"""
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+def format_plan(plan: Dict[str, Any], i18n=None) -> str:
+    """Formatta la strategia scelta e la sua motivazione (una riga)"""
+    if i18n is None:
+        i18n = get_i18n()
+    details = []
+    if plan['rows'] is not None:
+        details.append(f"~{plan['rows']} {i18n.t('plan_rows')}")
+    if plan['memory'] is not None:
+        details.append(f"~{_megabytes(plan['memory'])} {i18n.t('plan_estimated')}")
+    details.append(f"{i18n.t('plan_memory_cap')} {_megabytes(plan['memory_cap'])}")
+    return (f"{i18n.t('plan_strategy')}: {plan['strategy']} ({', '.join(details)}): "
+            f"{i18n.t(plan['reason'])}")
@@ -0,0 +1,99 @@
+"""
+YAML ↔ Excel Converter - Readers
+Modulo che legge qualsiasi input supportato (YAML, anche compresso,
+tabelle xlsx/csv/tsv/ndjson e .gpg di entrambi) come righe Name/Secret/Value
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import io
+import sys
+from contextlib import ExitStack, contextmanager
+from typing import IO, Dict, Iterator, List, Optional, Union
+from yamlconverter.converters.custom_excel_to_yaml import open_table_rows
+from yamlconverter.converters.custom_yaml_to_excel import iter_name_secret_value, load_yaml_document
+from yamlconverter.utils.formats import is_table_path, strip_gpg_extension, table_format as table_format_of
+from yamlconverter.utils.gpg_utils import decrypt_bytes, is_encrypted_file
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.streams import is_path
+
+
+def is_table_input(source: Union[str, IO], table_format: Optional[str] = None) -> bool:
+    """Verifica se l'input è una tabella (xlsx/csv/tsv/ndjson), anche cifrata con GPG"""
+    if table_format:
+        return True
+    return is_path(source) and is_table_path(strip_gpg_extension(source))
+
+
+@contextmanager
+def open_rows(source: Union[str, IO], password: Optional[str] = None, i18n=None,
+              warnings: Optional[List[str]] = None, table_format: Optional[str] = None,
+              parallel: bool = False, workers: Optional[int] = None, connection_filter=None,
+              console: Optional[IO] = None) -> Iterator[Iterator[Dict[str, str]]]:
+    """
+    Apre un input e restituisce le sue righe Name/Secret/Value con i reader dei converter.
+
+    Le tabelle vengono lette riga per riga (xlsx in read_only); i YAML
+    passano da load_yaml_document, quindi con gli stessi warning sui duplicati.
+    Un file .gpg (o cifrato con GPG, riconosciuto dal contenuto) viene
+    decrittato in memoria: il formato interno si deduce dall'estensione che
+    precede .gpg (es: secrets.xlsx.gpg) e un livello di compressione interno
+    (es: secrets.yml.gz.gpg) viene riconosciuto dal contenuto e decompresso.
+
+    Args:
+        source: Path, stream o '-' dell'input
+        password: Password GPG per input .gpg
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        warnings: Lista a cui aggiungere i warning (opzionale)
+        table_format: Formato tabellare esplicito (per gli stream)
+        parallel: Parsing YAML parallelo / lettura parallela dei fogli
+        workers: Numero di processi
+        connection_filter: ConnectionFilter (vedi filters.py, opzionale)
+        console: Stream per i messaggi (default: stderr)
+
+    Yields:
+        Iteratore delle righe Name/Secret/Value
+
+    Raises:
+        ValueError: Se la decrittazione fallisce o l'input non è valido
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    if warnings is None:
+        warnings = []
+    console = console or sys.stderr
+
+    actual_source = source
+    is_table = is_table_input(source, table_format)
+    fmt = table_format or (table_format_of(strip_gpg_extension(source)) if is_table else None)
+    if is_path(source) and (source.lower().endswith('.gpg') or is_encrypted_file(source)):
+        if not password:
+            raise ValueError(i18n.t('password_required'))
+        success, data, error = decrypt_bytes(source, password, i18n)
+        if not success:
+            raise ValueError(error)
+        actual_source = io.BytesIO(data)
+        parallel = False
+
+    with ExitStack() as stack:
+        if is_table:
+            rows, _reopen = open_table_rows(stack, actual_source, fmt, True, parallel, workers, i18n)
+            if connection_filter is not None:
+                rows = connection_filter.filter_rows(rows)
+        else:
+            yaml_data = load_yaml_document(actual_source, i18n, warnings, console, parallel, workers,
+                                           connection_filter)
+            rows = iter_name_secret_value(yaml_data)
+        yield rows
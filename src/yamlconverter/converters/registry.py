@@ -0,0 +1,234 @@
+"""
+YAML ↔ Excel Converter - Registry
+Registro degli engine di lettura, scrittura e parsing YAML per formato, con
+caricamento lazy e plugin installati come entry point
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import importlib
+import importlib.util
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from yamlconverter.utils.formats import register_table_format
+
+# Tipi di engine:
+# - 'reader': (stack, source, fmt, streaming, parallel, workers, i18n) -> (righe, riapertura o None),
+#   stesso contratto di open_table_rows
+# - 'writer': (rows, output_file, fmt) -> (righe scritte, fogli creati)
+# - 'yaml_loader': classe Loader di PyYAML con i costruttori di SafeLoader
+ENGINE_KINDS = ['reader', 'writer', 'yaml_loader']
+
+# Gruppo degli entry point dei plugin: ogni entry point indica una funzione
+# senza argomenti che registra i propri engine con register_engine
+PLUGIN_GROUP = 'yamlconverter.engines'
+
+
+class EngineNotFoundError(ValueError):
+    """Sollevata quando nessun engine disponibile gestisce il formato richiesto"""
+
+    def __init__(self, kind: str, fmt: str):
+        super().__init__(f"{kind}: {fmt}")
+        self.kind = kind
+        self.fmt = fmt
+
+
+class Engine:
+    """
+    Engine registrato per un tipo e un formato.
+
+    Il target è un riferimento 'modulo:attributo' importato solo al primo
+    utilizzo (oppure direttamente l'oggetto); tra gli engine disponibili
+    viene scelto quello con priorità più alta, cioè il più veloce.
+    """
+
+    def __init__(self, kind: str, fmt: str, name: str, target: Union[str, Any], priority: int = 0,
+                 requires: Optional[List[str]] = None, available: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            kind: Tipo di engine (vedi ENGINE_KINDS)
+            fmt: Formato gestito (es: 'xlsx', 'ndjson', 'yaml')
+            name: Nome dell'engine (es: 'openpyxl', 'libyaml')
+            target: 'modulo:attributo' oppure l'oggetto stesso
+            priority: Priorità (più alta = preferito)
+            requires: Moduli necessari, controllati senza importarli
+            available: Controllo aggiuntivo di disponibilità (opzionale)
+        """
+        self.kind = kind
+        self.fmt = fmt
+        self.name = name
+        self.target = target
+        self.priority = priority
+        self.requires = requires or []
+        self._available = available
+        self._loaded = None if isinstance(target, str) else target
+
+    def is_available(self) -> bool:
+        """Verifica se i moduli richiesti sono installati (senza importare l'engine)"""
+        try:
+            if any(importlib.util.find_spec(module) is None for module in self.requires):
+                return False
+            return self._available is None or bool(self._available())
+        except (ImportError, ValueError):
+            return False
+
+    @property
+    def loaded(self) -> bool:
+        """True se il target è già stato importato"""
+        return self._loaded is not None
+
+    def load(self) -> Any:
+        """Importa il target al primo utilizzo e lo restituisce"""
+        if self._loaded is None:
+            module_name, _, attribute = self.target.partition(':')
+            value = importlib.import_module(module_name)
+            for part in attribute.split('.') if attribute else []:
+                value = getattr(value, part)
+            self._loaded = value
+        return self._loaded
+
+    def __repr__(self) -> str:
+        return f"Engine({self.kind!r}, {self.fmt!r}, {self.name!r}, priority={self.priority})"
+
+
+_ENGINES: Dict[Tuple[str, str], List[Engine]] = {}
+_PREFERRED: Dict[Tuple[str, str], str] = {}
+_plugins_loaded = False
+
+# Errori dei plugin che non è stato possibile caricare: (entry point, messaggio)
+PLUGIN_ERRORS: List[Tuple[str, str]] = []
+
+
+def register_engine(kind: str, fmt: str, name: str, target: Union[str, Any], priority: int = 0,
+                    requires: Optional[List[str]] = None,
+                    available: Optional[Callable[[], bool]] = None) -> Engine:
+    """
+    Registra un engine (vedi Engine); un engine con lo stesso nome viene sostituito.
+
+    Returns:
+        Engine registrato
+
+    Raises:
+        ValueError: Se il tipo non è valido
+    """
+    if kind not in ENGINE_KINDS:
+        raise ValueError(kind)
+    engine = Engine(kind, fmt, name, target, priority, requires, available)
+    candidates = [other for other in _ENGINES.get((kind, fmt), []) if other.name != name]
+    candidates.append(engine)
+    _ENGINES[(kind, fmt)] = candidates
+    return engine
+
+
+def register_format(fmt: str, extensions: List[str]):
+    """
+    Registra un nuovo formato tabellare e le sue estensioni (es: 'psv', ['.psv']).
+
+    Il formato diventa riconosciuto da rilevamento della modalità, CLI e GUI;
+    i suoi engine 'reader' e 'writer' vanno registrati con register_engine.
+    """
+    register_table_format(fmt, extensions)
+
+
+def _plugin_entry_points() -> list:
+    """Entry point del gruppo PLUGIN_GROUP (solo metadati, nessun import)"""
+    points = entry_points()
+    if hasattr(points, 'select'):
+        return list(points.select(group=PLUGIN_GROUP))
+    return list(points.get(PLUGIN_GROUP, []))  # Python < 3.10
+
+
+def load_plugins():
+    """
+    Carica una sola volta i plugin installati (gruppo PLUGIN_GROUP).
+
+    Viene chiamata al primo utilizzo del registro; un plugin che non si
+    carica non blocca gli altri e finisce in PLUGIN_ERRORS.
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+    for entry_point in _plugin_entry_points():
+        try:
+            entry_point.load()()
+        except Exception as e:
+            PLUGIN_ERRORS.append((entry_point.name, str(e)))
+
+
+def set_preferred_engine(kind: str, fmt: str, name: Optional[str] = None):
+    """Forza l'engine da usare per tipo e formato (None ripristina la scelta automatica)"""
+    if name is None:
+        _PREFERRED.pop((kind, fmt), None)
+    else:
+        _PREFERRED[(kind, fmt)] = name
+
+
+def list_engines(kind: Optional[str] = None, fmt: Optional[str] = None) -> List[Engine]:
+    """Engine registrati, per tipo e formato e in ordine di priorità decrescente"""
+    load_plugins()
+    engines = [engine for (engine_kind, engine_fmt), candidates in _ENGINES.items()
+               if kind in (None, engine_kind) and fmt in (None, engine_fmt) for engine in candidates]
+    return sorted(engines, key=lambda engine: (engine.kind, engine.fmt, -engine.priority, engine.name))
+
+
+def get_engine(kind: str, fmt: str) -> Engine:
+    """
+    Sceglie l'engine per tipo e formato: quello preferito (set_preferred_engine)
+    se disponibile, altrimenti il disponibile con priorità più alta.
+
+    Raises:
+        EngineNotFoundError: Se nessun engine disponibile gestisce il formato
+    """
+    load_plugins()
+    candidates = [engine for engine in _ENGINES.get((kind, fmt), []) if engine.is_available()]
+    preferred = _PREFERRED.get((kind, fmt))
+    chosen = next((engine for engine in candidates if engine.name == preferred), None)
+    if chosen is None and candidates:
+        chosen = max(candidates, key=lambda engine: engine.priority)
+    if chosen is None:
+        raise EngineNotFoundError(kind, fmt)
+    return chosen
+
+
+def load_engine(kind: str, fmt: str) -> Any:
+    """Importa e restituisce l'engine scelto da get_engine"""
+    return get_engine(kind, fmt).load()
+
+
+def yaml_loader() -> Any:
+    """Classe Loader di PyYAML più veloce disponibile (libyaml se compilato)"""
+    return load_engine('yaml_loader', 'yaml')
+
+
+def _has_libyaml() -> bool:
+    import yaml
+    return bool(getattr(yaml, '__with_libyaml__', False))
+
+
+# Engine inclusi: a parità di formato la priorità più alta è la più veloce
+register_engine('yaml_loader', 'yaml', 'libyaml', 'yaml:CSafeLoader', priority=100, available=_has_libyaml)
+register_engine('yaml_loader', 'yaml', 'pyyaml', 'yaml:SafeLoader')
+register_engine('reader', 'xlsx', 'openpyxl', 'yamlconverter.converters.custom_excel_to_yaml:open_xlsx_rows')
+register_engine('writer', 'xlsx', 'openpyxl', 'yamlconverter.converters.engines:write_xlsx_rows')
+for _fmt in ('csv', 'tsv'):
+    register_engine('reader', _fmt, 'csv', 'yamlconverter.converters.engines:open_csv_rows')
+    register_engine('writer', _fmt, 'csv', 'yamlconverter.converters.engines:write_csv_table')
+register_engine('reader', 'ndjson', 'json', 'yamlconverter.converters.engines:open_ndjson_rows')
+register_engine('writer', 'ndjson', 'json', 'yamlconverter.converters.engines:write_ndjson_table')
+register_engine('reader', 'ndjson', 'orjson', 'yamlconverter.converters.engines:open_ndjson_rows_orjson',
+                priority=100, requires=['orjson'])
+register_engine('writer', 'ndjson', 'orjson', 'yamlconverter.converters.engines:write_ndjson_table_orjson',
+                priority=100, requires=['orjson'])
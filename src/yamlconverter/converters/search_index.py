@@ -0,0 +1,334 @@
+"""
+YAML ↔ Excel Converter - Search index
+Modulo per l'indice SQLite FTS5 persistente di connessioni e placeholder dei
+secret di molte rlist (YAML, Excel/CSV/NDJSON o .gpg), senza memorizzare i valori
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from yamlconverter.converters.custom_excel_to_yaml import connection_name_of
+from yamlconverter.converters.readers import open_rows
+from yamlconverter.utils.formats import is_table_path, is_yaml_path, strip_gpg_extension
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.metrics import inc
+
+# File dell'indice usato se non ne viene indicato un altro
+DEFAULT_INDEX_FILE = '.yamlconverter-index.sqlite'
+
+# Formati di output dei risultati di ricerca
+SEARCH_FORMATS = ['text', 'json']
+
+# Numero massimo di risultati di una ricerca
+SEARCH_LIMIT = 1000
+
+# Dimensione dei blocchi letti per calcolare l'hash dei file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Il tokenizer trigram permette la ricerca di sottostringhe di almeno 3 caratteri
+# (es: "API_KEY" trova "$$API_KEY$$"), senza distinzione tra maiuscole e minuscole
+_TRIGRAM_MIN_LENGTH = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    row INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    connection TEXT NOT NULL,
+    secret TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_file_idx ON entries (file_id);
+CREATE INDEX IF NOT EXISTS entries_connection_idx ON entries (connection);
+CREATE INDEX IF NOT EXISTS entries_secret_idx ON entries (secret);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5 (
+    connection, secret, content='entries', content_rowid='id', tokenize='trigram'
+);
+"""
+
+
+def open_index(index_file: str) -> sqlite3.Connection:
+    """Apre (creandolo se necessario) il database dell'indice"""
+    db = sqlite3.connect(index_file)
+    db.executescript(_SCHEMA)
+    return db
+
+
+def file_digest(path: str) -> str:
+    """Hash BLAKE2b del contenuto del file, letto a blocchi"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_rlist_path(path: str) -> bool:
+    """Verifica se il path è una rlist indicizzabile (YAML, tabella o .gpg di entrambi)"""
+    return is_yaml_path(path) or is_table_path(strip_gpg_extension(path))
+
+
+def iter_rlist_files(roots: Iterable[str], exclude: Iterable[str] = ()) -> Iterator[str]:
+    """
+    Percorre file e cartelle restituendo i path assoluti delle rlist.
+
+    Le cartelle nascoste (es: .git) vengono saltate.
+
+    Args:
+        roots: File o cartelle da percorrere
+        exclude: Path assoluti da escludere (es: il file dell'indice)
+
+    Yields:
+        Path assoluti normalizzati, in ordine alfabetico per cartella
+    """
+    excluded = {os.path.abspath(path) for path in exclude}
+    for root in roots:
+        root = os.path.abspath(root)
+        if os.path.isfile(root):
+            if root not in excluded and is_rlist_path(root):
+                yield root
+            continue
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+            for filename in sorted(filenames):
+                path = os.path.join(directory, filename)
+                if path not in excluded and is_rlist_path(path):
+                    yield path
+
+
+def _read_entries(path: str, password: Optional[str], i18n, warnings: List[str]) -> List[tuple]:
+    """Legge le righe di un file restituendo (posizione, Name, connessione, secret), senza valori"""
+    entries = []
+    with open_rows(path, password, i18n, warnings, console=io.StringIO()) as rows:
+        for position, row in enumerate(rows, start=1):
+            name = row.get('Name', '')
+            entries.append((position, name, connection_name_of(name), row.get('Secret', '')))
+    return entries
+
+
+def _delete_file_entries(db: sqlite3.Connection, file_id: int):
+    """Rimuove le voci di un file dall'indice FTS e dalla tabella delle voci"""
+    db.execute("INSERT INTO entries_fts (entries_fts, rowid, connection, secret) "
+               "SELECT 'delete', id, connection, secret FROM entries WHERE file_id = ?", (file_id,))
+    db.execute('DELETE FROM entries WHERE file_id = ?', (file_id,))
+
+
+def _store_file(db: sqlite3.Connection, path: str, stat: os.stat_result, digest: str,
+                entries: List[tuple], file_id: Optional[int]):
+    """Sostituisce, in una transazione, le voci di un file"""
+    with db:
+        if file_id is not None:
+            _delete_file_entries(db, file_id)
+            db.execute('UPDATE files SET mtime_ns = ?, size = ?, hash = ?, rows = ? WHERE id = ?',
+                       (stat.st_mtime_ns, stat.st_size, digest, len(entries), file_id))
+        else:
+            file_id = db.execute('INSERT INTO files (path, mtime_ns, size, hash, rows) VALUES (?, ?, ?, ?, ?)',
+                                 (path, stat.st_mtime_ns, stat.st_size, digest, len(entries))).lastrowid
+        first_id = db.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM entries').fetchone()[0]
+        db.executemany('INSERT INTO entries (file_id, row, name, connection, secret) VALUES (?, ?, ?, ?, ?)',
+                       ((file_id,) + entry for entry in entries))
+        db.execute('INSERT INTO entries_fts (rowid, connection, secret) '
+                   'SELECT id, connection, secret FROM entries WHERE file_id = ? AND id >= ?', (file_id, first_id))
+
+
+def update_index(roots: List[str], index_file: str = DEFAULT_INDEX_FILE, password: Optional[str] = None,
+                 i18n=None) -> tuple:
+    """
+    Aggiorna in modo incrementale l'indice delle rlist sotto roots.
+
+    Un file con mtime e dimensione invariati viene saltato senza leggerlo;
+    se cambiano ma l'hash del contenuto è lo stesso viene aggiornato solo
+    mtime. Gli altri file vengono riletti con i reader dei converter (.gpg
+    decrittati in memoria) e ne vengono indicizzati Name, connessione,
+    placeholder e posizione della riga: i valori non vengono mai scritti.
+    I file indicizzati sotto roots che non esistono più vengono rimossi.
+
+    Args:
+        roots: File o cartelle da indicizzare
+        index_file: Path del database dell'indice
+        password: Password GPG per i file .gpg (senza password vengono saltati)
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+
+    Returns:
+        Tupla (success, warnings, error, report) dove report contiene i
+        conteggi 'indexed', 'unchanged', 'removed', 'entries' e la lista 'failed'
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    warnings = []
+    report = {'indexed': 0, 'unchanged': 0, 'removed': 0, 'entries': 0, 'failed': []}
+    try:
+        db = open_index(index_file)
+    except sqlite3.Error as e:
+        return (False, warnings, f"{i18n.t('error_index')} {index_file}: {e}", None)
+
+    try:
+        known = {path: (file_id, mtime_ns, size, digest)
+                 for file_id, path, mtime_ns, size, digest
+                 in db.execute('SELECT id, path, mtime_ns, size, hash FROM files')}
+        seen = set()
+        for path in iter_rlist_files(roots, exclude=[index_file]):
+            seen.add(path)
+            stat = os.stat(path)
+            file_id, mtime_ns, size, digest = known.get(path, (None, None, None, None))
+            if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+                report['unchanged'] += 1
+                continue
+            new_digest = file_digest(path)
+            if new_digest == digest:
+                with db:
+                    db.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?',
+                               (stat.st_mtime_ns, stat.st_size, file_id))
+                report['unchanged'] += 1
+                continue
+            if path.lower().endswith('.gpg') and not password:
+                report['failed'].append(f"{path}: {i18n.t('password_required')}")
+                continue
+            file_warnings = []
+            try:
+                entries = _read_entries(path, password, i18n, file_warnings)
+            except Exception as e:
+                report['failed'].append(f"{path}: {e}")
+                continue
+            warnings.extend(f"[{path}] {warning}" for warning in file_warnings)
+            _store_file(db, path, stat, new_digest, entries, file_id)
+            report['indexed'] += 1
+            report['entries'] += len(entries)
+
+        # File rimossi dalle cartelle indicizzate
+        prefixes = [os.path.join(os.path.abspath(root), '') for root in roots if os.path.isdir(root)]
+        files = [os.path.abspath(root) for root in roots]
+        with db:
+            for path, (file_id, *_rest) in known.items():
+                inside = path in files or any(path.startswith(prefix) for prefix in prefixes)
+                if inside and path not in seen:
+                    _delete_file_entries(db, file_id)
+                    db.execute('DELETE FROM files WHERE id = ?', (file_id,))
+                    report['removed'] += 1
+        inc('cache_hits_total', report['unchanged'], cache='index')
+        inc('cache_misses_total', report['indexed'], cache='index')
+        return (True, warnings, None, report)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        error_msg = f"{i18n.t('error_index')} {index_file}: {e}\n\n{i18n.t('error_details')}:\n{error_details}"
+        return (False, warnings, error_msg, None)
+    finally:
+        db.close()
+
+
+def _fts_phrase(text: str) -> str:
+    """Quota il testo come frase FTS5 (i doppi apici interni vengono raddoppiati)"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def search_index(index_file: str = DEFAULT_INDEX_FILE, text: Optional[str] = None,
+                 connection: Optional[str] = None, secret: Optional[str] = None,
+                 exact: bool = False, limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Cerca nell'indice le righe che corrispondono ai criteri (in AND).
+
+    Senza exact i criteri sono sottostringhe senza distinzione tra maiuscole
+    e minuscole, risolte con l'indice trigram (i testi più corti di 3
+    caratteri richiedono una scansione); con exact si confronta il testo
+    intero usando gli indici su connessione e secret.
+
+    Args:
+        index_file: Path del database dell'indice
+        text: Testo cercato sia nei nomi di connessione che nei placeholder
+        connection: Nome (o parte del nome) della connessione
+        secret: Placeholder (o parte del placeholder) del secret
+        exact: Confronta il testo intero invece delle sottostringhe
+        limit: Numero massimo di risultati (i primi in ordine di indicizzazione)
+
+    Returns:
+        Lista di {'path', 'row', 'name', 'connection', 'secret'} ordinata per file e riga
+
+    Raises:
+        FileNotFoundError: Se l'indice non esiste
+    """
+    if not os.path.exists(index_file):
+        raise FileNotFoundError(index_file)
+
+    matches = []
+    conditions = []
+    params: List[Any] = []
+    for column, value in (('connection', connection), ('secret', secret), (None, text)):
+        if not value:
+            continue
+        if exact:
+            if column is None:
+                conditions.append('(e.connection = ? OR e.secret = ?)')
+                params.extend([value, value])
+            else:
+                conditions.append(f'e.{column} = ?')
+                params.append(value)
+        elif len(value) >= _TRIGRAM_MIN_LENGTH:
+            phrase = _fts_phrase(value)
+            matches.append(f'{column} : {phrase}' if column else phrase)
+        else:
+            pattern = '%' + value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            if column is None:
+                conditions.append("(e.connection LIKE ? ESCAPE '\\' OR e.secret LIKE ? ESCAPE '\\')")
+                params.extend([pattern, pattern])
+            else:
+                conditions.append(f"e.{column} LIKE ? ESCAPE '\\'")
+                params.append(pattern)
+
+    query = 'SELECT f.path, e.row, e.name, e.connection, e.secret FROM '
+    if matches:
+        query += 'entries_fts JOIN entries e ON e.id = entries_fts.rowid '
+        conditions.insert(0, 'entries_fts MATCH ?')
+        params.insert(0, ' AND '.join(matches))
+    else:
+        query += 'entries e '
+    query += 'JOIN files f ON f.id = e.file_id'
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    # L'ordine delle voci nell'indice permette di fermarsi al limite senza ordinare tutte le corrispondenze
+    query += ' ORDER BY entries_fts.rowid LIMIT ?' if matches else ' ORDER BY e.id LIMIT ?'
+    params.append(limit)
+
+    db = sqlite3.connect(Path(index_file).absolute().as_uri() + '?mode=ro', uri=True)
+    try:
+        results = [{'path': path, 'row': row, 'name': name, 'connection': connection_name, 'secret': secret_name}
+                   for path, row, name, connection_name, secret_name in db.execute(query, params)]
+    finally:
+        db.close()
+    results.sort(key=lambda result: (result['path'], result['row']))
+    return results
+
+
+def format_search_results(results: List[Dict[str, Any]], output_format: str = 'text') -> str:
+    """Formatta i risultati come righe 'path:riga  Name  secret' oppure come JSON"""
+    if output_format == 'json':
+        return json.dumps(results, ensure_ascii=False, indent=2) + '\n'
+    return ''.join(f"{result['path']}:{result['row']}  {result['name']}  {result['secret']}\n"
+                   for result in results)
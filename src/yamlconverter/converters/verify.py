@@ -0,0 +1,324 @@
+"""
+YAML ↔ Excel Converter - Verify
+Modulo per la verifica del round trip YAML → tabella → YAML in memoria,
+tramite digest calcolati in streaming sulle righe Name/Secret/Value
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import io
+import itertools
+import traceback
+from contextlib import ExitStack
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+import yaml
+from yamlconverter.converters.custom_excel_to_yaml import (
+    UngroupedRowsError, format_connection_block, iter_connection_groups, open_table_rows, rebuild_yaml_structure,
+)
+from yamlconverter.converters.custom_yaml_to_excel import iter_name_secret_value
+from yamlconverter.converters.diff import MASK
+from yamlconverter.converters.readers import open_rows
+from yamlconverter.converters.registry import load_engine, yaml_loader
+from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.streams import describe, is_path
+
+# Numero massimo di righe divergenti riportate
+MAX_DIVERGENCES = 5
+
+
+class RowDigest:
+    """
+    Digest incrementale di una sequenza di righe Name/Secret/Value.
+
+    Ogni riga viene codificata in forma canonica (campi separati da \\x1f,
+    righe terminate da \\x1e) e aggiunta a un hash BLAKE2b: due sequenze
+    hanno lo stesso digest solo se contengono le stesse righe nello stesso ordine.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.blake2b(digest_size=16)
+        self.count = 0
+
+    def update(self, row: Dict[str, str]):
+        """Aggiunge una riga al digest"""
+        self._hash.update(f"{row['Name']}\x1f{row['Secret']}\x1f{row['Value']}\x1e".encode('utf-8'))
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        """Digest esadecimale delle righe aggiunte"""
+        return self._hash.hexdigest()
+
+    def tee(self, rows: Iterable[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        """Restituisce le righe aggiornando il digest man mano che vengono lette"""
+        for row in rows:
+            self.update(row)
+            yield row
+
+
+def _write_table(rows: Iterable[Dict[str, str]], fmt: str) -> IO:
+    """Scrive le righe nel formato tabellare in un buffer in memoria (riposizionato all'inizio)"""
+    buffer = io.BytesIO()
+    load_engine('writer', fmt)(rows, buffer, fmt)
+    buffer.seek(0)
+    return buffer
+
+
+def _read_table(stack: ExitStack, buffer: IO, fmt: str, i18n) -> Iterator[Dict[str, str]]:
+    """Rilegge le righe del buffer tabellare con il reader del converter"""
+    buffer.seek(0)
+    return open_table_rows(stack, buffer, fmt, True, False, None, i18n)[0]
+
+
+def _masked(row: Optional[Dict[str, str]], show_values: bool) -> Optional[Dict[str, str]]:
+    """Copia della riga con il valore mascherato (None per righe mancanti)"""
+    if row is None or show_values:
+        return row
+    return dict(row, Value=MASK)
+
+
+def _differing_fields(left: Optional[Dict[str, str]], right: Optional[Dict[str, str]]) -> List[str]:
+    """Campi che differiscono tra due righe (tutti quelli della riga presente se l'altra manca)"""
+    if left is None or right is None:
+        return list(left or right or {})
+    return [field for field in ('Name', 'Secret', 'Value') if left.get(field) != right.get(field)]
+
+
+def first_divergences(expected: Iterable[Dict[str, str]], actual: Iterable[Dict[str, str]],
+                      limit: int = MAX_DIVERGENCES, show_values: bool = False) -> List[Dict[str, Any]]:
+    """
+    Confronta due sequenze di righe in parallelo e restituisce le prime divergenze.
+
+    Args:
+        expected: Righe attese
+        actual: Righe ottenute
+        limit: Numero massimo di divergenze restituite
+        show_values: Riporta i valori in chiaro invece di MASK
+
+    Returns:
+        Lista di {'index', 'expected', 'actual', 'fields'}: righe None se mancanti,
+        'fields' i campi divergenti (con i valori mascherati due righe che
+        differiscono solo nel Value verrebbero mostrate identiche)
+    """
+    divergences = []
+    for index, (left, right) in enumerate(itertools.zip_longest(expected, actual)):
+        if left != right:
+            divergences.append({'index': index, 'expected': _masked(left, show_values),
+                                'actual': _masked(right, show_values), 'fields': _differing_fields(left, right)})
+            if len(divergences) >= limit:
+                break
+    return divergences
+
+
+def _round_trip_connections(connections: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+    """Righe del YAML generato per le connessioni, rianalizzato un blocco di connessione alla volta"""
+    for conn_name, items in connections.items():
+        block = '\n'.join(['Connections:'] + format_connection_block(conn_name, items)) + '\n'
+        yield from iter_name_secret_value(yaml.load(block, Loader=yaml_loader()) or {})
+
+
+def verify_table(source_digest: RowDigest, open_table: Callable[[ExitStack], Iterable[Dict[str, str]]],
+                 source_rows: Optional[Callable[[], Iterable[Dict[str, str]]]] = None, show_values: bool = False,
+                 max_divergences: int = MAX_DIVERGENCES) -> Dict[str, Any]:
+    """
+    Confronta le righe scritte in una tabella con quelle della tabella riletta
+    e del YAML ricostruito da essa.
+
+    La tabella viene riletta con il reader del converter e ricostruita in YAML
+    una connessione alla volta (come write_yaml_streaming): ogni blocco viene
+    formattato, rianalizzato e appiattito, senza tenere in memoria la
+    struttura o il testo del YAML intero (solo se le righe non sono
+    raggruppate per connessione la struttura viene ricostruita per intero).
+    Le sequenze vengono confrontate solo tramite digest; se differiscono la
+    tabella (e, per la fase yaml_to_table, source_rows) viene riletta per
+    individuare le prime righe divergenti.
+
+    Args:
+        source_digest: Digest delle righe scritte nella tabella
+        open_table: Funzione che apre le righe della tabella (nello stack dato)
+        source_rows: Funzione che restituisce di nuovo le righe scritte (None se
+                     non possono essere rilette: le divergenze non vengono elencate)
+        show_values: Riporta i valori in chiaro nelle divergenze
+        max_divergences: Numero massimo di divergenze riportate
+
+    Returns:
+        Dizionario con 'ok', 'rows', 'digests' (per 'source', 'table' e
+        'round_trip'), 'stage' (prima fase divergente o None) e 'divergences'
+    """
+    table_digest = RowDigest()
+    round_trip_digest = RowDigest()
+    try:
+        with ExitStack() as stack:
+            for _name, group in iter_connection_groups(table_digest.tee(open_table(stack))):
+                for row in _round_trip_connections(rebuild_yaml_structure(group)['Connections']):
+                    round_trip_digest.update(row)
+    except UngroupedRowsError:
+        table_digest = RowDigest()
+        round_trip_digest = RowDigest()
+        with ExitStack() as stack:
+            structure = rebuild_yaml_structure(table_digest.tee(open_table(stack)))
+        for row in _round_trip_connections(structure['Connections']):
+            round_trip_digest.update(row)
+        del structure
+
+    digests = {'source': source_digest.hexdigest(), 'table': table_digest.hexdigest(),
+               'round_trip': round_trip_digest.hexdigest()}
+    result = {'ok': True, 'rows': source_digest.count, 'digests': digests, 'stage': None, 'divergences': []}
+    if digests['source'] == digests['table'] == digests['round_trip']:
+        return result
+
+    # Individua la prima fase divergente e le relative righe
+    result['ok'] = False
+    with ExitStack() as stack:
+        if digests['source'] != digests['table']:
+            result['stage'] = 'yaml_to_table'
+            if source_rows is not None:
+                result['divergences'] = first_divergences(source_rows(), open_table(stack), max_divergences,
+                                                          show_values)
+        else:
+            result['stage'] = 'table_to_yaml'
+            structure = rebuild_yaml_structure(open_table(stack))
+            result['divergences'] = first_divergences(open_table(stack),
+                                                      _round_trip_connections(structure['Connections']),
+                                                      max_divergences, show_values)
+    return result
+
+
+def verify_rows(source_rows: Callable[[], Iterable[Dict[str, str]]], table_format: str = 'xlsx', i18n=None,
+                show_values: bool = False, max_divergences: int = MAX_DIVERGENCES) -> Dict[str, Any]:
+    """
+    Esegue YAML → tabella → YAML in memoria e confronta i digest delle righe.
+
+    Le righe originali passano nel writer tabellare (calcolandone il digest)
+    e il buffer prodotto viene verificato con verify_table.
+
+    Args:
+        source_rows: Funzione che restituisce le righe Name/Secret/Value originali
+                     (richiamata una seconda volta solo in caso di divergenza)
+        table_format: 'xlsx', 'csv', 'tsv' o 'ndjson'
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        show_values: Riporta i valori in chiaro nelle divergenze
+        max_divergences: Numero massimo di divergenze riportate
+
+    Returns:
+        Esito di verify_table
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    source_digest = RowDigest()
+    buffer = _write_table(source_digest.tee(source_rows()), table_format)
+    return verify_table(source_digest, lambda stack: _read_table(stack, buffer, table_format, i18n), source_rows,
+                        show_values, max_divergences)
+
+
+def format_verify_report(result: Dict[str, Any], label: str, i18n=None) -> str:
+    """Formatta l'esito di una verifica (una riga, più le righe divergenti)"""
+    if i18n is None:
+        i18n = get_i18n()
+    if result['ok']:
+        return f"✓ {label}: {i18n.t('verify_ok')} ({result['rows']} {i18n.t('verify_rows')}, {result['digests']['source']})"
+    lines = [f"✗ {label}: {i18n.t('verify_diverged')} ({i18n.t('verify_stage_' + result['stage'])})"]
+    for divergence in result['divergences']:
+        lines.append(f"  #{divergence['index']} ({', '.join(divergence['fields'])}): "
+                     f"{divergence['expected']} != {divergence['actual']}")
+    return '\n'.join(lines)
+
+
+def verify_round_trip(yaml_file: Union[str, IO], password: Optional[str] = None, i18n=None,
+                      table_format: str = 'xlsx', show_values: bool = False,
+                      max_divergences: int = MAX_DIVERGENCES) -> tuple:
+    """
+    Verifica che YAML → tabella → YAML non perda nulla (vedi verify_rows).
+
+    Args:
+        yaml_file: Path (anche .gpg o compresso) o stream del YAML
+        password: Password GPG per input .gpg
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        table_format: Formato tabellare intermedio
+        show_values: Riporta i valori in chiaro nelle divergenze
+        max_divergences: Numero massimo di divergenze riportate
+
+    Returns:
+        Tupla (success, warnings, error, result): success è False solo in caso
+        di errore; l'esito della verifica è result['ok']
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    warnings = []
+    reads = []
+
+    def source_rows() -> Iterator[Dict[str, str]]:
+        # I warning vengono raccolti solo alla prima lettura
+        with open_rows(yaml_file, password, i18n, warnings if not reads else []) as rows:
+            reads.append(True)
+            yield from rows
+
+    try:
+        result = verify_rows(source_rows, table_format, i18n, show_values, max_divergences)
+        return (True, warnings, None, result)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        error_msg = (f"{i18n.t('error_verify')} {describe(yaml_file)}: {e}"
+                     f"\n\n{i18n.t('error_details')}:\n{error_details}")
+        return (False, warnings, error_msg, None)
+
+
+def verify_written_table(source_digest: RowDigest, table_file: str, table_format: str,
+                         yaml_file: Union[str, IO], password: Optional[str] = None, i18n=None,
+                         connection_filter=None, show_values: bool = False,
+                         max_divergences: int = MAX_DIVERGENCES) -> tuple:
+    """
+    Verifica una conversione YAML → tabella appena scritta (convert --verify).
+
+    source_digest contiene le righe passate al writer durante la conversione
+    (opzione row_digest di custom_yaml_to_excel): la tabella scritta viene
+    riletta e verificata con verify_table senza rileggere il YAML, che viene
+    riaperto (se è un file) solo per elencare le righe divergenti.
+
+    Args:
+        source_digest: Digest delle righe scritte dalla conversione
+        table_file: Path della tabella scritta
+        table_format: Formato della tabella
+        yaml_file: Path, stream o '-' del YAML convertito
+        password: Password GPG per input .gpg
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        connection_filter: ConnectionFilter usato dalla conversione (opzionale)
+        show_values: Riporta i valori in chiaro nelle divergenze
+        max_divergences: Numero massimo di divergenze riportate
+
+    Returns:
+        Tupla (success, warnings, error, result) come verify_round_trip
+    """
+    if i18n is None:
+        i18n = get_i18n()
+
+    def source_rows() -> Iterator[Dict[str, str]]:
+        with open_rows(yaml_file, password, i18n, [], connection_filter=connection_filter) as rows:
+            yield from rows
+
+    def open_table(stack: ExitStack) -> Iterator[Dict[str, str]]:
+        return open_table_rows(stack, table_file, table_format, True, False, None, i18n)[0]
+
+    try:
+        result = verify_table(source_digest, open_table, source_rows if is_path(yaml_file) else None,
+                              show_values, max_divergences)
+        return (True, [], None, result)
+    except Exception as e:
+        error_details = traceback.format_exc()
+        error_msg = (f"{i18n.t('error_verify')} {describe(table_file)}: {e}"
+                     f"\n\n{i18n.t('error_details')}:\n{error_details}")
+        return (False, [], error_msg, None)
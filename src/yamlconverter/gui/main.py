@@ -21,12 +21,22 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 import platform
+import queue
 import traceback
 from tkinterdnd2 import TkinterDnD, DND_FILES
 from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
 from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
-from yamlconverter.utils.gpg_utils import decrypt_file, encrypt_file
+from yamlconverter.converters.pipeline import convert_file, encrypted_output_path
+from yamlconverter.converters.planner import format_plan, plan_conversion
+from yamlconverter.converters.registry import load_plugins
+from yamlconverter.utils.formats import (
+    COMPRESSION_EXTENSIONS, TABLE_EXTENSIONS, YAML_EXTENSIONS, describe_supported_formats,
+    format_extension, suggest_output_path,
+)
+from yamlconverter.utils.gpg_utils import GPG_PROFILES, decrypt_file, encrypt_file, is_encrypted_file
 from yamlconverter.utils.i18n import get_i18n, set_language
+from yamlconverter.utils.profiling import Profiler
+from yamlconverter.utils.watcher import ConversionWatcher
 
 # Prova a importare sv_ttk per temi moderni (opzionale)
 try:
@@ -53,8 +63,13 @@ class YAMLExcelConverterApp:
         self.output_file = tk.StringVar()
         self.conversion_mode = tk.StringVar(value="yaml_to_excel")
         self.use_gpg_encrypt = tk.BooleanVar(value=False)
+        self.gpg_profile = tk.StringVar(value='default')
         self.gpg_password = tk.StringVar()
         self.show_password = tk.BooleanVar(value=False)
+        self.watch_enabled = tk.BooleanVar(value=False)
+        self.profile_enabled = tk.BooleanVar(value=False)
+        self.watcher = None
+        self.watch_queue = queue.Queue()
         # Imposta la lingua corrente in base alla lingua del sistema
         self.current_language = tk.StringVar(value=self.i18n.language)
         
@@ -228,6 +243,13 @@ class YAMLExcelConverterApp:
                        variable=self.use_gpg_encrypt, command=self.update_output_extension)
         self.encrypt_check.pack(side=tk.LEFT)
         
+        # Profilo di cifratura (velocità/dimensione dell'output)
+        self.gpg_profile_label = ttk.Label(self.encrypt_frame, text=self.i18n.t("gpg_profile"))
+        self.gpg_profile_label.pack(side=tk.LEFT, padx=(20, 5))
+        self.gpg_profile_combo = ttk.Combobox(self.encrypt_frame, textvariable=self.gpg_profile,
+                                              values=list(GPG_PROFILES), state='readonly', width=10)
+        self.gpg_profile_combo.pack(side=tk.LEFT)
+        
         # Frame per password encrypt (dinamico, inizialmente nascosto)
         self.password_encrypt_frame = ttk.Frame(main_frame)
         self.password_encrypt_frame.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 10))
@@ -245,10 +267,22 @@ class YAMLExcelConverterApp:
         
         self.password_encrypt_frame.columnconfigure(1, weight=1)
         
-        # Pulsante di conversione
-        self.convert_btn = ttk.Button(main_frame, text=self.i18n.t("convert"), command=self.convert, 
+        # Pulsante di conversione e toggle di monitoraggio
+        action_frame = ttk.Frame(main_frame)
+        action_frame.grid(row=9, column=0, columnspan=3, pady=30)
+        
+        self.convert_btn = ttk.Button(action_frame, text=self.i18n.t("convert"), command=self.convert, 
                                 style='Accent.TButton')
-        self.convert_btn.grid(row=9, column=0, columnspan=3, pady=30, ipadx=20, ipady=5)
+        self.convert_btn.pack(side=tk.LEFT, ipadx=20, ipady=5)
+        
+        self.watch_check = ttk.Checkbutton(action_frame, text=self.i18n.t("watch_toggle"),
+                                           variable=self.watch_enabled, command=self.toggle_watch)
+        self.watch_check.pack(side=tk.LEFT, padx=(20, 0))
+        
+        # Profilo della conversione (<output>.trace.json, apribile in Perfetto o chrome://tracing)
+        self.profile_check = ttk.Checkbutton(action_frame, text=self.i18n.t("profile_toggle"),
+                                             variable=self.profile_enabled)
+        self.profile_check.pack(side=tk.LEFT, padx=(20, 0))
         
         # Area di log
         self.log_frame = ttk.LabelFrame(main_frame, text=self.i18n.t("log"), padding="10")
@@ -289,7 +323,10 @@ class YAMLExcelConverterApp:
         self.password_label.config(text=self.i18n.t("gpg_password"))
         self.password_encrypt_label.config(text=self.i18n.t("gpg_password"))
         self.encrypt_check.config(text=self.i18n.t("encrypt_output"))
+        self.gpg_profile_label.config(text=self.i18n.t("gpg_profile"))
         self.convert_btn.config(text=self.i18n.t("convert"))
+        self.watch_check.config(text=self.i18n.t("watch_toggle"))
+        self.profile_check.config(text=self.i18n.t("profile_toggle"))
         self.log_frame.config(text=self.i18n.t("log"))
         
         # Messaggio di cambio lingua
@@ -323,14 +360,19 @@ class YAMLExcelConverterApp:
             self.toggle_password_encrypt_btn.config(text="🔒")
             self.show_password.set(True)
     
+    @staticmethod
+    def _is_encrypted_input(input_path):
+        """Verifica se l'input è cifrato con GPG (estensione .gpg o contenuto)"""
+        return bool(input_path) and (input_path.lower().endswith('.gpg') or is_encrypted_file(input_path))
+    
     def update_password_visibility(self):
         """Mostra/nasconde i campi password in base all'input o encrypt"""
         input_path = self.input_file.get()
         mode = self.conversion_mode.get()
         use_encrypt = self.use_gpg_encrypt.get()
         
-        # Mostra password decrypt se input è .gpg in modalità yaml_to_excel
-        if mode == "yaml_to_excel" and input_path.lower().endswith('.gpg'):
+        # Mostra password decrypt se input è cifrato in modalità yaml_to_excel
+        if mode == "yaml_to_excel" and self._is_encrypted_input(input_path):
             self.password_frame.grid()
         else:
             self.password_frame.grid_remove()
@@ -377,23 +419,23 @@ class YAMLExcelConverterApp:
     
     def detect_conversion_mode(self, input_path, output_path):
         """Rileva e imposta la modalità di conversione in base alle estensioni dei file"""
-        input_ext = os.path.splitext(input_path)[1].lower() if input_path else ''
-        output_ext = os.path.splitext(output_path)[1].lower() if output_path else ''
+        input_ext = format_extension(input_path)
+        output_ext = format_extension(output_path)
         
         # Estensioni valide
-        yaml_exts = ['.yml', '.yaml', '.gpg']
-        excel_exts = ['.xlsx', '.xls']
+        yaml_exts = YAML_EXTENSIONS
+        excel_exts = TABLE_EXTENSIONS
         
         # Valida le estensioni
         valid_input = input_ext in yaml_exts + excel_exts
         valid_output = output_ext in yaml_exts + excel_exts
         
         if not valid_input and input_path:
-            self.log(f"⚠ {self.i18n.t('warning_extension_not_recognized')} ({input_ext}). {self.i18n.t('supported_formats')}: .yml, .yaml, .gpg, .xlsx\n")
+            self.log(f"⚠ {self.i18n.t('warning_extension_not_recognized')} ({input_ext}). {self.i18n.t('supported_formats')}: {describe_supported_formats()}\n")
             return False
         
         if not valid_output and output_path:
-            self.log(f"⚠ {self.i18n.t('warning_extension_not_recognized')} ({output_ext}). {self.i18n.t('supported_formats')}: .yml, .yaml, .gpg, .xlsx\n")
+            self.log(f"⚠ {self.i18n.t('warning_extension_not_recognized')} ({output_ext}). {self.i18n.t('supported_formats')}: {describe_supported_formats()}\n")
             return False
         
         # Se è presente solo l'input, deduce la modalità dall'estensione dell'input
@@ -450,22 +492,9 @@ class YAMLExcelConverterApp:
             self.log(f"{self.i18n.t('input_file_dropped')}: {file_path}\n")
             
             # Suggerisce automaticamente il file di output (stessa logica di browse_input)
-            base_name = os.path.splitext(file_path)[0]
-            input_ext = os.path.splitext(file_path)[1].lower()
-            
-            # Se il file è .gpg, rimuove anche l'estensione .yml/.yaml dal base_name
-            if input_ext == '.gpg':
-                # Controlla se il base_name termina con .yml o .yaml
-                if base_name.lower().endswith('.yml'):
-                    base_name = base_name[:-4]
-                elif base_name.lower().endswith('.yaml'):
-                    base_name = base_name[:-5]
-            
-            # Determina l'estensione di output in base all'input
-            if input_ext in ['.yml', '.yaml', '.gpg']:
-                self.output_file.set(os.path.normpath(base_name + ".xlsx"))
-            elif input_ext in ['.xlsx', '.xls']:
-                self.output_file.set(os.path.normpath(base_name + ".yml"))
+            suggested_output = suggest_output_path(file_path)
+            if suggested_output:
+                self.output_file.set(suggested_output)
             
             # Rileva e imposta la modalità di conversione
             self.detect_conversion_mode(file_path, self.output_file.get())
@@ -488,30 +517,18 @@ class YAMLExcelConverterApp:
         mode = self.conversion_mode.get()
         
         if mode == "yaml_to_excel":
-            filetypes = [("YAML files", "*.yaml *.yml *.gpg"), ("All files", "*.*")]
+            compressed = ' '.join(f"*.yml{ext} *.yaml{ext}" for ext in COMPRESSION_EXTENSIONS)
+            filetypes = [("YAML files", f"*.yaml *.yml *.gpg {compressed}"), ("All files", "*.*")]
         else:
-            filetypes = [("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+            filetypes = [("Excel files", "*.xlsx *.xls"), ("CSV/TSV files", "*.csv *.tsv"), ("NDJSON files", "*.ndjson *.jsonl"), ("All files", "*.*")]
         
         filename = filedialog.askopenfilename(title="Seleziona file di input", filetypes=filetypes)
         if filename:
             self.input_file.set(filename)
             # Suggerisce un nome per l'output
-            base_name = os.path.splitext(filename)[0]
-            input_ext = os.path.splitext(filename)[1].lower()
-            
-            # Se il file è .gpg, rimuove anche l'estensione .yml/.yaml dal base_name
-            if input_ext == '.gpg':
-                # Controlla se il base_name termina con .yml o .yaml
-                if base_name.lower().endswith('.yml'):
-                    base_name = base_name[:-4]
-                elif base_name.lower().endswith('.yaml'):
-                    base_name = base_name[:-5]
-            
-            # Determina l'estensione di output in base all'input
-            if input_ext in ['.yml', '.yaml', '.gpg']:
-                self.output_file.set(os.path.normpath(base_name + ".xlsx"))
-            elif input_ext in ['.xlsx', '.xls']:
-                self.output_file.set(os.path.normpath(base_name + ".yml"))
+            suggested_output = suggest_output_path(filename)
+            if suggested_output:
+                self.output_file.set(suggested_output)
             
             self.log(f"{self.i18n.t('input_file_selected')}: {filename}\n")
             
@@ -523,7 +540,7 @@ class YAMLExcelConverterApp:
         mode = self.conversion_mode.get()
         
         if mode == "yaml_to_excel":
-            filetypes = [("Excel files", "*.xlsx"), ("All files", "*.*")]
+            filetypes = [("Excel files", "*.xlsx"), ("CSV/TSV files", "*.csv *.tsv"), ("NDJSON files", "*.ndjson *.jsonl"), ("All files", "*.*")]
             default_ext = ".xlsx"
         else:
             filetypes = [("YAML files", "*.yaml *.yml"), ("All files", "*.*")]
@@ -553,7 +570,7 @@ class YAMLExcelConverterApp:
         password = self.gpg_password.get()
         
         # Determina se input è crittografato
-        input_is_encrypted = input_file.lower().endswith('.gpg')
+        input_is_encrypted = self._is_encrypted_input(input_file)
         
         # Determina il path del file in chiaro (senza .gpg)
         if output_file.lower().endswith('.gpg'):
@@ -621,6 +638,7 @@ class YAMLExcelConverterApp:
             self.log(f"{self.i18n.t('encrypt_output_label')}: {self.i18n.t('yes')}\n")
         self.log(f"{'='*50}\n")
         
+        profiler = Profiler().start() if self.profile_enabled.get() else None
         try:
             success = False
             warnings = []
@@ -652,10 +670,15 @@ class YAMLExcelConverterApp:
             # Il file in chiaro sarà sempre salvato nel path senza .gpg
             actual_output = clear_output_file
             
+            # Strategia scelta dal planner in base alla stima di righe e memoria
+            plan = plan_conversion(actual_input if mode == "yaml_to_excel" else input_file, mode)
+            self.log(f"{format_plan(plan, self.i18n)}\n")
+            
             # Esegui conversione (sempre custom format)
             if mode == "yaml_to_excel":
                 self.log(f"{self.i18n.t('conversion_with_format')}\n")
-                success, warnings, error_msg = custom_yaml_to_excel(actual_input, output_file, self.i18n)
+                success, warnings, error_msg = custom_yaml_to_excel(actual_input, output_file, self.i18n,
+                                                                    **plan['options'])
                 if warnings:
                     for warning in warnings:
                         self.log(warning + "\n")
@@ -663,7 +686,8 @@ class YAMLExcelConverterApp:
                     self.log(f"✗ {error_msg}\n")
             else:  # excel_to_yaml
                 self.log(f"{self.i18n.t('conversion_with_format')}\n")
-                success, warnings, error_msg = custom_excel_to_yaml(input_file, actual_output, self.i18n)
+                success, warnings, error_msg = custom_excel_to_yaml(input_file, actual_output, self.i18n,
+                                                                    **plan['options'])
                 if warnings:
                     for warning in warnings:
                         self.log(warning + "\n")
@@ -678,7 +702,8 @@ class YAMLExcelConverterApp:
                 with open(clear_output_file, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
-                success_encrypt, error = encrypt_file(content, output_file, password, self.i18n)
+                success_encrypt, error = encrypt_file(content, output_file, password, self.i18n,
+                                                      self.gpg_profile.get())
                 
                 if not success_encrypt:
                     self.log(f"✗ {self.i18n.t('error_occurred')}:\n{error}\n")
@@ -702,6 +727,91 @@ class YAMLExcelConverterApp:
             self.log(f"✗ {self.i18n.t('error_occurred')}: {str(e)}\n")
             self.log("\n" + error_details + "\n")
             messagebox.showerror(self.i18n.t("error"), f"{self.i18n.t('error_occurred')}:\n{str(e)}")
+        finally:
+            if profiler is not None:
+                profiler.stop()
+                self.write_profile(profiler, clear_output_file + '.trace.json')
+    
+    def write_profile(self, profiler, profile_file):
+        """Scrive il profilo della conversione e ne riporta il path nel log"""
+        try:
+            profiler.write(profile_file)
+            self.log(f"{self.i18n.t('profile_written')}: {profile_file}\n")
+        except OSError as e:
+            self.log(f"✗ {self.i18n.t('error_profile')} {profile_file}: {e}\n")
+    
+    def toggle_watch(self):
+        """Avvia/ferma il monitoraggio del file di input con riconversione automatica"""
+        if not self.watch_enabled.get():
+            self.stop_watch()
+            return
+        
+        input_file = self.input_file.get()
+        output_file = self.output_file.get()
+        mode = self.conversion_mode.get()
+        use_encrypt = self.use_gpg_encrypt.get() and mode == "excel_to_yaml"
+        password = self.gpg_password.get()
+        gpg_profile = self.gpg_profile.get()
+        
+        # Validazione (stesse regole di convert)
+        if not input_file or not output_file:
+            messagebox.showerror(self.i18n.t("error"), self.i18n.t("input_file_required") + " / " + self.i18n.t("output_file_required"))
+            self.watch_enabled.set(False)
+            return
+        if not os.path.exists(input_file):
+            messagebox.showerror(self.i18n.t("error"), self.i18n.t("file_not_found"))
+            self.watch_enabled.set(False)
+            return
+        if (self._is_encrypted_input(input_file) or use_encrypt) and not password:
+            messagebox.showerror(self.i18n.t("error"), self.i18n.t("password_required"))
+            self.watch_enabled.set(False)
+            return
+        
+        def job(path):
+            return convert_file(path, output_file, mode=mode, password=password,
+                                encrypt=use_encrypt, i18n=self.i18n, gpg_profile=gpg_profile)
+        
+        # File effettivamente scritto (con la cifratura convert_file aggiunge .gpg):
+        # il watcher lo usa per ignorare gli eventi generati dalle proprie scritture
+        written_output = encrypted_output_path(output_file) if use_encrypt else output_file
+        
+        # I risultati arrivano dai thread del watcher: passano da una coda
+        # perché Tk può essere aggiornato solo dal thread principale
+        self.watcher = ConversionWatcher(
+            [input_file], job, output_for=lambda path: written_output,
+            max_workers=1, on_result=lambda path, result: self.watch_queue.put((path, result)),
+        )
+        self.watcher.start()
+        self.log(f"{self.i18n.t('watch_started')}: {input_file} ({self.i18n.t('watch_backend')}: {self.watcher.backend_name})\n")
+        self.root.after(300, self.poll_watch_queue)
+    
+    def stop_watch(self):
+        """Ferma il monitoraggio se attivo"""
+        if self.watcher is not None:
+            self.watcher.stop(wait=False)
+            self.watcher = None
+            self.log(f"{self.i18n.t('watch_stopped')}\n")
+    
+    def poll_watch_queue(self):
+        """Riporta nel log i risultati delle riconversioni automatiche"""
+        while True:
+            try:
+                path, (success, warnings, error_msg) = self.watch_queue.get_nowait()
+            except queue.Empty:
+                break
+            for warning in warnings or []:
+                self.log(warning + "\n")
+            if success:
+                self.log(f"✓ {self.i18n.t('watch_file_changed')}: {path} -> {self.output_file.get()}\n")
+            else:
+                self.log(f"✗ {self.i18n.t('conversion_failed')}\n{error_msg or ''}\n")
+        if self.watcher is not None:
+            self.root.after(300, self.poll_watch_queue)
+    
+    def on_close(self):
+        """Chiusura della finestra: ferma il monitoraggio prima di uscire"""
+        self.stop_watch()
+        self.root.destroy()
 
 
 
@@ -709,6 +819,10 @@ def main():
     """Funzione principale"""
     import sys
     import os
+    import multiprocessing
+    
+    # Necessario per i process pool negli eseguibili PyInstaller
+    multiprocessing.freeze_support()
     
     # Fix per PyInstaller: configura il percorso di tkdnd
     if getattr(sys, 'frozen', False):
@@ -744,6 +858,9 @@ def main():
         
         tkinterdnd2.TkinterDnD.Tk.__init__ = patched_init
     
+    # Carica i plugin prima della GUI, così i formati aggiunti compaiono nei filtri
+    load_plugins()
+    
     root = TkinterDnD.Tk()
     
     # Log informazioni sul tema per debug
@@ -752,6 +869,7 @@ def main():
     print(f"[INFO] sv_ttk disponibile: {SV_TTK_AVAILABLE}")
     
     app = YAMLExcelConverterApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
 
 
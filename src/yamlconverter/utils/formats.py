@@ -0,0 +1,259 @@
+"""
+YAML ↔ Excel Converter - Formats
+Modulo per il riconoscimento dei formati dei file in base all'estensione
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+from typing import Dict, List, Optional
+
+# Estensioni valide
+YAML_EXTENSIONS = ['.yml', '.yaml', '.gpg']
+EXCEL_EXTENSIONS = ['.xlsx', '.xls']
+CSV_EXTENSIONS = ['.csv', '.tsv']
+NDJSON_EXTENSIONS = ['.ndjson', '.jsonl']
+
+# Formati tabellari Name/Secret/Value (lato "Excel" della conversione)
+TEXT_TABLE_EXTENSIONS = CSV_EXTENSIONS + NDJSON_EXTENSIONS
+TABLE_EXTENSIONS = EXCEL_EXTENSIONS + TEXT_TABLE_EXTENSIONS
+TABLE_FORMATS = ['xlsx', 'csv', 'tsv', 'ndjson']
+
+# Formati tabellari aggiunti dai plugin: estensione -> formato (vedi register_table_format)
+_PLUGIN_TABLE_EXTENSIONS: Dict[str, str] = {}
+
+# Estensioni di compressione ammesse dopo .yml/.yaml e i formati tabellari testuali (es: secrets.rlist.yml.gz)
+COMPRESSION_EXTENSIONS = ['.gz', '.xz', '.zst']
+
+
+def register_table_format(fmt: str, extensions: List[str]):
+    """
+    Aggiunge un formato tabellare (es: da un plugin, vedi registry.py).
+
+    Le liste di estensioni e formati vengono estese sul posto, così i moduli
+    che le hanno già importate vedono il nuovo formato.
+
+    Args:
+        fmt: Nome del formato (es: 'psv')
+        extensions: Estensioni del formato (es: ['.psv'])
+    """
+    if fmt not in TABLE_FORMATS:
+        TABLE_FORMATS.append(fmt)
+    for extension in extensions:
+        extension = extension.lower()
+        _PLUGIN_TABLE_EXTENSIONS[extension] = fmt
+        for extension_list in (TEXT_TABLE_EXTENSIONS, TABLE_EXTENSIONS):
+            if extension not in extension_list:
+                extension_list.append(extension)
+
+
+def get_extension(path: str) -> str:
+    """
+    Restituisce l'estensione del file in minuscolo (es: '.yml').
+
+    Args:
+        path: Path del file
+
+    Returns:
+        Estensione del file oppure stringa vuota
+    """
+    return os.path.splitext(path)[1].lower() if path else ''
+
+
+def split_compression_extension(path: str) -> tuple:
+    """
+    Separa l'estensione di compressione di un file YAML, CSV/TSV o NDJSON compresso.
+
+    Esempi:
+        "secrets.rlist.yml.gz" -> ("secrets.rlist.yml", ".gz")
+        "secrets.rlist.csv.gz" -> ("secrets.rlist.csv", ".gz")
+        "secrets.rlist.yml"    -> ("secrets.rlist.yml", "")
+        "archive.tar.gz"       -> ("archive.tar.gz", "")
+
+    Args:
+        path: Path del file
+
+    Returns:
+        Tupla (path senza compressione, estensione di compressione o stringa vuota)
+    """
+    ext = get_extension(path)
+    if ext in COMPRESSION_EXTENSIONS:
+        base = path[:-len(ext)]
+        if get_extension(base) in ['.yml', '.yaml'] + TEXT_TABLE_EXTENSIONS:
+            return (base, ext)
+    return (path, '')
+
+
+def strip_table_compression(path: str) -> str:
+    """Rimuove l'estensione di compressione da un path tabellare (es: data.csv.gz -> data.csv)"""
+    return split_compression_extension(path)[0]
+
+
+def format_extension(path: str) -> str:
+    """
+    Restituisce l'estensione che identifica il formato, ignorando la compressione.
+
+    Esempi:
+        "secrets.rlist.yml.zst" -> ".yml"
+        "secrets.rlist.xlsx"    -> ".xlsx"
+
+    Args:
+        path: Path del file
+
+    Returns:
+        Estensione del formato in minuscolo oppure stringa vuota
+    """
+    return get_extension(split_compression_extension(path)[0])
+
+
+def is_compressed_path(path: str) -> bool:
+    """Verifica se il path è un file compresso (.yml.gz, .csv.xz, .yml.zst, ...)"""
+    return bool(split_compression_extension(path)[1])
+
+
+def is_yaml_path(path: str) -> bool:
+    """Verifica se il path ha un'estensione YAML (anche criptata .gpg o compressa)"""
+    return format_extension(path) in YAML_EXTENSIONS
+
+
+def is_excel_path(path: str) -> bool:
+    """Verifica se il path ha un'estensione Excel"""
+    return get_extension(path) in EXCEL_EXTENSIONS
+
+
+def is_text_table_path(path: str) -> bool:
+    """Verifica se il path ha un'estensione CSV/TSV/NDJSON (anche compressa)"""
+    return get_extension(strip_table_compression(path)) in TEXT_TABLE_EXTENSIONS
+
+
+def is_table_path(path: str) -> bool:
+    """Verifica se il path è un formato tabellare (Excel, CSV, TSV o NDJSON)"""
+    return is_excel_path(path) or is_text_table_path(path)
+
+
+def table_format(path: str) -> str:
+    """
+    Restituisce il formato tabellare del path.
+
+    Args:
+        path: Path del file
+
+    Returns:
+        'csv', 'tsv', 'ndjson', un formato registrato da un plugin oppure
+        'xlsx' (default per Excel ed estensioni non riconosciute)
+    """
+    ext = get_extension(strip_table_compression(path)) if isinstance(path, str) else ''
+    if ext in CSV_EXTENSIONS:
+        return ext[1:]
+    if ext in NDJSON_EXTENSIONS:
+        return 'ndjson'
+    return _PLUGIN_TABLE_EXTENSIONS.get(ext, 'xlsx')
+
+
+def strip_gpg_extension(path: str) -> str:
+    """
+    Rimuove l'estensione .gpg dal path, se presente.
+
+    Args:
+        path: Path del file
+
+    Returns:
+        Path senza estensione .gpg
+    """
+    return path[:-4] if path.lower().endswith('.gpg') else path
+
+
+def suggest_output_path(input_path: str) -> Optional[str]:
+    """
+    Suggerisce il path di output in base all'estensione dell'input.
+
+    Esempi:
+        "secrets.rlist.yml.gpg" -> "secrets.rlist.xlsx"
+        "secrets.rlist.yml.gz"  -> "secrets.rlist.xlsx"
+        "secrets.rlist.yml"     -> "secrets.rlist.xlsx"
+        "secrets.rlist.xlsx"    -> "secrets.rlist.yml"
+        "secrets.rlist.csv"     -> "secrets.rlist.yml"
+
+    Args:
+        input_path: Path del file di input
+
+    Returns:
+        Path di output suggerito oppure None se l'estensione non è riconosciuta
+    """
+    input_path = split_compression_extension(input_path)[0]
+    base_name = os.path.splitext(input_path)[0]
+    input_ext = get_extension(input_path)
+
+    # Se il file è .gpg, rimuove anche l'estensione .yml/.yaml dal base_name
+    if input_ext == '.gpg':
+        if base_name.lower().endswith('.yml'):
+            base_name = base_name[:-4]
+        elif base_name.lower().endswith('.yaml'):
+            base_name = base_name[:-5]
+
+    # Determina l'estensione di output in base all'input
+    if input_ext in YAML_EXTENSIONS:
+        return os.path.normpath(base_name + ".xlsx")
+    elif input_ext in TABLE_EXTENSIONS:
+        return os.path.normpath(base_name + ".yml")
+    return None
+
+
+def describe_supported_formats() -> str:
+    """Restituisce l'elenco delle estensioni supportate da mostrare all'utente"""
+    compressed = [f".yml{ext}" for ext in COMPRESSION_EXTENSIONS]
+    return ', '.join(YAML_EXTENSIONS + compressed + TABLE_EXTENSIONS)
+
+
+def detect_conversion_mode(input_path: str, output_path: str = '') -> Optional[str]:
+    """
+    Rileva la modalità di conversione in base alle estensioni dei file.
+
+    Il lato "Excel" comprende tutti i formati tabellari (xlsx, csv, tsv).
+
+    Se uno dei due path è '-' (stdin/stdout) la modalità viene dedotta
+    dall'estensione dell'altro.
+
+    Args:
+        input_path: Path del file di input
+        output_path: Path del file di output (opzionale)
+
+    Returns:
+        'yaml_to_excel', 'excel_to_yaml' oppure None se non determinabile
+    """
+    if input_path == '-':
+        if is_table_path(output_path):
+            return 'yaml_to_excel'
+        if is_yaml_path(output_path):
+            return 'excel_to_yaml'
+        return None
+    if output_path == '-':
+        output_path = ''
+
+    input_is_yaml = is_yaml_path(input_path)
+    input_is_excel = is_table_path(input_path)
+
+    if output_path:
+        if input_is_yaml and is_table_path(output_path):
+            return 'yaml_to_excel'
+        if input_is_excel and is_yaml_path(output_path):
+            return 'excel_to_yaml'
+        return None
+
+    if input_is_yaml:
+        return 'yaml_to_excel'
+    if input_is_excel:
+        return 'excel_to_yaml'
+    return None
@@ -17,8 +17,153 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import asyncio
+import functools
+import os
+import shutil
+import tempfile
+from typing import IO, Dict, List, Optional, Union
 import gnupg
 from yamlconverter.utils.i18n import get_i18n
+from yamlconverter.utils.metrics import record_gpg
+from yamlconverter.utils.profiling import span
+from yamlconverter.utils.sniff import is_gpg_chain, sniff_file
+
+# Eseguibile GPG usato dalle funzioni asincrone (lo stesso cercato da python-gnupg)
+GPG_BINARY = 'gpg'
+
+# Dimensione dei blocchi scambiati con il processo gpg
+GPG_CHUNK_SIZE = 64 * 1024
+
+# Opzioni comuni: modalità batch, passphrase dalla prima riga di stdin (come python-gnupg)
+_GPG_BASE_ARGS = ['--batch', '--no-tty', '--yes', '--quiet', '--status-fd', '2',
+                  '--pinentry-mode', 'loopback', '--passphrase-fd', '0']
+
+# Profili di cifratura (valori assenti = default di gpg). 'fast' salta la
+# compressione, che sui YAML costa più tempo di quanto ne faccia risparmiare
+# in I/O; 'compact' produce i file più piccoli; 'strong' rende più costoso
+# l'attacco a forza bruta della passphrase (s2k iterato con SHA512)
+GPG_PROFILES: Dict[str, Dict[str, Union[str, int]]] = {
+    'default': {},
+    'fast': {'cipher': 'AES128', 'compress_algo': 'none'},
+    'balanced': {'cipher': 'AES256', 'compress_algo': 'zlib', 'compress_level': 1},
+    'compact': {'cipher': 'AES256', 'compress_algo': 'bzip2', 'compress_level': 9},
+    'strong': {'cipher': 'AES256', 'compress_algo': 'zlib', 'compress_level': 6,
+               's2k_digest': 'SHA512', 's2k_count': 65011712},
+}
+
+GPG_CIPHERS = ['AES', 'AES128', 'AES192', 'AES256', 'TWOFISH', 'CAMELLIA128', 'CAMELLIA192',
+               'CAMELLIA256', 'BLOWFISH', 'CAST5', '3DES']
+GPG_COMPRESS_ALGOS = ['none', 'zip', 'zlib', 'bzip2']
+GPG_S2K_DIGESTS = ['SHA1', 'SHA256', 'SHA384', 'SHA512', 'SHA224', 'RIPEMD160']
+
+# Opzioni di un profilo e corrispondenti opzioni di gpg
+_GPG_PROFILE_OPTIONS = {
+    'cipher': '--cipher-algo',
+    'compress_algo': '--compress-algo',
+    'compress_level': '--compress-level',
+    's2k_mode': '--s2k-mode',
+    's2k_digest': '--s2k-digest-algo',
+    's2k_count': '--s2k-count',
+}
+
+GPGProfile = Union[str, Dict[str, Union[str, int]], None]
+
+
+def _profile_value(key: str, value) -> Union[str, int]:
+    """Valida e normalizza il valore di un'opzione del profilo (ValueError se non valido)"""
+    if key not in _GPG_PROFILE_OPTIONS:
+        raise ValueError(key)
+    if key in ('compress_level', 's2k_mode', 's2k_count'):
+        number = int(value)
+        valid = {'compress_level': 0 <= number <= 9, 's2k_mode': number in (0, 1, 3),
+                 's2k_count': 1024 <= number <= 65011712}[key]
+        if not valid:
+            raise ValueError(f"{key}={value}")
+        return number
+    choices = {'cipher': GPG_CIPHERS, 'compress_algo': GPG_COMPRESS_ALGOS, 's2k_digest': GPG_S2K_DIGESTS}[key]
+    for choice in choices:
+        if str(value).lower() == choice.lower():
+            return choice
+    raise ValueError(f"{key}={value}")
+
+
+def parse_profile(spec: str) -> Dict[str, Union[str, int]]:
+    """
+    Interpreta un profilo dalla riga di comando.
+
+    Lo spec è il nome di un profilo, opzioni 'chiave=valore' o entrambi
+    separati da virgole (es: 'fast', 'compress_algo=zlib,compress_level=1',
+    'strong,s2k_count=1048576'); le opzioni sovrascrivono quelle del profilo.
+
+    Returns:
+        Dizionario delle opzioni del profilo
+
+    Raises:
+        ValueError: Se il profilo o un'opzione non sono validi
+    """
+    profile = {}
+    for item in (part.strip() for part in spec.split(',')):
+        if not item:
+            continue
+        key, equals, value = item.partition('=')
+        if not equals:
+            if item not in GPG_PROFILES:
+                raise ValueError(item)
+            profile.update(GPG_PROFILES[item])
+        else:
+            key = key.strip().replace('-', '_')
+            profile[key] = _profile_value(key, value.strip())
+    return profile
+
+
+def profile_args(profile: GPGProfile = None) -> List[str]:
+    """
+    Opzioni di gpg corrispondenti a un profilo di cifratura.
+
+    Args:
+        profile: Nome in GPG_PROFILES, dizionario di opzioni o None (default di gpg)
+
+    Returns:
+        Lista di argomenti per gpg
+
+    Raises:
+        ValueError: Se il profilo o un'opzione non sono validi
+    """
+    if profile is None:
+        return []
+    if isinstance(profile, str):
+        if profile not in GPG_PROFILES:
+            raise ValueError(profile)
+        profile = GPG_PROFILES[profile]
+    args = []
+    for key, value in profile.items():
+        value = _profile_value(key, value)
+        args.extend([_GPG_PROFILE_OPTIONS[key], str(value)])
+    return args
+
+
+def _metered(operation: str):
+    """
+    Registra nelle metriche ogni chiamata della funzione decorata
+    (sincrona o asincrona) come operazione GPG, e i fallimenti
+    (primo elemento della tupla restituita False).
+    """
+    def decorator(function):
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                result = await function(*args, **kwargs)
+                record_gpg(operation, result[0])
+                return result
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                result = function(*args, **kwargs)
+                record_gpg(operation, result[0])
+                return result
+        return wrapper
+    return decorator
 
 
 def decrypt_file(input_file: str, password: str, i18n=None) -> tuple:
@@ -33,6 +178,29 @@ def decrypt_file(input_file: str, password: str, i18n=None) -> tuple:
     Returns:
         Tupla (success, decrypted_content, error_message)
     """
+    success, data, error = decrypt_bytes(input_file, password, i18n)
+    if not success:
+        return (False, None, error)
+    try:
+        return (True, data.decode('utf-8'), None)
+    except UnicodeDecodeError as e:
+        return (False, None, f"{(i18n or get_i18n()).t('generic_error')}: {str(e)}")
+
+
+@_metered('decrypt')
+def decrypt_bytes(input_file: str, password: str, i18n=None) -> tuple:
+    """
+    Decripta un file GPG con password restituendo i byte in chiaro
+    (per contenuti binari, es: un .xlsx.gpg).
+    
+    Args:
+        input_file: Path del file criptato
+        password: Password per decrittare
+        i18n: Oggetto i18n per la localizzazione (opzionale)
+        
+    Returns:
+        Tupla (success, decrypted_bytes, error_message)
+    """
     if i18n is None:
         i18n = get_i18n()
     
@@ -44,10 +212,11 @@ def decrypt_file(input_file: str, password: str, i18n=None) -> tuple:
             encrypted_data = f.read()
         
         # Decripta
-        decrypted = gpg.decrypt(encrypted_data, passphrase=password)
+        with span('decrypt', bytes=len(encrypted_data)):
+            decrypted = gpg.decrypt(encrypted_data, passphrase=password)
         
         if decrypted.ok:
-            return (True, decrypted.data.decode('utf-8'), None)
+            return (True, decrypted.data, None)
         else:
             return (False, None, f"{i18n.t('gpg_decryption_error')}: {decrypted.status}")
     
@@ -55,7 +224,8 @@ def decrypt_file(input_file: str, password: str, i18n=None) -> tuple:
         return (False, None, f"{i18n.t('generic_error')}: {str(e)}")
 
 
-def encrypt_file(content: str, output_file: str, password: str, i18n=None) -> tuple:
+@_metered('encrypt')
+def encrypt_file(content: str, output_file: str, password: str, i18n=None, profile: GPGProfile = None) -> tuple:
     """
     Cripta un file con password usando GPG (symmetric encryption).
     
@@ -64,6 +234,7 @@ def encrypt_file(content: str, output_file: str, password: str, i18n=None) -> tu
         output_file: Path del file di output
         password: Password per criptare
         i18n: Oggetto i18n per la localizzazione (opzionale)
+        profile: Profilo di cifratura (nome in GPG_PROFILES o dizionario, default di gpg se None)
         
     Returns:
         Tupla (success, error_message)
@@ -75,13 +246,16 @@ def encrypt_file(content: str, output_file: str, password: str, i18n=None) -> tu
         gpg = gnupg.GPG()
         
         # Cripta il contenuto con cifratura simmetrica
-        encrypted = gpg.encrypt(
-            content.encode('utf-8'),
-            recipients=None,
-            symmetric=True,
-            passphrase=password,
-            armor=False  # Output binario
-        )
+        data = content.encode('utf-8')
+        with span('encrypt', bytes=len(data)):
+            encrypted = gpg.encrypt(
+                data,
+                recipients=None,
+                symmetric=True,
+                passphrase=password,
+                armor=False,  # Output binario
+                extra_args=profile_args(profile)
+            )
         
         if encrypted.ok:
             # Scrive il file criptato
@@ -95,9 +269,283 @@ def encrypt_file(content: str, output_file: str, password: str, i18n=None) -> tu
         return (False, f"{i18n.t('generic_error')}: {str(e)}")
 
 
+class GPGProcessError(Exception):
+    """Sollevata quando il processo gpg termina con errore"""
+
+    def __init__(self, status: str):
+        super().__init__(status)
+        self.status = status
+
+
+def _gpg_status(stderr: bytes) -> str:
+    """Ultimo stato significativo dell'output di gpg (come decrypted.status di python-gnupg)"""
+    lines = stderr.decode('utf-8', errors='replace').splitlines()
+    for line in reversed(lines):
+        if line.startswith('[GNUPG:] '):
+            keyword = line[len('[GNUPG:] '):].split(' ', 1)[0]
+            if keyword in ('DECRYPTION_FAILED', 'BAD_PASSPHRASE', 'NODATA', 'FAILURE', 'ERROR'):
+                return keyword.lower().replace('_', ' ')
+    return lines[-1] if lines else ''
+
+
+async def run_gpg(args: list, password: str, source: Union[bytes, IO, asyncio.StreamReader, None] = None,
+                  sink: Optional[IO] = None) -> bytes:
+    """
+    Esegue gpg come sottoprocesso asyncio scambiando i dati a blocchi.
+
+    La passphrase viene scritta come prima riga di stdin, seguita dai dati
+    di source (byte, file binario o StreamReader letti a blocchi); stdout viene scritto
+    su sink man mano che arriva, oppure restituito. Letture e scritture dei
+    file ordinari girano nell'executor di default, così l'event loop non si
+    blocca sul disco. Se il task viene cancellato il processo gpg viene terminato.
+
+    Args:
+        args: Argomenti di gpg dopo le opzioni comuni (es: ['--decrypt', path])
+        password: Passphrase
+        source: Dati da inviare su stdin (opzionale)
+        sink: File binario su cui scrivere stdout (default: restituito come bytes)
+
+    Returns:
+        stdout di gpg (vuoto se è stato scritto su sink)
+
+    Raises:
+        GPGProcessError: Se gpg termina con codice diverso da zero
+    """
+    loop = asyncio.get_running_loop()
+    process = await asyncio.create_subprocess_exec(
+        GPG_BINARY, *_GPG_BASE_ARGS, *args,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+    async def feed():
+        try:
+            process.stdin.write(password.encode('utf-8') + b'\n')
+            if isinstance(source, bytes):
+                for start in range(0, len(source), GPG_CHUNK_SIZE):
+                    process.stdin.write(source[start:start + GPG_CHUNK_SIZE])
+                    await process.stdin.drain()
+            elif isinstance(source, asyncio.StreamReader):
+                # Stdout di un altro processo: i dati passano da un processo all'altro a blocchi
+                while True:
+                    chunk = await source.read(GPG_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+            elif source is not None:
+                while True:
+                    chunk = await loop.run_in_executor(None, source.read, GPG_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # gpg ha chiuso stdin (es: passphrase errata): l'errore arriva dal codice di uscita
+        finally:
+            process.stdin.close()
+
+    async def drain_stdout() -> bytes:
+        chunks = []
+        while True:
+            chunk = await process.stdout.read(GPG_CHUNK_SIZE)
+            if not chunk:
+                return b''.join(chunks)
+            if sink is not None:
+                await loop.run_in_executor(None, sink.write, chunk)
+            else:
+                chunks.append(chunk)
+
+    try:
+        _fed, stdout, stderr = await asyncio.gather(feed(), drain_stdout(), process.stderr.read())
+        returncode = await process.wait()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+        raise
+    if returncode != 0:
+        raise GPGProcessError(_gpg_status(stderr))
+    return stdout
+
+
+@_metered('decrypt')
+async def decrypt_bytes_async(input_file: str, password: str, i18n=None) -> tuple:
+    """
+    Versione asincrona di decrypt_bytes: gpg gira come sottoprocesso asyncio.
+
+    Returns:
+        Tupla (success, decrypted_bytes, error_message)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    try:
+        data = await run_gpg(['--decrypt', input_file], password)
+        return (True, data, None)
+    except GPGProcessError as e:
+        return (False, None, f"{i18n.t('gpg_decryption_error')}: {e.status}")
+    except (OSError, ValueError) as e:
+        return (False, None, f"{i18n.t('generic_error')}: {str(e)}")
+
+
+async def decrypt_file_async(input_file: str, password: str, i18n=None) -> tuple:
+    """
+    Versione asincrona di decrypt_file.
+
+    Returns:
+        Tupla (success, decrypted_content, error_message)
+    """
+    success, data, error = await decrypt_bytes_async(input_file, password, i18n)
+    if not success:
+        return (False, None, error)
+    try:
+        return (True, data.decode('utf-8'), None)
+    except UnicodeDecodeError as e:
+        return (False, None, f"{(i18n or get_i18n()).t('generic_error')}: {str(e)}")
+
+
+def _temp_output(output_file: str) -> tuple:
+    """
+    File temporaneo (fd, path) nella stessa cartella di output_file, con un
+    nome neutro (può contenere anche dati in chiaro) e permessi 0600.
+    """
+    directory = os.path.dirname(os.path.abspath(output_file))
+    return tempfile.mkstemp(prefix='.tmp-', suffix='.tmp', dir=directory)
+
+
+def _replace_output(temp_path: str, output_file: str, mode_source: str):
+    """Sostituisce output_file col temporaneo, con i permessi di mode_source se esiste"""
+    if os.path.exists(mode_source):
+        shutil.copymode(mode_source, temp_path)
+    os.replace(temp_path, output_file)
+
+
+async def _run_gpg_to_file(args: list, password: str, source: Union[bytes, IO, None], output_file: str) -> None:
+    """
+    Esegue gpg scrivendo stdout a blocchi in un file temporaneo nella stessa
+    cartella di output_file, che viene sostituito solo se gpg termina con
+    successo mantenendo i permessi di output_file (0600 per un file nuovo).
+    """
+    fd, temp_path = _temp_output(output_file)
+    try:
+        with os.fdopen(fd, 'wb') as sink:
+            await run_gpg(args, password, source, sink)
+        _replace_output(temp_path, output_file, output_file)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+@_metered('encrypt')
+async def encrypt_bytes_async(data: Union[bytes, IO], output_file: str, password: str, i18n=None,
+                              profile: GPGProfile = None) -> tuple:
+    """
+    Cripta byte (o un file binario letto a blocchi) con cifratura simmetrica.
+
+    L'output di gpg viene scritto a blocchi in un file temporaneo nella
+    stessa cartella e sostituisce output_file solo se gpg termina con successo.
+    profile è il profilo di cifratura, come per encrypt_file.
+
+    Returns:
+        Tupla (success, error_message)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    try:
+        await _run_gpg_to_file(['--symmetric', *profile_args(profile), '--output', '-'], password, data, output_file)
+        return (True, None)
+    except GPGProcessError as e:
+        return (False, f"{i18n.t('gpg_encryption_error')}: {e.status}")
+    except (OSError, ValueError) as e:
+        return (False, f"{i18n.t('generic_error')}: {str(e)}")
+
+
+@_metered('decrypt')
+async def decrypt_to_file_async(input_file: str, output_file: str, password: str, i18n=None) -> tuple:
+    """
+    Decripta un file .gpg direttamente in output_file, a blocchi e senza
+    passare il contenuto in memoria (sostituzione atomica come encrypt_bytes_async).
+
+    Returns:
+        Tupla (success, error_message)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    try:
+        await _run_gpg_to_file(['--decrypt', input_file], password, None, output_file)
+        return (True, None)
+    except GPGProcessError as e:
+        return (False, f"{i18n.t('gpg_decryption_error')}: {e.status}")
+    except (OSError, ValueError) as e:
+        return (False, f"{i18n.t('generic_error')}: {str(e)}")
+
+
+@_metered('rekey')
+async def rekey_file_async(input_file: str, old_password: str, new_password: str,
+                           output_file: Optional[str] = None, i18n=None, profile: GPGProfile = None) -> tuple:
+    """
+    Cambia la passphrase di un file .gpg senza scrivere il contenuto in chiaro.
+
+    Lo stdout di 'gpg --decrypt' con la vecchia passphrase viene passato a
+    blocchi, in memoria, allo stdin di 'gpg --symmetric' con la nuova; il
+    risultato sostituisce output_file (default: input_file) solo se entrambi
+    i processi terminano con successo, con i permessi di input_file.
+    profile è il profilo della nuova cifratura, come per encrypt_file.
+
+    Returns:
+        Tupla (success, error_message)
+    """
+    if i18n is None:
+        i18n = get_i18n()
+    output_file = output_file or input_file
+    temp_path = None
+    decrypt = None
+    stderr_task = None
+    try:
+        encrypt_args = ['--symmetric', *profile_args(profile), '--output', '-']
+        decrypt = await asyncio.create_subprocess_exec(
+            GPG_BINARY, *_GPG_BASE_ARGS, '--decrypt', input_file,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        decrypt.stdin.write(old_password.encode('utf-8') + b'\n')
+        decrypt.stdin.close()
+        stderr_task = asyncio.ensure_future(decrypt.stderr.read())
+
+        fd, temp_path = _temp_output(output_file)
+        with os.fdopen(fd, 'wb') as sink:
+            await run_gpg(encrypt_args, new_password, decrypt.stdout, sink)
+        stderr = await stderr_task
+        if await decrypt.wait() != 0:
+            return (False, f"{i18n.t('gpg_decryption_error')}: {_gpg_status(stderr)}")
+        _replace_output(temp_path, output_file, input_file)
+        return (True, None)
+    except GPGProcessError as e:
+        return (False, f"{i18n.t('gpg_encryption_error')}: {e.status}")
+    except (OSError, ValueError) as e:
+        return (False, f"{i18n.t('generic_error')}: {str(e)}")
+    finally:
+        if decrypt is not None and decrypt.returncode is None:
+            decrypt.kill()
+            await decrypt.wait()
+        if stderr_task is not None and not stderr_task.done():
+            stderr_task.cancel()
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+async def encrypt_file_async(content: str, output_file: str, password: str, i18n=None,
+                             profile: GPGProfile = None) -> tuple:
+    """
+    Versione asincrona di encrypt_file.
+
+    Returns:
+        Tupla (success, error_message)
+    """
+    return await encrypt_bytes_async(content.encode('utf-8'), output_file, password, i18n, profile)
+
+
 def is_encrypted_file(file_path: str) -> bool:
     """
-    Verifica se un file è criptato con GPG.
+    Verifica se un file è criptato con GPG (binario o armored) dal contenuto,
+    indipendentemente dall'estensione (vedi sniff_file).
     
     Args:
         file_path: Path del file da verificare
@@ -105,13 +553,4 @@ def is_encrypted_file(file_path: str) -> bool:
     Returns:
         True se il file è criptato, False altrimenti
     """
-    try:
-        with open(file_path, 'rb') as f:
-            # Legge i primi byte per verificare la firma GPG
-            header = f.read(6)
-            # File GPG iniziano con questi magic bytes
-            # 0x85 = GPG encrypted data packet tag
-            # 0x8c = GPG compressed data packet
-            return header[0] in [0x85, 0x8c] or header.startswith(b'\x84') or header.startswith(b'\x8c')
-    except Exception:
-        return False
+    return is_gpg_chain(sniff_file(file_path))
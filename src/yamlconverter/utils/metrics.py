@@ -0,0 +1,288 @@
+"""
+YAML ↔ Excel Converter - Metrics
+Metriche di un'esecuzione (file convertiti, righe, byte letti/scritti,
+durata delle fasi, cache, operazioni GPG fallite) scritte in modo atomico
+nel formato testuale di Prometheus, per il textfile collector di
+node_exporter: nessun demone, nessuna connessione di rete
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import math
+import os
+import re
+import threading
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from yamlconverter.utils.streams import is_path, write_text_atomic
+
+# Prefisso dei nomi delle metriche
+METRIC_PREFIX = 'yamlconverter_'
+
+# Limiti superiori (secondi) dei bucket degli istogrammi di durata
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+# Metriche note: nome (senza prefisso) -> (tipo, descrizione)
+METRICS = {
+    'files_converted_total': ('counter', 'Files converted by the pipeline, by mode and result'),
+    'rows_total': ('counter', 'Name/Secret/Value rows converted, by mode'),
+    'bytes_in_total': ('counter', 'Bytes of the converted input files, by mode'),
+    'bytes_out_total': ('counter', 'Bytes of the written output files, by mode'),
+    'stage_duration_seconds': ('histogram', 'Duration of the conversion stages, by stage'),
+    'cache_hits_total': ('counter', 'Files served from a cache without being read again, by cache'),
+    'cache_misses_total': ('counter', 'Files that had to be read again, by cache'),
+    'gpg_operations_total': ('counter', 'GPG operations, by operation'),
+    'gpg_failures_total': ('counter', 'Failed GPG operations, by operation'),
+    'run_duration_seconds': ('gauge', 'Duration of the run, by command'),
+    'run_exit_code': ('gauge', 'Exit code of the run, by command'),
+    'run_timestamp_seconds': ('gauge', 'Unix time at the end of the run, by command'),
+}
+
+# Etichette impostate dagli hook e dai bucket degli istogrammi: un'etichetta
+# costante con lo stesso nome le sovrascriverebbe o duplicherebbe
+RESERVED_LABELS = frozenset({'le', 'mode', 'result', 'stage', 'cache', 'operation', 'command'})
+
+_LABEL_NAME_RE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+# Recorder attivo (al massimo uno per processo)
+_ACTIVE = None
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def parse_labels(specs: Iterable[str]) -> Dict[str, str]:
+    """
+    Etichette costanti da specifiche 'chiave=valore' (es: --metrics-label job=nightly).
+
+    Raises:
+        ValueError: Se una specifica non è nel formato chiave=valore o la chiave
+                    non è valida o è riservata (RESERVED_LABELS)
+    """
+    labels = {}
+    for spec in specs:
+        key, equals, value = spec.partition('=')
+        key = key.strip()
+        if not equals or not _LABEL_NAME_RE.match(key) or key.startswith('__') or key in RESERVED_LABELS:
+            raise ValueError(spec)
+        labels[key] = value.strip()
+    return labels
+
+
+def _escape(value: str) -> str:
+    """Valore di un'etichetta con backslash, virgolette e a capo protetti"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    """Etichette nel formato {chiave="valore",...} (vuoto se non ce ne sono)"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Valore numerico nel formato di Prometheus"""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRecorder:
+    """
+    Raccoglie contatori, gauge e istogrammi di un'esecuzione.
+
+    Uso:
+        with MetricsRecorder({'job': 'nightly'}) as recorder:
+            convert_file(...)
+        recorder.write('/var/lib/node_exporter/textfile/yamlconverter.prom')
+
+    Mentre è attivo riceve gli eventi degli hook (inc, observe, Tally,
+    record_conversion, record_gpg) e le durate degli span di fase (vedi
+    profiling.py); il lavoro dei process pool non viene contato.
+    """
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None):
+        self.labels = dict(labels or {})
+        self.values: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> 'MetricsRecorder':
+        """Attiva gli hook (RuntimeError se un altro recorder è attivo)"""
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError('metrics recorder already active')
+        _ACTIVE = self
+        return self
+
+    def stop(self):
+        """Disattiva gli hook"""
+        global _ACTIVE
+        if _ACTIVE is self:
+            _ACTIVE = None
+
+    def __enter__(self) -> 'MetricsRecorder':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _key(self, name: str, labels: Dict[str, Any]) -> Tuple[str, Labels]:
+        """Chiave della serie: nome e etichette (costanti incluse) ordinate"""
+        if name not in METRICS:
+            raise KeyError(name)
+        merged = {**self.labels, **{key: str(value) for key, value in labels.items()}}
+        return (name, tuple(sorted(merged.items())))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Incrementa un contatore"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Imposta un gauge"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.values[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Aggiunge un'osservazione a un istogramma (bucket DURATION_BUCKETS)"""
+        key = self._key(name, labels)
+        with self._lock:
+            # Conteggi per bucket (non cumulativi), somma e numero di osservazioni
+            histogram = self.histograms.setdefault(key, [0] * len(DURATION_BUCKETS) + [0.0, 0])
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def get(self, name: str, **labels) -> float:
+        """Valore corrente di un contatore o gauge (0 se la serie non esiste)"""
+        return self.values.get(self._key(name, labels), 0)
+
+    def render(self) -> str:
+        """Metriche nel formato testuale di Prometheus (textfile collector)"""
+        lines = []
+        with self._lock:
+            for name, (kind, description) in METRICS.items():
+                full_name = METRIC_PREFIX + name
+                if kind == 'histogram':
+                    series = sorted((labels, histogram) for (metric, labels), histogram in self.histograms.items()
+                                    if metric == name)
+                else:
+                    series = sorted((labels, value) for (metric, labels), value in self.values.items()
+                                    if metric == name)
+                if not series:
+                    continue
+                lines.append(f'# HELP {full_name} {description}')
+                lines.append(f'# TYPE {full_name} {kind}')
+                for labels, value in series:
+                    if kind != 'histogram':
+                        lines.append(f'{full_name}{_format_labels(labels)} {_format_value(value)}')
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(DURATION_BUCKETS + (math.inf,), value[:len(DURATION_BUCKETS)] + [0]):
+                        cumulative += count
+                        bucket_labels = labels + (('le', _format_value(bound)),)
+                        lines.append(f'{full_name}_bucket{_format_labels(bucket_labels)} '
+                                     f'{value[-1] if math.isinf(bound) else cumulative}')
+                    lines.append(f'{full_name}_sum{_format_labels(labels)} {_format_value(value[-2])}')
+                    lines.append(f'{full_name}_count{_format_labels(labels)} {value[-1]}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def write(self, path: str):
+        """Scrive le metriche in modo atomico (node_exporter non legge mai un file a metà)"""
+        write_text_atomic(path, self.render())
+
+
+def active_recorder() -> Optional[MetricsRecorder]:
+    """Recorder attivo nel processo (None se le metriche non vengono raccolte)"""
+    return _ACTIVE
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Incrementa un contatore del recorder attivo (nessun effetto senza recorder)"""
+    recorder = _ACTIVE
+    if recorder is not None:
+        recorder.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    """Aggiunge un'osservazione a un istogramma del recorder attivo (nessun effetto senza recorder)"""
+    recorder = _ACTIVE
+    if recorder is not None:
+        recorder.observe(name, value, **labels)
+
+
+class Tally:
+    """
+    Conta gli elementi dell'ultima passata su un iterabile, per gli input
+    che possono essere riletti (es: ripiego della modalità streaming):
+    solo il conteggio della passata completa finisce nelle metriche.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def wrap(self, items: Iterable[Any]) -> Iterable[Any]:
+        """Elementi contati (items invariato senza recorder attivo)"""
+        if _ACTIVE is None:
+            return items
+        return self._iterate(items)
+
+    def _iterate(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Generatore di wrap: azzera il conteggio all'inizio della passata"""
+        self.count = 0
+        for item in items:
+            self.count += 1
+            yield item
+
+
+def _file_size(target: Union[str, IO, None]) -> Optional[int]:
+    """Dimensione di un file (None per stream, '-' o file inesistenti)"""
+    if not is_path(target) or not os.path.isfile(target):
+        return None
+    return os.path.getsize(target)
+
+
+def record_conversion(mode: str, input_file: Union[str, IO], output_file: Union[str, IO, None], success: bool):
+    """
+    Registra una conversione: file convertiti per esito e, per i path su
+    disco, byte dell'input e dell'output scritto.
+    """
+    recorder = _ACTIVE
+    if recorder is None:
+        return
+    recorder.inc('files_converted_total', mode=mode, result='success' if success else 'failure')
+    input_size = _file_size(input_file)
+    if input_size is not None:
+        recorder.inc('bytes_in_total', input_size, mode=mode)
+    output_size = _file_size(output_file) if success else None
+    if output_size is not None:
+        recorder.inc('bytes_out_total', output_size, mode=mode)
+
+
+def record_gpg(operation: str, success: bool):
+    """Registra un'operazione GPG ('decrypt', 'encrypt', 'rekey') e l'eventuale fallimento"""
+    recorder = _ACTIVE
+    if recorder is None:
+        return
+    recorder.inc('gpg_operations_total', operation=operation)
+    if not success:
+        recorder.inc('gpg_failures_total', operation=operation)
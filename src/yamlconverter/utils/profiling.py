@@ -0,0 +1,334 @@
+"""
+YAML ↔ Excel Converter - Profiling
+Profilo di una conversione: span con nome per fase (decrittazione, parsing,
+ricostruzione, scrittura, cifratura) e per batch di connessioni, più gli
+stack Python campionati da un thread, esportati come trace-event JSON di
+Chrome (chrome://tracing, Perfetto) o come file speedscope
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from yamlconverter.utils import metrics
+from yamlconverter.utils.streams import write_text_atomic
+
+# Formati di output del profilo
+PROFILE_FORMATS = ['chrome', 'speedscope']
+
+# Secondi tra due campioni dello stack (il campionatore ottiene il GIL al
+# massimo ogni sys.getswitchinterval(), 5 ms di default, durante il codice Python)
+SAMPLE_INTERVAL = 0.001
+
+# Connessioni per span di batch (vedi traced_batches)
+BATCH_CONNECTIONS = 1000
+
+# Thread fittizio della traccia Chrome su cui vengono disegnati gli stack campionati
+SAMPLES_TID = 0
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+# Profiler attivo (al massimo uno per processo)
+_ACTIVE = None
+
+
+class Span:
+    """Intervallo con nome registrato da span() o traced_batches()"""
+
+    __slots__ = ('name', 'category', 'start', 'end', 'tid', 'args')
+
+    def __init__(self, name: str, category: str, start: float, end: float, tid: int, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = end
+        self.tid = tid
+        self.args = args
+
+
+class Profiler:
+    """
+    Registra gli span delle fasi e campiona lo stack del thread che lo avvia.
+
+    Uso:
+        with Profiler() as profiler:
+            convert_file(...)
+        profiler.write('trace.json')
+
+    Gli span vengono registrati solo nel processo corrente: il lavoro dei
+    process pool (strategia parallela) compare come un'unica fase.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, sampling: bool = True):
+        self.interval = interval
+        self.sampling = sampling
+        self.spans: List[Span] = []
+        self.samples: List[Tuple[float, Tuple[int, ...]]] = []
+        self.frames: List[Tuple[str, str, int]] = []
+        self.thread_names: Dict[int, str] = {}
+        self.origin = 0.0
+        self.finish = 0.0
+        self._frame_ids: Dict[Any, int] = {}
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self) -> 'Profiler':
+        """Attiva gli span e il campionamento (RuntimeError se un altro profiler è attivo)"""
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError('profiler already active')
+        self._thread_id = threading.get_ident()
+        self.thread_names[self._thread_id] = threading.current_thread().name
+        self.origin = time.perf_counter()
+        _ACTIVE = self
+        if self.sampling:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        """Disattiva gli span e attende la fine del campionamento"""
+        global _ACTIVE
+        if _ACTIVE is self:
+            _ACTIVE = None
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        self.finish = time.perf_counter()
+
+    def __enter__(self) -> 'Profiler':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def add_span(self, name: str, category: str, start: float, end: float, args: Dict[str, Any]):
+        """Registra uno span già concluso (tempi di time.perf_counter)"""
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.spans.append(Span(name, category, start, end, tid, args))
+
+    def _frame_id(self, code) -> int:
+        """Indice del frame (funzione, file, riga) di un code object"""
+        frame_id = self._frame_ids.get(code)
+        if frame_id is None:
+            frame_id = self._frame_ids[code] = len(self.frames)
+            self.frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+        return frame_id
+
+    def _sample_loop(self):
+        """Campiona lo stack del thread profilato fino a stop()"""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            self.samples.append((time.perf_counter(), tuple(reversed(stack))))
+
+    def _micros(self, value: float) -> float:
+        """Microsecondi dall'avvio del profiler"""
+        return round((value - self.origin) * 1e6, 3)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Profilo nel formato trace-event di Chrome: uno evento 'X' per span,
+        gli stack campionati come fiamme su un thread separato.
+        """
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'yamlconverter'}}]
+        for tid, name in self.thread_names.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        for item in sorted(self.spans, key=lambda item: (item.start, -item.end)):
+            events.append({'name': item.name, 'cat': item.category, 'ph': 'X', 'pid': pid, 'tid': item.tid,
+                           'ts': self._micros(item.start), 'dur': self._micros(item.end) - self._micros(item.start),
+                           'args': item.args})
+        if self.samples:
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': SAMPLES_TID,
+                           'args': {'name': 'python (sampled)'}})
+            for frame_id, start, end in self._sample_intervals():
+                function, filename, line = self.frames[frame_id]
+                events.append({'name': function, 'cat': 'python', 'ph': 'X', 'pid': pid, 'tid': SAMPLES_TID,
+                               'ts': self._micros(start), 'dur': self._micros(end) - self._micros(start),
+                               'args': {'file': filename, 'line': line}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'exporter': 'yamlconverter'}}
+
+    def _sample_intervals(self) -> Iterator[Tuple[int, float, float]]:
+        """Frame dei campioni come intervalli (frame, inizio, fine): un frame resta aperto finché è nello stack"""
+        opened: List[Tuple[int, float]] = []
+        for timestamp, stack in self.samples:
+            common = 0
+            while common < len(opened) and common < len(stack) and opened[common][0] == stack[common]:
+                common += 1
+            while len(opened) > common:
+                frame_id, start = opened.pop()
+                yield (frame_id, start, timestamp)
+            opened.extend((frame_id, timestamp) for frame_id in stack[common:])
+        end = self.samples[-1][0] + self.interval
+        while opened:
+            frame_id, start = opened.pop()
+            yield (frame_id, start, end)
+
+    def speedscope(self) -> Dict[str, Any]:
+        """
+        Profilo nel formato speedscope: un profilo 'evented' degli span per
+        thread e un profilo 'sampled' degli stack Python.
+        """
+        frames = []
+        span_frames: Dict[str, int] = {}
+        profiles = []
+        end_value = self._micros(self.finish or time.perf_counter())
+        for tid, name in self.thread_names.items():
+            spans = sorted((item for item in self.spans if item.tid == tid), key=lambda item: (item.start, -item.end))
+            if not spans:
+                continue
+            events = []
+            stack: List[Span] = []
+            for item in spans:
+                while stack and stack[-1].end <= item.start:
+                    closed = stack.pop()
+                    events.append({'type': 'C', 'frame': span_frames[closed.name], 'at': self._micros(closed.end)})
+                if item.name not in span_frames:
+                    span_frames[item.name] = len(frames)
+                    frames.append({'name': item.name})
+                events.append({'type': 'O', 'frame': span_frames[item.name], 'at': self._micros(item.start)})
+                stack.append(item)
+            while stack:
+                closed = stack.pop()
+                events.append({'type': 'C', 'frame': span_frames[closed.name], 'at': self._micros(closed.end)})
+            profiles.append({'type': 'evented', 'name': f'{name} (spans)', 'unit': 'microseconds',
+                             'startValue': 0, 'endValue': max(end_value, events[-1]['at']), 'events': events})
+
+        if self.samples:
+            offset = len(frames)
+            frames.extend({'name': function, 'file': filename, 'line': line}
+                          for function, filename, line in self.frames)
+            timestamps = [timestamp for timestamp, _stack in self.samples]
+            weights = [round((after - before) * 1e6, 3) for before, after in zip(timestamps, timestamps[1:])]
+            weights.append(round(self.interval * 1e6, 3))
+            profiles.append({'type': 'sampled', 'name': 'python (sampled)', 'unit': 'microseconds',
+                             'startValue': self._micros(timestamps[0]),
+                             'endValue': self._micros(timestamps[0]) + sum(weights),
+                             'samples': [[offset + frame_id for frame_id in stack]
+                                         for _timestamp, stack in self.samples],
+                             'weights': weights})
+        return {'$schema': SPEEDSCOPE_SCHEMA, 'shared': {'frames': frames}, 'profiles': profiles,
+                'name': 'yamlconverter', 'exporter': 'yamlconverter'}
+
+    def write(self, path: str, output_format: Optional[str] = None):
+        """
+        Scrive il profilo su file (in modo atomico).
+
+        Args:
+            path: Path del file di output
+            output_format: 'chrome' o 'speedscope' (default: dedotto dal nome, vedi profile_format)
+        """
+        output_format = output_format or profile_format(path)
+        data = self.speedscope() if output_format == 'speedscope' else self.chrome_trace()
+        write_text_atomic(path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+
+def profile_format(path: str) -> str:
+    """Formato del profilo dedotto dal nome: 'speedscope' per *.speedscope.json, altrimenti 'chrome'"""
+    return 'speedscope' if path.lower().endswith('.speedscope.json') else 'chrome'
+
+
+def active_profiler() -> Optional[Profiler]:
+    """Profiler attivo nel processo (None se la conversione non è profilata)"""
+    return _ACTIVE
+
+
+@contextmanager
+def span(name: str, category: str = 'stage', **args):
+    """
+    Registra il blocco come span con nome nel profiler attivo e, per le fasi,
+    la sua durata nelle metriche (nessun costo apprezzabile senza profiler
+    né recorder delle metriche).
+
+    Args:
+        name: Nome della fase (es: 'parse', 'write')
+        category: Categoria dello span ('stage' per le fasi, 'batch' per i batch)
+        **args: Dettagli mostrati dai viewer (es: format='xlsx')
+    """
+    profiler = _ACTIVE
+    recorder = metrics.active_recorder() if category == 'stage' else None
+    if profiler is None and recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        if profiler is not None:
+            profiler.add_span(name, category, start, end, args)
+        if recorder is not None:
+            recorder.observe('stage_duration_seconds', end - start, stage=name)
+
+
+def traced_batches(items: Iterable[Any], name: str, key: Callable[[Any], str],
+                   batch_size: Optional[int] = None) -> Iterable[Any]:
+    """
+    Registra uno span per ogni batch di batch_size gruppi consecutivi
+    (es: connessioni) mentre gli elementi vengono consumati.
+
+    Uno span copre il tempo dal primo all'ultimo elemento del batch, incluso
+    il lavoro di chi produce e di chi consuma gli elementi (parsing,
+    appiattimento e scrittura di una pipeline di generatori). Senza profiler
+    attivo items viene restituito invariato.
+
+    Args:
+        items: Elementi (es: righe Name/Secret/Value raggruppate per connessione)
+        name: Nome degli span
+        key: Funzione che restituisce il gruppo di un elemento
+        batch_size: Gruppi per batch (default: BATCH_CONNECTIONS)
+    """
+    profiler = _ACTIVE
+    if profiler is None:
+        return items
+    return _traced_batches(profiler, items, name, key, batch_size or BATCH_CONNECTIONS)
+
+
+def _traced_batches(profiler: Profiler, items: Iterable[Any], name: str, key: Callable[[Any], str],
+                    batch_size: int) -> Iterator[Any]:
+    """Generatore di traced_batches"""
+    start = time.perf_counter()
+    first = last = None
+    groups = count = 0
+    for item in items:
+        group = key(item)
+        if group != last or groups == 0:
+            if groups == batch_size:
+                now = time.perf_counter()
+                profiler.add_span(name, 'batch', start, now, {'first': first, 'last': last, 'items': count})
+                start = now
+                groups = count = 0
+            if groups == 0:
+                first = group
+            groups += 1
+            last = group
+        count += 1
+        yield item
+    if count:
+        profiler.add_span(name, 'batch', start, time.perf_counter(), {'first': first, 'last': last, 'items': count})
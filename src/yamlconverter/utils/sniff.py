@@ -0,0 +1,337 @@
+"""
+YAML ↔ Excel Converter - Sniff
+Registro dei rilevatori di formato in base al contenuto: una sola lettura
+dei primi byte del file restituisce la catena dei formati (es: gpg → gzip → yaml)
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import lzma
+import re
+import zlib
+from typing import Callable, List, Optional, Tuple
+from yamlconverter.utils.formats import (
+    get_extension, is_excel_path, is_table_path, is_text_table_path, is_yaml_path, table_format,
+)
+from yamlconverter.utils.streams import STDIO
+
+try:
+    import zstandard
+except ImportError:  # Modulo opzionale: il contenuto zstd non viene ispezionato
+    zstandard = None
+
+# Byte letti dall'inizio del file (una sola volta) per il riconoscimento
+SNIFF_SIZE = 4096
+
+# Livelli cifrati: il contenuto interno si deduce dall'estensione
+GPG_FORMATS = ['gpg', 'gpg-armor']
+
+# Formati tabellari e relativo formato di TABLE_FORMATS
+TABLE_SNIFF_FORMATS = ['xlsx', 'csv', 'tsv', 'ndjson']
+
+# Formati di output del comando 'detect'
+DETECT_FORMATS = ['text', 'json']
+
+# Pacchetti OpenPGP con cui inizia un messaggio cifrato o compresso e valori
+# ammessi per il primo byte del loro contenuto (versione o algoritmo):
+# 1 = PKESK, 3 = SKESK, 8 = compresso, 18 = SEIPD, 20 = AEAD
+_GPG_PACKET_VERSIONS = {1: {3, 6}, 3: {4, 5, 6}, 8: {0, 1, 2, 3}, 18: {1, 2}, 20: {1}}
+
+# Estensioni dei livelli, rimosse dal nome per dedurre il formato interno
+_LAYER_EXTENSIONS = {'gpg': ['.gpg', '.pgp'], 'gpg-armor': ['.asc', '.gpg', '.pgp'],
+                     'gzip': ['.gz'], 'xz': ['.xz'], 'zstd': ['.zst']}
+
+# Prima riga significativa di un documento YAML: 'chiave:', '- elemento' o un marcatore
+_YAML_LINE = re.compile(r'^(?:---|%YAML|- |[^\s#,{\[][^,\t]*?:(?:\s|$))')
+
+# Rilevatori registrati: (nome, rilevatore, estrattore del contenuto interno o None)
+Detector = Callable[[bytes], bool]
+Unwrapper = Callable[[bytes], Optional[bytes]]
+_LAYERS: List[Tuple[str, Detector, Optional[Unwrapper]]] = []
+_FORMATS: List[Tuple[str, Detector]] = []
+
+
+def register_layer(name: str, detect: Detector, unwrap: Optional[Unwrapper] = None,
+                   extensions: Optional[List[str]] = None):
+    """
+    Registra un livello che avvolge altro contenuto (cifratura, compressione).
+
+    Args:
+        name: Nome del livello nella catena (es: 'gzip')
+        detect: Funzione che riconosce il livello dai primi byte
+        unwrap: Funzione che restituisce i primi byte del contenuto interno
+                (None se il livello è opaco, es: cifrato)
+        extensions: Estensioni del livello, rimosse per dedurre il formato interno
+    """
+    _LAYERS.append((name, detect, unwrap))
+    if extensions is not None:
+        _LAYER_EXTENSIONS[name] = extensions
+
+
+def register_format(name: str, detect: Detector, before: Optional[str] = None):
+    """
+    Registra un formato finale (es: 'yaml', 'csv').
+
+    Args:
+        name: Nome del formato nella catena
+        detect: Funzione che riconosce il formato dai primi byte
+        before: Nome di un formato già registrato da provare dopo questo
+    """
+    position = len(_FORMATS)
+    if before is not None:
+        position = next((index for index, (other, _detect) in enumerate(_FORMATS) if other == before), position)
+    _FORMATS.insert(position, (name, detect))
+
+
+def _is_gpg_binary(head: bytes) -> bool:
+    """Riconosce un pacchetto OpenPGP iniziale (formato vecchio o nuovo) e ne controlla la versione"""
+    if len(head) < 3 or not head[0] & 0x80:
+        return False
+    if head[0] & 0x40:
+        # Formato nuovo: la lunghezza occupa 1, 2 o 5 byte
+        tag = head[0] & 0x3F
+        header_size = 2 if head[1] < 192 or 224 <= head[1] < 255 else (3 if head[1] < 224 else 6)
+    else:
+        # Formato vecchio: la lunghezza occupa 1, 2, 4 o 0 byte (indeterminata)
+        tag = (head[0] >> 2) & 0x0F
+        header_size = 1 + {0: 1, 1: 2, 2: 4, 3: 0}[head[0] & 0x03]
+    return tag in _GPG_PACKET_VERSIONS and len(head) > header_size and \
+        head[header_size] in _GPG_PACKET_VERSIONS[tag]
+
+
+def _decompress_head(decompressor) -> Unwrapper:
+    """Estrattore che decomprime solo i primi SNIFF_SIZE byte del contenuto"""
+    def unwrap(head: bytes) -> Optional[bytes]:
+        try:
+            return decompressor().decompress(head, SNIFF_SIZE)
+        except (zlib.error, lzma.LZMAError, EOFError):
+            return None
+    return unwrap
+
+
+def _unwrap_zstd(head: bytes) -> Optional[bytes]:
+    """Primi byte del contenuto zstd (None se il modulo zstandard non è installato)"""
+    if zstandard is None:
+        return None
+    try:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(head)[:SNIFF_SIZE]
+    except zstandard.ZstdError:
+        return None
+
+
+def _text(head: bytes) -> Optional[str]:
+    """Decodifica i primi byte come testo UTF-8 (None se binari)"""
+    if b'\x00' in head:
+        return None
+    try:
+        text = head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Un carattere multibyte può essere troncato alla fine del blocco letto
+        if e.start < len(head) - 3:
+            return None
+        text = head[:e.start].decode('utf-8')
+    return text.lstrip('\ufeff')
+
+
+def _first_line(head: bytes) -> Optional[str]:
+    """Prima riga non vuota e non commentata del testo (None se binario o vuoto)"""
+    text = _text(head)
+    if text is None:
+        return None
+    for line in text.splitlines():
+        if line.strip() and not line.lstrip().startswith('#'):
+            return line
+    return None
+
+
+def _is_ndjson(head: bytes) -> bool:
+    line = _first_line(head)
+    return line is not None and line.lstrip().startswith('{')
+
+
+def _is_yaml(head: bytes) -> bool:
+    line = _first_line(head)
+    return line is not None and bool(_YAML_LINE.match(line))
+
+
+def _is_tsv(head: bytes) -> bool:
+    line = _first_line(head)
+    return line is not None and '\t' in line
+
+
+def _is_csv(head: bytes) -> bool:
+    line = _first_line(head)
+    return line is not None and ',' in line
+
+
+register_layer('gpg-armor', lambda head: head.lstrip().startswith(b'-----BEGIN PGP MESSAGE-----'))
+register_layer('gpg', _is_gpg_binary)
+register_layer('gzip', lambda head: head.startswith(b'\x1f\x8b'), _decompress_head(lambda: zlib.decompressobj(31)))
+register_layer('xz', lambda head: head.startswith(b'\xfd7zXZ\x00'), _decompress_head(lzma.LZMADecompressor))
+register_layer('zstd', lambda head: head.startswith(b'\x28\xb5\x2f\xfd'), _unwrap_zstd)
+
+register_format('xlsx', lambda head: head.startswith(b'PK\x03\x04') and (
+    b'xl/' in head or b'[Content_Types].xml' in head))
+register_format('zip', lambda head: head.startswith(b'PK\x03\x04'))
+register_format('ndjson', _is_ndjson)
+register_format('yaml', _is_yaml)
+register_format('tsv', _is_tsv)
+register_format('csv', _is_csv)
+
+
+def _strip_layer_extension(name: Optional[str], layer: str) -> Optional[str]:
+    """Rimuove dal nome l'estensione del livello (es: secrets.yml.gz -> secrets.yml)"""
+    if name:
+        for extension in _LAYER_EXTENSIONS.get(layer, []):
+            if name.lower().endswith(extension):
+                return name[:-len(extension)]
+    return name
+
+
+def format_from_extension(name: Optional[str]) -> Optional[str]:
+    """Formato finale dedotto dall'estensione ('yaml', 'xlsx', 'csv', 'tsv', 'ndjson' o None)"""
+    if not name:
+        return None
+    if is_excel_path(name):
+        return 'xlsx'
+    if is_text_table_path(name):
+        return table_format(name)
+    if is_yaml_path(name) and get_extension(name) != '.gpg':
+        return 'yaml'
+    return None
+
+
+def chain_from_extension(name: Optional[str]) -> List[str]:
+    """
+    Catena dedotta solo dalle estensioni del nome, dall'esterno all'interno
+    (es: secrets.yml.gz -> ['gzip', 'yaml']; vuota se non riconosciuta).
+    """
+    chain = []
+    while name and len(chain) < 8:
+        layer = next((layer_name for layer_name, extensions in _LAYER_EXTENSIONS.items()
+                      if name.lower().endswith(tuple(extensions))), None)
+        if layer is None:
+            break
+        chain.append(layer)
+        name = _strip_layer_extension(name, layer)
+    guessed = format_from_extension(name)
+    return chain + [guessed] if guessed else chain
+
+
+def sniff_bytes(head: bytes, name: Optional[str] = None) -> List[str]:
+    """
+    Riconosce la catena dei formati dai primi byte di un contenuto.
+
+    I livelli di compressione vengono attraversati decomprimendo solo i
+    primi byte; oltre un livello opaco (GPG, o zstd senza il modulo
+    zstandard) livelli e formato interni vengono dedotti dalle estensioni
+    che restano nel nome (es: secrets.yml.gz.gpg -> gpg → gzip → yaml).
+
+    Args:
+        head: Primi byte del contenuto (vedi SNIFF_SIZE)
+        name: Nome o path del file, usato solo oltre i livelli opachi (opzionale)
+
+    Returns:
+        Catena dei formati dall'esterno all'interno (es: ['gpg', 'yaml']);
+        vuota se il contenuto non è riconosciuto
+    """
+    chain = []
+    while len(chain) < 8:
+        layer = next(((layer_name, unwrap) for layer_name, detect, unwrap in _LAYERS if detect(head)), None)
+        if layer is None:
+            break
+        layer_name, unwrap = layer
+        chain.append(layer_name)
+        name = _strip_layer_extension(name, layer_name)
+        inner = unwrap(head) if unwrap is not None else None
+        if inner is None:
+            return chain + chain_from_extension(name)
+        head = inner
+    fmt = next((format_name for format_name, detect in _FORMATS if detect(head)), None)
+    return chain + [fmt] if fmt else chain
+
+
+def sniff_file(path: str) -> List[str]:
+    """
+    Legge i primi SNIFF_SIZE byte del file e ne restituisce la catena dei formati.
+
+    Returns:
+        Catena dei formati (vuota se il file non è leggibile o non riconosciuto)
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(SNIFF_SIZE)
+    except OSError:
+        return []
+    return sniff_bytes(head, path)
+
+
+def is_gpg_chain(chain: List[str]) -> bool:
+    """Verifica se la catena inizia con un livello GPG"""
+    return bool(chain) and chain[0] in GPG_FORMATS
+
+
+def conversion_for_chain(chain: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Modalità di conversione e formato tabellare corrispondenti a una catena.
+
+    Un contenuto GPG di formato interno sconosciuto viene trattato come YAML,
+    come un file .gpg (vedi YAML_EXTENSIONS).
+
+    Returns:
+        Tupla (modalità 'yaml_to_excel'/'excel_to_yaml' o None, formato tabellare o None)
+    """
+    fmt = chain[-1] if chain else None
+    if fmt == 'yaml' or fmt in GPG_FORMATS:
+        return ('yaml_to_excel', None)
+    if fmt in TABLE_SNIFF_FORMATS:
+        return ('excel_to_yaml', fmt)
+    return (None, None)
+
+
+def sniff_conversion_mode(input_file: str, output_file: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Modalità di conversione dedotta dal contenuto dell'input, quando le
+    estensioni non bastano (es: un export senza estensione o un .gpg senza
+    il formato interno nel nome).
+
+    La modalità viene scartata se l'estensione dell'output non è coerente
+    (es: input YAML con output .yml).
+
+    Returns:
+        Tupla (modalità o None, formato tabellare dell'input o None)
+    """
+    mode, fmt = conversion_for_chain(sniff_file(input_file))
+    if output_file != STDIO:
+        if mode == 'yaml_to_excel' and not is_table_path(output_file):
+            return (None, None)
+        if mode == 'excel_to_yaml' and not is_yaml_path(output_file):
+            return (None, None)
+    return (mode, fmt)
+
+
+def describe_chain(chain: List[str]) -> str:
+    """Catena in forma leggibile (es: 'gpg → gzip → yaml'), '?' se vuota"""
+    return ' → '.join(chain) if chain else '?'
+
+
+def format_chains(chains: List[Tuple[str, List[str]]], output_format: str = 'text') -> str:
+    """Formatta le catene come righe 'path: gpg → yaml' oppure come JSON"""
+    if output_format == 'json':
+        results = [{'path': path, 'chain': chain, 'mode': conversion_for_chain(chain)[0]}
+                   for path, chain in chains]
+        return json.dumps(results, ensure_ascii=False, indent=2) + '\n'
+    return ''.join(f"{path}: {describe_chain(chain)}\n" for path, chain in chains)
@@ -0,0 +1,212 @@
+"""
+YAML ↔ Excel Converter - Spill
+Archivio temporaneo su disco (SQLite) per le righe Name/Secret/Value che
+non entrano nel budget di memoria, riletto in ordine con un cursore
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import sqlite3
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# Oltre questa stima di memoria occupata le righe passano su disco
+SPILL_MEMORY_BUDGET = 512 * 1024 * 1024
+
+# Stima dei byte occupati da una riga oltre ai suoi testi (dizionario e tre stringhe)
+ROW_OVERHEAD = 400
+
+# Righe inserite per transazione
+INSERT_BATCH_SIZE = 10000
+
+# Righe lette dal cursore per ogni fetch
+FETCH_SIZE = 1000
+
+# Ordini di rilettura: prima occorrenza della connessione (come rebuild_yaml_structure) o nome
+SPILL_ORDERS = ['first_seen', 'name']
+
+
+def row_index(name: str) -> int:
+    """Indice finale di un Name (es: 'SAP_SOAP[3]' -> 3), -1 se assente"""
+    head, bracket, tail = name.rpartition('[')
+    if bracket and tail.endswith(']') and tail[:-1].isdecimal():
+        return int(tail[:-1])
+    return -1
+
+
+def estimate_row_size(row: Dict[str, str]) -> int:
+    """Stima approssimativa dei byte occupati in memoria da una riga"""
+    return ROW_OVERHEAD + len(row.get('Name', '')) + len(row.get('Secret', '')) + len(row.get('Value', ''))
+
+
+class SpillStore:
+    """
+    Righe Name/Secret/Value in un database SQLite temporaneo.
+
+    Le righe vengono inserite a blocchi, una transazione per blocco, con
+    journal e sync disattivati (il file viene eliminato alla chiusura);
+    l'indice su (connessione, indice) viene creato alla prima rilettura,
+    dopo il caricamento, ed è quello usato dal cursore per restituire le
+    righe raggruppate per connessione.
+    """
+
+    def __init__(self, connection_of: Callable[[str], str], directory: Optional[str] = None):
+        """
+        Args:
+            connection_of: Funzione che ricava il nome della connessione da un Name
+            directory: Cartella del file temporaneo (default: cartella temporanea di sistema)
+        """
+        self._connection_of = connection_of
+        fd, self.path = tempfile.mkstemp(prefix='yamlconverter-', suffix='.sqlite', dir=directory)
+        os.close(fd)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(
+            'PRAGMA journal_mode = OFF;'
+            'PRAGMA synchronous = OFF;'
+            'PRAGMA temp_store = MEMORY;'
+            'CREATE TABLE connections (ord INTEGER PRIMARY KEY, connection TEXT UNIQUE NOT NULL);'
+            'CREATE TABLE rows (connection TEXT NOT NULL, idx INTEGER NOT NULL,'
+            ' name TEXT, secret TEXT, value TEXT);'
+        )
+        self._indexed = False
+        self._last_connection = None
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_rows(self, rows: Iterable[Dict[str, str]], batch_size: int = INSERT_BATCH_SIZE) -> int:
+        """
+        Inserisce le righe a blocchi di batch_size per transazione.
+
+        Returns:
+            Numero di righe inserite
+        """
+        if self._indexed:
+            # Nuovi inserimenti dopo una rilettura: l'indice va ricostruito
+            self._db.execute('DROP INDEX rows_connection_idx')
+            self._indexed = False
+        inserted = 0
+        batch = []
+        connections = []
+        for row in rows:
+            name = row.get('Name', '')
+            if not name:
+                continue
+            connection = self._connection_of(name)
+            if connection != self._last_connection:
+                connections.append((connection,))
+                self._last_connection = connection
+            batch.append((connection, row_index(name), name, row.get('Secret', ''), row.get('Value', '')))
+            if len(batch) >= batch_size:
+                inserted += self._insert(batch, connections)
+                batch = []
+                connections = []
+        if batch or connections:
+            inserted += self._insert(batch, connections)
+        self.count += inserted
+        return inserted
+
+    def _insert(self, batch: List[tuple], connections: List[tuple]) -> int:
+        """Inserisce un blocco di righe in una singola transazione"""
+        with self._db:
+            self._db.executemany('INSERT OR IGNORE INTO connections (connection) VALUES (?)', connections)
+            self._db.executemany('INSERT INTO rows VALUES (?, ?, ?, ?, ?)', batch)
+        return len(batch)
+
+    def iter_rows(self, order: str = 'first_seen') -> Iterator[Dict[str, str]]:
+        """
+        Rilegge le righe raggruppate per connessione con un cursore.
+
+        Le righe di una connessione seguono l'indice e, a parità di indice,
+        l'ordine di inserimento (come le sovrascritture di rebuild_yaml_structure).
+
+        Args:
+            order: 'first_seen' (ordine di prima occorrenza delle connessioni) o 'name'
+
+        Yields:
+            Righe Name/Secret/Value
+        """
+        if order not in SPILL_ORDERS:
+            raise ValueError(order)
+        if not self._indexed:
+            self._db.execute('CREATE INDEX rows_connection_idx ON rows (connection, idx)')
+            self._indexed = True
+        if order == 'name':
+            query = 'SELECT name, secret, value FROM rows ORDER BY connection, idx, rows.rowid'
+        else:
+            query = ('SELECT name, secret, value FROM connections CROSS JOIN rows USING (connection) '
+                     'ORDER BY connections.ord, rows.idx, rows.rowid')
+        cursor = self._db.execute(query)
+        try:
+            while True:
+                records = cursor.fetchmany(FETCH_SIZE)
+                if not records:
+                    return
+                for name, secret, value in records:
+                    yield {'Name': name, 'Secret': secret, 'Value': value}
+        finally:
+            cursor.close()
+
+    def close(self):
+        """Chiude il database ed elimina il file temporaneo"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def collect_rows(rows: Iterable[Dict[str, str]], connection_of: Callable[[str], str],
+                 memory_budget: Optional[int] = None) -> Union[List[Dict[str, str]], SpillStore]:
+    """
+    Raccoglie le righe in memoria finché la stima resta nel budget.
+
+    Al superamento del budget le righe già lette e tutte le successive
+    vengono spostate in uno SpillStore: il chiamante riceve una lista oppure
+    lo SpillStore (da chiudere dopo l'uso).
+
+    Args:
+        rows: Righe Name/Secret/Value
+        connection_of: Funzione che ricava il nome della connessione da un Name
+        memory_budget: Byte stimati oltre i quali usare il disco (default: SPILL_MEMORY_BUDGET)
+
+    Returns:
+        Lista delle righe oppure SpillStore
+    """
+    budget = SPILL_MEMORY_BUDGET if memory_budget is None else memory_budget
+    rows = iter(rows)
+    buffered = []
+    size = 0
+    for row in rows:
+        buffered.append(row)
+        size += estimate_row_size(row)
+        if size > budget:
+            store = SpillStore(connection_of)
+            try:
+                store.add_rows(buffered)
+                buffered = None
+                store.add_rows(rows)
+            except BaseException:
+                store.close()
+                raise
+            return store
+    return buffered
@@ -0,0 +1,430 @@
+"""
+YAML ↔ Excel Converter - Streams
+Modulo per aprire input/output come path, stream Python oppure '-' (stdin/stdout),
+con (de)compressione trasparente gzip/xz/zstd in streaming
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import gzip
+import io
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional, Union
+from yamlconverter.utils.formats import split_compression_extension
+from yamlconverter.utils.i18n import get_i18n
+
+try:
+    import zstandard
+except ImportError:  # Modulo opzionale: i file .zst non sono supportati
+    zstandard = None
+
+# Path speciale per stdin/stdout
+STDIO = '-'
+
+# Oltre questa soglia i buffer temporanei passano da memoria a disco
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+Source = Union[str, IO]
+
+# Compressione associata a ciascuna estensione
+COMPRESSION_BY_EXTENSION = {'.gz': 'gzip', '.xz': 'xz', '.zst': 'zstd'}
+
+# Magic bytes iniziali dei formati compressi
+_MAGIC_NUMBERS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+_MAGIC_SIZE = max(len(magic) for magic, _name in _MAGIC_NUMBERS)
+
+
+def is_stdio(target: Source) -> bool:
+    """Verifica se il target è '-' (stdin/stdout)"""
+    return isinstance(target, str) and target == STDIO
+
+
+def is_stream(target: Source) -> bool:
+    """Verifica se il target è uno stream Python (e non un path)"""
+    return not isinstance(target, (str, bytes)) and (hasattr(target, 'read') or hasattr(target, 'write'))
+
+
+def is_path(target: Source) -> bool:
+    """Verifica se il target è un path su filesystem"""
+    return isinstance(target, str) and target != STDIO
+
+
+def is_text_stream(stream: IO) -> bool:
+    """Verifica se lo stream lavora con str (True) o bytes (False)"""
+    if isinstance(stream, io.TextIOBase):
+        return True
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        return False
+    mode = getattr(stream, 'mode', '')
+    if isinstance(mode, str) and mode:
+        return 'b' not in mode
+    return hasattr(stream, 'encoding')
+
+
+def is_seekable(stream: IO) -> bool:
+    """Verifica se lo stream supporta seek (False per pipe e socket)"""
+    try:
+        return bool(stream.seekable())
+    except (AttributeError, ValueError, OSError):
+        return False
+
+
+def describe(target: Source, default: str = '<stream>') -> str:
+    """
+    Restituisce un nome leggibile per path, stream o '-'.
+
+    Args:
+        target: Path, stream o '-'
+        default: Nome da usare per stream senza attributo name
+
+    Returns:
+        Nome da mostrare nei messaggi
+    """
+    if is_stdio(target):
+        return '<stdio>'
+    if isinstance(target, str):
+        return target
+    name = getattr(target, 'name', None)
+    return name if isinstance(name, str) else default
+
+
+def console_for(output: Source) -> IO:
+    """
+    Restituisce lo stream su cui stampare i messaggi di stato.
+
+    Se l'output della conversione è stdout i messaggi vanno su stderr,
+    per non mescolarli con i dati.
+
+    Args:
+        output: Output della conversione
+
+    Returns:
+        sys.stdout oppure sys.stderr
+    """
+    if is_stdio(output) or output is sys.stdout or output is getattr(sys.stdout, 'buffer', None):
+        return sys.stderr
+    return sys.stdout
+
+
+def sniff_compression(head: bytes) -> Optional[str]:
+    """
+    Riconosce la compressione dai primi byte del contenuto.
+
+    Args:
+        head: Primi byte del file o dello stream
+
+    Returns:
+        'gzip', 'xz', 'zstd' oppure None se il contenuto non è compresso
+    """
+    for magic, name in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def output_compression(path: str) -> Optional[str]:
+    """Restituisce la compressione da applicare a un file di output in base all'estensione"""
+    return COMPRESSION_BY_EXTENSION.get(split_compression_extension(path)[1])
+
+
+def input_compression(path: str) -> Optional[str]:
+    """
+    Restituisce la compressione di un file di input, in base all'estensione
+    oppure, se l'estensione non la indica, ai magic bytes iniziali.
+
+    Args:
+        path: Path del file
+
+    Returns:
+        'gzip', 'xz', 'zstd' oppure None
+    """
+    compression = output_compression(path)
+    if compression:
+        return compression
+    try:
+        with open(path, 'rb') as f:
+            return sniff_compression(f.read(_MAGIC_SIZE))
+    except OSError:
+        return None
+
+
+def _peek(stream: IO) -> bytes:
+    """Legge i primi byte di uno stream binario senza consumarli (b'' se non possibile)"""
+    if hasattr(stream, 'peek'):
+        return stream.peek(_MAGIC_SIZE)[:_MAGIC_SIZE]
+    if is_seekable(stream):
+        position = stream.tell()
+        head = stream.read(_MAGIC_SIZE)
+        stream.seek(position)
+        return head
+    return b''
+
+
+def is_rewritable(target: Source) -> bool:
+    """
+    Verifica se un output di testo può essere riavvolto e troncato dopo la scrittura
+    (file non compressi e stream riposizionabili).
+
+    Args:
+        target: Path, stream o '-'
+
+    Returns:
+        True se seek(0) + truncate() sono possibili
+    """
+    if is_path(target):
+        return output_compression(target) is None
+    return is_seekable(sys.stdout if is_stdio(target) else target)
+
+
+def _open_codec(binary: IO, compression: str, mode: str) -> IO:
+    """
+    Apre un lettore/scrittore di (de)compressione sopra uno stream binario.
+
+    Lo stream sottostante non viene chiuso alla chiusura del codec.
+
+    Raises:
+        ValueError: Se il modulo per la compressione richiesta non è installato
+    """
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=binary, mode=mode)
+    if compression == 'xz':
+        return lzma.LZMAFile(binary, mode=mode)
+    if zstandard is None:
+        raise ValueError(get_i18n().t('compression_module_missing').format(module='zstandard'))
+    if mode == 'rb':
+        return io.BufferedReader(
+            zstandard.ZstdDecompressor().stream_reader(binary, read_across_frames=True, closefd=False))
+    return zstandard.ZstdCompressor().stream_writer(binary, closefd=False)
+
+
+@contextmanager
+def _codec(binary: IO, compression: Optional[str], mode: str) -> Iterator[IO]:
+    """Context manager che applica la (de)compressione solo se richiesta"""
+    if not compression:
+        yield binary
+        return
+    codec = _open_codec(binary, compression, mode)
+    try:
+        yield codec
+    finally:
+        codec.close()
+
+
+@contextmanager
+def _wrap_text(binary: IO, newline=None) -> Iterator[IO]:
+    """Avvolge uno stream binario in uno stream di testo UTF-8 senza chiuderlo"""
+    wrapper = io.TextIOWrapper(binary, encoding='utf-8', newline=newline)
+    try:
+        yield wrapper
+    finally:
+        try:
+            wrapper.flush()
+        except ValueError:
+            pass
+        wrapper.detach()
+
+
+@contextmanager
+def open_text_input(source: Source) -> Iterator[IO]:
+    """
+    Apre un input di testo UTF-8 da path, stream o '-' (stdin).
+
+    Il contenuto compresso (gzip/xz/zstd) viene riconosciuto dall'estensione
+    o dai magic bytes e decompresso a blocchi durante la lettura.
+    Gli stream passati dal chiamante non vengono chiusi.
+
+    Args:
+        source: Path, stream di testo/binario o '-'
+
+    Yields:
+        Stream di testo leggibile
+    """
+    if is_path(source):
+        compression = input_compression(source)
+        if compression is None:
+            with open(source, 'r', encoding='utf-8') as f:
+                yield f
+        else:
+            with open(source, 'rb') as raw, _codec(raw, compression, 'rb') as binary, \
+                    _wrap_text(binary) as f:
+                yield f
+    elif is_stream(source) and is_text_stream(source):
+        yield source
+    else:
+        stream = sys.stdin.buffer if is_stdio(source) else source
+        with _codec(stream, sniff_compression(_peek(stream)), 'rb') as binary, \
+                _wrap_text(binary) as f:
+            yield f
+
+
+@contextmanager
+def open_text_output(target: Source) -> Iterator[IO]:
+    """
+    Apre un output di testo UTF-8 con line ending Unix (LF) su path, stream o '-' (stdout).
+
+    I path con estensione .gz/.xz/.zst vengono compressi a blocchi durante la scrittura.
+    Gli stream passati dal chiamante non vengono chiusi.
+
+    Args:
+        target: Path, stream di testo/binario o '-'
+
+    Yields:
+        Stream di testo scrivibile
+    """
+    if is_path(target):
+        compression = output_compression(target)
+        if compression is None:
+            with open(target, 'w', encoding='utf-8', newline='\n') as f:
+                yield f
+        else:
+            with open(target, 'wb') as raw, _codec(raw, compression, 'wb') as binary, \
+                    _wrap_text(binary, newline='\n') as f:
+                yield f
+    elif is_stdio(target):
+        sys.stdout.flush()
+        with _wrap_text(sys.stdout.buffer, newline='\n') as f:
+            yield f
+    elif is_text_stream(target):
+        yield target
+    else:
+        with _wrap_text(target, newline='\n') as f:
+            yield f
+
+
+@contextmanager
+def open_binary_input(source: Source, seekable: bool = False) -> Iterator[IO]:
+    """
+    Apre un input binario da path, stream o '-' (stdin).
+
+    Args:
+        source: Path, stream binario o '-'
+        seekable: Se True e lo stream non supporta seek (es: pipe), il contenuto
+                  viene copiato in un file temporaneo "spooled" (in memoria fino a
+                  SPOOL_MAX_SIZE, poi su disco)
+
+    Yields:
+        Stream binario leggibile
+    """
+    if is_path(source):
+        with open(source, 'rb') as f:
+            yield f
+        return
+
+    stream = sys.stdin.buffer if is_stdio(source) else source
+    if not seekable or is_seekable(stream):
+        yield stream
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        shutil.copyfileobj(stream, spool)
+        spool.seek(0)
+        yield spool
+
+
+@contextmanager
+def open_binary_output(target: Source, seekable: bool = False) -> Iterator[IO]:
+    """
+    Apre un output binario su path, stream o '-' (stdout).
+
+    Args:
+        target: Path, stream binario o '-'
+        seekable: Se True e lo stream non supporta seek (es: pipe), i dati vengono
+                  scritti in un file temporaneo "spooled" e copiati nello stream
+                  solo alla fine
+
+    Yields:
+        Stream binario scrivibile
+    """
+    if is_path(target):
+        with open(target, 'wb') as f:
+            yield f
+        return
+
+    if is_stdio(target):
+        sys.stdout.flush()
+        stream = sys.stdout.buffer
+    else:
+        stream = target
+    if not seekable or is_seekable(stream):
+        yield stream
+        stream.flush()
+        return
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        yield spool
+        spool.seek(0)
+        shutil.copyfileobj(spool, stream)
+        stream.flush()
+
+
+def write_text_atomic(path: str, content: str):
+    """
+    Scrive un file di testo in modo atomico: il contenuto va in un file
+    temporaneo nella stessa cartella, che sostituisce path solo a scrittura
+    completata (chi legge path non vede mai un file a metà). I permessi
+    sono quelli di un file normale (umask), non quelli ristretti di mkstemp.
+
+    Args:
+        path: Path del file di output
+        content: Testo da scrivere (UTF-8, line ending LF)
+    """
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+@contextmanager
+def atomic_output_path(path: str) -> Iterator[str]:
+    """
+    Path temporaneo nella stessa cartella di path (stesso nome ed estensione,
+    prefisso '.tmp-<pid>-'), che sostituisce path solo se il blocco termina
+    senza errori: in caso di errore path resta intatto e il temporaneo
+    viene eliminato. Se path esiste ne vengono mantenuti i permessi,
+    altrimenti valgono quelli di un file normale (umask).
+    Un path che non è un file regolare (es: /dev/null) viene usato direttamente.
+
+    Args:
+        path: Path del file di output
+
+    Yields:
+        Path su cui scrivere
+    """
+    if os.path.exists(path) and not os.path.isfile(path):
+        yield path
+        return
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f'.tmp-{os.getpid()}-{name}')
+    try:
+        yield temp_path
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
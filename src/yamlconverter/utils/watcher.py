@@ -0,0 +1,443 @@
+"""
+YAML ↔ Excel Converter - Watcher
+Modulo per il monitoraggio di file e cartelle con riconversione automatica.
+Su Linux usa inotify (tramite ctypes), altrove ripiega sul polling dell'mtime.
+
+Copyright (C) 2026  Paolo Cardamone
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from yamlconverter.utils.formats import is_table_path, is_yaml_path, suggest_output_path
+
+# Costanti inotify (vedi <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ATTRIB
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def is_temporary_file(path: str) -> bool:
+    """
+    Verifica se il file è un file temporaneo/di lock creato da Excel o LibreOffice.
+
+    Args:
+        path: Path del file
+
+    Returns:
+        True se il file va ignorato
+    """
+    name = os.path.basename(path)
+    return name.startswith('~$') or name.startswith('.~lock') or name.startswith('.#')
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Restituisce la firma (mtime_ns, size) del file, o None se non esiste.
+
+    Args:
+        path: Path del file
+
+    Returns:
+        Tupla (mtime_ns, size) oppure None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def input_filter_for_mode(mode: str) -> Callable[[str], bool]:
+    """
+    Restituisce il filtro dei file di input per la modalità di conversione.
+
+    Args:
+        mode: 'yaml_to_excel', 'excel_to_yaml' oppure 'auto'
+
+    Returns:
+        Funzione che accetta un path e restituisce True se è un input valido
+    """
+    def _filter(path: str) -> bool:
+        if is_temporary_file(path):
+            return False
+        if mode == 'yaml_to_excel':
+            return is_yaml_path(path)
+        if mode == 'excel_to_yaml':
+            return is_table_path(path)
+        return is_yaml_path(path) or is_table_path(path)
+    return _filter
+
+
+def watch_output_path(input_path: str, output_dir: Optional[str] = None, encrypt: bool = False) -> Optional[str]:
+    """
+    Calcola il path di output per un file monitorato.
+
+    Args:
+        input_path: Path del file di input
+        output_dir: Cartella di output (se None, accanto all'input)
+        encrypt: Aggiunge .gpg all'output YAML
+
+    Returns:
+        Path di output oppure None se l'estensione non è riconosciuta
+    """
+    output_path = suggest_output_path(input_path)
+    if output_path is None:
+        return None
+    if output_dir:
+        output_path = os.path.join(output_dir, os.path.basename(output_path))
+    if encrypt and is_yaml_path(output_path):
+        output_path += '.gpg'
+    return output_path
+
+
+def _expand_targets(targets: Iterable[str], file_filter: Callable[[str], bool]) -> List[str]:
+    """Elenca i file candidati (file espliciti + file nelle cartelle, non ricorsivo)"""
+    files = []
+    for target in targets:
+        if os.path.isdir(target):
+            try:
+                entries = sorted(os.listdir(target))
+            except OSError:
+                continue
+            for entry in entries:
+                path = os.path.join(target, entry)
+                if os.path.isfile(path) and file_filter(path):
+                    files.append(path)
+        elif os.path.isfile(target):
+            files.append(target)
+    return files
+
+
+class PollingBackend:
+    """Backend di monitoraggio basato sul polling di mtime e dimensione"""
+
+    name = 'polling'
+
+    def __init__(self, targets: List[str], file_filter: Callable[[str], bool], interval: float = 1.0):
+        self.targets = targets
+        self.file_filter = file_filter
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        return {path: file_signature(path) for path in _expand_targets(self.targets, self.file_filter)}
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        Attende al massimo timeout secondi e restituisce i file modificati.
+
+        Args:
+            timeout: Tempo massimo di attesa in secondi
+
+        Returns:
+            Insieme dei path modificati
+        """
+        delay = max(0.0, min(timeout, self._next_poll - time.monotonic()))
+        if self._stop_event.wait(delay):
+            return set()
+        if time.monotonic() < self._next_poll:
+            return set()
+        self._next_poll = time.monotonic() + self.interval
+
+        snapshot = self._take_snapshot()
+        changed = {path for path, sig in snapshot.items()
+                   if sig is not None and self._snapshot.get(path) != sig}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        self._stop_event.set()
+
+
+class InotifyBackend:
+    """Backend di monitoraggio basato su inotify (solo Linux)"""
+
+    name = 'inotify'
+
+    def __init__(self, targets: List[str], file_filter: Callable[[str], bool]):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify non disponibile")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify non disponibile")
+
+        self.targets = targets
+        self.file_filter = file_filter
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fallita")
+
+        # I file vengono monitorati tramite la cartella che li contiene:
+        # così si intercettano anche i salvataggi "scrivi temporaneo + rinomina"
+        self._watches: Dict[int, str] = {}
+        self._explicit_files: Dict[str, Set[str]] = {}
+        for target in targets:
+            if os.path.isdir(target):
+                directory = target
+                self._explicit_files.setdefault(directory, set()).add('*')
+            else:
+                directory = os.path.dirname(target) or '.'
+                self._explicit_files.setdefault(directory, set()).add(os.path.basename(target))
+            if directory not in self._watches.values():
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _INOTIFY_MASK)
+                if wd < 0:
+                    self.close()
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch fallita: {directory}")
+                self._watches[wd] = directory
+
+    def _accepts(self, directory: str, name: str) -> bool:
+        wanted = self._explicit_files.get(directory, set())
+        path = os.path.join(directory, name)
+        if name in wanted:
+            return True
+        return '*' in wanted and self.file_filter(path)
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        Attende al massimo timeout secondi e restituisce i file modificati.
+
+        Args:
+            timeout: Tempo massimo di attesa in secondi
+
+        Returns:
+            Insieme dei path modificati
+        """
+        if self._fd < 0:
+            return set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Coda piena: considera modificati tutti i file monitorati
+                changed.update(_expand_targets(self.targets, self.file_filter))
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            decoded = os.fsdecode(name)
+            if self._accepts(directory, decoded):
+                changed.add(os.path.join(directory, decoded))
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_backend(targets: List[str], file_filter: Callable[[str], bool],
+                   use_inotify: Optional[bool] = None, poll_interval: float = 1.0):
+    """
+    Crea il backend di monitoraggio più adatto al sistema.
+
+    Args:
+        targets: File e cartelle da monitorare
+        file_filter: Filtro dei file di input
+        use_inotify: True forza inotify, False forza il polling, None = automatico
+        poll_interval: Intervallo di polling in secondi
+
+    Returns:
+        Istanza di InotifyBackend o PollingBackend
+    """
+    if use_inotify is not False:
+        try:
+            return InotifyBackend(targets, file_filter)
+        except (OSError, AttributeError):
+            if use_inotify:
+                raise
+    return PollingBackend(targets, file_filter, interval=poll_interval)
+
+
+class ConversionWatcher:
+    """
+    Monitora file/cartelle e lancia un job di conversione per ogni file modificato.
+
+    - Le raffiche di eventi (es: salvataggio Excel) vengono raggruppate con un debounce.
+    - Le conversioni girano su un pool di thread con un limite di concorrenza.
+    - Lo stesso file non viene mai convertito in parallelo con se stesso.
+    - I file scritti dalle conversioni non rilanciano una nuova conversione.
+    """
+
+    def __init__(self, targets: Iterable[str], job: Callable[[str], tuple],
+                 output_for: Optional[Callable[[str], Optional[str]]] = None,
+                 file_filter: Optional[Callable[[str], bool]] = None,
+                 debounce: float = 0.5, max_workers: int = 2,
+                 use_inotify: Optional[bool] = None, poll_interval: float = 1.0,
+                 on_result: Optional[Callable[[str, tuple], None]] = None):
+        """
+        Inizializza il watcher.
+
+        Args:
+            targets: File e cartelle da monitorare
+            job: Funzione job(path) -> (success, warnings, error)
+            output_for: Funzione che restituisce il path di output di un input
+            file_filter: Filtro dei file di input nelle cartelle
+            debounce: Secondi di quiete prima di lanciare la conversione
+            max_workers: Numero massimo di conversioni concorrenti
+            use_inotify: True forza inotify, False forza il polling, None = automatico
+            poll_interval: Intervallo di polling in secondi
+            on_result: Callback on_result(path, result) chiamata al termine di ogni job
+        """
+        self.targets = [os.path.abspath(t) for t in targets]
+        self.job = job
+        self.output_for = output_for
+        self.file_filter = file_filter or input_filter_for_mode('auto')
+        self.debounce = debounce
+        self.max_workers = max(1, int(max_workers))
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self.on_result = on_result
+
+        self.backend = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, float] = {}
+        self._running: Set[str] = set()
+        self._dirty: Set[str] = set()
+        # Output dei job in corso: i loro eventi vengono rimandati a fine job
+        self._writing: Dict[str, int] = {}
+        # Ultima firma nota di ogni file (input già convertiti e output scritti)
+        self._known: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    @property
+    def backend_name(self) -> str:
+        return self.backend.name if self.backend else ''
+
+    def start(self):
+        """Avvia il monitoraggio in un thread in background"""
+        self.backend = create_backend(self.targets, self.file_filter,
+                                      self.use_inotify, self.poll_interval)
+        for path in _expand_targets(self.targets, self.file_filter):
+            self._known[path] = file_signature(path)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='yamlconverter-watch')
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='yamlconverter-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """Ferma il monitoraggio e (opzionalmente) attende le conversioni in corso"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.backend is not None:
+            self.backend.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def run_forever(self):
+        """Avvia il monitoraggio (se non già avviato) e blocca fino a KeyboardInterrupt"""
+        if self._thread is None:
+            self.start()
+        try:
+            while not self._stop_event.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _run(self):
+        tick = min(0.2, self.debounce) if self.debounce > 0 else 0.05
+        while not self._stop_event.is_set():
+            changed = self.backend.wait(tick)
+            now = time.monotonic()
+            with self._lock:
+                for path in changed:
+                    self._pending[path] = now
+                ready = [p for p, t in self._pending.items() if now - t >= self.debounce]
+                for path in ready:
+                    del self._pending[path]
+            for path in ready:
+                self._submit(path)
+
+    def _submit(self, path: str):
+        signature = file_signature(path)
+        with self._lock:
+            # File eliminato oppure non modificato dall'ultima volta (es: output appena scritto)
+            if signature is None or self._known.get(path) == signature:
+                return
+            if path in self._writing:
+                self._pending[path] = time.monotonic()
+                return
+            if path in self._running:
+                self._dirty.add(path)
+                return
+            self._running.add(path)
+            self._known[path] = signature
+            output_path = self._output_path(path)
+            if output_path:
+                self._writing[output_path] = self._writing.get(output_path, 0) + 1
+        self._executor.submit(self._execute, path, output_path)
+
+    def _output_path(self, path: str) -> Optional[str]:
+        output_path = self.output_for(path) if self.output_for else None
+        return os.path.abspath(output_path) if output_path else None
+
+    def _execute(self, path: str, output_path: Optional[str]):
+        try:
+            result = self.job(path)
+        except Exception as e:
+            result = (False, [], str(e))
+        finally:
+            with self._lock:
+                if output_path:
+                    self._known[output_path] = file_signature(output_path)
+                    self._writing[output_path] -= 1
+                    if not self._writing[output_path]:
+                        del self._writing[output_path]
+                self._running.discard(path)
+                if path in self._dirty:
+                    # Modificato durante la conversione: ripianifica
+                    self._dirty.discard(path)
+                    self._pending[path] = time.monotonic()
+        if self.on_result is not None:
+            self.on_result(path, result)
@@ -0,0 +1,60 @@
+"""
+Test suite for the command line interface
+"""
+import pytest
+import os
+import shutil
+import tempfile
+from yamlconverter.cli.main import build_parser, main
+from yamlconverter.utils.i18n import get_i18n
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+"""
+
+
+class TestCLI:
+    """Test cases for yamlconverter-cli"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_convert_command(self, work_dir):
+        """Test the convert subcommand in both directions"""
+        yaml_file = os.path.join(work_dir, 'a.yml')
+        with open(yaml_file, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        excel_file = os.path.join(work_dir, 'a.xlsx')
+        back_file = os.path.join(work_dir, 'b.yml')
+
+        assert main(['convert', yaml_file, excel_file]) == 0
+        assert main(['convert', excel_file, back_file]) == 0
+        with open(back_file, 'r', encoding='utf-8') as f:
+            assert f.read() == SAMPLE_YAML
+
+    def test_convert_unknown_extension(self, work_dir):
+        """Test that unknown extensions return a usage error"""
+        assert main(['convert', os.path.join(work_dir, 'a.txt'), os.path.join(work_dir, 'b.txt')]) == 2
+
+    def test_convert_stdio_requires_mode(self):
+        """Test that '-' on both sides without --mode is a usage error"""
+        assert main(['convert', '-', '-']) == 2
+
+    def test_watch_arguments(self):
+        """Test parsing of the watch subcommand"""
+        args = build_parser(get_i18n()).parse_args(
+            ['watch', 'dir1', 'file.xlsx', '--workers', '4', '--debounce', '1.5', '--poll'])
+        assert args.targets == ['dir1', 'file.xlsx']
+        assert args.workers == 4
+        assert args.debounce == 1.5
+        assert args.poll
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
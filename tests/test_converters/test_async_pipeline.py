@@ -0,0 +1,168 @@
+"""
+Test suite for the asyncio facade
+"""
+import pytest
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+from yamlconverter.converters.async_pipeline import AsyncConverter
+from yamlconverter.utils.gpg_utils import (
+    decrypt_bytes_async, decrypt_file, encrypt_bytes_async, encrypt_file, encrypt_file_async, run_gpg,
+)
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$PASSWORD$$"
+      value: 'pà"ss'
+"""
+
+
+class TestAsyncPipeline:
+    """Test cases for AsyncConverter and the async GPG helpers"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory with a sample rlist"""
+        temp_dir = tempfile.mkdtemp()
+        with open(os.path.join(temp_dir, 'secrets.yml'), 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_concurrent_round_trips(self, work_dir):
+        """Test several concurrent conversions with bounded concurrency"""
+        yaml_file = os.path.join(work_dir, 'secrets.yml')
+
+        async def run():
+            async with AsyncConverter(max_concurrency=2) as converter:
+                excel_files = [os.path.join(work_dir, f'out_{i}.xlsx') for i in range(4)]
+                results = await asyncio.gather(*(converter.convert_file(yaml_file, path) for path in excel_files))
+                assert all(success for success, _warnings, _error in results)
+                back = os.path.join(work_dir, 'back.yml')
+                return await converter.excel_to_yaml(excel_files[-1], back, streaming=True), back
+
+        (success, warnings, error), back = asyncio.run(run())
+        assert success, error
+        assert warnings == []
+        with open(back, 'r', encoding='utf-8') as f:
+            assert f.read() == SAMPLE_YAML
+
+    def test_unrecognized_extension(self, work_dir):
+        """Test that errors are returned like the sync API"""
+        async def run():
+            async with AsyncConverter() as converter:
+                return await converter.convert_file(os.path.join(work_dir, 'a.txt'), os.path.join(work_dir, 'b.txt'))
+
+        success, warnings, error = asyncio.run(run())
+        assert not success and warnings == [] and error
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_gpg_interoperability(self, work_dir):
+        """Test that async and sync GPG helpers read each other's files"""
+        async_file = os.path.join(work_dir, 'async.yml.gpg')
+        sync_file = os.path.join(work_dir, 'sync.yml.gpg')
+        assert encrypt_file(SAMPLE_YAML, sync_file, 'pw')[0]
+
+        async def run():
+            assert await encrypt_file_async(SAMPLE_YAML, async_file, 'pw') == (True, None)
+            return await decrypt_bytes_async(sync_file, 'pw'), await decrypt_bytes_async(sync_file, 'wrong')
+
+        (success, data, error), (bad_success, _data, bad_error) = asyncio.run(run())
+        assert success, error
+        assert data.decode('utf-8') == SAMPLE_YAML
+        assert not bad_success and bad_error
+        assert decrypt_file(async_file, 'pw') == (True, SAMPLE_YAML, None)
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_encrypted_conversions(self, work_dir, monkeypatch):
+        """Test .gpg input and encrypted output through the facade, with gpg run as an asyncio subprocess"""
+        def blocking_gpg(*_args, **_kwargs):
+            raise AssertionError('python-gnupg called from the async facade')
+
+        monkeypatch.setattr('yamlconverter.converters.pipeline.decrypt_bytes', blocking_gpg)
+        monkeypatch.setattr('yamlconverter.converters.pipeline.encrypt_file', blocking_gpg)
+        gpg_file = os.path.join(work_dir, 'secrets.yml.gpg')
+        assert encrypt_file(SAMPLE_YAML, gpg_file, 'pw')[0]
+        excel_file = os.path.join(work_dir, 'secrets.xlsx')
+        output = os.path.join(work_dir, 'back.yml.gpg')
+
+        async def run():
+            async with AsyncConverter() as converter:
+                first = await converter.convert_file(gpg_file, excel_file, password='pw')
+                second = await converter.convert_file(excel_file, output, password='pw')
+                missing = await converter.convert_file(gpg_file, excel_file)
+                return first, second, missing
+
+        first, second, missing = asyncio.run(run())
+        assert first[0], first[2]
+        assert second[0], second[2]
+        assert not missing[0]
+        assert decrypt_file(output, 'pw') == (True, SAMPLE_YAML, None)
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_cancellation_kills_gpg(self, work_dir):
+        """Test that cancelling a task terminates gpg and removes the temporary output"""
+        output = os.path.join(work_dir, 'endless.gpg')
+
+        async def run():
+            task = asyncio.create_task(encrypt_bytes_async(_EndlessSource(), output, 'pw'))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(asyncio.wait_for(run(), 10))
+        assert os.listdir(work_dir) == ['secrets.yml']
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_file_io_off_event_loop(self, work_dir):
+        """Test that run_gpg reads the source and writes the sink outside the event loop thread"""
+        gpg_file = os.path.join(work_dir, 'secrets.yml.gpg')
+        source = _ThreadRecorder(os.path.join(work_dir, 'secrets.yml'), 'rb')
+        sink = _ThreadRecorder(os.path.join(work_dir, 'plain.yml'), 'wb')
+
+        async def run():
+            assert (await encrypt_bytes_async(source, gpg_file, 'pw'))[0]
+            await run_gpg(['--decrypt', gpg_file], 'pw', sink=sink)
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+        source.file.close()
+        sink.file.close()
+        assert source.threads and loop_thread not in source.threads
+        assert sink.threads and loop_thread not in sink.threads
+        with open(sink.file.name, encoding='utf-8') as f:
+            assert f.read() == SAMPLE_YAML
+
+
+class _ThreadRecorder:
+    """Binary file that records the threads calling read and write"""
+
+    def __init__(self, path, mode):
+        self.file = open(path, mode)
+        self.threads = set()
+
+    def read(self, size):
+        self.threads.add(threading.get_ident())
+        return self.file.read(size)
+
+    def write(self, data):
+        self.threads.add(threading.get_ident())
+        return self.file.write(data)
+
+
+class _EndlessSource:
+    """Binary source that never reaches end of file"""
+
+    def read(self, size):
+        return b'x' * size
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
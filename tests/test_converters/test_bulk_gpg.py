@@ -0,0 +1,159 @@
+"""
+Test suite for bulk GPG encryption/decryption
+"""
+import pytest
+import os
+import shutil
+import tempfile
+from yamlconverter.cli.main import main
+from yamlconverter.converters.bulk_gpg import bulk_decrypt_files, bulk_encrypt_files, bulk_targets, rekey_files
+from yamlconverter.utils.gpg_utils import decrypt_file
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+
+def _rlist(value: str) -> str:
+    return f'Connections:\n  SAP_SOAP:\n    - secret: "$$PASSWORD$$"\n      value: "{value}"\n'
+
+
+class TestBulkGPG:
+    """Test cases for bulk_gpg"""
+
+    @pytest.fixture
+    def tree(self):
+        """Create a directory tree with plain rlists and an unrelated file"""
+        temp_dir = tempfile.mkdtemp()
+        root = os.path.join(temp_dir, 'rlists')
+        os.makedirs(os.path.join(root, 'team'))
+        os.makedirs(os.path.join(root, '.hidden'))
+        for index, name in enumerate(['a.yml', 'team/b.yml', 'team/c.yaml', '.hidden/d.yml']):
+            with open(os.path.join(root, name), 'w', encoding='utf-8') as f:
+                f.write(_rlist(f'value-{index}'))
+        with open(os.path.join(root, 'notes.txt'), 'w', encoding='utf-8') as f:
+            f.write('not an rlist')
+        yield temp_dir, root
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_targets(self, tree):
+        """Test target discovery and output paths"""
+        temp_dir, root = tree
+        targets = bulk_targets([root], 'encrypt')
+        assert [os.path.relpath(path, root) for path, _output in targets] == ['a.yml', 'team/b.yml', 'team/c.yaml']
+        assert all(output == path + '.gpg' for path, output in targets)
+
+        output_dir = os.path.join(temp_dir, 'out')
+        targets = bulk_targets([root, os.path.join(root, 'notes.txt')], 'decrypt', output_dir)
+        assert targets == [(os.path.join(root, 'notes.txt'), None)]
+
+        assert bulk_targets([root], 'decrypt') == []
+        with pytest.raises(ValueError):
+            bulk_targets([root], 'sign')
+
+    def test_missing_password_and_files(self, tree):
+        """Test batch-level errors"""
+        _temp_dir, root = tree
+        success, _warnings, error, report = bulk_encrypt_files([root], '')
+        assert not success and error and report is None
+        success, _warnings, error, report = bulk_decrypt_files([root], 'pw')
+        assert not success and error and report is None
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_encrypt_decrypt_round_trip(self, tree):
+        """Test encrypting a tree and decrypting it into another directory"""
+        temp_dir, root = tree
+        seen = []
+        success, _warnings, error, report = bulk_encrypt_files([root], 'pw', workers=2, on_result=seen.append)
+        assert success, error
+        assert report['succeeded'] == 3 and report['failed'] == 0
+        assert len(seen) == 3
+        assert decrypt_file(os.path.join(root, 'team', 'b.yml.gpg'), 'pw') == (True, _rlist('value-1'), None)
+
+        output_dir = os.path.join(temp_dir, 'plain')
+        success, _warnings, error, report = bulk_decrypt_files([root], 'pw', output_dir, workers=3)
+        assert success, error
+        assert [result['output'] for result in report['results']] == [
+            os.path.join(output_dir, 'a.yml'), os.path.join(output_dir, 'team', 'b.yml'),
+            os.path.join(output_dir, 'team', 'c.yaml')]
+        with open(os.path.join(output_dir, 'team', 'c.yaml'), 'r', encoding='utf-8') as f:
+            assert f.read() == _rlist('value-2')
+        assert report['bytes_out'] == sum(
+            os.path.getsize(os.path.join(root, name)) for name in ['a.yml', 'team/b.yml', 'team/c.yaml'])
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_per_file_failures(self, tree):
+        """Test that a wrong passphrase fails per file and leaves no output"""
+        temp_dir, root = tree
+        assert bulk_encrypt_files([os.path.join(root, 'a.yml')], 'pw')[0]
+        other = os.path.join(temp_dir, 'other.yml.gpg')
+        assert bulk_encrypt_files([os.path.join(root, 'team', 'b.yml')], 'other', temp_dir)[0]
+        os.rename(os.path.join(temp_dir, 'b.yml.gpg'), other)
+        output_dir = os.path.join(temp_dir, 'plain')
+
+        success, _warnings, error, report = bulk_decrypt_files(
+            [os.path.join(root, 'a.yml.gpg'), other], 'pw', output_dir)
+        assert success, error
+        assert [result['success'] for result in report['results']] == [True, False]
+        assert report['results'][1]['error']
+        assert sorted(os.listdir(output_dir)) == ['a.yml']
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_cli(self, tree, monkeypatch, capsys):
+        """Test the encrypt/decrypt subcommands and their exit codes"""
+        temp_dir, root = tree
+        monkeypatch.setenv('BULK_PASSWORD', 'pw')
+        assert main(['encrypt', root, '--gpg-profile', 'turbo', '--password-env', 'BULK_PASSWORD']) == 2
+        assert main(['encrypt', root, '--workers', '2', '--gpg-profile', 'fast,compress_level=0',
+                     '--password-env', 'BULK_PASSWORD']) == 0
+        output_dir = os.path.join(temp_dir, 'plain')
+        assert main(['decrypt', root, '--output-dir', output_dir, '--password-env', 'BULK_PASSWORD']) == 0
+        assert os.path.exists(os.path.join(output_dir, 'team', 'b.yml'))
+        assert main(['decrypt', os.path.join(root, 'a.yml'), '--password-env', 'BULK_PASSWORD']) == 1
+        assert main(['decrypt', os.path.join(root, 'missing.gpg'), '--password-env', 'BULK_PASSWORD']) == 2
+        output = capsys.readouterr()
+        assert '✓' in output.out and '✗' in output.err
+
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_rekey_in_place(self, tree):
+        """Test re-keying a tree in place without leaving plaintext or temporary files"""
+        temp_dir, root = tree
+        assert bulk_encrypt_files([root], 'old', workers=2)[0]
+        for name in ['a.yml', 'team/b.yml', 'team/c.yaml']:
+            os.remove(os.path.join(root, name))
+        before = sorted(os.listdir(os.path.join(root, 'team')))
+        with open(os.path.join(root, 'a.yml.gpg'), 'rb') as f:
+            original = f.read()
+
+        success, _warnings, error, report = rekey_files([root], 'wrong', 'new', workers=2)
+        assert success, error
+        assert report['failed'] == 3
+        with open(os.path.join(root, 'a.yml.gpg'), 'rb') as f:
+            assert f.read() == original
+
+        os.chmod(os.path.join(root, 'a.yml.gpg'), 0o640)
+        success, _warnings, error, report = rekey_files([root], 'old', 'new', workers=2)
+        assert success, error
+        assert report['succeeded'] == 3
+        assert os.stat(os.path.join(root, 'a.yml.gpg')).st_mode & 0o777 == 0o640
+        assert [result['output'] for result in report['results']] == [result['input'] for result in report['results']]
+        assert sorted(os.listdir(os.path.join(root, 'team'))) == before
+        assert decrypt_file(os.path.join(root, 'team', 'b.yml.gpg'), 'new') == (True, _rlist('value-1'), None)
+        assert not decrypt_file(os.path.join(root, 'team', 'b.yml.gpg'), 'old')[0]
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_rekey_cli(self, tree, monkeypatch):
+        """Test the rekey subcommand"""
+        _temp_dir, root = tree
+        target = os.path.join(root, 'a.yml')
+        assert bulk_encrypt_files([target], 'old')[0]
+        monkeypatch.setenv('OLD_PASSWORD', 'old')
+        monkeypatch.setenv('NEW_PASSWORD', 'new')
+        assert main(['rekey', target + '.gpg', '--password-env', 'OLD_PASSWORD',
+                     '--new-password-env', 'NEW_PASSWORD']) == 0
+        assert decrypt_file(target + '.gpg', 'new') == (True, _rlist('value-0'), None)
+        assert main(['rekey', target, '--password-env', 'OLD_PASSWORD',
+                     '--new-password-env', 'NEW_PASSWORD']) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,111 @@
+"""
+Test suite for CSV/TSV conversion
+"""
+import pytest
+import io
+import os
+import shutil
+import tempfile
+from yamlconverter.converters.custom_csv import read_csv_table, write_csv_rows
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml, iter_table_rows
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.utils.formats import detect_conversion_mode, suggest_output_path, table_format
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$PASSWORD$$"
+      value: 'pa,ss"word'
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+"""
+
+
+class TestCSVConversion:
+    """Test cases for CSV/TSV as tabular format"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def yaml_file(self, work_dir):
+        """Create a sample YAML file"""
+        path = os.path.join(work_dir, 'secrets.yml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        return path
+
+    def test_format_detection(self):
+        """Test extension-based detection of CSV/TSV"""
+        assert table_format('a.csv') == 'csv'
+        assert table_format('a.TSV') == 'tsv'
+        assert table_format('a.csv.gz') == 'csv'
+        assert table_format('a.xlsx') == 'xlsx'
+        assert detect_conversion_mode('a.yml', 'a.csv') == 'yaml_to_excel'
+        assert detect_conversion_mode('a.tsv') == 'excel_to_yaml'
+        assert suggest_output_path('a.rlist.csv') == 'a.rlist.yml'
+
+    @pytest.mark.parametrize('extension', ['.csv', '.tsv'])
+    def test_round_trip(self, work_dir, yaml_file, extension):
+        """Test YAML → CSV/TSV → YAML gives back the same file"""
+        table_file = os.path.join(work_dir, 'secrets' + extension)
+        back_file = os.path.join(work_dir, 'back.yml')
+
+        success, _warnings, error = custom_yaml_to_excel(yaml_file, table_file)
+        assert success, error
+        with open(table_file, 'r', encoding='utf-8') as f:
+            assert f.readline() == ('Name,Secret,Value\n' if extension == '.csv' else 'Name\tSecret\tValue\n')
+
+        success, _warnings, error = custom_excel_to_yaml(table_file, back_file, streaming=True)
+        assert success, error
+        with open(back_file, 'r', encoding='utf-8') as f:
+            assert f.read() == SAMPLE_YAML
+
+    def test_header_contract_and_normalization(self):
+        """Test column order, BOM and cell normalization match the Excel path"""
+        source = io.StringIO('\ufeffValue,Name,Secret\n"  a \n b  ",CONN[0],$$X$$\n,,\n')
+        rows = list(iter_table_rows(read_csv_table(source, 'csv')))
+        assert rows == [{'Name': 'CONN[0]', 'Secret': '$$X$$', 'Value': 'a b'}]
+
+    def test_missing_columns(self, work_dir):
+        """Test that a CSV without the required header is rejected"""
+        table_file = os.path.join(work_dir, 'bad.csv')
+        with open(table_file, 'w', encoding='utf-8') as f:
+            f.write('Name,Value\nA[0],x\n')
+        success, _warnings, error = custom_excel_to_yaml(table_file, os.path.join(work_dir, 'out.yml'))
+        assert not success
+        assert error
+
+    def test_ungrouped_rows_fallback(self, work_dir):
+        """Test streaming fallback when rows of a connection are not adjacent"""
+        table_file = os.path.join(work_dir, 'ungrouped.csv')
+        with open(table_file, 'w', encoding='utf-8') as f:
+            f.write('Name,Secret,Value\nA[0],s0,v0\nB[0],s1,v1\nA[1],s2,v2\n')
+        back_file = os.path.join(work_dir, 'back.yml')
+        success, warnings, error = custom_excel_to_yaml(table_file, back_file, streaming=True)
+        assert success, error
+        assert len(warnings) == 1
+        with open(back_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        assert content.index('s2') < content.index('B:')
+
+    def test_stream_requires_explicit_format(self):
+        """Test CSV written to a stream when the format is given explicitly"""
+        output = io.StringIO()
+        count = write_csv_rows([{'Name': 'A[0]', 'Secret': 's', 'Value': 'v'}], output, 'csv')
+        assert count == 1
+        assert output.getvalue() == 'Name,Secret,Value\nA[0],s,v\n'
+
+        table = io.StringIO()
+        assert custom_yaml_to_excel(io.StringIO(SAMPLE_YAML), table, table_format='csv')[0]
+        assert table.getvalue().startswith('Name,Secret,Value\nSAP_SOAP[0]')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
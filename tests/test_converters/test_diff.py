@@ -0,0 +1,136 @@
+"""
+Test suite for the structural diff between two rlists
+"""
+import pytest
+import json
+import os
+import shutil
+import tempfile
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.diff import MASK, diff_files, diff_rows, format_diff_text
+from yamlconverter.utils.gpg_utils import encrypt_file
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+OLD_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$PASSWORD$$"
+      value: "old_pw"
+  LEGACY:
+    - secret: "$$USER$$"
+      value: "root"
+"""
+
+NEW_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$PASSWORD$$"
+      value: "new_pw"
+    - secret: "$$CLIENT$$"
+      value: "100"
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+"""
+
+
+def row(name, secret, value):
+    return {'Name': name, 'Secret': secret, 'Value': value}
+
+
+class TestDiff:
+    """Test cases for diff_rows and diff_files"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def files(self, work_dir):
+        """Write the old version as YAML and the new one as YAML and XLSX"""
+        paths = {}
+        for key, content in (('old', OLD_YAML), ('new', NEW_YAML)):
+            paths[key] = os.path.join(work_dir, f'{key}.yml')
+            with open(paths[key], 'w', encoding='utf-8') as f:
+                f.write(content)
+        paths['new_xlsx'] = os.path.join(work_dir, 'new.xlsx')
+        assert custom_yaml_to_excel(paths['new'], paths['new_xlsx'])[0]
+        return paths
+
+    def test_diff_rows(self):
+        """Test added, removed and changed connections and secrets"""
+        old = [row('A[0]', 's', '1'), row('A[1]', 't', '2'), row('GONE[0]', 'u', '3')]
+        new = [row('A[0]', 's', '1'), row('A[1]', 't', '9'), row('NEW[0]', 'v', '4')]
+        result = diff_rows(old, new)
+        statuses = {c['name']: c['status'] for c in result['connections']}
+        assert statuses == {'A': 'changed', 'NEW': 'added', 'GONE': 'removed'}
+        changed = result['connections'][0]['entries'][0]
+        assert changed['value_changed'] and changed['value_old'] == MASK == changed['value_new']
+        assert result['summary']['secrets_unchanged'] == 1
+
+    def test_identical(self):
+        """Test that identical inputs produce no differences"""
+        rows = [row('A[0]', 's', '1')]
+        result = diff_rows(rows, list(rows))
+        assert result['connections'] == []
+        assert format_diff_text(result, 'a', 'b') == ''
+
+    def test_across_formats(self, files):
+        """Test YAML against XLSX of the same content and of a new version"""
+        success, _warnings, error, result = diff_files(files['new'], files['new_xlsx'])
+        assert success, error
+        assert result['connections'] == []
+
+        success, _warnings, error, result = diff_files(files['old'], files['new_xlsx'])
+        assert success, error
+        text = format_diff_text(result, 'old.yml', 'new.xlsx')
+        assert text.startswith('--- old.yml\n+++ new.xlsx\n@@ SAP_SOAP')
+        assert '-SAP_SOAP[1]  $$PASSWORD$$ = ***\n+SAP_SOAP[1]  $$PASSWORD$$ = ***' in text
+        assert '+SAP_SOAP[2]  $$CLIENT$$ = ***' in text
+        assert 'old_pw' not in text and 'new_pw' not in text
+
+    def test_show_values(self, files):
+        """Test revealing values on request"""
+        _success, _warnings, _error, result = diff_files(files['old'], files['new'], show_values=True)
+        text = format_diff_text(result, 'a', 'b')
+        assert 'old_pw' in text and 'new_pw' in text
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="GPG not installed")
+    def test_encrypted_inputs(self, work_dir, files):
+        """Test .yml.gpg and .xlsx.gpg inputs"""
+        encrypted_yaml = os.path.join(work_dir, 'old.yml.gpg')
+        assert encrypt_file(OLD_YAML, encrypted_yaml, 'pw')[0]
+        success, _warnings, error, result = diff_files(encrypted_yaml, files['old'], password='pw')
+        assert success, error
+        assert result['connections'] == []
+
+        import gnupg
+        with open(files['new_xlsx'], 'rb') as f:
+            encrypted = gnupg.GPG().encrypt(f.read(), recipients=None, symmetric=True, passphrase='pw', armor=False)
+        encrypted_xlsx = os.path.join(work_dir, 'new.xlsx.gpg')
+        with open(encrypted_xlsx, 'wb') as f:
+            f.write(encrypted.data)
+        success, _warnings, error, result = diff_files(files['new'], encrypted_xlsx, password='pw')
+        assert success, error
+        assert result['connections'] == []
+
+    def test_cli(self, work_dir, files, capsys):
+        """Test exit codes and the JSON report"""
+        assert main(['diff', files['new'], files['new_xlsx']]) == 0
+        report = os.path.join(work_dir, 'report.json')
+        assert main(['diff', files['old'], files['new'], '--format', 'json', '--output', report]) == 1
+        with open(report, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['summary']['connections_added'] == 1
+        assert main(['diff', files['old'], os.path.join(work_dir, 'missing.yml')]) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
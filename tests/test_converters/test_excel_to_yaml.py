@@ -7,7 +7,9 @@ import tempfile
 import time
 import gc
 from pathlib import Path
-from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.custom_excel_to_yaml import (
+    UngroupedRowsError, custom_excel_to_yaml, iter_connection_groups,
+)
 
 
 class TestExcelToYAML:
@@ -198,5 +200,78 @@ class TestExcelToYAML:
         assert b'\r\n' not in content or content.count(b'\n') > content.count(b'\r\n')
 
 
+class TestStreamingExcelToYAML:
+    """Test cases for the streaming group-by emission mode"""
+    
+    def _write_excel(self, path, rows):
+        from openpyxl import Workbook
+        wb = Workbook()
+        ws = wb.active
+        ws.append(['Name', 'Secret', 'Value'])
+        for row in rows:
+            ws.append(list(row))
+        wb.save(path)
+        wb.close()
+    
+    def _convert_both_ways(self, tmp_path, rows):
+        excel_file = str(tmp_path / 'in.xlsx')
+        self._write_excel(excel_file, rows)
+        full_yaml = str(tmp_path / 'full.yml')
+        stream_yaml = str(tmp_path / 'stream.yml')
+        full = custom_excel_to_yaml(excel_file, full_yaml)
+        stream = custom_excel_to_yaml(excel_file, stream_yaml, streaming=True)
+        with open(full_yaml, 'r', encoding='utf-8') as f:
+            full_content = f.read()
+        with open(stream_yaml, 'r', encoding='utf-8') as f:
+            stream_content = f.read()
+        return full, stream, full_content, stream_content
+    
+    def test_grouped_rows_match_full_rebuild(self, tmp_path):
+        """Test that streaming output is identical for grouped rows"""
+        rows = [
+            ('A[0]', '$$ENDPOINT$$', 'https://a'),
+            ('A[1]', '$$USER$$', "it's"),
+            ('B[1]', '$$USER$$', 'b "quoted"'),
+            ('B[0]', '$$ENDPOINT$$', '  multi\nline  '),
+            ('SIMPLE', '', 'plain'),
+        ]
+        full, stream, full_content, stream_content = self._convert_both_ways(tmp_path, rows)
+        assert full[0] and stream[0]
+        assert stream[1] == []
+        assert stream_content == full_content
+    
+    def test_out_of_order_rows_fall_back(self, tmp_path):
+        """Test fallback to the full rebuild when a connection reappears"""
+        rows = [
+            ('A[0]', '$$ENDPOINT$$', 'https://a'),
+            ('B[0]', '$$ENDPOINT$$', 'https://b'),
+            ('A[1]', '$$USER$$', 'user'),
+        ]
+        full, stream, full_content, stream_content = self._convert_both_ways(tmp_path, rows)
+        assert stream[0]
+        assert len(stream[1]) == 1 and 'A' in stream[1][0]
+        assert stream_content == full_content
+    
+    def test_failed_conversion_keeps_output(self, tmp_path):
+        """Test that a failed conversion leaves an existing output file untouched"""
+        csv_file = tmp_path / 'bad.csv'
+        csv_file.write_text('Name,Secret,Value\nA.B[0],,x\n', encoding='utf-8')
+        yaml_file = tmp_path / 'keep.yml'
+        yaml_file.write_text('ORIGINAL\n', encoding='utf-8')
+        for streaming in (False, True):
+            success, _warnings, error = custom_excel_to_yaml(str(csv_file), str(yaml_file), streaming=streaming)
+            assert not success and error
+            assert yaml_file.read_text(encoding='utf-8') == 'ORIGINAL\n'
+        assert sorted(os.listdir(tmp_path)) == ['bad.csv', 'keep.yml']
+    
+    def test_iter_connection_groups(self):
+        """Test grouping of consecutive rows"""
+        rows = [{'Name': 'A[0]'}, {'Name': 'A[1]'}, {'Name': ''}, {'Name': 'B[0]'}]
+        groups = list(iter_connection_groups(rows))
+        assert [(name, len(group)) for name, group in groups] == [('A', 2), ('B', 1)]
+        with pytest.raises(UngroupedRowsError):
+            list(iter_connection_groups(rows + [{'Name': 'A[2]'}]))
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,176 @@
+"""
+Test suite for connection filtering
+"""
+import pytest
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import openpyxl
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_excel_to_yaml import UngroupedRowsError, custom_excel_to_yaml
+from yamlconverter.converters.custom_yaml_to_excel import ScanningReader, custom_yaml_to_excel
+from yamlconverter.converters.filters import ConnectionFilter, build_connection_filter
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$PASSWORD$$"
+      value: "sap_pw"
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+    - secret: "$$PASSWORD$$"
+      value: "db_pw"
+  SAP_RFC:
+    - secret: "$$HOST$$"
+      value: "rfc.local"
+"""
+
+
+class TestConnectionFilter:
+    """Test cases for include/exclude filters"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def yaml_file(self, work_dir):
+        """Create a sample YAML file"""
+        path = os.path.join(work_dir, 'secrets.yml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        return path
+
+    def names_in(self, excel_file):
+        wb = openpyxl.load_workbook(excel_file)
+        return [row[0] for row in wb.active.iter_rows(min_row=2, values_only=True)]
+
+    def test_patterns(self):
+        """Test glob, regex and literal patterns"""
+        flt = ConnectionFilter(include=['SAP_*', 're:^DB_'], exclude=['SAP_RFC'])
+        assert flt.match_connection('SAP_SOAP')
+        assert flt.match_connection('DB_MAIN')
+        assert not flt.match_connection('SAP_RFC')
+        assert not flt.match_connection('OTHER')
+        assert flt.explicit_names is None
+        assert ConnectionFilter(include=['A', 'B']).explicit_names == {'A', 'B'}
+        assert build_connection_filter() is None
+        with pytest.raises(ValueError):
+            ConnectionFilter(include=['re:('])
+
+    def test_pickle(self):
+        """Test that filters can be sent to worker processes"""
+        flt = pickle.loads(pickle.dumps(ConnectionFilter(include=['SAP_*'])))
+        assert flt.match_connection('SAP_X') and not flt.match_connection('DB')
+
+    @pytest.mark.parametrize('parallel', [False, True])
+    def test_yaml_to_excel_skips_blocks(self, work_dir, yaml_file, parallel):
+        """Test name filters on the file path, with and without parallel parsing"""
+        excel_file = os.path.join(work_dir, 'out.xlsx')
+        flt = ConnectionFilter(include=['SAP_*'])
+        success, _warnings, error = custom_yaml_to_excel(yaml_file, excel_file, parallel=parallel,
+                                                         connection_filter=flt)
+        assert success, error
+        assert self.names_in(excel_file) == ['SAP_SOAP[0]', 'SAP_SOAP[1]', 'SAP_RFC[0]']
+
+    def test_secret_filter_renumbers(self, work_dir, yaml_file):
+        """Test that secret filters keep indexes consecutive in both directions"""
+        excel_file = os.path.join(work_dir, 'out.xlsx')
+        flt = ConnectionFilter(include_secrets=['$$PASSWORD$$'])
+        assert custom_yaml_to_excel(yaml_file, excel_file, connection_filter=flt)[0]
+        assert self.names_in(excel_file) == ['SAP_SOAP[0]', 'DB_MAIN[0]']
+
+        full_excel = os.path.join(work_dir, 'full.xlsx')
+        back_file = os.path.join(work_dir, 'back.yml')
+        assert custom_yaml_to_excel(yaml_file, full_excel)[0]
+        assert custom_excel_to_yaml(full_excel, back_file, connection_filter=flt)[0]
+        with open(back_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+        assert content == ('Connections:\n  SAP_SOAP:\n    - secret: "$$PASSWORD$$"\n      value: "sap_pw"\n'
+                           '  DB_MAIN:\n    - secret: "$$PASSWORD$$"\n      value: "db_pw"\n')
+
+    def test_stream_input_stops_early(self):
+        """Test that the stream reader stops after the named connections"""
+        source = io.StringIO(SAMPLE_YAML)
+        reader = ScanningReader(source, ConnectionFilter(include=['SAP_SOAP']).match_connection, {'SAP_SOAP'})
+        text = ''
+        while True:
+            chunk = reader.read(16)
+            if not chunk:
+                break
+            text += chunk
+        assert 'SAP_SOAP' in text and 'DB_MAIN' not in text
+        assert reader.connection_names == ['SAP_SOAP']
+
+        output = io.BytesIO()
+        success, _warnings, error = custom_yaml_to_excel(io.StringIO(SAMPLE_YAML), output,
+                                                         connection_filter=ConnectionFilter(include=['DB_MAIN']))
+        assert success, error
+
+    def test_excel_to_yaml_early_exit(self, work_dir, yaml_file):
+        """Test that streaming stops emitting once the named connections are done"""
+        excel_file = os.path.join(work_dir, 'out.xlsx')
+        assert custom_yaml_to_excel(yaml_file, excel_file)[0]
+        flt = ConnectionFilter(include=['SAP_SOAP'])
+
+        consumed = []
+        rows = iter([{'Name': n, 'Secret': '', 'Value': ''} for n in
+                     ['SAP_SOAP[0]', 'SAP_SOAP[1]', 'DB_MAIN[0]', 'DB_MAIN[1]', 'SAP_RFC[0]']])
+
+        def tracking():
+            for row in rows:
+                consumed.append(row['Name'])
+                yield row
+
+        kept = list(flt.filter_rows(tracking(), early_exit=True))
+        assert [row['Name'] for row in kept] == ['SAP_SOAP[0]', 'SAP_SOAP[1]']
+        assert consumed == ['SAP_SOAP[0]', 'SAP_SOAP[1]', 'DB_MAIN[0]', 'DB_MAIN[1]', 'SAP_RFC[0]']
+
+        back_file = os.path.join(work_dir, 'back.yml')
+        assert custom_excel_to_yaml(excel_file, back_file, streaming=True, connection_filter=flt)[0]
+        with open(back_file, 'r', encoding='utf-8') as f:
+            assert f.read() == SAMPLE_YAML.split('  DB_MAIN:')[0]
+
+    def test_early_exit_ungrouped_rows(self, work_dir):
+        """Test that a named connection reappearing after the early exit falls back to a full read"""
+        rows = [{'Name': n, 'Secret': '', 'Value': v} for n, v in
+                [('A[0]', 'a0'), ('B[0]', 'b0'), ('A[1]', 'a1')]]
+        with pytest.raises(UngroupedRowsError):
+            list(ConnectionFilter(include=['A']).filter_rows(iter(rows), early_exit=True))
+
+        csv_file = os.path.join(work_dir, 'ungrouped.csv')
+        with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+            f.write('Name,Secret,Value\nA[0],,a0\nB[0],,b0\nA[1],,a1\n')
+        yaml_path = os.path.join(work_dir, 'out.yml')
+        success, warnings, error = custom_excel_to_yaml(csv_file, yaml_path, streaming=True,
+                                                        connection_filter=ConnectionFilter(include=['A']))
+        assert success, error
+        assert warnings
+        with open(yaml_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        assert 'a0' in text and 'a1' in text and 'b0' not in text
+
+    def test_no_match(self, work_dir, yaml_file):
+        """Test the error when nothing matches"""
+        success, _warnings, error = custom_yaml_to_excel(
+            yaml_file, os.path.join(work_dir, 'out.xlsx'), connection_filter=ConnectionFilter(include=['NOPE']))
+        assert not success
+        assert error
+
+    def test_cli_filters(self, work_dir, yaml_file):
+        """Test the --include/--exclude options"""
+        excel_file = os.path.join(work_dir, 'out.xlsx')
+        assert main(['convert', yaml_file, excel_file, '--include', 'SAP_*', '--exclude', 'SAP_RFC']) == 0
+        assert self.names_in(excel_file) == ['SAP_SOAP[0]', 'SAP_SOAP[1]']
+        assert main(['convert', yaml_file, excel_file, '--include', 're:(']) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,181 @@
+"""
+Test suite for the inventory/stats scan
+"""
+import pytest
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import yaml
+from openpyxl import Workbook
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_yaml_to_excel import (
+    count_list_items, custom_yaml_to_excel, scan_connection_blocks,
+)
+from yamlconverter.converters.inventory import file_stats, inventory_files, table_stats, yaml_stats
+from yamlconverter.utils.gpg_utils import encrypt_file
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+
+def write_rlist(path, connections, secrets=3, duplicate=False):
+    """Write a synthetic rlist (optionally repeating the first connection)"""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('# header\nConnections:\n')
+        names = [f'CONN_{i:04d}' for i in range(connections)] + (['CONN_0000'] if duplicate else [])
+        for name in names:
+            f.write(f'  {name}:\n')
+            for j in range(secrets):
+                f.write(f'    - secret: "$$S{j}$$"\n      value: "- not an item"\n')
+        f.write('Other:\n  - ignored\n')
+
+
+def converted_rows(path):
+    """Number of rows produced by converting the YAML to CSV"""
+    csv_path = os.path.splitext(path)[0] + '.converted.csv'
+    assert custom_yaml_to_excel(path, csv_path)[0]
+    with open(csv_path, encoding='utf-8', newline='') as f:
+        return len(list(csv.reader(f))) - 1
+
+
+class TestInventory:
+    """Test cases for inventory.py"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_yaml_stats(self, temp_dir, monkeypatch):
+        """Test the line scan against a full parse, for plain and compressed files"""
+        path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(path, 400)
+        with open(path, encoding='utf-8') as f:
+            connections = yaml.safe_load(f)['Connections']
+        expected = {'connections': len(connections), 'rows': sum(len(items) for items in connections.values()),
+                    'duplicates': []}
+        assert yaml_stats(path) == expected
+
+        # Finestre piccole: nessun elemento contato due volte o perso ai bordi
+        monkeypatch.setattr('yamlconverter.converters.custom_yaml_to_excel.ITEM_SCAN_WINDOW', 100)
+        with open(path, 'rb') as f:
+            data = f.read()
+        _start, blocks, end = scan_connection_blocks(data)
+        assert count_list_items(data, blocks[0][1], end) == expected['rows']
+
+        gz_path = path + '.gz'
+        with gzip.open(gz_path, 'wb') as f:
+            f.write(data)
+        assert yaml_stats(gz_path) == expected
+
+        write_rlist(path, 10, duplicate=True)
+        assert yaml_stats(path) == {'connections': 10, 'rows': converted_rows(path), 'duplicates': ['CONN_0000']}
+
+    @pytest.mark.parametrize('text', [
+        # Connessione con valore scalare e connessione con mappa di scalari
+        'Connections:\n  A: plain\n  B:\n    host: x\n    port: 1\n  C:\n    - secret: s\n      value: v\n',
+        # Lista in stile flow e nome tra virgolette prima del primo blocco
+        'Connections:\n  "Q A": [1, 2]\n  A: [a, b]\n  B:\n    - x\n',
+        # Block scalar con righe che sembrano elementi di lista
+        'Connections:\n  A:\n    - secret: s\n      value: |\n        - a\n        - b\n    - |\n      - c\n',
+        # Lista annidata, connessione vuota, alias a un altro blocco
+        'Connections:\n  A:\n    - value:\n        - a\n        - b\n  E:\n  B:\n    - &i {secret: s}\n  C:\n    - *i\n',
+        # Nessuna sezione Connections
+        'A:\n  - x\n  - y\nB: 1\n',
+        # Duplicato con un numero di righe diverso dalla prima copia
+        'Connections:\n  A:\n    - x\n    - y\n    - z\n  B:\n    - b\n  A:\n    - w\n',
+        # Duplicato in un documento che richiede il parsing intero (alias)
+        'Connections:\n  A:\n    - &i {secret: s}\n    - y\n  C:\n    - *i\n  A:\n    - w\n',
+    ])
+    def test_yaml_stats_irregular_blocks(self, temp_dir, text):
+        """Test that blocks outside the canonical layout are counted like the conversion does"""
+        path = os.path.join(temp_dir, 'a.yml')
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+        rows = converted_rows(path)
+        duplicates = ['A'] if text.count('\n  A:') > 1 else []
+        with gzip.open(path + '.gz', 'wt', encoding='utf-8') as f:
+            f.write(text)
+        for source in (path, path + '.gz', text.encode('utf-8')):
+            stats = yaml_stats(source)
+            assert (stats['rows'], stats['duplicates']) == (rows, duplicates)
+
+    def test_table_stats(self, temp_dir):
+        """Test xlsx (inline and shared strings, shards) and text tables"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 200)
+        for extension in ('xlsx', 'csv', 'ndjson'):
+            table_path = os.path.join(temp_dir, f'a.{extension}')
+            assert custom_yaml_to_excel(yaml_path, table_path)[0]
+            assert file_stats(table_path)['error'] is None
+            assert table_stats(table_path, extension) == {'connections': 200, 'rows': 600, 'duplicates': []}
+
+        # Salvataggio normale di openpyxl (stringhe condivise), fogli di shard e un foglio estraneo attivo
+        wb = Workbook()
+        wb.active.title = 'Notes'
+        wb.active.append(['unrelated'])
+        for title, names in (('Connections', ['A[0]', 'A[1]', 'B[0]']), ('Connections_2', ['C[0]', 'B[0]', None])):
+            sheet = wb.create_sheet(title)
+            sheet.append(['Value', 'Secret', 'Name'])
+            for name in names:
+                sheet.append(['v', '$$X$$', name])
+        xlsx_path = os.path.join(temp_dir, 'shards.xlsx')
+        wb.save(xlsx_path)
+        assert table_stats(xlsx_path, 'xlsx') == {'connections': 3, 'rows': 5, 'duplicates': ['B[0]']}
+
+        wb = Workbook()
+        wb.active.append(['Name', 'Value'])
+        wb.save(xlsx_path)
+        result = file_stats(xlsx_path)
+        assert result['error'] and result['rows'] == 0
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_encrypted_files(self, temp_dir):
+        """Test that .gpg files are decrypted in memory and need the password"""
+        path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(path, 5)
+        with open(path, encoding='utf-8') as f:
+            assert encrypt_file(f.read(), path + '.gpg', 'pw')[0]
+        os.remove(path)
+        assert file_stats(path + '.gpg', 'pw')['rows'] == 15
+        assert file_stats(path + '.gpg')['error']
+
+    def test_directory_in_parallel(self, temp_dir):
+        """Test totals and per-file results over a directory with worker processes"""
+        for index in range(4):
+            write_rlist(os.path.join(temp_dir, f'r{index}.yml'), 10 + index)
+        with open(os.path.join(temp_dir, 'broken.csv'), 'w', encoding='utf-8') as f:
+            f.write('Name,Value\nA[0],x\n')
+        seen = []
+        success, _warnings, error, report = inventory_files([temp_dir], workers=2, on_result=seen.append)
+        assert success, error
+        assert report['files'] == 5 and report['failed'] == 1
+        assert report['connections'] == 46 and report['rows'] == 138
+        assert [os.path.basename(result['path']) for result in seen] == ['broken.csv'] + [
+            f'r{index}.yml' for index in range(4)]
+        assert inventory_files([os.path.join(temp_dir, 'missing')])[0] is False
+
+    def test_cli(self, temp_dir, capsys):
+        """Test the stats command output formats and exit codes"""
+        path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(path, 3, duplicate=True)
+        assert main(['stats', path]) == 0
+        output = capsys.readouterr().out
+        assert f'{path}: 3 stats_connections, 9 stats_rows, stats_duplicates: CONN_0000' in output
+
+        assert main(['stats', temp_dir, '--format', 'json', '--workers', '1']) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report['results'][0]['duplicates'] == ['CONN_0000']
+
+        with open(os.path.join(temp_dir, 'b.csv'), 'w', encoding='utf-8') as f:
+            f.write('bad\n')
+        assert main(['stats', temp_dir]) == 1
+        assert main(['stats', os.path.join(temp_dir, 'missing.yml')]) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,132 @@
+"""
+Test suite for merging several rlists into one
+"""
+import pytest
+import os
+import shutil
+import tempfile
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.merge import MergeConflictError, merge_files, merge_groups
+from yamlconverter.converters.readers import open_rows
+
+TEAM_A = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://a.example.com"
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+"""
+
+TEAM_B = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://b.example.com"
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+  API_KEY:
+    - secret: "$$TOKEN$$"
+      value: "t0k"
+"""
+
+
+def row(name, secret, value):
+    return {'Name': name, 'Secret': secret, 'Value': value}
+
+
+def read_rows(path):
+    with open_rows(path) as rows:
+        return list(rows)
+
+
+class TestMerge:
+    """Test cases for merge_groups and merge_files"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def files(self, work_dir):
+        """Write team A as YAML and team B as YAML and XLSX"""
+        paths = {}
+        for key, content in (('a', TEAM_A), ('b', TEAM_B)):
+            paths[key] = os.path.join(work_dir, f'{key}.yml')
+            with open(paths[key], 'w', encoding='utf-8') as f:
+                f.write(content)
+        paths['b_xlsx'] = os.path.join(work_dir, 'b.xlsx')
+        success, _warnings, error = custom_yaml_to_excel(paths['b'], paths['b_xlsx'])
+        assert success, error
+        return paths
+
+    def test_merge_groups_policies(self):
+        """Test the k-way merge order and the conflict policies"""
+        first = [('A', [row('A[0]', 's', '1')]), ('C', [row('C[0]', 's', 'x')])]
+        second = [('A', [row('A[0]', 's', '2')]), ('B', [row('B[0]', 's', 'y')]), ('C', [row('C[0]', 's', 'x')])]
+
+        conflicts = []
+        rows = list(merge_groups([iter(first), iter(second)], 'first', conflicts))
+        assert [r['Name'] for r in rows] == ['A[0]', 'B[0]', 'C[0]']
+        assert rows[0]['Value'] == '1'
+        assert conflicts == [('A', [0, 1])]
+
+        rows = list(merge_groups([iter(first), iter(second)], 'last'))
+        assert rows[0]['Value'] == '2'
+
+        with pytest.raises(MergeConflictError) as excinfo:
+            list(merge_groups([iter(first), iter(second)], 'error'))
+        assert excinfo.value.connection_name == 'A'
+
+    def test_merge_yaml_and_xlsx(self, work_dir, files):
+        """Test merging a YAML and an unsorted workbook into a sorted YAML"""
+        output = os.path.join(work_dir, 'merged.yml')
+        success, warnings, error = merge_files([files['a'], files['b_xlsx']], output)
+        assert success, error
+        assert any('SAP_SOAP' in warning for warning in warnings)
+        rows = read_rows(output)
+        assert [r['Name'] for r in rows] == ['API_KEY[0]', 'DB_MAIN[0]', 'SAP_SOAP[0]']
+        assert rows[2]['Value'] == 'https://a.example.com'
+
+    def test_sorted_table_streams(self, work_dir, files):
+        """Test that a merged (sorted) table can be merged again"""
+        merged = os.path.join(work_dir, 'merged.ndjson')
+        success, _warnings, error = merge_files([files['b'], files['a']], merged, policy='first')
+        assert success, error
+        output = os.path.join(work_dir, 'again.csv')
+        success, warnings, error = merge_files([merged, files['a']], output, policy='last')
+        assert success, error
+        assert read_rows(output)[2]['Value'] == 'https://a.example.com'
+
+    def test_error_policy(self, work_dir, files):
+        """Test that a conflict names the connection and leaves an existing output untouched"""
+        for extension in ('yml', 'csv', 'xlsx'):
+            output = os.path.join(work_dir, f'merged.{extension}')
+            assert merge_files([files['b']], output)[0]
+            os.chmod(output, 0o640)
+            with open(output, 'rb') as f:
+                before = f.read()
+            success, _warnings, error = merge_files([files['a'], files['b']], output, policy='error')
+            assert not success
+            assert 'SAP_SOAP' in error
+            with open(output, 'rb') as f:
+                assert f.read() == before
+            assert merge_files([files['a'], files['b']], output, policy='last')[0]
+            assert os.stat(output).st_mode & 0o777 == 0o640
+        assert not [name for name in os.listdir(work_dir) if name.startswith('.tmp-')]
+
+    def test_cli(self, work_dir, files):
+        """Test the merge subcommand"""
+        output = os.path.join(work_dir, 'merged.xlsx')
+        assert main(['merge', files['a'], files['b'], '-o', output, '--policy', 'last']) == 0
+        assert read_rows(output)[2]['Value'] == 'https://b.example.com'
+        assert main(['merge', files['a'], files['b'], '-o', output, '--policy', 'error']) == 1
+        assert main(['merge', files['a'], os.path.join(work_dir, 'missing.yml'), '-o', output]) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
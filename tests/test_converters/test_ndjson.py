@@ -0,0 +1,91 @@
+"""
+Test suite for NDJSON export/import of flattened rows
+"""
+import pytest
+import io
+import json
+import os
+import shutil
+import tempfile
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml, iter_table_rows
+from yamlconverter.converters.custom_ndjson import read_ndjson_table, write_ndjson_rows
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.utils.formats import detect_conversion_mode, table_format
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$PASSWORD$$"
+      value: 'pà"ss'
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+"""
+
+
+class TestNDJSON:
+    """Test cases for NDJSON as tabular format"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_format_detection(self):
+        """Test extension-based detection of NDJSON"""
+        assert table_format('rows.ndjson') == 'ndjson'
+        assert table_format('rows.jsonl.gz') == 'ndjson'
+        assert detect_conversion_mode('a.yml', 'a.jsonl') == 'yaml_to_excel'
+
+    def test_round_trip(self, work_dir):
+        """Test YAML → NDJSON → YAML gives back the same file"""
+        yaml_file = os.path.join(work_dir, 'secrets.yml')
+        with open(yaml_file, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        ndjson_file = os.path.join(work_dir, 'secrets.ndjson')
+        back_file = os.path.join(work_dir, 'back.yml')
+
+        success, _warnings, error = custom_yaml_to_excel(yaml_file, ndjson_file)
+        assert success, error
+        with open(ndjson_file, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert records[0] == {'Name': 'SAP_SOAP[0]', 'Secret': '$$ENDPOINT$$', 'Value': 'https://example.com/api'}
+        assert len(records) == 3
+
+        success, _warnings, error = custom_excel_to_yaml(ndjson_file, back_file, streaming=True)
+        assert success, error
+        with open(back_file, 'r', encoding='utf-8') as f:
+            assert f.read() == SAMPLE_YAML
+
+    def test_batched_writes(self):
+        """Test that rows are written in batches"""
+        writes = []
+
+        class Recorder(io.StringIO):
+            def write(self, data):
+                writes.append(data)
+                return super().write(data)
+
+        rows = ({'Name': f'C[{i}]', 'Secret': 's', 'Value': 'v'} for i in range(25))
+        assert write_ndjson_rows(rows, Recorder(), batch_size=10) == 25
+        assert [chunk.count('\n') for chunk in writes] == [10, 10, 5]
+
+    def test_reader_normalizes_and_skips_blank_lines(self):
+        """Test normalization of values and blank lines"""
+        source = io.StringIO('{"Name":"A[0]","Secret":"s","Value":42}\n\n{"Name":" B[0] ","Value":"x  y"}\n')
+        rows = list(iter_table_rows(read_ndjson_table(source)))
+        assert rows == [{'Name': 'A[0]', 'Secret': 's', 'Value': '42'},
+                        {'Name': 'B[0]', 'Secret': '', 'Value': 'x y'}]
+
+    def test_invalid_line(self):
+        """Test that a malformed line reports its line number"""
+        source = io.StringIO('{"Name":"A[0]"}\nnot json\n')
+        with pytest.raises(ValueError, match='2'):
+            list(iter_table_rows(read_ndjson_table(source)))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,85 @@
+"""
+Test suite for the single-file conversion pipeline (GPG + converters)
+"""
+import pytest
+import os
+import shutil
+import tempfile
+from openpyxl import load_workbook
+from yamlconverter.converters.pipeline import convert_file
+from yamlconverter.utils.gpg_utils import decrypt_file, encrypt_file
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$USERNAME$$"
+      value: "user"
+"""
+
+
+class TestConvertFile:
+    """Test cases for convert_file"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def yaml_file(self, work_dir):
+        """Create a sample YAML file"""
+        path = os.path.join(work_dir, 'secrets.yml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        return path
+
+    def test_mode_detected_from_extensions(self, yaml_file, work_dir):
+        """Test YAML → Excel conversion with automatic mode detection"""
+        output = os.path.join(work_dir, 'secrets.xlsx')
+        success, warnings, error = convert_file(yaml_file, output)
+        assert success, error
+        wb = load_workbook(output)
+        assert wb.active['B2'].value == '$$ENDPOINT$$'
+        wb.close()
+
+    def test_unrecognized_extensions(self, yaml_file, work_dir):
+        """Test that unknown extensions are rejected"""
+        success, warnings, error = convert_file(yaml_file, os.path.join(work_dir, 'out.txt'))
+        assert not success
+        assert error
+
+    def test_password_required_for_encrypted_input(self, work_dir):
+        """Test that a missing password is reported"""
+        success, warnings, error = convert_file(os.path.join(work_dir, 'a.yml.gpg'),
+                                                os.path.join(work_dir, 'a.xlsx'))
+        assert not success
+        assert error
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="GPG not installed")
+    def test_encrypted_roundtrip_leaves_no_plaintext(self, work_dir):
+        """Test .gpg → Excel → .gpg without plaintext files left on disk"""
+        encrypted_input = os.path.join(work_dir, 'secrets.yml.gpg')
+        ok, error = encrypt_file(SAMPLE_YAML, encrypted_input, 'pw')
+        assert ok, error
+
+        excel = os.path.join(work_dir, 'secrets.xlsx')
+        success, warnings, error = convert_file(encrypted_input, excel, password='pw')
+        assert success, error
+
+        encrypted_output = os.path.join(work_dir, 'roundtrip.yml.gpg')
+        success, warnings, error = convert_file(excel, encrypted_output, password='pw')
+        assert success, error
+        assert sorted(os.listdir(work_dir)) == ['roundtrip.yml.gpg', 'secrets.xlsx', 'secrets.yml.gpg']
+
+        ok, content, error = decrypt_file(encrypted_output, 'pw')
+        assert ok, error
+        assert '$$USERNAME$$' in content
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
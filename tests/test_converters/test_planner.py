@@ -0,0 +1,153 @@
+"""
+Test suite for the adaptive conversion planner
+"""
+import pytest
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from openpyxl import Workbook
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.filters import build_connection_filter
+from yamlconverter.converters.pipeline import convert_file
+from yamlconverter.converters.planner import estimate_input, format_plan, plan_conversion
+
+
+def write_rlist(path, connections, secrets=3):
+    """Write a synthetic rlist and return its row count"""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('# header\nConnections:\n')
+        for i in range(connections):
+            f.write(f'  CONN_{i:05d}:\n')
+            for j in range(secrets):
+                f.write(f'    - secret: "$$S{j}$$"\n      value: "v{i}-{j}"\n')
+    return connections * secrets
+
+
+class TestPlanner:
+    """Test cases for planner.py and the YAML streaming strategy"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_estimates(self, temp_dir):
+        """Test cheap row estimates for YAML, text tables and both kinds of xlsx sheets"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        rows = write_rlist(yaml_path, 2000)
+        estimated, memory = estimate_input(yaml_path, 'yaml_to_excel')
+        assert abs(estimated - rows) < rows * 0.1 and memory > os.path.getsize(yaml_path)
+
+        for extension in ('csv', 'xlsx'):
+            table_path = os.path.join(temp_dir, f'a.{extension}')
+            custom_yaml_to_excel(yaml_path, table_path)
+            estimated, memory = estimate_input(table_path, 'excel_to_yaml')
+            assert abs(estimated - rows) < rows * 0.2 and memory > 0
+
+        # Foglio salvato da openpyxl in modalità normale: righe lette da <dimension>
+        wb = Workbook()
+        wb.active.append(['Name', 'Secret', 'Value'])
+        for i in range(123):
+            wb.active.append([f'C[{i}]', '$$X$$', 'v'])
+        xlsx_path = os.path.join(temp_dir, 'dimension.xlsx')
+        wb.save(xlsx_path)
+        assert estimate_input(xlsx_path, 'excel_to_yaml')[0] == 123
+        assert estimate_input(io.StringIO(''), 'excel_to_yaml') == (None, None)
+
+    def test_plan_choices(self, temp_dir):
+        """Test the strategy chosen for each mode under different memory caps"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 500)
+        plan = plan_conversion(yaml_path, 'yaml_to_excel')
+        assert (plan['strategy'], plan['reason']) == ('memory', 'plan_reason_within_cap')
+        plan = plan_conversion(yaml_path, 'yaml_to_excel', memory_cap=1024)
+        assert (plan['strategy'], plan['options']) == ('streaming', {'streaming': True})
+        gz_path = yaml_path + '.gz'
+        with open(yaml_path, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+            dst.write(src.read())
+        assert plan_conversion(gz_path, 'yaml_to_excel', memory_cap=1024)['reason'] == 'plan_reason_single_read'
+
+        csv_path = os.path.join(temp_dir, 'a.csv')
+        custom_yaml_to_excel(yaml_path, csv_path)
+        plan = plan_conversion(csv_path, 'excel_to_yaml', memory_cap=1024)
+        assert plan['options'] == {'streaming': True, 'memory_budget': 1024}
+        plan = plan_conversion(io.StringIO(''), 'excel_to_yaml')
+        assert (plan['strategy'], plan['reason']) == ('memory', 'plan_reason_unknown_size')
+        plan = plan_conversion(csv_path, 'excel_to_yaml', strategy='spill')
+        assert plan['options'] == {'memory_budget': 0} and plan['reason'] == 'plan_reason_forced'
+        assert 'spill' in format_plan(plan)
+        with pytest.raises(ValueError):
+            plan_conversion(yaml_path, 'yaml_to_excel', strategy='spill')
+
+    def test_yaml_streaming_output(self, temp_dir, monkeypatch):
+        """Test that chunked YAML parsing writes the same table, with filters and duplicates"""
+        monkeypatch.setattr('yamlconverter.converters.custom_yaml_to_excel.PARALLEL_MIN_CHUNK_BYTES', 256)
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 300)
+        outputs = {}
+        for streaming in (False, True):
+            path = os.path.join(temp_dir, f'out_{streaming}.csv')
+            assert custom_yaml_to_excel(yaml_path, path, streaming=streaming)[0]
+            with open(path, encoding='utf-8') as f:
+                outputs[streaming] = f.read()
+        assert outputs[True] == outputs[False]
+
+        connection_filter = build_connection_filter(include=['CONN_0001*'])
+        path = os.path.join(temp_dir, 'filtered.csv')
+        assert custom_yaml_to_excel(yaml_path, path, streaming=True, connection_filter=connection_filter)[0]
+        with open(path, encoding='utf-8') as f:
+            assert len(f.read().splitlines()) == 1 + 10 * 3
+
+        # Connessioni duplicate: documento intero, come yaml.safe_load
+        with open(yaml_path, 'a', encoding='utf-8') as f:
+            f.write('  CONN_00000:\n    - secret: "$$NEW$$"\n      value: "new"\n')
+        success, warnings, _error = custom_yaml_to_excel(yaml_path, path, streaming=True)
+        assert success and warnings
+        with open(path, encoding='utf-8') as f:
+            assert f.read().splitlines()[1] == 'CONN_00000[0],$$NEW$$,new'
+
+    def test_syntax_error_lines(self, temp_dir, monkeypatch):
+        """Test that errors in a streamed chunk report the line number of the file"""
+        monkeypatch.setattr('yamlconverter.converters.custom_yaml_to_excel.PARALLEL_MIN_CHUNK_BYTES', 256)
+        yaml_path = os.path.join(temp_dir, 'bad.yml')
+        write_rlist(yaml_path, 100)
+        with open(yaml_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        lines[150] = '      value: "unterminated'
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        errors = [custom_yaml_to_excel(yaml_path, os.path.join(temp_dir, 'out.csv'), streaming=streaming)[2]
+                  for streaming in (False, True)]
+        assert f'"{yaml_path}", line 151' in errors[0]
+        assert f'"{yaml_path}", line 151' in errors[1]
+
+    def test_convert_file_and_cli(self, temp_dir, capsys):
+        """Test the logged plan, explicit overrides and the CLI options"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 50)
+        csv_path = os.path.join(temp_dir, 'a.csv')
+        assert convert_file(yaml_path, csv_path, memory_cap=1024)[0]
+        assert 'plan_strategy: streaming' in capsys.readouterr().out
+
+        # Un'opzione esplicita esclude la scelta automatica
+        back_path = os.path.join(temp_dir, 'back.yml')
+        assert convert_file(csv_path, back_path, streaming=True)[0]
+        assert 'plan_strategy' not in capsys.readouterr().out
+        assert not convert_file(yaml_path, csv_path, strategy='spill')[0]
+
+        assert main(['convert', csv_path, back_path, '--strategy', 'spill']) == 0
+        assert 'plan_strategy: spill' in capsys.readouterr().out
+        with open(back_path, encoding='utf-8') as f, open(yaml_path, encoding='utf-8') as g:
+            assert f.read() == g.read().replace('# header\n', '')
+        assert main(['convert', yaml_path, csv_path, '--strategy', 'spill']) == 2
+        assert main(['convert', yaml_path, csv_path, '--memory-cap', '0.001']) == 0
+        assert 'plan_strategy: streaming' in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
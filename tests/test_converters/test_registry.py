@@ -0,0 +1,148 @@
+"""
+Test suite for the engine registry
+"""
+import pytest
+import csv
+import io
+import os
+import shutil
+import tempfile
+import yaml
+from yamlconverter.cli.main import main
+from yamlconverter.converters import registry
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml, open_text_table_rows
+from yamlconverter.converters.custom_ndjson import write_ndjson_rows
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.registry import (
+    EngineNotFoundError, get_engine, list_engines, register_engine, register_format, set_preferred_engine,
+)
+from yamlconverter.utils import formats
+from yamlconverter.utils.formats import detect_conversion_mode, table_format
+
+RLIST = 'Connections:\n  SAP_SOAP:\n    - secret: "$$PASSWORD$$"\n      value: "pw"\n'
+
+CALLS = []
+
+
+def open_psv_rows(stack, source, fmt, streaming, parallel, workers, i18n):
+    """Reader engine for pipe-separated values (used through a 'module:attribute' target)"""
+    CALLS.append('reader')
+    return open_text_table_rows(stack, source, lambda f: csv.reader(f, delimiter='|'), i18n)
+
+
+def write_psv_rows(rows, output_file, fmt):
+    """Writer engine for pipe-separated values"""
+    CALLS.append('writer')
+    with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
+        writer = csv.writer(f, delimiter='|', lineterminator='\n')
+        writer.writerow(['Name', 'Secret', 'Value'])
+        count = 0
+        for row in rows:
+            writer.writerow([row['Name'], row['Secret'], row['Value']])
+            count += 1
+    return (count, 1)
+
+
+class TestRegistry:
+    """Test cases for registry.py"""
+
+    @pytest.fixture
+    def isolated(self):
+        """Restore the registry and the format lists after the test"""
+        engines = {key: list(value) for key, value in registry._ENGINES.items()}
+        saved = {name: list(getattr(formats, name))
+                 for name in ('TABLE_FORMATS', 'TEXT_TABLE_EXTENSIONS', 'TABLE_EXTENSIONS')}
+        plugin_extensions = dict(formats._PLUGIN_TABLE_EXTENSIONS)
+        temp_dir = tempfile.mkdtemp()
+        CALLS.clear()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        registry._ENGINES.clear()
+        registry._ENGINES.update(engines)
+        registry._PREFERRED.clear()
+        for name, values in saved.items():
+            getattr(formats, name)[:] = values
+        formats._PLUGIN_TABLE_EXTENSIONS.clear()
+        formats._PLUGIN_TABLE_EXTENSIONS.update(plugin_extensions)
+        registry.PLUGIN_ERRORS.clear()
+
+    def test_fastest_available_engine(self, isolated):
+        """Test priority order, availability checks and the preferred override"""
+        expected = 'libyaml' if yaml.__with_libyaml__ else 'pyyaml'
+        assert get_engine('yaml_loader', 'yaml').name == expected
+        register_engine('writer', 'ndjson', 'missing', 'nowhere:write', priority=1000,
+                        requires=['module_that_does_not_exist'])
+        assert get_engine('writer', 'ndjson').name != 'missing'
+        set_preferred_engine('writer', 'ndjson', 'json')
+        assert get_engine('writer', 'ndjson').name == 'json'
+        set_preferred_engine('writer', 'ndjson')
+        with pytest.raises(EngineNotFoundError):
+            get_engine('writer', 'parquet')
+        with pytest.raises(ValueError):
+            register_engine('parser', 'yaml', 'x', 'yaml:SafeLoader')
+
+    def test_ndjson_engines_same_output(self, isolated):
+        """Test that every available ndjson writer produces the same bytes"""
+        rows = [{'Name': 'A[0]', 'Secret': '$$X$$', 'Value': 'é\n"\t\x01 😀'}] * 3
+        outputs = set()
+        for engine in list_engines('writer', 'ndjson'):
+            if engine.is_available():
+                buffer = io.StringIO()
+                assert engine.load()(iter(rows), buffer, 'ndjson') == (3, 1)
+                outputs.add(buffer.getvalue())
+        reference = io.StringIO()
+        write_ndjson_rows(rows, reference)
+        assert outputs == {reference.getvalue()}
+
+    def test_plugin_format_round_trip(self, isolated):
+        """Test a new format registered with lazily loaded engines"""
+        register_format('psv', ['.psv'])
+        reader = register_engine('reader', 'psv', 'pipe', f'{__name__}:open_psv_rows')
+        register_engine('writer', 'psv', 'pipe', f'{__name__}:write_psv_rows')
+        assert not reader.loaded
+        assert table_format('data.psv') == 'psv'
+        assert detect_conversion_mode('data.yml', 'data.psv') == 'yaml_to_excel'
+
+        yaml_path = os.path.join(isolated, 'data.yml')
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            f.write(RLIST)
+        psv_path = os.path.join(isolated, 'data.psv')
+        assert custom_yaml_to_excel(yaml_path, psv_path)[0]
+        with open(psv_path, encoding='utf-8') as f:
+            assert f.read() == 'Name|Secret|Value\nSAP_SOAP[0]|$$PASSWORD$$|pw\n'
+        back_path = os.path.join(isolated, 'back.yml')
+        assert custom_excel_to_yaml(psv_path, back_path)[0]
+        with open(back_path, encoding='utf-8') as f:
+            assert f.read() == RLIST
+        assert reader.loaded and CALLS == ['writer', 'reader']
+
+    def test_plugins_from_entry_points(self, isolated, monkeypatch, capsys):
+        """Test entry point discovery, error isolation and the engines command"""
+        class FakeEntryPoint:
+            def __init__(self, name, func):
+                self.name = name
+                self.func = func
+
+            def load(self):
+                return self.func
+
+        def broken():
+            raise ImportError('missing dependency')
+
+        def register():
+            register_engine('yaml_loader', 'yaml', 'plugin', 'yaml:SafeLoader', priority=500)
+
+        monkeypatch.setattr(registry, '_plugin_entry_points',
+                            lambda: [FakeEntryPoint('broken', broken), FakeEntryPoint('fast', register)])
+        monkeypatch.setattr(registry, '_plugins_loaded', False)
+        assert get_engine('yaml_loader', 'yaml').name == 'plugin'
+        assert registry.PLUGIN_ERRORS == [('broken', 'missing dependency')]
+
+        assert main(['engines']) == 1
+        output = capsys.readouterr()
+        assert '* yaml_loader  yaml    plugin' in output.out
+        assert 'broken' in output.err
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
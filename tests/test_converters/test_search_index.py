@@ -0,0 +1,123 @@
+"""
+Test suite for the persistent search index
+"""
+import pytest
+import os
+import shutil
+import sqlite3
+import tempfile
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.converters.search_index import search_index, update_index
+from yamlconverter.utils.gpg_utils import encrypt_file
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+APP_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$API_KEY$$"
+      value: "very-secret-value"
+"""
+
+DB_YAML = """Connections:
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+    - secret: "$$API_KEY$$"
+      value: "other-secret-value"
+"""
+
+
+class TestSearchIndex:
+    """Test cases for update_index and search_index"""
+
+    @pytest.fixture
+    def tree(self):
+        """Create a tree of rlists and an index path outside of it"""
+        temp_dir = tempfile.mkdtemp()
+        root = os.path.join(temp_dir, 'rlists')
+        os.makedirs(os.path.join(root, 'db'))
+        os.makedirs(os.path.join(root, '.git'))
+        with open(os.path.join(root, 'app.yml'), 'w', encoding='utf-8') as f:
+            f.write(APP_YAML)
+        db_yaml = os.path.join(root, 'db', 'db.yml')
+        with open(db_yaml, 'w', encoding='utf-8') as f:
+            f.write(DB_YAML)
+        success, _warnings, error = custom_yaml_to_excel(db_yaml, os.path.join(root, 'db', 'db.xlsx'))
+        assert success, error
+        with open(os.path.join(root, '.git', 'hidden.yml'), 'w', encoding='utf-8') as f:
+            f.write(APP_YAML)
+        yield {'root': root, 'index': os.path.join(temp_dir, 'index.sqlite')}
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_index_and_search(self, tree):
+        """Test indexing a tree and querying placeholders and connections"""
+        success, _warnings, error, report = update_index([tree['root']], tree['index'])
+        assert success, error
+        assert report['indexed'] == 3 and report['entries'] == 6
+
+        results = search_index(tree['index'], secret='API_KEY')
+        assert [(os.path.basename(r['path']), r['row']) for r in results] == [
+            ('app.yml', 2), ('db.xlsx', 2), ('db.yml', 2)]
+        assert results[0]['name'] == 'SAP_SOAP[1]'
+
+        results = search_index(tree['index'], secret='$$API_KEY$$', connection='DB_MAIN', exact=True)
+        assert len(results) == 2
+        assert len(search_index(tree['index'], text='db_')) == 4
+        assert search_index(tree['index'], connection='DB', secret='ENDPOINT') == []
+
+    def test_values_are_not_stored(self, tree):
+        """Test that no value reaches the index file"""
+        update_index([tree['root']], tree['index'])
+        db = sqlite3.connect(tree['index'])
+        dump = '\n'.join(db.iterdump())
+        db.close()
+        assert 'secret-value' not in dump
+        assert 'example.com' not in dump
+
+    def test_incremental_update(self, tree):
+        """Test that unchanged files are skipped and changes and removals are picked up"""
+        update_index([tree['root']], tree['index'])
+        _success, _warnings, _error, report = update_index([tree['root']], tree['index'])
+        assert report['indexed'] == 0 and report['unchanged'] == 3
+
+        # Stesso contenuto con mtime diverso: solo l'hash viene ricalcolato
+        app = os.path.join(tree['root'], 'app.yml')
+        os.utime(app, ns=(0, 0))
+        _success, _warnings, _error, report = update_index([tree['root']], tree['index'])
+        assert report['indexed'] == 0
+
+        with open(app, 'w', encoding='utf-8') as f:
+            f.write(APP_YAML.replace('API_KEY', 'TOKEN'))
+        os.remove(os.path.join(tree['root'], 'db', 'db.xlsx'))
+        _success, _warnings, _error, report = update_index([tree['root']], tree['index'])
+        assert report['indexed'] == 1 and report['removed'] == 1
+        assert [os.path.basename(r['path']) for r in search_index(tree['index'], secret='API_KEY')] == ['db.yml']
+        assert len(search_index(tree['index'], secret='TOKEN')) == 1
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_encrypted_files(self, tree, monkeypatch):
+        """Test that .gpg files need the password and are indexed with it"""
+        gpg_file = os.path.join(tree['root'], 'secure.yml.gpg')
+        success, error = encrypt_file(APP_YAML.replace('SAP_SOAP', 'VAULT'), gpg_file, 'pw')
+        assert success, error
+        _success, _warnings, _error, report = update_index([tree['root']], tree['index'])
+        assert len(report['failed']) == 1
+        _success, _warnings, _error, report = update_index([tree['root']], tree['index'], password='pw')
+        assert report['indexed'] == 1
+        assert len(search_index(tree['index'], connection='VAULT')) == 2
+
+    def test_cli(self, tree, capsys):
+        """Test the index and search subcommands"""
+        assert main(['index', tree['root'], '--index', tree['index']]) == 0
+        capsys.readouterr()
+        assert main(['search', '--secret', '$$API_KEY$$', '--index', tree['index']]) == 0
+        assert 'app.yml:2' in capsys.readouterr().out
+        assert main(['search', 'NOTHING_LIKE_THIS', '--index', tree['index']]) == 1
+        assert main(['search', 'x', '--index', tree['index'] + '.missing']) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
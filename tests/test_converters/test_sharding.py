@@ -0,0 +1,104 @@
+"""
+Test suite for sharding large workbooks across Connections, Connections_2, ...
+"""
+import pytest
+import os
+import shutil
+import tempfile
+import openpyxl
+from yamlconverter.converters import custom_yaml_to_excel as yaml_to_excel_module
+from yamlconverter.converters.custom_excel_to_yaml import (
+    custom_excel_to_yaml, shard_sheet_name, shard_sheet_names,
+)
+from yamlconverter.converters.custom_yaml_to_excel import (
+    ConnectionTooLargeError, custom_yaml_to_excel, write_workbook_rows,
+)
+
+
+def make_yaml(connections, secrets_per_connection):
+    """Build a YAML document with the given number of connections"""
+    lines = ['Connections:']
+    for c in range(connections):
+        lines.append(f'  CONN_{c}:')
+        for s in range(secrets_per_connection):
+            lines.append(f'    - secret: "$$S{s}$$"')
+            lines.append(f'      value: "v{c}_{s}"')
+    return '\n'.join(lines) + '\n'
+
+
+class TestSheetSharding:
+    """Test cases for multi-sheet workbooks"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def yaml_file(self, work_dir):
+        """Create a YAML file with 7 connections of 3 secrets each"""
+        path = os.path.join(work_dir, 'secrets.yml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(make_yaml(7, 3))
+        return path
+
+    def test_sheet_names(self):
+        """Test naming of the shard sheets"""
+        assert shard_sheet_name(1) == 'Connections'
+        assert shard_sheet_name(3) == 'Connections_3'
+
+    def test_connections_never_split(self, work_dir, yaml_file, monkeypatch):
+        """Test that a connection is always written to a single sheet"""
+        monkeypatch.setattr(yaml_to_excel_module, 'SHEET_MAX_ROWS', 8)
+        excel_file = os.path.join(work_dir, 'secrets.xlsx')
+        success, _warnings, error = custom_yaml_to_excel(yaml_file, excel_file)
+        assert success, error
+
+        wb = openpyxl.load_workbook(excel_file, read_only=True)
+        try:
+            names = shard_sheet_names(wb)
+            assert names == ['Connections', 'Connections_2', 'Connections_3', 'Connections_4']
+            seen = {}
+            for sheet_name in names:
+                rows = list(wb[sheet_name].iter_rows(values_only=True))
+                assert rows[0] == ('Name', 'Secret', 'Value')
+                assert len(rows) <= 8
+                for name, _secret, _value in rows[1:]:
+                    connection = name.split('[')[0]
+                    assert seen.setdefault(connection, sheet_name) == sheet_name
+        finally:
+            wb.close()
+
+    @pytest.mark.parametrize('options', [{}, {'streaming': True}, {'parallel': True, 'workers': 2}])
+    def test_round_trip_all_sheets(self, work_dir, yaml_file, monkeypatch, options):
+        """Test that all sheets are read back, in order, into one document"""
+        monkeypatch.setattr(yaml_to_excel_module, 'SHEET_MAX_ROWS', 8)
+        excel_file = os.path.join(work_dir, 'secrets.xlsx')
+        back_file = os.path.join(work_dir, 'back.yml')
+        assert custom_yaml_to_excel(yaml_file, excel_file)[0]
+
+        success, _warnings, error = custom_excel_to_yaml(excel_file, back_file, **options)
+        assert success, error
+        with open(back_file, 'r', encoding='utf-8') as f:
+            assert f.read() == make_yaml(7, 3)
+
+    def test_single_sheet_by_default(self, work_dir, yaml_file):
+        """Test that small inputs still produce a single Connections sheet"""
+        excel_file = os.path.join(work_dir, 'secrets.xlsx')
+        assert custom_yaml_to_excel(yaml_file, excel_file)[0]
+        wb = openpyxl.load_workbook(excel_file)
+        assert wb.sheetnames == ['Connections']
+
+    def test_connection_too_large(self, work_dir, yaml_file):
+        """Test the error when one connection does not fit in a sheet"""
+        rows = ({'Name': f'BIG[{i}]', 'Secret': 's', 'Value': 'v'} for i in range(5))
+        with pytest.raises(ConnectionTooLargeError) as excinfo:
+            write_workbook_rows(rows, os.path.join(work_dir, 'big.xlsx'), max_rows=4)
+        assert excinfo.value.connection_name == 'BIG'
+        assert excinfo.value.row_count == 5
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
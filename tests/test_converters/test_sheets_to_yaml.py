@@ -0,0 +1,122 @@
+"""
+Test suite for converting every sheet of a workbook to its own YAML file
+"""
+import pytest
+import os
+import shutil
+import tempfile
+from openpyxl import Workbook
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_excel_to_yaml import (
+    convert_workbook_sheets, custom_excel_sheets_to_yaml, sheet_output_path, sheet_output_paths,
+)
+
+ENVIRONMENTS = {
+    'dev': [('DB[0]', '$$USER$$', 'dev_user'), ('DB[1]', '$$HOST$$', 'dev.local')],
+    'staging': [('DB[0]', '$$USER$$', 'stg_user'), ('API[0]', '$$URL$$', 'https://stg')],
+    'prod': [('DB[0]', '$$USER$$', 'prod_user'), ('API[0]', '$$URL$$', 'https://prod'),
+             ('DB[1]', '$$HOST$$', 'prod.local')],
+}
+
+
+class TestSheetsToYaml:
+    """Test cases for one YAML per sheet"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def excel_file(self, work_dir):
+        """Create a workbook with a sheet per environment"""
+        wb = Workbook()
+        wb.remove(wb.active)
+        for sheet_name, rows in ENVIRONMENTS.items():
+            ws = wb.create_sheet(sheet_name)
+            ws.append(['Name', 'Secret', 'Value'])
+            for row in rows:
+                ws.append(list(row))
+        path = os.path.join(work_dir, 'app.xlsx')
+        wb.save(path)
+        return path
+
+    def read(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_output_path(self):
+        """Test the per-sheet output file name"""
+        assert sheet_output_path('/x/app.xlsx', 'prod', 'out') == os.path.join('out', 'app.prod.yml')
+        assert sheet_output_path('app.xlsx', 'my env/2', 'out') == os.path.join('out', 'app.my_env_2.yml')
+        assert sheet_output_paths('app.xlsx', ['a/b', 'a:b', 'A b', 'a_b_2'], 'out') == [
+            os.path.join('out', name) for name in ('app.a_b.yml', 'app.a_b_2.yml', 'app.A_b_3.yml', 'app.a_b_2_2.yml')]
+
+    def test_colliding_sheet_names(self, work_dir, excel_file):
+        """Test that sheets with the same sanitized name do not overwrite each other"""
+        from openpyxl import load_workbook
+        wb = load_workbook(excel_file)
+        wb['dev'].title = 'env x'
+        wb['staging'].title = 'ENV<x'
+        wb.save(excel_file)
+
+        out_dir = os.path.join(work_dir, 'out')
+        reports = convert_workbook_sheets(excel_file, out_dir)
+        assert [os.path.basename(report['output']) for report in reports] == [
+            'app.env_x.yml', 'app.ENV_x_2.yml', 'app.prod.yml']
+        assert 'stg_user' in self.read(os.path.join(out_dir, 'app.ENV_x_2.yml'))
+        assert 'stg_user' not in self.read(os.path.join(out_dir, 'app.env_x.yml'))
+
+    @pytest.mark.parametrize('options', [{}, {'streaming': True}, {'parallel': True, 'workers': 2}])
+    def test_all_sheets(self, work_dir, excel_file, options):
+        """Test that every sheet gets its own YAML with per-sheet reports"""
+        out_dir = os.path.join(work_dir, 'out')
+        reports = convert_workbook_sheets(excel_file, out_dir, **options)
+        assert [report['sheet'] for report in reports] == ['dev', 'staging', 'prod']
+        for report in reports:
+            assert report['success'], report['error']
+            assert set(report['timings']) >= {'open', 'read', 'write', 'total'}
+
+        assert 'prod_user' in self.read(os.path.join(out_dir, 'app.prod.yml'))
+        assert 'stg_user' not in self.read(os.path.join(out_dir, 'app.prod.yml'))
+        assert reports[2]['connections'] == 2
+
+    def test_selected_sheets_and_warnings(self, work_dir, excel_file):
+        """Test a subset of sheets and that warnings are prefixed by the sheet"""
+        out_dir = os.path.join(work_dir, 'out')
+        success, warnings, error = custom_excel_sheets_to_yaml(excel_file, out_dir, ['prod'], streaming=True)
+        assert success, error
+        assert os.listdir(out_dir) == ['app.prod.yml']
+        # prod has DB rows split by API rows: the streaming writer falls back
+        assert len(warnings) == 1 and warnings[0].startswith('[prod] ')
+
+    def test_missing_sheet(self, work_dir, excel_file):
+        """Test that an unknown sheet is reported before writing anything"""
+        success, _warnings, error = custom_excel_sheets_to_yaml(excel_file, work_dir, ['qa'])
+        assert not success
+        assert error.endswith("sheet_not_found: qa")
+
+    def test_sheet_error_is_isolated(self, work_dir, excel_file):
+        """Test that a bad sheet fails alone"""
+        from openpyxl import load_workbook
+        wb = load_workbook(excel_file)
+        wb.create_sheet('notes').append(['just', 'text'])
+        wb.save(excel_file)
+
+        reports = convert_workbook_sheets(excel_file, work_dir)
+        assert [report['success'] for report in reports] == [True, True, True, False]
+        success, _warnings, error = custom_excel_sheets_to_yaml(excel_file, work_dir)
+        assert not success
+        assert error.startswith('[notes]')
+
+    def test_cli_split(self, work_dir, excel_file):
+        """Test the split subcommand"""
+        out_dir = os.path.join(work_dir, 'out')
+        assert main(['split', excel_file, '--output-dir', out_dir, '--sheets', 'dev,staging']) == 0
+        assert sorted(os.listdir(out_dir)) == ['app.dev.yml', 'app.staging.yml']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
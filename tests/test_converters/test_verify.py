@@ -0,0 +1,148 @@
+"""
+Test suite for the in-memory round trip verification
+"""
+import pytest
+import os
+import shutil
+import tempfile
+from yamlconverter.cli.main import main
+from yamlconverter.converters.diff import MASK
+from yamlconverter.converters.verify import (
+    RowDigest, first_divergences, format_verify_report, verify_round_trip, verify_rows, verify_table, verify_written_table,
+)
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+    - secret: "$$PASSWORD$$"
+      value: 'pà"ss\\\\x'
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+"""
+
+
+def row(name, secret, value):
+    return {'Name': name, 'Secret': secret, 'Value': value}
+
+
+class TestVerify:
+    """Test cases for verify_rows and verify_round_trip"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def yaml_file(self, work_dir):
+        """Write the sample rlist"""
+        path = os.path.join(work_dir, 'secrets.yml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        return path
+
+    def test_digest_is_order_sensitive(self):
+        """Test that the digest depends on content and order of the rows"""
+        rows = [row('A[0]', 's', 'v'), row('B[0]', 's', 'v')]
+        first, second, reversed_digest = RowDigest(), RowDigest(), RowDigest()
+        assert list(first.tee(rows)) == rows
+        for item in rows:
+            second.update(item)
+        for item in reversed(rows):
+            reversed_digest.update(item)
+        assert first.hexdigest() == second.hexdigest() != reversed_digest.hexdigest()
+        assert first.count == 2
+
+    @pytest.mark.parametrize('fmt', ['xlsx', 'csv', 'tsv', 'ndjson'])
+    def test_round_trip_ok(self, yaml_file, fmt):
+        """Test that a clean rlist survives the round trip in every table format"""
+        success, warnings, error, result = verify_round_trip(yaml_file, table_format=fmt)
+        assert success, error
+        assert warnings == []
+        assert result['ok']
+        assert result['rows'] == 3
+        assert len(set(result['digests'].values())) == 1
+        assert result['stage'] is None and result['divergences'] == []
+
+    def test_divergence_is_reported(self):
+        """Test that a value altered by the table reader is located and masked"""
+        rows = [row('A[0]', '$$USER$$', 'admin'), row('A[1]', '$$PASSWORD$$', 'a  b')]
+        result = verify_rows(lambda: iter(rows), 'csv')
+        assert not result['ok']
+        assert result['stage'] == 'yaml_to_table'
+        assert result['divergences'] == [{'index': 1, 'expected': row('A[1]', '$$PASSWORD$$', MASK),
+                                          'actual': row('A[1]', '$$PASSWORD$$', MASK), 'fields': ['Value']}]
+        assert "#1 (Value): " in format_verify_report(result, 'a.yml')
+
+        shown = verify_rows(lambda: iter(rows), 'csv', show_values=True)
+        assert shown['divergences'][0]['actual']['Value'] == 'a b'
+
+    def test_first_divergences_limit_and_missing_rows(self):
+        """Test the limit and the None placeholder for missing rows"""
+        expected = [row(f'A[{i}]', 's', 'v') for i in range(4)]
+        actual = [row(f'A[{i}]', 's', 'x') for i in range(2)]
+        divergences = first_divergences(expected, actual, limit=3, show_values=True)
+        assert [d['index'] for d in divergences] == [0, 1, 2]
+        assert divergences[2]['actual'] is None
+        assert divergences[2]['fields'] == ['Name', 'Secret', 'Value']
+
+    def test_missing_file(self, work_dir):
+        """Test that a read error is returned, not raised"""
+        success, _warnings, error, result = verify_round_trip(os.path.join(work_dir, 'missing.yml'))
+        assert not success and error and result is None
+
+    def test_cli(self, work_dir, yaml_file, capsys):
+        """Test the verify subcommand and convert --verify"""
+        assert main(['verify', yaml_file, '--table-format', 'ndjson']) == 0
+        assert '✓' in capsys.readouterr().out
+        assert main(['verify', os.path.join(work_dir, 'missing.yml')]) == 2
+
+        output = os.path.join(work_dir, 'secrets.csv')
+        assert main(['convert', yaml_file, output, '--verify']) == 0
+        assert os.path.exists(output)
+        assert main(['convert', yaml_file, '-', '--verify']) == 2
+        assert 'verify_requires_output_file' in capsys.readouterr().err
+
+    def test_convert_verify_single_read(self, work_dir, yaml_file, monkeypatch, capsys):
+        """Test that convert --verify digests the written rows instead of converting twice"""
+        def fail(*args, **kwargs):
+            raise AssertionError('unexpected second read of the input')
+
+        monkeypatch.setattr('yamlconverter.cli.main.verify_round_trip', fail)
+        monkeypatch.setattr('yamlconverter.converters.verify.open_rows', fail)
+        output = os.path.join(work_dir, 'secrets.xlsx')
+        assert main(['convert', yaml_file, output, '--verify']) == 0
+        assert '✓' in capsys.readouterr().out
+
+    def test_written_table_divergence(self, work_dir, yaml_file):
+        """Test that a written table that lost rows is reported with the diverging rows"""
+        output = os.path.join(work_dir, 'secrets.csv')
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            f.write('Name,Secret,Value\nSAP_SOAP[0],$$ENDPOINT$$,https://example.com/api\n')
+        digest = RowDigest()
+        digest.update(row('SAP_SOAP[0]', '$$ENDPOINT$$', 'https://example.com/api'))
+        digest.update(row('SAP_SOAP[1]', '$$PASSWORD$$', 'x'))
+        success, _warnings, error, result = verify_written_table(digest, output, 'csv', yaml_file)
+        assert success, error
+        assert not result['ok'] and result['stage'] == 'yaml_to_table'
+        assert result['divergences'][0]['index'] == 1
+
+    def test_ungrouped_table(self):
+        """Test the whole-structure fallback when the table rows are not grouped by connection"""
+        rows = [row('A[0]', 's', 'a'), row('B[0]', 's', 'b'), row('A[1]', 's', 'c')]
+        digest = RowDigest()
+        for item in rows:
+            digest.update(item)
+        result = verify_table(digest, lambda stack: iter(rows))
+        assert not result['ok'] and result['stage'] == 'table_to_yaml'
+        assert result['digests']['source'] == result['digests']['table']
+        assert result['divergences'][0] == {'index': 1, 'expected': row('B[0]', 's', MASK),
+                                            'actual': row('A[1]', 's', MASK), 'fields': ['Name', 'Value']}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
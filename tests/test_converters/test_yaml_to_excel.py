@@ -7,7 +7,10 @@ import tempfile
 import time
 import gc
 from pathlib import Path
-from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+import yaml
+from yamlconverter.converters.custom_yaml_to_excel import (
+    custom_yaml_to_excel, parallel_safe_load, scan_connection_blocks,
+)
 
 
 class TestYAMLToExcel:
@@ -142,5 +145,58 @@ class TestYAMLToExcel:
                 os.unlink(temp_yaml)
 
 
+class TestParallelParsing:
+    """Test cases for parallel chunked YAML parsing"""
+    
+    @pytest.fixture
+    def large_yaml_file(self):
+        """Create a YAML file with many connections and a duplicate far apart"""
+        lines = ['# secrets.rlist', 'Connections:']
+        for i in range(200):
+            name = 'DUP_CONN' if i in (3, 150) else f'CONN_{i:04d}'
+            lines.append(f'  {name}:')
+            lines.append(f'    - secret: "$$ENDPOINT$$"')
+            lines.append(f'      value: "https://host{i}.example.com"')
+            lines.append(f'    - secret: "$$PASSWORD$$"')
+            lines.append(f'      value: "p\'w{i}"')
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False, encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            temp_path = f.name
+        yield temp_path
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+    
+    def test_scan_connection_blocks(self, large_yaml_file):
+        """Test that block boundaries cover the whole Connections section"""
+        with open(large_yaml_file, 'rb') as f:
+            content = f.read()
+        start, blocks, end = scan_connection_blocks(content)
+        assert content[start:].startswith(b'Connections:')
+        assert len(blocks) == 200
+        assert blocks[-1][2] == end == len(content)
+        assert all(blocks[i][2] == blocks[i + 1][1] for i in range(len(blocks) - 1))
+    
+    def test_parallel_matches_serial(self, large_yaml_file):
+        """Test that the merged result equals yaml.safe_load, duplicates included"""
+        with open(large_yaml_file, 'r', encoding='utf-8') as f:
+            expected = yaml.safe_load(f)
+        result = parallel_safe_load(large_yaml_file, workers=2, chunk_bytes=512)
+        assert result == expected
+        assert list(result['Connections']) == list(expected['Connections'])
+    
+    def test_parallel_duplicate_warning(self, large_yaml_file, tmp_path):
+        """Test duplicate detection across chunk edges in parallel mode"""
+        excel_file = str(tmp_path / 'out.xlsx')
+        success, warnings, error = custom_yaml_to_excel(large_yaml_file, excel_file, parallel=True, workers=2)
+        assert success, error
+        assert any('DUP_CONN' in w for w in warnings)
+    
+    def test_parallel_falls_back_on_extra_sections(self, tmp_path):
+        """Test that files with other top-level keys are not split"""
+        path = tmp_path / 'extra.yml'
+        path.write_text('Connections:\n  A:\n    - secret: "x"\n      value: "y"\nOther: 1\n', encoding='utf-8')
+        assert parallel_safe_load(str(path), workers=2, chunk_bytes=1) is None
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -7,9 +7,12 @@ Note: These tests are adapted to the actual GPG utilities API:
 """
 import pytest
 import os
+import shutil
 import tempfile
 from pathlib import Path
-from yamlconverter.utils.gpg_utils import encrypt_file, decrypt_file
+from yamlconverter.utils.gpg_utils import (
+    GPG_PROFILES, decrypt_file, encrypt_file, parse_profile, profile_args,
+)
 
 
 class TestGPGUtils:
@@ -198,5 +201,50 @@ class TestGPGUtilsEdgeCases:
                 os.unlink(encrypted_path)
 
 
+class TestGPGProfiles:
+    """Test cases for GPG encryption profiles"""
+
+    def test_profile_args(self):
+        """Test the gpg options generated by profiles"""
+        assert profile_args(None) == []
+        assert profile_args('default') == []
+        assert profile_args('fast') == ['--cipher-algo', 'AES128', '--compress-algo', 'none']
+        assert profile_args({'compress_level': '3', 's2k_digest': 'sha512'}) == [
+            '--compress-level', '3', '--s2k-digest-algo', 'SHA512']
+        for profile in GPG_PROFILES:
+            profile_args(profile)
+        for invalid in ['turbo', {'cipher': 'ROT13'}, {'compress_level': 10}, {'s2k_count': 10},
+                        {'armor': True}]:
+            with pytest.raises(ValueError):
+                profile_args(invalid)
+
+    def test_parse_profile(self):
+        """Test profile specs from the command line"""
+        assert parse_profile('fast') == GPG_PROFILES['fast']
+        assert parse_profile('compress-algo=ZLIB, compress_level=1') == {'compress_algo': 'zlib', 'compress_level': 1}
+        assert parse_profile('strong,s2k_count=1048576')['s2k_count'] == 1048576
+        assert parse_profile('strong,s2k_count=1048576')['s2k_digest'] == 'SHA512'
+        for invalid in ['turbo', 'cipher=ROT13', 'level=3', 'compress_level=x']:
+            with pytest.raises(ValueError):
+                parse_profile(invalid)
+
+    @pytest.mark.skipif(shutil.which('gpg') is None, reason="gpg not available")
+    def test_encrypt_with_profiles(self, tmp_path):
+        """Test that every profile produces a decryptable file and compression changes the size"""
+        content = 'Connections:\n' + ''.join(
+            f'  CONN_{i}:\n    - secret: "$$PASSWORD$$"\n      value: "value-{i}"\n' for i in range(500))
+        sizes = {}
+        for profile in GPG_PROFILES:
+            path = str(tmp_path / f'{profile}.yml.gpg')
+            assert encrypt_file(content, path, 'pw', profile=profile) == (True, None)
+            assert decrypt_file(path, 'pw') == (True, content, None)
+            sizes[profile] = os.path.getsize(path)
+        assert sizes['fast'] > len(content) > sizes['balanced'] >= sizes['compact']
+
+        success, error = encrypt_file(content, str(tmp_path / 'bad.gpg'), 'pw', profile='turbo')
+        assert not success and error
+        assert not os.path.exists(tmp_path / 'bad.gpg')
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
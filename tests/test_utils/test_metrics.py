@@ -0,0 +1,174 @@
+"""
+Test suite for the Prometheus textfile metrics export
+"""
+import pytest
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+from yamlconverter.cli.main import main
+from yamlconverter.converters.pipeline import convert_file
+from yamlconverter.converters.search_index import update_index
+from yamlconverter.utils import metrics
+from yamlconverter.utils.gpg_utils import decrypt_bytes_async, encrypt_file
+from yamlconverter.utils.metrics import (
+    RESERVED_LABELS, MetricsRecorder, Tally, active_recorder, inc, parse_labels, record_gpg,
+)
+from yamlconverter.utils.profiling import span
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+# Riga di un campione nel formato testuale di Prometheus
+SAMPLE_RE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+def write_rlist(path, connections, secrets=2):
+    """Write a synthetic rlist"""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('Connections:\n')
+        for i in range(connections):
+            f.write(f'  CONN_{i:04d}:\n')
+            for j in range(secrets):
+                f.write(f'    - secret: "$$S{j}$$"\n      value: "v{i}-{j}"\n')
+
+
+def assert_exposition(text):
+    """Every line must be a HELP/TYPE comment or a valid sample"""
+    assert text.endswith('\n')
+    for line in text.splitlines():
+        assert line.startswith(('# HELP ', '# TYPE ')) or SAMPLE_RE.match(line), line
+
+
+class TestMetrics:
+    """Test cases for metrics.py"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_no_recorder(self):
+        """Test that the hooks do nothing without an active recorder"""
+        rows = iter([1, 2])
+        assert active_recorder() is None
+        assert Tally().wrap(rows) is rows
+        inc('rows_total', 5, mode='yaml_to_excel')
+        record_gpg('decrypt', False)
+        with MetricsRecorder() as recorder:
+            with pytest.raises(RuntimeError):
+                MetricsRecorder().start()
+        assert active_recorder() is None and recorder.render() == ''
+
+    def test_render(self):
+        """Test counters, escaped labels and cumulative histogram buckets"""
+        recorder = MetricsRecorder({'job': 'a "b"\\c\nd'})
+        recorder.inc('rows_total', 3, mode='yaml_to_excel')
+        recorder.inc('rows_total', 2, mode='yaml_to_excel')
+        for seconds in (0.003, 0.2, 0.2, 1000):
+            recorder.observe('stage_duration_seconds', seconds, stage='parse')
+        with pytest.raises(KeyError):
+            recorder.inc('unknown_total')
+        text = recorder.render()
+        assert_exposition(text)
+        assert 'yamlconverter_rows_total{job="a \\"b\\"\\\\c\\nd",mode="yaml_to_excel"} 5\n' in text
+        buckets = re.findall(r'stage_duration_seconds_bucket\{.*le="([^"]+)"\} (\d+)', text)
+        assert buckets[0] == ('0.01', '1') and ('0.25', '3') in buckets and ('900', '3') in buckets
+        assert buckets[-1] == ('+Inf', '4')
+        assert 'yamlconverter_stage_duration_seconds_count{job="a \\"b\\"\\\\c\\nd",stage="parse"} 4\n' in text
+        assert text.count('# TYPE yamlconverter_stage_duration_seconds histogram') == 1
+
+        assert parse_labels(['job=nightly', ' host = a=b ']) == {'job': 'nightly', 'host': 'a=b'}
+        for spec in ('job', '1x=a', '__name__=a'):
+            with pytest.raises(ValueError):
+                parse_labels([spec])
+
+    @pytest.mark.parametrize('name', sorted(RESERVED_LABELS))
+    def test_reserved_labels(self, name, capsys):
+        """Test that constant labels cannot clash with the hook and bucket labels"""
+        with pytest.raises(ValueError):
+            parse_labels([f'{name}=x'])
+        assert main(['--metrics', os.devnull, '--metrics-label', f'{name}=x', 'stats', os.devnull]) == 2
+        assert 'invalid_metrics_label' in capsys.readouterr().err
+
+    def test_conversions_and_cache(self, temp_dir, monkeypatch):
+        """Test files, rows, bytes and stage durations of both modes and the index cache hits"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 50)
+        csv_path = os.path.join(temp_dir, 'a.csv')
+        back_path = os.path.join(temp_dir, 'b.yml')
+        index_path = os.path.join(temp_dir, 'index.db')
+        with MetricsRecorder() as recorder:
+            assert convert_file(yaml_path, csv_path)[0]
+            assert convert_file(csv_path, back_path, streaming=True)[0]
+            assert not convert_file(os.path.join(temp_dir, 'bad.csv'), back_path, mode='excel_to_yaml')[0]
+            assert update_index([yaml_path], index_path)[0]
+            assert update_index([yaml_path], index_path)[0]
+        assert recorder.get('files_converted_total', mode='yaml_to_excel', result='success') == 1
+        assert recorder.get('files_converted_total', mode='excel_to_yaml', result='success') == 1
+        assert recorder.get('files_converted_total', mode='excel_to_yaml', result='failure') == 1
+        assert recorder.get('rows_total', mode='yaml_to_excel') == 100
+        assert recorder.get('rows_total', mode='excel_to_yaml') == 100
+        assert recorder.get('bytes_in_total', mode='yaml_to_excel') == os.path.getsize(yaml_path)
+        assert recorder.get('bytes_out_total', mode='excel_to_yaml') == os.path.getsize(back_path)
+        assert recorder.get('cache_hits_total', cache='index') == 1
+        assert recorder.get('cache_misses_total', cache='index') == 1
+        stages = {dict(labels)['stage'] for (name, labels) in recorder.histograms}
+        assert {'convert', 'plan', 'parse', 'write', 'open'} <= stages
+
+        # Ripiego dello streaming su input non raggruppato: solo la rilettura completa viene contata
+        with open(csv_path, 'a', encoding='utf-8', newline='') as f:
+            f.write('CONN_0000[2],$$S2$$,late\n')
+        with MetricsRecorder() as recorder:
+            assert convert_file(csv_path, back_path, streaming=True)[0]
+        assert recorder.get('rows_total', mode='excel_to_yaml') == 101
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="gpg not available")
+    def test_gpg_failures(self, temp_dir):
+        """Test GPG operations and failures of the sync and async helpers"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 3)
+        gpg_path = yaml_path + '.gpg'
+        with MetricsRecorder() as recorder:
+            with open(yaml_path, encoding='utf-8') as f:
+                assert encrypt_file(f.read(), gpg_path, 'pw')[0]
+            assert not convert_file(gpg_path, os.path.join(temp_dir, 'a.csv'), password='wrong')[0]
+            assert asyncio.run(decrypt_bytes_async(gpg_path, 'pw'))[0]
+        assert recorder.get('gpg_operations_total', operation='encrypt') == 1
+        assert recorder.get('gpg_operations_total', operation='decrypt') == 2
+        assert recorder.get('gpg_failures_total', operation='decrypt') == 1
+        assert recorder.get('gpg_failures_total', operation='encrypt') == 0
+        assert recorder.get('files_converted_total', mode='yaml_to_excel', result='failure') == 1
+
+    def test_cli(self, temp_dir, capsys):
+        """Test the --metrics option, constant labels, run gauges and the atomic write"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 5)
+        metrics_path = os.path.join(temp_dir, 'run.prom')
+        assert main(['--metrics', metrics_path, '--metrics-label', 'job=nightly',
+                     'convert', yaml_path, os.path.join(temp_dir, 'a.xlsx')]) == 0
+        with open(metrics_path, encoding='utf-8') as f:
+            text = f.read()
+        assert_exposition(text)
+        assert 'yamlconverter_rows_total{job="nightly",mode="yaml_to_excel"} 10\n' in text
+        assert 'yamlconverter_run_exit_code{command="convert",job="nightly"} 0\n' in text
+        assert 'yamlconverter_run_timestamp_seconds{command="convert",job="nightly"}' in text
+
+        assert main(['--metrics', metrics_path, 'stats', os.path.join(temp_dir, 'missing.yml')]) == 2
+        with open(metrics_path, encoding='utf-8') as f:
+            assert 'yamlconverter_run_exit_code{command="stats"} 2\n' in f.read()
+        assert metrics.active_recorder() is None
+
+        assert main(['--metrics', metrics_path, '--metrics-label', 'bad', 'stats', yaml_path]) == 2
+        assert 'invalid_metrics_label' in capsys.readouterr().err
+        assert main(['--metrics', os.path.join(temp_dir, 'missing', 'run.prom'), 'stats', yaml_path]) == 1
+        assert 'error_metrics' in capsys.readouterr().err
+        with span('idle'):
+            pass
+        assert sorted(os.listdir(temp_dir)) == ['a.xlsx', 'a.yml', 'run.prom']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,144 @@
+"""
+Test suite for conversion profiling (Chrome trace and speedscope export)
+"""
+import pytest
+import json
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+from yamlconverter.cli.main import main
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel
+from yamlconverter.utils import profiling
+from yamlconverter.utils.profiling import Profiler, active_profiler, profile_format, span, traced_batches
+from yamlconverter.utils.streams import write_text_atomic
+
+
+def write_rlist(path, connections, secrets=2):
+    """Write a synthetic rlist"""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('Connections:\n')
+        for i in range(connections):
+            f.write(f'  CONN_{i:04d}:\n')
+            for j in range(secrets):
+                f.write(f'    - secret: "$$S{j}$$"\n      value: "v{i}-{j}"\n')
+
+
+def assert_nested(events):
+    """Spans of the same thread must be nested or disjoint (required by trace viewers)"""
+    by_thread = defaultdict(list)
+    for event in events:
+        by_thread[event['tid']].append((event['ts'], event['ts'] + event['dur']))
+    for intervals in by_thread.values():
+        stack = []
+        for start, end in sorted(intervals, key=lambda interval: (interval[0], -interval[1])):
+            while stack and stack[-1] <= start + 0.01:
+                stack.pop()
+            assert not stack or end <= stack[-1] + 0.01
+            stack.append(end)
+
+
+class TestProfiling:
+    """Test cases for profiling.py"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_no_profiler(self):
+        """Test that the hooks do nothing without an active profiler"""
+        rows = iter([{'Name': 'A[0]'}])
+        assert active_profiler() is None
+        assert traced_batches(rows, 'batch', lambda row: row['Name']) is rows
+        with span('idle'):
+            pass
+        with Profiler(sampling=False) as profiler:
+            with pytest.raises(RuntimeError):
+                Profiler().start()
+        assert active_profiler() is None and profiler.spans == []
+
+    def test_batches(self):
+        """Test one span per batch of consecutive groups"""
+        items = ['a', 'a', 'b', 'c', 'c', 'c', 'd', 'e']
+        with Profiler(sampling=False) as profiler:
+            assert list(traced_batches(items, 'batch', lambda item: item, batch_size=2)) == items
+        assert [item.args for item in profiler.spans] == [
+            {'first': 'a', 'last': 'b', 'items': 3},
+            {'first': 'c', 'last': 'd', 'items': 4},
+            {'first': 'e', 'last': 'e', 'items': 1},
+        ]
+
+    def test_chrome_trace(self, temp_dir, monkeypatch):
+        """Test stage and batch spans of both conversions in the Chrome trace-event format"""
+        monkeypatch.setattr('yamlconverter.converters.custom_yaml_to_excel.PARALLEL_MIN_CHUNK_BYTES', 2048)
+        monkeypatch.setattr(profiling, 'BATCH_CONNECTIONS', 50)
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 300)
+        csv_path = os.path.join(temp_dir, 'a.csv')
+        with Profiler(interval=0.0005) as profiler:
+            assert custom_yaml_to_excel(yaml_path, csv_path, streaming=True)[0]
+            assert custom_excel_to_yaml(csv_path, os.path.join(temp_dir, 'b.yml'))[0]
+        trace = profiler.chrome_trace()
+        json.dumps(trace)
+        spans = [event for event in trace['traceEvents'] if event['ph'] == 'X' and event['cat'] != 'python']
+        names = [event['name'] for event in spans]
+        assert {'write', 'open', 'rebuild', 'parse_batch'} <= set(names)
+        batches = [event['args'] for event in spans if event['name'] == 'connection_batch']
+        assert len(batches) == 12 and batches[0] == {'first': 'CONN_0000', 'last': 'CONN_0049', 'items': 100}
+        assert_nested(spans)
+        samples = [event for event in trace['traceEvents'] if event.get('cat') == 'python']
+        assert all(event['tid'] == profiling.SAMPLES_TID for event in samples)
+        assert_nested(samples)
+
+    def test_speedscope(self, temp_dir):
+        """Test balanced evented profiles and weighted samples in the speedscope format"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 2000)
+        with Profiler(interval=0.0005) as profiler:
+            assert custom_yaml_to_excel(yaml_path, os.path.join(temp_dir, 'a.xlsx'))[0]
+        data = profiler.speedscope()
+        evented, sampled = data['profiles']
+        depth = 0
+        last = 0
+        for event in evented['events']:
+            assert event['at'] >= last
+            last = event['at']
+            depth += 1 if event['type'] == 'O' else -1
+            assert depth >= 0
+        assert depth == 0
+        assert len(sampled['samples']) == len(sampled['weights']) > 0
+        frame_count = len(data['shared']['frames'])
+        assert all(0 <= index < frame_count for stack in sampled['samples'] for index in stack)
+
+    def test_cli_and_atomic_write(self, temp_dir, capsys):
+        """Test the --profile option, the format chosen from the name and the atomic write"""
+        yaml_path = os.path.join(temp_dir, 'a.yml')
+        write_rlist(yaml_path, 20)
+        trace_path = os.path.join(temp_dir, 'run.json')
+        assert main(['convert', yaml_path, os.path.join(temp_dir, 'a.csv'), '--profile', trace_path]) == 0
+        assert 'profile_written' in capsys.readouterr().err
+        with open(trace_path, encoding='utf-8') as f:
+            names = {event['name'] for event in json.load(f)['traceEvents']}
+        assert {'convert', 'plan', 'parse', 'write'} <= names
+
+        speedscope_path = os.path.join(temp_dir, 'run.speedscope.json')
+        assert profile_format(speedscope_path) == 'speedscope'
+        assert main(['convert', yaml_path, os.path.join(temp_dir, 'b.csv'), '--profile', speedscope_path]) == 0
+        with open(speedscope_path, encoding='utf-8') as f:
+            assert json.load(f)['$schema'] == profiling.SPEEDSCOPE_SCHEMA
+        assert main(['convert', yaml_path, os.path.join(temp_dir, 'c.csv'),
+                     '--profile', os.path.join(temp_dir, 'missing', 'run.json')]) == 1
+
+        write_text_atomic(trace_path, 'new')
+        with open(trace_path, encoding='utf-8') as f:
+            assert f.read() == 'new'
+        assert sorted(os.listdir(temp_dir)) == ['a.csv', 'a.yml', 'b.csv', 'c.csv', 'run.json',
+                                                'run.speedscope.json']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
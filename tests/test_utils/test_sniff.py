@@ -0,0 +1,168 @@
+"""
+Test suite for content-sniffing format detection
+"""
+import pytest
+import asyncio
+import gzip
+import json
+import lzma
+import os
+import shutil
+import tempfile
+from openpyxl import load_workbook
+from yamlconverter.cli.main import main
+from yamlconverter.converters.inventory import file_stats
+from yamlconverter.converters.pipeline import convert_file
+from yamlconverter.converters.readers import open_rows
+from yamlconverter.utils.gpg_utils import encrypt_bytes_async, encrypt_file, is_encrypted_file
+from yamlconverter.utils.sniff import (
+    conversion_for_chain, describe_chain, register_format, sniff_bytes, sniff_conversion_mode, sniff_file,
+    _FORMATS,
+)
+
+GPG_AVAILABLE = shutil.which('gpg') is not None
+
+RLIST = 'Connections:\n  SAP_SOAP:\n    - secret: "$$PASSWORD$$"\n      value: "pw"\n'
+
+
+class TestSniff:
+    """Test cases for sniff_bytes and the format registry"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a temporary directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_text_formats(self):
+        """Test YAML, CSV, TSV and NDJSON recognition from the first meaningful line"""
+        assert sniff_bytes(b'# comment\n' + RLIST.encode()) == ['yaml']
+        assert sniff_bytes('\ufeffé: x\n'.encode('utf-8')) == ['yaml']
+        assert sniff_bytes(b'Name,Secret,Value\nA[0],$$USER$$,bob\n') == ['csv']
+        assert sniff_bytes(b'Name\tSecret\tValue\n') == ['tsv']
+        assert sniff_bytes(b'{"Name": "A[0]", "Secret": "", "Value": ""}\n') == ['ndjson']
+        assert sniff_bytes(b'\x00\x01\x02binary') == []
+        assert sniff_bytes(b'') == []
+
+    def test_compressed_chains(self):
+        """Test that compression layers are unwrapped from the first bytes only"""
+        assert sniff_bytes(gzip.compress(RLIST.encode())) == ['gzip', 'yaml']
+        assert sniff_bytes(lzma.compress(b'Name,Secret,Value\n')) == ['xz', 'csv']
+        # Un blocco troncato resta riconoscibile
+        assert sniff_bytes(gzip.compress(RLIST.encode() * 1000)[:64]) == ['gzip', 'yaml']
+
+    def test_gpg_layers(self):
+        """Test binary and armored packets, with the inner format guessed from the name"""
+        skesk = bytes([0x8c, 0x0d, 0x04, 0x09, 0x03, 0x08])
+        assert sniff_bytes(skesk, 'secrets.yml.gpg') == ['gpg', 'yaml']
+        assert sniff_bytes(skesk, 'secrets.xlsx.gpg') == ['gpg', 'xlsx']
+        assert sniff_bytes(skesk, 'blob') == ['gpg']
+        assert sniff_bytes(skesk, 'secrets.yml.gz.gpg') == ['gpg', 'gzip', 'yaml']
+        assert sniff_bytes(skesk, 'secrets.csv.xz.gpg') == ['gpg', 'xz', 'csv']
+        armor = b'-----BEGIN PGP MESSAGE-----\n\njA0EBwMC\n'
+        assert sniff_bytes(armor, 'secrets.csv.asc') == ['gpg-armor', 'csv']
+        # Testo UTF-8 che inizia con un byte con il bit alto non è un pacchetto
+        assert sniff_bytes('é\n'.encode('utf-8')) == []
+
+    def test_register_format(self):
+        """Test that a registered format is tried before an existing one"""
+        register_format('ini', lambda head: head.startswith(b'['), before='yaml')
+        try:
+            assert sniff_bytes(b'[section]\nkey = value\n') == ['ini']
+            assert sniff_bytes(RLIST.encode()) == ['yaml']
+        finally:
+            _FORMATS[:] = [entry for entry in _FORMATS if entry[0] != 'ini']
+
+    def test_conversion_for_chain(self, temp_dir):
+        """Test conversion modes derived from chains and output extensions"""
+        assert conversion_for_chain(['gzip', 'yaml']) == ('yaml_to_excel', None)
+        assert conversion_for_chain(['gpg']) == ('yaml_to_excel', None)
+        assert conversion_for_chain(['xlsx']) == ('excel_to_yaml', 'xlsx')
+        assert conversion_for_chain([]) == (None, None)
+        assert describe_chain(['gpg', 'gzip', 'yaml']) == 'gpg → gzip → yaml'
+        assert describe_chain([]) == '?'
+
+        path = os.path.join(temp_dir, 'export')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('Name,Secret,Value\n')
+        assert sniff_conversion_mode(path, 'out.yml') == ('excel_to_yaml', 'csv')
+        assert sniff_conversion_mode(path, 'out.csv') == (None, None)
+        assert sniff_file(os.path.join(temp_dir, 'missing')) == []
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="GPG not installed")
+    def test_misnamed_encrypted_input(self, temp_dir):
+        """Test conversion of an encrypted YAML without the .gpg extension"""
+        path = os.path.join(temp_dir, 'secrets.bin')
+        assert encrypt_file(RLIST, path, 'pw') == (True, None)
+        assert is_encrypted_file(path)
+        assert sniff_file(path) == ['gpg']
+
+        output = os.path.join(temp_dir, 'out.xlsx')
+        assert not convert_file(path, output)[0]
+        success, warnings, error = convert_file(path, output, password='pw')
+        assert success, error
+        sheet = load_workbook(output).active
+        assert [cell.value for cell in sheet[2]] == ['SAP_SOAP[0]', '$$PASSWORD$$', 'pw']
+
+    @pytest.mark.skipif(not GPG_AVAILABLE, reason="GPG not installed")
+    def test_compressed_encrypted_input(self, temp_dir):
+        """Test that a gpg → gzip → yaml (or csv) chain is decrypted and decompressed by every reader"""
+        yaml_path = os.path.join(temp_dir, 'secrets.yml.gz.gpg')
+        data = gzip.compress(RLIST.replace('\n', '\r\n').encode('utf-8'))
+        assert asyncio.run(encrypt_bytes_async(data, yaml_path, 'pw')) == (True, None)
+        assert sniff_file(yaml_path) == ['gpg', 'gzip', 'yaml']
+
+        csv_path = os.path.join(temp_dir, 'secrets.csv')
+        success, _warnings, error = convert_file(yaml_path, csv_path, password='pw')
+        assert success, error
+        with open(csv_path, encoding='utf-8') as f:
+            assert f.read().splitlines()[1] == 'SAP_SOAP[0],$$PASSWORD$$,pw'
+        with open_rows(yaml_path, password='pw') as rows:
+            assert [row['Name'] for row in rows] == ['SAP_SOAP[0]']
+        assert file_stats(yaml_path, 'pw')['rows'] == 1
+
+        table_path = os.path.join(temp_dir, 'secrets.csv.gz.gpg')
+        with open(csv_path, 'rb') as f:
+            data = gzip.compress(f.read())
+        assert asyncio.run(encrypt_bytes_async(data, table_path, 'pw')) == (True, None)
+        output = os.path.join(temp_dir, 'back.yml')
+        success, _warnings, error = convert_file(table_path, output, password='pw')
+        assert success, error
+        with open(output, encoding='utf-8') as f:
+            assert f.read() == RLIST
+
+    def test_cli_detect(self, temp_dir, capsys):
+        """Test the detect command output and exit codes"""
+        yaml_path = os.path.join(temp_dir, 'data')
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            f.write(RLIST)
+        gz_path = os.path.join(temp_dir, 'data.yml.gz')
+        with gzip.open(gz_path, 'wt', encoding='utf-8') as f:
+            f.write(RLIST)
+        assert main(['detect', yaml_path, gz_path]) == 0
+        assert capsys.readouterr().out == f"{yaml_path}: yaml\n{gz_path}: gzip → yaml\n"
+
+        assert main(['detect', '--format', 'json', gz_path]) == 0
+        assert json.loads(capsys.readouterr().out) == [
+            {'path': gz_path, 'chain': ['gzip', 'yaml'], 'mode': 'yaml_to_excel'}]
+
+        binary_path = os.path.join(temp_dir, 'blob')
+        with open(binary_path, 'wb') as f:
+            f.write(b'\x00\x01')
+        assert main(['detect', binary_path]) == 1
+        assert main(['detect', os.path.join(temp_dir, 'missing')]) == 2
+
+        # Conversione di un input senza estensione: modalità dedotta dal contenuto
+        table_path = os.path.join(temp_dir, 'out.csv')
+        assert main(['convert', yaml_path, table_path]) == 0
+        export_path = os.path.join(temp_dir, 'export')
+        os.replace(table_path, export_path)
+        back_path = os.path.join(temp_dir, 'back.yml')
+        assert main(['convert', export_path, back_path]) == 0
+        with open(back_path, encoding='utf-8') as f:
+            assert f.read() == RLIST
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
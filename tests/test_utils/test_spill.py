@@ -0,0 +1,91 @@
+"""
+Test suite for the SQLite spill store
+"""
+import pytest
+import io
+import os
+from yamlconverter.converters.custom_excel_to_yaml import (
+    connection_name_of, custom_excel_to_yaml, format_yaml_custom, rebuild_or_spill, rebuild_yaml_structure,
+    write_yaml_streaming,
+)
+from yamlconverter.converters.merge import merge_files
+from yamlconverter.utils.spill import SpillStore, collect_rows, row_index
+
+
+def row(name, secret, value):
+    return {'Name': name, 'Secret': secret, 'Value': value}
+
+
+# Connessioni non raggruppate, con un indice mancante e una sovrascrittura
+UNGROUPED_ROWS = [
+    row('B_CONN[0]', '$$USER$$', 'bob'),
+    row('A_CONN[1]', '$$PASSWORD$$', 'pw'),
+    row('B_CONN[1]', '$$PASSWORD$$', "it's"),
+    row('A_CONN[0]', '$$USER$$', 'alice'),
+    row('C_CONN[2]', '$$TOKEN$$', 'tok'),
+    row('B_CONN[0]', '$$USER$$', 'bobby'),
+    row('SIMPLE', '', 'plain'),
+]
+
+
+class TestSpill:
+    """Test cases for SpillStore, collect_rows and rebuild_or_spill"""
+
+    def test_row_index(self):
+        """Test parsing of the trailing index"""
+        assert row_index('SAP_SOAP[12]') == 12
+        assert row_index('SIMPLE') == -1
+        assert row_index('ODD[x]') == -1
+
+    def test_store_orders(self):
+        """Test read back in first-seen and name order, batched over several transactions"""
+        with SpillStore(connection_name_of) as store:
+            assert store.add_rows(UNGROUPED_ROWS, batch_size=2) == len(UNGROUPED_ROWS)
+            first_seen = [r['Name'] for r in store.iter_rows()]
+            assert first_seen == ['B_CONN[0]', 'B_CONN[0]', 'B_CONN[1]', 'A_CONN[0]', 'A_CONN[1]',
+                                  'C_CONN[2]', 'SIMPLE']
+            by_name = [connection_name_of(r['Name']) for r in store.iter_rows(order='name')]
+            assert by_name == sorted(by_name)
+            path = store.path
+            assert os.path.exists(path)
+        assert not os.path.exists(path)
+
+    def test_collect_rows_budget(self):
+        """Test that rows stay in memory within the budget and spill above it"""
+        assert collect_rows(UNGROUPED_ROWS, connection_name_of) == UNGROUPED_ROWS
+        store = collect_rows(iter(UNGROUPED_ROWS), connection_name_of, memory_budget=1000)
+        with store:
+            assert isinstance(store, SpillStore)
+            assert store.count == len(UNGROUPED_ROWS)
+
+    @pytest.mark.parametrize('budget', [0, 1000, 1500])
+    def test_spilled_yaml_is_identical(self, budget):
+        """Test that the spilled rebuild writes the same YAML as the in-memory one"""
+        expected = format_yaml_custom(rebuild_yaml_structure(UNGROUPED_ROWS))
+        yaml_data, store = rebuild_or_spill(iter(UNGROUPED_ROWS), memory_budget=budget)
+        assert yaml_data is None
+        buffer = io.StringIO()
+        with store:
+            write_yaml_streaming(store.iter_rows(), buffer)
+        assert buffer.getvalue() == expected
+
+    def test_converter_memory_budget(self, tmp_path):
+        """Test the converter and the merge with a tiny memory budget"""
+        csv_file = tmp_path / 'rows.csv'
+        csv_file.write_text('Name,Secret,Value\n' + ''.join(
+            f"{r['Name']},{r['Secret']},\"{r['Value']}\"\n" for r in UNGROUPED_ROWS), encoding='utf-8')
+        expected = format_yaml_custom(rebuild_yaml_structure(UNGROUPED_ROWS))
+
+        output = tmp_path / 'out.yml'
+        success, _warnings, error = custom_excel_to_yaml(str(csv_file), str(output), memory_budget=0)
+        assert success, error
+        assert output.read_text(encoding='utf-8') == expected
+
+        merged = tmp_path / 'merged.ndjson'
+        success, _warnings, error = merge_files([str(csv_file)], str(merged), memory_budget=0)
+        assert success, error
+        assert '"SIMPLE"' in merged.read_text(encoding='utf-8').splitlines()[-1]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
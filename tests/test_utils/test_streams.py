@@ -0,0 +1,231 @@
+"""
+Test suite for stream/stdio support in the converters
+"""
+import pytest
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tempfile
+from openpyxl import load_workbook
+from yamlconverter.converters.custom_yaml_to_excel import custom_yaml_to_excel, ScanningReader
+from yamlconverter.converters.custom_excel_to_yaml import custom_excel_to_yaml
+from yamlconverter.utils.formats import detect_conversion_mode, format_extension, suggest_output_path
+from yamlconverter.utils.streams import (
+    describe, is_text_stream, open_binary_input, open_binary_output, open_text_input,
+    open_text_output, sniff_compression, zstandard,
+)
+
+SAMPLE_YAML = """Connections:
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/api"
+  DB_MAIN:
+    - secret: "$$USER$$"
+      value: "admin"
+  SAP_SOAP:
+    - secret: "$$ENDPOINT$$"
+      value: "https://example.com/v2"
+"""
+
+
+class NonSeekable(io.RawIOBase):
+    """Binary stream that behaves like a pipe (no seek)"""
+
+    def __init__(self, data: bytes = b''):
+        self._source = io.BytesIO(data)
+        self.written = bytearray()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def readinto(self, buffer):
+        data = self._source.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def write(self, data):
+        self.written.extend(data)
+        return len(data)
+
+
+class TestStreamHelpers:
+    """Test cases for the stream helpers"""
+
+    def test_text_stream_detection(self):
+        """Test text vs binary stream detection"""
+        assert is_text_stream(io.StringIO())
+        assert not is_text_stream(io.BytesIO())
+        assert not is_text_stream(NonSeekable())
+
+    def test_describe(self):
+        """Test readable names for paths, streams and stdio"""
+        assert describe('a.yml') == 'a.yml'
+        assert describe('-') == '<stdio>'
+        assert describe(io.BytesIO()) == '<stream>'
+
+    def test_binary_input_spools_non_seekable(self):
+        """Test that a non-seekable input is spooled only when requested"""
+        pipe = NonSeekable(b'payload')
+        with open_binary_input(pipe, seekable=True) as f:
+            assert f is not pipe
+            assert f.seekable()
+            assert f.read() == b'payload'
+
+        seekable = io.BytesIO(b'payload')
+        with open_binary_input(seekable, seekable=True) as f:
+            assert f is seekable
+
+    def test_binary_output_spools_non_seekable(self):
+        """Test that data written to a pipe arrives only once complete"""
+        pipe = NonSeekable()
+        with open_binary_output(pipe, seekable=True) as f:
+            f.write(b'abc')
+            f.seek(0)
+            f.write(b'A')
+            assert pipe.written == b''
+        assert bytes(pipe.written) == b'Abc'
+
+    def test_text_output_does_not_close_caller_stream(self):
+        """Test that a caller-owned binary stream stays open"""
+        target = io.BytesIO()
+        with open_text_output(target) as f:
+            f.write('Connections:\n')
+        assert not target.closed
+        assert target.getvalue() == b'Connections:\n'
+
+    def test_detect_mode_with_stdio(self):
+        """Test mode detection when one side is '-'"""
+        assert detect_conversion_mode('-', 'out.xlsx') == 'yaml_to_excel'
+        assert detect_conversion_mode('-', 'out.yml') == 'excel_to_yaml'
+        assert detect_conversion_mode('in.yml', '-') == 'yaml_to_excel'
+        assert detect_conversion_mode('-', '-') is None
+
+
+class TestStreamConversion:
+    """Test cases for converters reading from and writing to streams"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_scanning_reader_finds_duplicates(self):
+        """Test that duplicates are detected during the single read"""
+        reader = ScanningReader(io.StringIO(SAMPLE_YAML))
+        while reader.read(7):
+            pass
+        assert reader.connection_names == ['SAP_SOAP', 'DB_MAIN', 'SAP_SOAP']
+
+    def test_yaml_stream_matches_file(self, work_dir):
+        """Test that stream input gives the same rows and warnings as a file"""
+        yaml_path = os.path.join(work_dir, 'in.yml')
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_YAML)
+        file_xlsx = os.path.join(work_dir, 'file.xlsx')
+        file_result = custom_yaml_to_excel(yaml_path, file_xlsx)
+
+        pipe = NonSeekable()
+        stream_result = custom_yaml_to_excel(NonSeekable(SAMPLE_YAML.encode('utf-8')), pipe)
+        assert stream_result[0]
+        assert stream_result[1] == file_result[1]
+
+        stream_xlsx = os.path.join(work_dir, 'stream.xlsx')
+        with open(stream_xlsx, 'wb') as f:
+            f.write(pipe.written)
+        rows_file = list(load_workbook(file_xlsx).active.iter_rows(values_only=True))
+        rows_stream = list(load_workbook(stream_xlsx).active.iter_rows(values_only=True))
+        assert rows_stream == rows_file
+
+    @pytest.mark.parametrize('streaming', [False, True])
+    def test_excel_stream_round_trip(self, streaming):
+        """Test xlsx from a pipe to YAML on a pipe"""
+        xlsx = NonSeekable()
+        assert custom_yaml_to_excel(io.StringIO(SAMPLE_YAML), xlsx)[0]
+
+        output = NonSeekable()
+        success, warnings, error = custom_excel_to_yaml(NonSeekable(bytes(xlsx.written)), output,
+                                                        streaming=streaming)
+        assert success, error
+        text = bytes(output.written).decode('utf-8')
+        assert text.startswith('Connections:\n  SAP_SOAP:')
+        assert '"https://example.com/v2"' in text
+        assert 'DB_MAIN' in text
+
+
+class TestCompression:
+    """Test cases for compressed YAML input/output"""
+
+    @pytest.fixture
+    def work_dir(self):
+        """Create a temporary working directory"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_compressed_extensions(self):
+        """Test format detection and output suggestions for compressed YAML"""
+        assert format_extension('secrets.rlist.yml.gz') == '.yml'
+        assert format_extension('archive.tar.gz') == '.gz'
+        assert detect_conversion_mode('secrets.yml.zst') == 'yaml_to_excel'
+        assert detect_conversion_mode('secrets.xlsx', 'secrets.yaml.xz') == 'excel_to_yaml'
+        assert suggest_output_path('secrets.rlist.yml.gz') == 'secrets.rlist.xlsx'
+
+    def test_sniff_compression(self):
+        """Test detection of compressed content from magic bytes"""
+        assert sniff_compression(gzip.compress(b'x')) == 'gzip'
+        assert sniff_compression(lzma.compress(b'x')) == 'xz'
+        assert sniff_compression(b'\x28\xb5\x2f\xfd\x00') == 'zstd'
+        assert sniff_compression(b'Connections:') is None
+
+    @pytest.mark.parametrize('extension, decompress', [('.gz', gzip.decompress), ('.xz', lzma.decompress)])
+    def test_round_trip(self, work_dir, extension, decompress):
+        """Test compressed YAML → Excel → compressed YAML"""
+        yaml_path = os.path.join(work_dir, 'in.yml' + extension)
+        with open_text_output(yaml_path) as f:
+            f.write(SAMPLE_YAML)
+        with open(yaml_path, 'rb') as f:
+            assert decompress(f.read()).decode('utf-8') == SAMPLE_YAML
+
+        excel_path = os.path.join(work_dir, 'out.xlsx')
+        success, warnings, error = custom_yaml_to_excel(yaml_path, excel_path)
+        assert success, error
+        assert any('SAP_SOAP' in warning for warning in warnings)
+
+        back_path = os.path.join(work_dir, 'back.yml' + extension)
+        success, _warnings, error = custom_excel_to_yaml(excel_path, back_path, streaming=True)
+        assert success, error
+        with open_text_input(back_path) as f:
+            assert '"https://example.com/v2"' in f.read()
+
+    def test_magic_bytes_without_extension(self, work_dir):
+        """Test that gzip content is recognized from a plain .yml name and from a stream"""
+        yaml_path = os.path.join(work_dir, 'disguised.yml')
+        with open(yaml_path, 'wb') as f:
+            f.write(gzip.compress(SAMPLE_YAML.encode('utf-8')))
+        with open_text_input(yaml_path) as f:
+            assert f.read() == SAMPLE_YAML
+        with open_text_input(io.BytesIO(gzip.compress(SAMPLE_YAML.encode('utf-8')))) as f:
+            assert f.read() == SAMPLE_YAML
+
+    @pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+    def test_zstd_round_trip(self, work_dir):
+        """Test zstd compressed output and input"""
+        yaml_path = os.path.join(work_dir, 'in.yml.zst')
+        with open_text_output(yaml_path) as f:
+            f.write(SAMPLE_YAML)
+        with open_text_input(yaml_path) as f:
+            assert f.read() == SAMPLE_YAML
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
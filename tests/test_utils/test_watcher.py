@@ -0,0 +1,155 @@
+"""
+Test suite for the file watcher (watch mode)
+"""
+import pytest
+import os
+import shutil
+import tempfile
+import threading
+import time
+from yamlconverter.utils.watcher import (
+    ConversionWatcher, PollingBackend, input_filter_for_mode, watch_output_path,
+)
+
+
+def _wait_until(predicate, timeout=5.0):
+    """Attende che predicate() diventi vero entro timeout secondi"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+def _touch(path, content):
+    """Scrive il file e forza un mtime diverso dal precedente"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestWatcherHelpers:
+    """Test cases for watcher helper functions"""
+
+    def test_input_filter_for_mode(self):
+        """Test input filtering by conversion mode"""
+        yaml_only = input_filter_for_mode('yaml_to_excel')
+        auto = input_filter_for_mode('auto')
+        assert yaml_only('/tmp/a.yml')
+        assert yaml_only('/tmp/a.yml.gpg')
+        assert not yaml_only('/tmp/a.xlsx')
+        assert auto('/tmp/a.xlsx')
+        assert not auto('/tmp/~$a.xlsx')
+        assert not auto('/tmp/notes.txt')
+
+    def test_watch_output_path(self):
+        """Test output path computation"""
+        assert watch_output_path('/data/secrets.yml.gpg') == os.path.normpath('/data/secrets.xlsx')
+        assert watch_output_path('/data/secrets.xlsx', '/out') == os.path.join('/out', 'secrets.yml')
+        assert watch_output_path('/data/secrets.xlsx', encrypt=True) == os.path.normpath('/data/secrets.yml.gpg')
+        assert watch_output_path('/data/notes.txt') is None
+
+
+class TestConversionWatcher:
+    """Test cases for ConversionWatcher"""
+
+    @pytest.fixture
+    def watch_dir(self):
+        """Create a temporary directory to watch"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_polling_backend_detects_change(self, watch_dir):
+        """Test that the polling backend reports modified files"""
+        path = os.path.join(watch_dir, 'a.yml')
+        _touch(path, 'Connections:\n')
+        backend = PollingBackend([watch_dir], input_filter_for_mode('auto'), interval=0.05)
+        _touch(path, 'Connections:\n  A:\n')
+        changed = set()
+        deadline = time.monotonic() + 2
+        while not changed and time.monotonic() < deadline:
+            changed = backend.wait(0.1)
+        backend.close()
+        assert path in changed
+
+    @pytest.mark.parametrize('use_inotify', [False, None])
+    def test_debounce_coalesces_bursts(self, watch_dir, use_inotify):
+        """Test that a burst of saves triggers a single conversion"""
+        path = os.path.join(watch_dir, 'a.yml')
+        _touch(path, 'Connections:\n')
+        calls = []
+
+        watcher = ConversionWatcher([watch_dir], lambda p: calls.append(p) or (True, [], None),
+                                    debounce=0.3, use_inotify=use_inotify, poll_interval=0.05)
+        watcher.start()
+        try:
+            for i in range(5):
+                _touch(path, f'Connections:\n  A{i}:\n')
+                time.sleep(0.02)
+            assert _wait_until(lambda: len(calls) >= 1)
+            time.sleep(0.5)
+        finally:
+            watcher.stop()
+        assert calls == [path]
+
+    def test_concurrency_cap(self, watch_dir):
+        """Test that no more than max_workers conversions run at once"""
+        paths = [os.path.join(watch_dir, f'f{i}.yml') for i in range(6)]
+        for path in paths:
+            _touch(path, 'Connections:\n')
+
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+        done = []
+
+        def job(path):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.2)
+            with lock:
+                active[0] -= 1
+                done.append(path)
+            return (True, [], None)
+
+        watcher = ConversionWatcher([watch_dir], job, debounce=0.05, max_workers=2,
+                                    use_inotify=False, poll_interval=0.05)
+        watcher.start()
+        try:
+            for path in paths:
+                _touch(path, 'Connections:\n  CHANGED:\n')
+            assert _wait_until(lambda: len(done) == len(paths))
+        finally:
+            watcher.stop()
+        assert peak[0] <= 2
+
+    def test_own_output_does_not_retrigger(self, watch_dir):
+        """Test that files written by a conversion do not start a new one"""
+        source = os.path.join(watch_dir, 'a.yml')
+        target = os.path.join(watch_dir, 'a.xlsx')
+        _touch(source, 'Connections:\n')
+        calls = []
+
+        def job(path):
+            calls.append(path)
+            _touch(target, 'fake workbook')
+            return (True, [], None)
+
+        watcher = ConversionWatcher([watch_dir], job, output_for=lambda p: target,
+                                    debounce=0.05, use_inotify=False, poll_interval=0.05)
+        watcher.start()
+        try:
+            _touch(source, 'Connections:\n  A:\n')
+            assert _wait_until(lambda: len(calls) >= 1)
+            time.sleep(0.5)
+        finally:
+            watcher.stop()
+        assert calls == [source]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])